@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import re
 import sys
+from collections.abc import Mapping
 from importlib import import_module
 from pathlib import Path
 
@@ -21,27 +23,72 @@ ENGINE_NAMES = {
 # Default engine_name = script_name without starting 'q' and capitalized
 engine_name = ENGINE_NAMES.get(script_name, script_name[1:].capitalize())
 
-# Each module in `qlever/commands` corresponds to a command. The name
-# of the command is the base name of the module file.
-package_path = Path(__file__).parent.parent / script_name
-command_names = [
-    Path(p).stem
-    for p in package_path.glob("commands/*.py")
-    if p.name != "__init__.py"
-]
-
-# Dynamically load all the command classes and create an object for each.
-command_objects = {}
-for command_name in command_names:
-    module_path = f"{script_name}.commands.{command_name}"
-    try:
-        module = import_module(module_path)
-    except ImportError as e:
-        raise Exception(
-            f"Could not import module {module_path} for {script_name}: {e}"
-        ) from e
-    # Create an object of the class and store it in the dictionary. For the
-    # commands, take - instead of _.
-    class_name = snake_to_camel(command_name) + "Command"
-    command_class = getattr(module, class_name)
-    command_objects[command_name.replace("_", "-")] = command_class()
+# The `description` method of a command, when it returns a string literal
+# (possibly split over several lines), see `CommandRegistry.description`.
+DESCRIPTION_REGEX = re.compile(
+    r"def description\(self\)[^:]*:\s*return\s*"
+    r"(\(\s*(?:\"[^\"\\\n]*\"\s*)+\)|\"[^\"\\\n]*\")\s*\n"
+)
+
+
+class CommandRegistry(Mapping):
+    """
+    The commands, by name. Each module in `qlever/commands` corresponds to a
+    command, the name of the command is the base name of the module file
+    (with - instead of _).
+
+    A module is only imported, and the object of its command class only
+    created, when the command is accessed (some of the modules import heavy
+    packages like `rdflib`, and each invocation of the script, including
+    each autocompletion, needs only one command). The description of a
+    command can be obtained without importing its module.
+    """
+
+    def __init__(self, package_path: Path, package_name: str):
+        self.package_name = package_name
+        self.module_files = {
+            p.stem.replace("_", "-"): p
+            for p in sorted(package_path.glob("commands/*.py"))
+            if p.name != "__init__.py"
+        }
+        self.command_objects = {}
+
+    def __getitem__(self, command_name: str):
+        if command_name not in self.command_objects:
+            module_name = self.module_files[command_name].stem
+            module_path = f"{self.package_name}.commands.{module_name}"
+            try:
+                module = import_module(module_path)
+            except ImportError as e:
+                raise Exception(
+                    f"Could not import module {module_path} for "
+                    f"{self.package_name}: {e}"
+                ) from e
+            class_name = snake_to_camel(module_name) + "Command"
+            command_class = getattr(module, class_name)
+            self.command_objects[command_name] = command_class()
+        return self.command_objects[command_name]
+
+    def __iter__(self):
+        return iter(self.module_files)
+
+    def __len__(self) -> int:
+        return len(self.module_files)
+
+    def description(self, command_name: str) -> str:
+        """
+        Get the description of the command. If `description` returns a string
+        literal, read it from the source of the module, otherwise import the
+        module.
+        """
+        if command_name not in self.command_objects:
+            source = self.module_files[command_name].read_text()
+            match = DESCRIPTION_REGEX.search(source)
+            if match:
+                return "".join(re.findall(r'"([^"]*)"', match.group(1)))
+        return self[command_name].description()
+
+
+command_objects = CommandRegistry(
+    Path(__file__).parent.parent / script_name, script_name
+)
@@ -0,0 +1,128 @@
+"""
+Sample the cache statistics of QLever servers periodically (see `qlever
+cache-stats --watch`), over one persistent HTTP connection per server, and
+compute what changed between two samples.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import time
+
+from qlever.http_client import PersistentHttpClient
+from qlever.util import parse_size
+
+# The fields of a sample and of its deltas to the previous sample, in the
+# order of the columns of a CSV file.
+SAMPLE_FIELDS = [
+    "time",
+    "endpoint",
+    "pinned_entries",
+    "unpinned_entries",
+    "pinned_size",
+    "unpinned_size",
+    "max_size",
+    "hits",
+    "misses",
+]
+DELTA_FIELDS = [
+    "seconds",
+    "delta_pinned_entries",
+    "delta_unpinned_entries",
+    "delta_size",
+    "size_churn",
+    "delta_hits",
+    "delta_misses",
+    "hit_rate",
+]
+
+
+def find_counter(stats: dict, regex: str) -> int | None:
+    """
+    Find a counter in the cache statistics whose name matches the regex (the
+    server does not necessarily expose hits and misses).
+    """
+    for key, value in stats.items():
+        if re.search(regex, key) and isinstance(value, int):
+            return value
+    return None
+
+
+class CacheStatsClient(PersistentHttpClient):
+    """
+    Get the cache statistics and settings of one server, over a persistent
+    HTTP connection.
+    """
+
+    def __init__(self, endpoint: str, timeout: float = 10):
+        super().__init__(endpoint, timeout)
+
+    def command(self, cmd: str):
+        """
+        Send the given command to the server and return the parsed JSON.
+        """
+        status, data = self.post({"cmd": cmd}, "application/json")
+        if status != 200:
+            raise Exception(
+                f"HTTP status {status} for cmd={cmd}: "
+                f"{data[:200].decode(errors='replace')}"
+            )
+        return json.loads(data)
+
+    def sample(self) -> dict:
+        """
+        Get the current cache statistics as a sample (with the fields from
+        `SAMPLE_FIELDS`; hits and misses are `None` if the server does not
+        expose them).
+        """
+        stats = self.command("cache-stats")
+        settings = self.command("get-settings")
+        if isinstance(settings, list):
+            settings = settings[0]
+        return {
+            "time": round(time.time(), 3),
+            "endpoint": self.endpoint,
+            "pinned_entries": stats.get("num-pinned-entries", 0),
+            "unpinned_entries": stats.get("num-non-pinned-entries", 0),
+            "pinned_size": stats.get("cache-size-pinned", 0),
+            "unpinned_size": stats.get("cache-size-unpinned", 0),
+            "max_size": parse_size(settings.get("cache-max-size", 0)),
+            "hits": find_counter(stats, r"hit"),
+            "misses": find_counter(stats, r"miss"),
+        }
+
+
+def compute_deltas(previous: dict, current: dict) -> dict:
+    """
+    Compute what changed between two samples of the same server (with the
+    fields from `DELTA_FIELDS`). The size churn is the sum of the absolute
+    changes of the pinned and the unpinned size (unlike the net change, it
+    also shows results that moved from the unpinned to the pinned part).
+    """
+    delta_pinned_size = current["pinned_size"] - previous["pinned_size"]
+    delta_unpinned_size = current["unpinned_size"] - previous["unpinned_size"]
+    deltas = {
+        "seconds": round(current["time"] - previous["time"], 3),
+        "delta_pinned_entries": current["pinned_entries"]
+        - previous["pinned_entries"],
+        "delta_unpinned_entries": current["unpinned_entries"]
+        - previous["unpinned_entries"],
+        "delta_size": delta_pinned_size + delta_unpinned_size,
+        "size_churn": abs(delta_pinned_size) + abs(delta_unpinned_size),
+        "delta_hits": None,
+        "delta_misses": None,
+        "hit_rate": None,
+    }
+    if None not in (
+        previous["hits"],
+        current["hits"],
+        previous["misses"],
+        current["misses"],
+    ):
+        deltas["delta_hits"] = current["hits"] - previous["hits"]
+        deltas["delta_misses"] = current["misses"] - previous["misses"]
+        num_lookups = deltas["delta_hits"] + deltas["delta_misses"]
+        if num_lookups > 0:
+            deltas["hit_rate"] = round(deltas["delta_hits"] / num_lookups, 4)
+    return deltas
@@ -0,0 +1,306 @@
+"""
+Simulate the query cache of QLever offline for a replayable workload (see
+`qlever simulate-cache`): profile each distinct query once (the sizes and
+computation times of its result and all its subresults, from the
+`runtimeInformation` of the server), and then replay the workload against a
+simulated LRU cache with pinned entries, for a range of cache sizes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import OrderedDict
+
+from qlever.workload import read_query_file
+
+# The size of one entry of a result table (QLever stores results as tables
+# of 64-bit IDs).
+BYTES_PER_ID = 8
+
+# The fractions of the cache size that are tried for the maximal size of a
+# single entry (see `recommend_cache_settings`).
+SINGLE_ENTRY_FRACTIONS = [1 / 20, 1 / 10, 1 / 5, 1 / 4, 1 / 2, 1]
+
+
+def read_query_sequence(workload_file: str) -> list[str]:
+    """
+    Read the queries from a workload file (TSV or YAML with optional
+    `count`, see `read_query_file`) in the order in which they arrive, with
+    repetitions (a query with a `count` is repeated that many times in a
+    row).
+    """
+    return [
+        query
+        for _, query, count in read_query_file(workload_file, "count", 1)
+        for _ in range(int(count))
+    ]
+
+
+def get_profile(tree: dict) -> dict:
+    """
+    Turn the query execution tree from the `runtimeInformation` of the
+    server into a profile with the estimated size in bytes, the time in
+    seconds to compute it from scratch, and the children of each node. The
+    key of a node identifies its subresult across queries (like the cache
+    key of QLever, it depends on the whole subtree). If the result came from
+    the cache of the server, the original computation times are used.
+    """
+    children = [get_profile(child) for child in tree.get("children", [])]
+    description = str(tree.get("description", ""))
+    key_text = description + "(" + ",".join(c["key"] for c in children) + ")"
+    milliseconds = tree.get("total_time", 0)
+    if tree.get("cache_status", "computed") != "computed":
+        milliseconds = tree.get("original_total_time", milliseconds)
+    return {
+        "key": hashlib.sha1(key_text.encode()).hexdigest()[:16],
+        "description": description[:80],
+        "size": int(tree.get("result_rows", 0))
+        * int(tree.get("result_cols", 0))
+        * BYTES_PER_ID,
+        "seconds": milliseconds / 1000,
+        "children": children,
+    }
+
+
+def profile_query(
+    endpoint_url: str,
+    query: str,
+    access_token: str | None = None,
+    timeout: float = 600.0,
+) -> dict:
+    """
+    Send the given query to the server (in-process, without sending the
+    result back) and return the profile of its result (see `get_profile`).
+    Raise an exception if the query fails.
+    """
+    params = {"query": query, "send": "0"}
+    if access_token:
+        params["access-token"] = access_token
+    request = urllib.request.Request(
+        endpoint_url,
+        data=urllib.parse.urlencode(params).encode(),
+        headers={"Accept": "application/qlever-results+json"},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            result = json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        try:
+            error = json.loads(e.read()).get("exception") or str(e)
+        except ValueError:
+            error = str(e)
+        raise Exception(error)
+    if "exception" in result:
+        raise Exception(result["exception"])
+    runtime_information = result.get("runtimeInformation") or {}
+    tree = runtime_information.get("query_execution_tree")
+    if not tree:
+        raise Exception("The result has no `runtimeInformation`")
+    return get_profile(tree)
+
+
+class CompiledWorkload:
+    """
+    A workload in a form that can be replayed quickly many times: each
+    distinct subresult has an integer ID with its size and time in two
+    arrays, and each distinct query is an array of the IDs of the nodes of
+    its tree in pre-order, together with an array of the sizes of the
+    subtrees (so that the subtree below a cache hit can be skipped).
+    """
+
+    def __init__(self, sequence: list[str], profiles: dict[str, dict]):
+        self.entry_ids = {}
+        self.entry_sizes = []
+        self.entry_seconds = []
+        self.query_nodes = []
+        self.query_subtree_sizes = []
+        query_ids = {}
+        self.sequence = []
+        for query in sequence:
+            if query not in profiles:
+                continue
+            if query not in query_ids:
+                query_ids[query] = len(self.query_nodes)
+                nodes, subtree_sizes = [], []
+                self.add_tree(profiles[query], nodes, subtree_sizes)
+                self.query_nodes.append(nodes)
+                self.query_subtree_sizes.append(subtree_sizes)
+            self.sequence.append(query_ids[query])
+        self.query_ids = query_ids
+
+    def add_tree(
+        self, profile: dict, nodes: list[int], subtree_sizes: list[int]
+    ) -> None:
+        key = profile["key"]
+        if key not in self.entry_ids:
+            self.entry_ids[key] = len(self.entry_sizes)
+            self.entry_sizes.append(profile["size"])
+            self.entry_seconds.append(profile["seconds"])
+        index = len(nodes)
+        nodes.append(self.entry_ids[key])
+        subtree_sizes.append(0)
+        for child in profile["children"]:
+            self.add_tree(child, nodes, subtree_sizes)
+        subtree_sizes[index] = len(nodes) - index
+
+    def total_size(self) -> int:
+        """
+        The size of a cache that can hold all results and subresults.
+        """
+        return sum(self.entry_sizes)
+
+
+def simulate_cache(
+    workload: CompiledWorkload,
+    max_size: int,
+    max_size_single_entry: int,
+    max_num_entries: int | None = None,
+    pinned_queries: list[str] | None = None,
+) -> dict:
+    """
+    Replay the workload against an LRU cache of the given size, in which
+    every result and subresult is cached when it is computed (unless it is
+    larger than `max_size_single_entry`), and the results of the pinned
+    queries are in the cache from the start and never evicted. Return the
+    number of queries and how many of them were answered from the cache,
+    the number of lookups of subresults and their hits, the total time to
+    compute all queries without a cache, and the time saved by the cache.
+    """
+    sizes = workload.entry_sizes
+    seconds = workload.entry_seconds
+    pinned = set()
+    pinned_size = 0
+    for query in pinned_queries or []:
+        if query in workload.query_ids:
+            entry = workload.query_nodes[workload.query_ids[query]][0]
+            if entry not in pinned:
+                pinned.add(entry)
+                pinned_size += sizes[entry]
+    lru = OrderedDict()
+    lru_size = 0
+    max_unpinned_entries = (
+        max_num_entries - len(pinned) if max_num_entries else None
+    )
+
+    def insert(entry: int) -> None:
+        nonlocal lru_size
+        size = sizes[entry]
+        if size > max_size_single_entry or pinned_size + size > max_size:
+            return
+        while lru and (
+            pinned_size + lru_size + size > max_size
+            or (
+                max_unpinned_entries is not None
+                and len(lru) >= max_unpinned_entries
+            )
+        ):
+            _, evicted_size = lru.popitem(last=False)
+            lru_size -= evicted_size
+        if max_unpinned_entries is None or max_unpinned_entries > 0:
+            lru[entry] = size
+            lru_size += size
+
+    query_hits = lookups = hits = 0
+    total_seconds = saved_seconds = 0.0
+    for query_id in workload.sequence:
+        nodes = workload.query_nodes[query_id]
+        subtree_sizes = workload.query_subtree_sizes[query_id]
+        total_seconds += seconds[nodes[0]]
+        # Walk the tree in pre-order. A hit skips the subtree below it; a
+        # computed node is cached once its subtree is done (that is, after
+        # its children, like in QLever).
+        pending = []
+        i = 0
+        while i < len(nodes):
+            while pending and pending[-1][0] <= i:
+                insert(pending.pop()[1])
+            entry = nodes[i]
+            lookups += 1
+            if entry in pinned or entry in lru:
+                hits += 1
+                saved_seconds += seconds[entry]
+                if i == 0:
+                    query_hits += 1
+                if entry in lru:
+                    lru.move_to_end(entry)
+                i += subtree_sizes[i]
+            else:
+                pending.append((i + subtree_sizes[i], entry))
+                i += 1
+        while pending:
+            insert(pending.pop()[1])
+    return {
+        "max_size": max_size,
+        "max_size_single_entry": max_size_single_entry,
+        "num_queries": len(workload.sequence),
+        "query_hits": query_hits,
+        "lookups": lookups,
+        "hits": hits,
+        "total_seconds": total_seconds,
+        "saved_seconds": saved_seconds,
+    }
+
+
+def get_default_cache_sizes(total_size: int, num_sizes: int = 8) -> list[int]:
+    """
+    The cache sizes to simulate by default: halving from the size that holds
+    all results and subresults of the workload, rounded up to full
+    megabytes.
+    """
+    megabyte = 1 << 20
+    sizes = set()
+    for i in range(num_sizes):
+        size = total_size >> i
+        sizes.add(max(-(-size // megabyte), 1) * megabyte)
+    return sorted(sizes)
+
+
+def format_cache_size(num_bytes: int) -> str:
+    """
+    Format a size for the Qleverfile (in full gigabytes if possible,
+    otherwise in megabytes, rounded up).
+    """
+    if num_bytes > 0 and num_bytes % (1 << 30) == 0:
+        return f"{num_bytes >> 30}G"
+    return f"{max(-(-num_bytes // (1 << 20)), 1)}M"
+
+
+def recommend_cache_settings(
+    workload: CompiledWorkload,
+    results: list[dict],
+    max_num_entries: int | None = None,
+    pinned_queries: list[str] | None = None,
+    target_fraction: float = 0.95,
+) -> tuple[int, int, dict]:
+    """
+    Recommend the smallest of the simulated cache sizes that saves at least
+    `target_fraction` of the time that the best of them saves, and for that
+    size, the maximal size of a single entry (from `SINGLE_ENTRY_FRACTIONS`)
+    that saves the most time (the smallest one in case of a tie). Return the
+    two sizes and the result of the simulation with them.
+    """
+    best_saved_seconds = max(result["saved_seconds"] for result in results)
+    max_size = min(
+        result["max_size"]
+        for result in results
+        if result["saved_seconds"] >= target_fraction * best_saved_seconds
+    )
+    best_result = None
+    for fraction in SINGLE_ENTRY_FRACTIONS:
+        result = simulate_cache(
+            workload,
+            max_size,
+            int(max_size * fraction),
+            max_num_entries,
+            pinned_queries,
+        )
+        if (
+            best_result is None
+            or result["saved_seconds"] > best_result["saved_seconds"]
+        ):
+            best_result = result
+    return max_size, best_result["max_size_single_entry"], best_result
@@ -18,8 +18,9 @@ class QleverCommand(ABC):
         Initialize the command.
 
         IMPORTANT: This should be very LIGHTWEIGHT (typically: a few
-        assignments, if any) because we create one object per command and
-        initialize each of them.
+        assignments, if any). The object is only created for the command
+        that is executed (see `CommandRegistry` in `__init__.py`), but also
+        for each autocompletion of its arguments.
         """
         pass
 
@@ -27,7 +28,9 @@ class QleverCommand(ABC):
     def description(self) -> str:
         """
         A concise description of the command, which will be shown when the user
-        types `qlever --help` or `qlever <command> --help`.
+        types `qlever --help` or `qlever <command> --help`. Return a string
+        literal, then `qlever --help` can show it without importing the module
+        of the command.
         """
         pass
 
@@ -2,8 +2,10 @@ from __future__ import annotations
 
 import csv
 import json
+import math
 import re
 import shlex
+import shutil
 import subprocess
 import time
 import traceback
@@ -19,7 +21,8 @@ from qlever.command import QleverCommand
 from qlever.commands.clear_cache import ClearCacheCommand
 from qlever.commands.ui import dict_to_yaml
 from qlever.log import log, mute_log
-from qlever.util import run_command, run_curl_command
+from qlever.result_cache import ResultCache, get_index_identity
+from qlever.util import parse_size, run_command, run_curl_command
 
 
 class BenchmarkQueriesCommand(QleverCommand):
@@ -205,6 +208,35 @@ class BenchmarkQueriesCommand(QleverCommand):
                 "YML file (Default = 5)"
             ),
         )
+        subparser.add_argument(
+            "--compare-with",
+            type=str,
+            default=None,
+            help=(
+                "Result YML file of an earlier run (see --result-file), for "
+                "example, with the server placed differently on CPUs and NUMA "
+                "nodes; show the median and tail query times of both runs "
+                "for the queries they have in common"
+            ),
+        )
+        subparser.add_argument(
+            "--result-cache",
+            action="store_true",
+            default=False,
+            help=(
+                "With `--download-or-count count`, take the result sizes "
+                "of queries that were counted before on the same index from "
+                "a local cache (see `qlever query --result-cache`); the "
+                "times shown for these queries are the original ones"
+            ),
+        )
+        subparser.add_argument(
+            "--result-cache-size",
+            type=str,
+            default="1G",
+            help="With `--result-cache`, the maximal size of the cache on "
+            "disk (default: 1G)",
+        )
 
     def pretty_printed_query(self, query: str, show_prefixes: bool) -> str:
         remove_prefixes_cmd = (
@@ -585,6 +617,34 @@ class BenchmarkQueriesCommand(QleverCommand):
             log.error("No queries to process!")
             return False
 
+        # The result cache (only when counting, and not when the point is to
+        # measure the queries without a cache).
+        result_cache = None
+        if args.result_cache:
+            if args.download_or_count != "count":
+                log.warning(
+                    "The result cache only works with "
+                    "`--download-or-count count`, option `--result-cache` "
+                    "is ignored"
+                )
+            elif args.clear_cache == "yes":
+                log.warning(
+                    "The result cache does not make sense with "
+                    "`--clear-cache yes`, option `--result-cache` is ignored"
+                )
+            else:
+                try:
+                    result_cache = ResultCache(
+                        parse_size(args.result_cache_size)
+                    )
+                    index_identity = get_index_identity(sparql_endpoint)
+                except ValueError as e:
+                    log.error(e)
+                    return False
+                except Exception as e:
+                    log.warning(f"Not using the result cache: {e}")
+                    result_cache = None
+
         # We want the width of the query description to be an uneven number (in
         # case we have to truncated it, in which case we want to have a " ... "
         # in the middle).
@@ -595,6 +655,7 @@ class BenchmarkQueriesCommand(QleverCommand):
         # description, the result size (number of rows), and the query
         # processing time (seconds).
         query_times = []
+        query_times_by_description = {}
         result_sizes = []
         result_yml_query_records = {"queries": []}
         num_failed = 0
@@ -698,33 +759,44 @@ class BenchmarkQueriesCommand(QleverCommand):
             result_file = (
                 f"qlever.example_queries.result.{abs(hash(curl_cmd))}.tmp"
             )
+            cache_key, cached = None, None
+            if result_cache is not None:
+                cache_key = result_cache.get_key(
+                    sparql_endpoint, index_identity, query, accept_header
+                )
+                cached = result_cache.lookup(sparql_endpoint, cache_key)
             start_time = time.time()
-            try:
-                http_code = run_curl_command(
-                    sparql_endpoint,
-                    headers={"Accept": accept_header},
-                    params={"query": query},
-                    result_file=result_file,
-                ).strip()
-                if http_code == "200":
-                    time_seconds = time.time() - start_time
-                    error_msg = None
-                else:
+            if cached is not None:
+                shutil.copyfile(cached[0], result_file)
+                time_seconds = cached[1]
+                error_msg = None
+            else:
+                try:
+                    http_code = run_curl_command(
+                        sparql_endpoint,
+                        headers={"Accept": accept_header},
+                        params={"query": query},
+                        result_file=result_file,
+                    ).strip()
+                    if http_code == "200":
+                        time_seconds = time.time() - start_time
+                        error_msg = None
+                    else:
+                        time_seconds = time.time() - start_time
+                        error_msg = {
+                            "short": f"HTTP code: {http_code}",
+                            "long": re.sub(
+                                r"\s+", " ", Path(result_file).read_text()
+                            ),
+                        }
+                except Exception as e:
                     time_seconds = time.time() - start_time
+                    if args.log_level == "DEBUG":
+                        traceback.print_exc()
                     error_msg = {
-                        "short": f"HTTP code: {http_code}",
-                        "long": re.sub(
-                            r"\s+", " ", Path(result_file).read_text()
-                        ),
+                        "short": "Exception",
+                        "long": re.sub(r"\s+", " ", str(e)),
                     }
-            except Exception as e:
-                time_seconds = time.time() - start_time
-                if args.log_level == "DEBUG":
-                    traceback.print_exc()
-                error_msg = {
-                    "short": "Exception",
-                    "long": re.sub(r"\s+", " ", str(e)),
-                }
 
             # Get result size (via the command line, in order to avoid loading
             # a potentially large JSON file into Python, which is slow).
@@ -735,6 +807,10 @@ class BenchmarkQueriesCommand(QleverCommand):
                     accept_header,
                     result_file,
                 )
+                if error_msg is None and cached is None and cache_key:
+                    result_cache.store(
+                        sparql_endpoint, cache_key, result_file, time_seconds
+                    )
                 single_int_result = None
                 if (
                     result_size == 1
@@ -768,6 +844,10 @@ class BenchmarkQueriesCommand(QleverCommand):
                 )
                 result_yml_query_records["queries"].append(query_record)
 
+            # Remember the time of the query (for `--compare-with`).
+            if error_msg is None:
+                query_times_by_description[description] = time_seconds
+
             # Print description, time, result in tabular form.
             if len(description) > width_query_description:
                 description = (
@@ -787,6 +867,7 @@ class BenchmarkQueriesCommand(QleverCommand):
                     f"{time_seconds:6.2f} s  "
                     f"{result_size:>{args.width_result_size},}"
                     f"{single_int_result}"
+                    f"{'   [cached]' if cached is not None else ''}"
                 )
                 query_times.append(time_seconds)
                 result_sizes.append(result_size)
@@ -889,9 +970,84 @@ class BenchmarkQueriesCommand(QleverCommand):
                 )
             )
 
+        # Show the hits and misses of the result cache.
+        if result_cache is not None:
+            log.info("")
+            log.info(f"Result cache: {result_cache.format_stats()}")
+
+        # Compare with an earlier run.
+        if args.compare_with:
+            log.info("")
+            self.show_comparison(query_times_by_description, args.compare_with)
+
         # Return success (has nothing to do with how many queries failed).
         return True
 
+    @staticmethod
+    def get_percentile(values: list[float], percentile: float) -> float:
+        """
+        Get the given percentile of the values (nearest rank).
+        """
+        values = sorted(values)
+        rank = math.ceil(percentile / 100 * len(values))
+        return values[max(rank, 1) - 1]
+
+    def show_comparison(
+        self, query_times: dict[str, float], compare_with: str
+    ) -> bool:
+        """
+        Compare the query times of this run with those of an earlier run
+        (from its result YML file), for the queries that succeeded in both.
+        """
+        try:
+            with open(compare_with, "r", encoding="utf-8") as yml_file:
+                data = yaml.safe_load(yml_file)
+            earlier_query_times = {
+                record["query"]: record["runtime_info"]["client_time"]
+                for record in data["queries"]
+                if "result_size" in record
+            }
+        except (OSError, yaml.YAMLError, KeyError, TypeError) as e:
+            log.error(f"Could not read the query times from {compare_with}")
+            log.info("")
+            log.info(f"The error message was: {e}")
+            return False
+        common_queries = [
+            description
+            for description in query_times
+            if description in earlier_query_times
+        ]
+        if len(common_queries) == 0:
+            log.error(f"No successful queries in common with {compare_with}")
+            return False
+        earlier = [earlier_query_times[q] for q in common_queries]
+        this_run = [query_times[q] for q in common_queries]
+        log.info(
+            f"Comparison with {compare_with} "
+            f"({len(common_queries)} queries in common):"
+        )
+        log.info("")
+        log.info(f"{'':<8}  {'earlier':>9}  {'this run':>9}  {'change':>7}")
+        for name, get_statistic in [
+            ("TOTAL", sum),
+            ("MEDIAN", lambda times: self.get_percentile(times, 50)),
+            ("P90", lambda times: self.get_percentile(times, 90)),
+            ("P95", lambda times: self.get_percentile(times, 95)),
+            ("P99", lambda times: self.get_percentile(times, 99)),
+            ("MAX", max),
+        ]:
+            before = get_statistic(earlier)
+            after = get_statistic(this_run)
+            change = (
+                f"{(after - before) / before * 100:+.0f}%"
+                if before > 0
+                else "-"
+            )
+            log.info(
+                f"{name:<8}  {before:7.2f} s  {after:7.2f} s  {change:>7}"
+            )
+        return True
+
     def get_result_yml_query_record(
         self,
         query: str,
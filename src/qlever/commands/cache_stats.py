@@ -1,9 +1,19 @@
 from __future__ import annotations
 
+import csv
 import json
 import re
 import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
 
+from qlever.cache_monitor import (
+    DELTA_FIELDS,
+    SAMPLE_FIELDS,
+    CacheStatsClient,
+    compute_deltas,
+)
 from qlever.command import QleverCommand
 from qlever.log import log
 
@@ -26,6 +36,32 @@ class CacheStatsCommand(QleverCommand):
         return {"server": ["host_name", "port"]}
 
     def additional_arguments(self, subparser) -> None:
+        subparser.add_argument(
+            "--watch",
+            type=float,
+            metavar="INTERVAL",
+            help="Show the cache statistics every INTERVAL seconds, with the "
+            "changes since the previous sample, until Ctrl-C",
+        )
+        subparser.add_argument(
+            "--watch-endpoints",
+            type=str,
+            help="With --watch, watch these comma-separated SPARQL endpoints "
+            "(default: the SPARQL endpoint)",
+        )
+        subparser.add_argument(
+            "--watch-count",
+            type=int,
+            default=0,
+            help="With --watch, stop after this many samples (default: 0, "
+            "which means until Ctrl-C)",
+        )
+        subparser.add_argument(
+            "--watch-output",
+            type=str,
+            help="With --watch, append the samples to this file, as JSON "
+            "lines, or as CSV if the name ends with `.csv`",
+        )
         subparser.add_argument(
             "--sparql-endpoint",
             help="URL of the SPARQL endpoint, default is {host_name}:{port}",
@@ -37,6 +73,120 @@ class CacheStatsCommand(QleverCommand):
             help="Show detailed statistics and settings",
         )
 
+    def show_sample(self, sample: dict, deltas: dict | None) -> None:
+        """
+        Show a sample in one line, with the changes since the previous
+        sample (if any).
+        """
+
+        # The sizes are in units of 1024, like the `cache-max-size` (see
+        # `parse_size`) and `format_size`.
+        def gb(num_bytes: int, sign: str = "") -> str:
+            return f"{num_bytes / 1024**3:{sign}.1f} GB"
+
+        cached_size = sample["pinned_size"] + sample["unpinned_size"]
+        free_size = sample["max_size"] - cached_size
+        line = (
+            f"{datetime.fromtimestamp(sample['time']).strftime('%H:%M:%S')}"
+            f"  {sample['endpoint']}"
+            f"  pinned {sample['pinned_entries']:,} / "
+            f"{gb(sample['pinned_size'])}"
+            f"  unpinned {sample['unpinned_entries']:,} / "
+            f"{gb(sample['unpinned_size'])}"
+            f"  free {gb(free_size)}"
+        )
+        if deltas is not None:
+            line += (
+                f"  entries {deltas['delta_pinned_entries']:+,}"
+                f"/{deltas['delta_unpinned_entries']:+,}"
+                f"  size {gb(deltas['delta_size'], '+')}"
+                f"  churn {gb(deltas['size_churn'])}"
+            )
+            if deltas["hit_rate"] is not None:
+                line += f"  hit rate {deltas['hit_rate']:.1%}"
+        log.info(line)
+
+    def write_sample(self, output_file: str, record: dict) -> None:
+        """
+        Append a sample (with its deltas) to the output file, as a JSON line
+        or as a CSV row (with a header if the file is new).
+        """
+        path = Path(output_file)
+        if path.suffix == ".csv":
+            is_new = not path.exists() or path.stat().st_size == 0
+            with path.open("a", newline="") as csv_file:
+                writer = csv.DictWriter(
+                    csv_file, fieldnames=SAMPLE_FIELDS + DELTA_FIELDS
+                )
+                if is_new:
+                    writer.writeheader()
+                writer.writerow(record)
+        else:
+            with path.open("a") as jsonl_file:
+                jsonl_file.write(json.dumps(record) + "\n")
+
+    def execute_watch(self, args, sparql_endpoint: str) -> bool:
+        """
+        Sample the cache statistics of one or more endpoints periodically,
+        over one persistent connection per endpoint.
+        """
+        endpoints = (
+            [e.strip() for e in args.watch_endpoints.split(",") if e.strip()]
+            if args.watch_endpoints
+            else [sparql_endpoint]
+        )
+        description = (
+            f"Get the cache statistics and settings of "
+            f"{', '.join(endpoints)} every {args.watch}s"
+        )
+        if args.watch_output:
+            description += f" and append them to {args.watch_output}"
+        self.show(description, only_show=args.show)
+        if args.show:
+            return True
+        if args.watch <= 0:
+            log.error("The interval of --watch must be positive")
+            return False
+
+        # In each round, sample all endpoints, then sleep until the next
+        # round (an endpoint that fails is reported and sampled again in the
+        # next round).
+        clients = [CacheStatsClient(endpoint) for endpoint in endpoints]
+        previous_samples = {}
+        num_rounds = 0
+        next_round_time = time.monotonic()
+        try:
+            while True:
+                for client in clients:
+                    try:
+                        sample = client.sample()
+                    except Exception as e:
+                        log.error(f"{client.endpoint}: {e}")
+                        previous_samples.pop(client.endpoint, None)
+                        continue
+                    previous = previous_samples.get(client.endpoint)
+                    deltas = (
+                        compute_deltas(previous, sample)
+                        if previous is not None
+                        else None
+                    )
+                    previous_samples[client.endpoint] = sample
+                    self.show_sample(sample, deltas)
+                    if args.watch_output:
+                        record = {**sample, **(deltas or {})}
+                        self.write_sample(args.watch_output, record)
+                num_rounds += 1
+                if args.watch_count and num_rounds >= args.watch_count:
+                    break
+                next_round_time += args.watch
+                time.sleep(max(next_round_time - time.monotonic(), 0))
+        except KeyboardInterrupt:
+            log.info("")
+        finally:
+            for client in clients:
+                client.close()
+        return True
+
     def execute(self, args) -> bool:
         # Construct the two curl commands.
         sparql_endpoint = (
@@ -44,6 +194,10 @@ class CacheStatsCommand(QleverCommand):
             if args.sparql_endpoint
             else f"{args.host_name}:{args.port}"
         )
+
+        # With `--watch`, sample the cache statistics periodically.
+        if args.watch is not None:
+            return self.execute_watch(args, sparql_endpoint)
         cache_stats_cmd = (
             f'curl -s {sparql_endpoint} --data-urlencode "cmd=cache-stats"'
         )
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import copy
 import re
 
 from qlever.command import QleverCommand
 from qlever.commands.cache_stats import CacheStatsCommand
+from qlever.commands.pin import PinCommand
 from qlever.log import log
 from qlever.util import run_command
 
@@ -23,7 +25,9 @@ class ClearCacheCommand(QleverCommand):
         return True
 
     def relevant_qleverfile_arguments(self) -> dict[str, list[str]]:
-        return {"server": ["host_name", "port", "access_token"]}
+        return {
+            "server": ["host_name", "port", "access_token", "pinned_queries"]
+        }
 
     def additional_arguments(self, subparser) -> None:
         subparser.add_argument(
@@ -77,9 +81,21 @@ class ClearCacheCommand(QleverCommand):
             log.error(e)
             return False
 
+        # Pin the queries from PINNED_QUERIES again.
+        if args.complete and args.pinned_queries:
+            log.info("")
+            pin_args = copy.copy(args)
+            pin_args.action = "sync"
+            pin_args.cache_budget = None
+            pin_args.max_in_flight = 4
+            if not PinCommand().execute(pin_args):
+                log.error("Pinning the queries from PINNED_QUERIES failed")
+                return False
+
         # Show cache stats.
         log.info("")
         args.detailed = False
+        args.watch = None
         if not CacheStatsCommand().execute(args):
             log.error(
                 "Clearing the cache was successful, but showing the "
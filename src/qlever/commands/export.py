@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from qlever.command import QleverCommand
+from qlever.log import log
+from qlever.result_export import (
+    concatenate_parts,
+    download_page,
+    format_throughput,
+    get_compressor,
+    get_key_range,
+    get_num_rows,
+    get_paged_queries,
+    get_range_queries,
+    get_variables,
+)
+
+
+class ExportCommand(QleverCommand):
+    """
+    Class for executing the `export` command.
+    """
+
+    def __init__(self):
+        pass
+
+    def description(self) -> str:
+        return "Export the result of a query to a (compressed) file"
+
+    def should_have_qleverfile(self) -> bool:
+        return False
+
+    def relevant_qleverfile_arguments(self) -> dict[str, list[str]]:
+        return {"server": ["host_name", "port"]}
+
+    def additional_arguments(self, subparser) -> None:
+        subparser.add_argument(
+            "query",
+            type=str,
+            help="SPARQL query whose result is exported",
+        )
+        subparser.add_argument(
+            "--output-file",
+            type=str,
+            required=True,
+            help="File to which the result is written (compressed with "
+            "gzip if it ends with `.gz`, and with zstd if it ends with "
+            "`.zst`)",
+        )
+        subparser.add_argument(
+            "--accept",
+            type=str,
+            choices=["text/tab-separated-values", "text/csv"],
+            default="text/tab-separated-values",
+            help="Format of the result (default: TSV)",
+        )
+        subparser.add_argument(
+            "--pages",
+            type=int,
+            default=1,
+            help="Split the query into this many pages, which are "
+            "downloaded concurrently and concatenated in order (default: 1)",
+        )
+        subparser.add_argument(
+            "--order-by",
+            type=str,
+            help="With `--pages`, the variables for the ORDER BY that makes "
+            "the pages deterministic (default: all variables of the result)",
+        )
+        subparser.add_argument(
+            "--split-by",
+            type=str,
+            help="With `--pages`, split into ranges of the values of this "
+            "numeric variable, instead of ORDER BY + LIMIT/OFFSET (the rows "
+            "where it is unbound or not numeric are in one extra page)",
+        )
+        subparser.add_argument(
+            "--parallel",
+            type=int,
+            default=4,
+            help="The maximal number of pages that are downloaded "
+            "concurrently (default: 4)",
+        )
+        subparser.add_argument(
+            "--sparql-endpoint",
+            help="URL of the SPARQL endpoint, default is {host_name}:{port}",
+        )
+
+    def get_page_queries(self, args, endpoint_url: str) -> list[str]:
+        """
+        Split the query into the queries for the pages.
+        """
+        if args.pages <= 1:
+            return [args.query]
+        if args.split_by:
+            min_value, max_value = get_key_range(
+                endpoint_url, args.query, args.split_by
+            )
+            log.info(
+                f"The values of {args.split_by} range from {min_value} to "
+                f"{max_value}"
+            )
+            return get_range_queries(
+                args.query, args.pages, args.split_by, min_value, max_value
+            )
+        order_by = (
+            args.order_by.split()
+            if args.order_by
+            else get_variables(endpoint_url, args.query)
+        )
+        num_rows = get_num_rows(endpoint_url, args.query)
+        log.info(f"The result has {num_rows:,} rows")
+        return get_paged_queries(args.query, args.pages, num_rows, order_by)
+
+    def execute(self, args) -> bool:
+        sparql_endpoint = (
+            args.sparql_endpoint
+            if args.sparql_endpoint
+            else f"{args.host_name}:{args.port}"
+        )
+        endpoint_url = (
+            sparql_endpoint
+            if "://" in sparql_endpoint
+            else f"http://{sparql_endpoint}"
+        )
+        try:
+            compressor = get_compressor(args.output_file)
+        except Exception as e:
+            log.error(e)
+            return False
+
+        # Show what the command does.
+        if args.pages <= 1:
+            how = "in one stream"
+        elif args.split_by:
+            how = (
+                f"in {args.pages} ranges of {args.split_by} (plus one page "
+                f"for the rows where it is unbound or not numeric), at most "
+                f"{args.parallel} concurrently"
+            )
+        else:
+            how = (
+                f"in {args.pages} pages (ORDER BY "
+                f"{args.order_by or 'all variables'} + LIMIT/OFFSET), at "
+                f"most {args.parallel} concurrently"
+            )
+        self.show(
+            f"Export the result of the query from {sparql_endpoint} to "
+            f"{args.output_file} ({args.accept}"
+            f"{', ' + compressor[0] if compressor else ''}), {how}; the "
+            f"completed pages are kept in {args.output_file}.part-* until "
+            f"all are done, so that running the same command again resumes",
+            only_show=args.show,
+        )
+        if args.show:
+            return True
+
+        # Resume from the pages of a previous run with the same settings,
+        # otherwise split the query into pages.
+        manifest_file = f"{args.output_file}.parts.json"
+        settings = {
+            "query": args.query,
+            "accept": args.accept,
+            "pages": args.pages,
+            "order_by": args.order_by,
+            "split_by": args.split_by,
+        }
+        manifest = None
+        if Path(manifest_file).exists():
+            with open(manifest_file, "r", encoding="utf-8") as file:
+                manifest = json.load(file)
+            if manifest.get("settings") != settings:
+                log.info(
+                    f"Ignoring the pages from {manifest_file}, they are from "
+                    f"a different export"
+                )
+                manifest = None
+        if manifest is None:
+            try:
+                page_queries = self.get_page_queries(args, endpoint_url)
+            except Exception as e:
+                log.error(f"Could not split the query into pages: {e}")
+                return False
+            manifest = {
+                "settings": settings,
+                "queries": page_queries,
+                "done": {},
+            }
+        num_pages = len(manifest["queries"])
+        part_files = [
+            f"{args.output_file}.part-{i + 1:05d}-of-{num_pages:05d}"
+            for i in range(num_pages)
+        ]
+        done = {
+            int(i): counts
+            for i, counts in manifest["done"].items()
+            if Path(part_files[int(i)]).exists()
+        }
+        if done:
+            log.info(
+                f"Resuming: {len(done)} of {num_pages} pages are already "
+                f"done"
+            )
+
+        # Download the missing pages, and record each completed page in the
+        # manifest.
+        lock = threading.Lock()
+
+        def export_page(i: int) -> tuple[int, int, float]:
+            start_time = time.monotonic()
+            try:
+                num_lines, num_bytes = download_page(
+                    endpoint_url,
+                    manifest["queries"][i],
+                    args.accept,
+                    f"{part_files[i]}.tmp",
+                    compressor,
+                    skip_header=i > 0,
+                )
+            except Exception:
+                Path(f"{part_files[i]}.tmp").unlink(missing_ok=True)
+                raise
+            os.replace(f"{part_files[i]}.tmp", part_files[i])
+            with lock:
+                done[i] = [num_lines, num_bytes]
+                manifest["done"] = done
+                with open(manifest_file, "w", encoding="utf-8") as file:
+                    json.dump(manifest, file)
+            return num_lines, num_bytes, time.monotonic() - start_time
+
+        pending = [i for i in range(num_pages) if i not in done]
+        failed = []
+        start_time = time.monotonic()
+        if pending:
+            with open(manifest_file, "w", encoding="utf-8") as file:
+                json.dump(manifest, file)
+            with ThreadPoolExecutor(max_workers=args.parallel) as executor:
+                futures = {
+                    executor.submit(export_page, i): i for i in pending
+                }
+                try:
+                    for future in as_completed(futures):
+                        i = futures[future]
+                        try:
+                            num_lines, num_bytes, seconds = future.result()
+                        except Exception as e:
+                            failed.append(i)
+                            log.error(f"Page {i + 1}/{num_pages} failed: {e}")
+                            continue
+                        throughput = format_throughput(
+                            num_lines, num_bytes, seconds
+                        )
+                        log.info(f"Page {i + 1}/{num_pages}: {throughput}")
+                except KeyboardInterrupt:
+                    for future in futures:
+                        future.cancel()
+                    log.warning(
+                        "Export interrupted, run the same command again to "
+                        "resume"
+                    )
+                    return False
+        seconds = time.monotonic() - start_time
+        if failed:
+            log.error(
+                f"{len(failed)} of {num_pages} pages failed, run the same "
+                f"command again to download them"
+            )
+            return False
+
+        # Concatenate the pages in order.
+        if num_pages == 1:
+            os.replace(part_files[0], args.output_file)
+        else:
+            concatenate_parts(part_files, args.output_file)
+            for part_file in part_files:
+                os.remove(part_file)
+        os.remove(manifest_file)
+        num_lines = sum(done[i][0] for i in pending)
+        num_bytes = sum(done[i][1] for i in pending)
+        log.info("")
+        log.info(
+            f"Exported {sum(counts[0] for counts in done.values()):,} rows "
+            f"to {args.output_file} "
+            f"({Path(args.output_file).stat().st_size / 1e6:,.1f} MB on "
+            f"disk); downloaded {len(pending)} of {num_pages} pages: "
+            f"{format_throughput(num_lines, num_bytes, seconds)}"
+        )
+        return True
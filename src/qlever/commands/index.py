@@ -3,15 +3,30 @@ from __future__ import annotations
 import glob
 import json
 import re
+import resource
 import shlex
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import psutil
 
 from qlever.command import QleverCommand
+from qlever.commands.system_info import get_partition
 from qlever.containerize import Containerize
+from qlever.index_profile import IndexProfiler
 from qlever.log import log
+from qlever.placement import check_placement, get_native_placement_prefix
+from qlever.preflight import check_input_stream
+from qlever.split_input import get_line_aligned_offsets
 from qlever.util import (
     binary_exists,
+    format_size,
     get_existing_index_files,
     get_total_file_size,
+    parse_size,
+    partition_by_size,
     run_command,
 )
 
@@ -50,7 +65,14 @@ class IndexCommand(QleverCommand):
                 "stxxl_memory",
                 "parser_buffer_size",
             ],
-            "runtime": ["system", "image", "index_container"],
+            "runtime": [
+                "system",
+                "image",
+                "index_container",
+                "cpuset_cpus",
+                "cpuset_mems",
+                "numa_memory_policy",
+            ],
         }
 
     def additional_arguments(self, subparser) -> None:
@@ -60,6 +82,54 @@ class IndexCommand(QleverCommand):
             default=False,
             help="Overwrite an existing index, think twice before using this",
         )
+        subparser.add_argument(
+            "--preflight",
+            action="store_true",
+            default=False,
+            help="Do not build the index, but check all input streams in "
+            "parallel (tokenization and prefix usage) and estimate the "
+            "number of triples",
+        )
+        subparser.add_argument(
+            "--preflight-sample-size",
+            type=str,
+            default="1G",
+            help="With `--preflight`, check only this much of the output of "
+            "each input stream (use `all` to check everything)",
+        )
+        subparser.add_argument(
+            "--auto-tune",
+            action="store_true",
+            default=False,
+            help="Choose STXXL_MEMORY, PARSER_BUFFER_SIZE, ULIMIT, "
+            "PARALLEL_PARSING, the `lbzcat` threads in MULTI_INPUT_JSON, "
+            "and `num-triples-per-batch` in SETTINGS_JSON automatically, "
+            "based on the machine and the input files",
+        )
+        subparser.add_argument(
+            "--memory-budget",
+            type=str,
+            help="With `--auto-tune`, the memory that the index build may "
+            "use (default: 80%% of the currently available memory)",
+        )
+        subparser.add_argument(
+            "--profile-interval",
+            type=float,
+            default=5,
+            help="Sample the memory, CPU, and disk usage of the index build "
+            "every this many seconds and write the samples to "
+            "`<name>.index-profile.jsonl`, for `qlever index-stats` "
+            "(default: 5, use 0 to disable)",
+        )
+        subparser.add_argument(
+            "--split-input",
+            type=int,
+            metavar="K",
+            help="If INPUT_FILES is a single N-Triples or N-Quads file "
+            "(uncompressed or compressed with bzip2), split it into K parts "
+            "at line (or bzip2 block) boundaries and parse them as K "
+            "parallel input streams (without temporary copies)",
+        )
 
     # Exception for invalid JSON.
     class InvalidInputJson(Exception):
@@ -68,8 +138,14 @@ class IndexCommand(QleverCommand):
             self.additional_info = additional_info
             super().__init__()
 
-    # Helper function to get command line options from JSON.
-    def get_input_options_for_json(self, args) -> str:
+    # Helper function to get the input streams from JSON, as a list of
+    # tuples `(cmd, format, graph, parallel)`.
+    #
+    # If `partitioning` is given, append a description of how the files of
+    # each element with a `streams` key were distributed over the streams.
+    def get_input_streams_for_json(
+        self, args, partitioning: list[str] | None = None
+    ) -> list[tuple[str, ...]]:
         # Parse the JSON. If `args.multi_input_json` look like JSONL, turn
         # it into a JSON array.
         try:
@@ -94,9 +170,8 @@ class IndexCommand(QleverCommand):
                 "`MULTI_INPUT_JSON` must contain at least one element",
                 args.multi_input_json,
             )
-        # For each of the maps, construct the corresponding command-line
-        # options to the index binary.
-        input_options = []
+        # For each of the maps, determine the corresponding input streams.
+        input_streams = []
         for i, input_spec in enumerate(input_specs):
             # Check that `input_spec` is a dictionary.
             if not isinstance(input_spec, dict):
@@ -143,6 +218,48 @@ class IndexCommand(QleverCommand):
                         input_spec,
                     )
                 input_cmds = [input_spec["cmd"].format(file) for file in files]
+            # With a `streams` key, the files matching the `for-each` pattern
+            # are distributed over that many streams (consecutively, so that
+            # the order of the files is preserved, and balanced by size), and
+            # the placeholder is replaced by all files of a stream. That way,
+            # there is one decompressor per stream instead of one per file.
+            if "streams" in input_spec:
+                num_streams = input_spec["streams"]
+                if (
+                    not isinstance(num_streams, int)
+                    or isinstance(num_streams, bool)
+                    or num_streams < 1
+                ):
+                    raise self.InvalidInputJson(
+                        f"Element {i} in `MULTI_INPUT_JSON` contains a key "
+                        "`streams`, whose value must be a positive integer",
+                        input_spec,
+                    )
+                if "for-each" not in input_spec:
+                    raise self.InvalidInputJson(
+                        f"Element {i} in `MULTI_INPUT_JSON` contains a key "
+                        "`streams`, but no key `for-each`",
+                        input_spec,
+                    )
+                sizes = [Path(file).stat().st_size for file in files]
+                parts = partition_by_size(sizes, num_streams)
+                input_cmds = [
+                    input_spec["cmd"].format(
+                        " ".join(shlex.quote(files[j]) for j in part)
+                    )
+                    for part in parts
+                ]
+                if partitioning is not None:
+                    partitioning.append(
+                        f"Element {i} in `MULTI_INPUT_JSON`: {len(files)} "
+                        f"files ({format_size(sum(sizes))}) in "
+                        f"{len(parts)} streams with "
+                        + ", ".join(
+                            f"{len(part)} files "
+                            f"({format_size(sum(sizes[j] for j in part))})"
+                            for part in parts
+                        )
+                    )
             # The `format`, `graph`, and `parallel` keys are optional.
             input_format = input_spec.get("format", args.format)
             input_graph = input_spec.get("graph", "-")
@@ -154,37 +271,554 @@ class IndexCommand(QleverCommand):
                 "graph",
                 "parallel",
                 "for-each",
+                "streams",
             }
             if extra_keys:
                 raise self.InvalidInputJson(
                     f"Element {i} in `MULTI_INPUT_JSON` must only contain "
-                    "the keys `format`, `graph`, and `parallel`. Contains "
-                    f"extra keys {extra_keys}.",
+                    "the keys `format`, `graph`, `parallel`, and `streams`. "
+                    f"Contains extra keys {extra_keys}.",
                     input_spec,
                 )
-            # Add the command-line options for this input stream. We use
-            # process substitution `<(...)` as a convenient way to handle an
-            # input stream just like a file. This is not POSIX compliant, but
-            # supported by various shells, including bash and zsh. If
-            # `for-each` is specified, add one command for each matching file.
+            # If `for-each` is specified, there is one input stream for each
+            # matching file.
             for input_cmd in input_cmds:
-                input_option = f"-f <({input_cmd}) -g {input_graph}"
-                input_option += f" -F {input_format}"
-                if input_parallel == "true":
-                    input_option += " -p true"
-                else:
-                    input_option += " -p false"
-                input_options.append(input_option)
+                input_streams.append(
+                    (input_cmd, input_format, input_graph, input_parallel)
+                )
+        return input_streams
+
+    # Helper function to get command line options from JSON.
+    def get_input_options_for_json(
+        self, args, partitioning: list[str] | None = None
+    ) -> str:
+        # For each input stream, construct the corresponding command-line
+        # options to the index binary. We use process substitution `<(...)`
+        # as a convenient way to handle an input stream just like a file.
+        # This is not POSIX compliant, but supported by various shells,
+        # including bash and zsh.
+        input_options = []
+        for input_stream in self.get_input_streams_for_json(
+            args, partitioning
+        ):
+            input_cmd, input_format, input_graph, input_parallel = input_stream
+            input_option = f"-f <({input_cmd}) -g {input_graph}"
+            input_option += f" -F {input_format}"
+            if input_parallel == "true":
+                input_option += " -p true"
+            else:
+                input_option += " -p false"
+            input_options.append(input_option)
         # Return the concatenated command-line options.
         return " ".join(input_options)
 
+    # Helper function that checks that each pattern in `INPUT_FILES` matches
+    # at least one file.
+    def input_files_exist(self, args) -> bool:
+        for pattern in shlex.split(args.input_files):
+            if len(glob.glob(pattern)) == 0:
+                log.error(f'No file matching "{pattern}" found')
+                log.info("")
+                log.info(
+                    "Did you call `qlever get-data`? If you did, check "
+                    "GET_DATA_CMD and INPUT_FILES in the QLeverfile"
+                )
+                return False
+        return True
+
+    def split_input_file(self, args) -> bool:
+        """
+        Part of `execute` for `--split-input`: replace the single input
+        stream from `CAT_INPUT_FILES` by an equivalent `MULTI_INPUT_JSON` with
+        `args.split_input` streams, each reading one part of the single input
+        file (see `qlever/split_input.py` for how the file is split).
+        """
+        num_parts = args.split_input
+        if num_parts < 1:
+            log.error("The argument of `--split-input` must be positive")
+            return False
+        if not args.cat_input_files or args.multi_input_json:
+            log.error(
+                "`--split-input` requires that the input is specified via "
+                "`CAT_INPUT_FILES` and not via `MULTI_INPUT_JSON`"
+            )
+            return False
+        if args.format not in ["nt", "nq"]:
+            log.error(
+                f"`--split-input` requires a line-based input format "
+                f'(nt or nq), but the format is "{args.format}"'
+            )
+            return False
+        input_files = sorted(
+            file
+            for pattern in shlex.split(args.input_files)
+            for file in glob.glob(pattern)
+        )
+        if len(input_files) != 1:
+            log.error(
+                f"`--split-input` requires that INPUT_FILES matches exactly "
+                f"one file, but it matches {len(input_files)} files"
+            )
+            return False
+        input_file = input_files[0]
+
+        # Uncompressed files are split into byte ranges that start at the
+        # beginning of a line. For bzip2, each part is decompressed by
+        # `qlever.split_input`, which needs the Python of this `qlever`
+        # installation and therefore does not work inside a container.
+        suffix = Path(input_file).suffix
+        if suffix == ".bz2":
+            if args.system != "native":
+                log.error(
+                    "`--split-input` for a bzip2 file requires "
+                    "`--system native`"
+                )
+                return False
+            input_cmds = [
+                f"{shlex.quote(sys.executable)} -m qlever.split_input "
+                f"{shlex.quote(input_file)} {i} {num_parts}"
+                for i in range(num_parts)
+            ]
+        elif suffix in [".gz", ".zst", ".xz"]:
+            log.error(
+                f"`--split-input` does not work for {suffix} files, which "
+                f"cannot be decompressed starting from the middle (use "
+                f"bzip2 or uncompressed input, or several files with "
+                f"MULTI_INPUT_JSON)"
+            )
+            return False
+        else:
+            offsets = get_line_aligned_offsets(input_file, num_parts)
+            input_cmds = [
+                f"tail -c +{begin + 1} {shlex.quote(input_file)}"
+                f" | head -c {end - begin}"
+                for begin, end in zip(offsets, offsets[1:])
+            ]
+        args.multi_input_json = json.dumps(
+            [
+                {
+                    "cmd": input_cmd,
+                    "format": args.format,
+                    "graph": "-",
+                    "parallel": "true",
+                }
+                for input_cmd in input_cmds
+            ]
+        )
+        args.cat_input_files = None
+        return True
+
+    def execute_preflight(self, args) -> bool:
+        """
+        Part of `execute` for `--preflight`: check all input streams in
+        parallel (one process per stream, at most one per core) and report
+        the throughput, the estimated number of triples, and the first errors.
+        """
+
+        # Get the input streams, as tuples `(cmd, format, graph, parallel)`.
+        # For `CAT_INPUT_FILES`, the estimate of the total number of triples
+        # is relative to all of the `INPUT_FILES` (for the streams from
+        # `MULTI_INPUT_JSON`, the files are taken from their commands).
+        input_files = None
+        if args.cat_input_files:
+            input_streams = [
+                (
+                    args.cat_input_files,
+                    args.format,
+                    "-",
+                    args.parallel_parsing or "false",
+                )
+            ]
+            input_files = [
+                file
+                for pattern in shlex.split(args.input_files or "")
+                for file in sorted(glob.glob(pattern))
+            ]
+        else:
+            input_streams = self.get_input_streams_for_json(args)
+        try:
+            if args.preflight_sample_size == "all":
+                max_bytes = None
+            else:
+                max_bytes = parse_size(args.preflight_sample_size)
+        except ValueError as e:
+            log.error(e)
+            return False
+        num_workers = min(len(input_streams), psutil.cpu_count() or 1)
+
+        # Show what we are doing.
+        sample_description = (
+            "the complete output"
+            if max_bytes is None
+            else f"the first {format_size(max_bytes)}"
+        )
+        self.show(
+            f"Check {sample_description} of each of the "
+            f"{len(input_streams)} input stream(s), using {num_workers} "
+            f"process(es) in parallel:\n"
+            + "\n".join(input_cmd for input_cmd, *_ in input_streams),
+            only_show=args.show,
+        )
+        if args.show:
+            return True
+        if not self.input_files_exist(args):
+            return False
+
+        # Check the input streams in parallel.
+        start_time = time.monotonic()
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            futures = [
+                executor.submit(
+                    check_input_stream,
+                    input_cmd,
+                    parallel=input_parallel == "true",
+                    max_bytes=max_bytes,
+                    input_files=input_files,
+                )
+                for input_cmd, _, _, input_parallel in input_streams
+            ]
+            results = []
+            for input_stream, future in zip(input_streams, futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    log.error(f"Checking `{input_stream[0]}` failed: {e}")
+                    return False
+        duration = time.monotonic() - start_time
+
+        # Show one line per input stream.
+        for i, result in enumerate(results):
+            status = "OK" if result["num_errors"] == 0 else "ERRORS"
+            if result["cmd_error"] is not None:
+                status = "FAILED"
+            log.info(
+                f"Stream #{i + 1:<3} {status:<6}"
+                f" {format_size(result['num_bytes']):>10} checked,"
+                f" {result['num_triples']:>13,} triples"
+                f" ({result['triples_per_second']:>11,.0f} triples/s)"
+                f"{'' if result['completed'] else ' [sampled]'}"
+            )
+
+        # Show the first errors (with byte offsets).
+        num_errors = sum(result["num_errors"] for result in results)
+        cmd_errors = [r for r in results if r["cmd_error"] is not None]
+        if num_errors > 0 or cmd_errors:
+            log.info("")
+            for i, result in enumerate(results):
+                if result["cmd_error"] is not None:
+                    log.error(f"Stream #{i + 1}: {result['cmd_error']}")
+                for error in result["errors"]:
+                    log.error(
+                        f"Stream #{i + 1}, line {error['line']:,},"
+                        f" byte offset {error['offset']:,}:"
+                        f" {error['message']}"
+                    )
+
+        # Show the summary. The estimated number of triples is only available
+        # if it could be determined for all streams (see `check_input_stream`).
+        num_triples = sum(result["num_triples"] for result in results)
+        estimates = [result["estimated_num_triples"] for result in results]
+        log.info("")
+        log.info(
+            f"Checked {num_triples:,} triples in {duration:.1f}s"
+            f" ({num_triples / max(duration, 1e-6):,.0f} triples/s)"
+            f", found {num_errors:,} error(s)"
+        )
+        if all(estimate is not None for estimate in estimates):
+            estimated_num_triples = sum(estimates)
+            log.info(
+                f"Estimated total number of triples: "
+                f"{estimated_num_triples:,}"
+            )
+            # Reading the complete input takes at least this long.
+            if num_triples > 0 and estimated_num_triples > num_triples:
+                estimated_read_time = (
+                    duration * estimated_num_triples / num_triples
+                )
+                log.info(
+                    f"Estimated time for reading the complete input with "
+                    f"{num_workers} process(es): "
+                    f"{estimated_read_time / 60:,.1f} min"
+                )
+        else:
+            log.info(
+                "Could not estimate the total number of triples (use "
+                "`--preflight-sample-size all` to check everything)"
+            )
+        return num_errors == 0 and not cmd_errors
+
+    def auto_tune(self, args) -> bool:
+        """
+        Part of `execute` for `--auto-tune`: determine the resource settings
+        for the index build from the number of cores, the available memory,
+        the file system, and the size and compression of the input files.
+        The settings are written to `args`, and each choice is explained.
+
+        NOTE: The memory for the batches is 30% of the memory budget, and the
+        memory for the parser buffers is about 10% (but at least two buffers
+        of 10 MB per core). STXXL_MEMORY gets the rest, but at most 50%, so
+        that the sum never exceeds the budget.
+        """
+
+        # Characteristics of the machine.
+        num_cores = psutil.cpu_count(logical=True) or 1
+        if args.memory_budget is not None:
+            try:
+                memory_budget = parse_size(args.memory_budget)
+            except ValueError as e:
+                log.error(e)
+                return False
+        else:
+            memory_budget = int(0.8 * psutil.virtual_memory().available)
+        if memory_budget < 1024**3:
+            log.error(
+                f"Memory budget of {format_size(memory_budget)} is too "
+                f"small for an index build (at least 1 GB needed)"
+            )
+            return False
+        partition = get_partition(Path.cwd())
+        fs_type = partition.fstype if partition else "unknown"
+        disk_free = psutil.disk_usage(str(Path.cwd())).free
+
+        # Characteristics of the input: total size, and the compression (of
+        # the majority of the bytes). The uncompressed size and the number of
+        # triples are rough estimates based on typical compression ratios and
+        # about 100 bytes per triple.
+        input_files = [
+            file
+            for pattern in shlex.split(args.input_files)
+            for file in glob.glob(pattern)
+        ]
+        size_per_compression = {}
+        for file in input_files:
+            suffix = Path(file).suffix.lstrip(".")
+            if suffix not in ["gz", "bz2", "zst", "xz"]:
+                suffix = "none"
+            size_per_compression[suffix] = size_per_compression.get(
+                suffix, 0
+            ) + Path(file).stat().st_size
+        input_size = sum(size_per_compression.values())
+        compression = max(
+            size_per_compression, key=size_per_compression.get, default="none"
+        )
+        compression_ratio = {"gz": 8, "bz2": 12, "zst": 10, "xz": 15}
+        uncompressed_size = input_size * compression_ratio.get(compression, 1)
+        num_triples = max(uncompressed_size // 100, 1)
+        log.info(
+            f"Machine: {num_cores} cores, memory budget "
+            f"{format_size(memory_budget)}, {format_size(disk_free)} free "
+            f"disk space ({fs_type})"
+        )
+        log.info(
+            f"Input: {len(input_files)} file(s), {format_size(input_size)} "
+            f"(compression: {compression}), estimated "
+            f"{num_triples:,} triples"
+        )
+        log.info("")
+
+        # The settings, as triples `(name, value, explanation)`.
+        settings = []
+
+        # With parallel parsing, several batches are in RAM at the same time,
+        # we assume three batches and about 300 bytes per triple.
+        batch_memory = memory_budget * 3 // 10
+        num_triples_per_batch = batch_memory // (3 * 300)
+        num_triples_per_batch = min(num_triples_per_batch, num_triples)
+        num_triples_per_batch = min(max(num_triples_per_batch, 100_000), 50e6)
+        num_triples_per_batch = int(round(num_triples_per_batch, -5))
+        try:
+            settings_json = json.loads(args.settings_json)
+        except Exception as e:
+            log.error(f"Failed to parse `SETTINGS_JSON` ({e})")
+            return False
+        settings_json["num-triples-per-batch"] = num_triples_per_batch
+        settings.append(
+            (
+                "num-triples-per-batch",
+                f"{num_triples_per_batch:,}",
+                "3 batches of ~300 bytes per triple fit into 30% of the "
+                "memory budget",
+            )
+        )
+        args.settings_json = json.dumps(settings_json)
+
+        # Each parser thread has its own buffers, we assume two per core.
+        parser_buffer_size = memory_budget // 10 // (2 * num_cores)
+        parser_buffer_size = min(
+            max(parser_buffer_size, 10 * 1024**2), 100 * 1024**2
+        )
+        parser_buffer_size = parser_buffer_size // (10 * 1024**2) * 10
+        parser_memory = 2 * num_cores * parser_buffer_size * 1024**2
+        settings.append(
+            (
+                "PARSER_BUFFER_SIZE",
+                f"{parser_buffer_size}M",
+                f"two buffers per core ({num_cores} cores) fit into "
+                f"{format_size(parser_memory)} of the memory budget",
+            )
+        )
+        args.parser_buffer_size = f"{parser_buffer_size}M"
+
+        # STXXL_MEMORY gets what is left of the memory budget (at most half
+        # of it). With many cores and a small budget, the parser buffers can
+        # take more than their 10%, and there might not be enough left.
+        stxxl_memory = min(
+            memory_budget // 2, memory_budget - batch_memory - parser_memory
+        )
+        if stxxl_memory < 512 * 1024**2:
+            log.error(
+                f"Memory budget of {format_size(memory_budget)} is too "
+                f"small for an index build with {num_cores} cores (the parser "
+                f"buffers alone need {format_size(parser_memory)})"
+            )
+            return False
+        stxxl_memory = (
+            f"{stxxl_memory // 1024**3}G"
+            if stxxl_memory >= 1024**3
+            else f"{stxxl_memory // 1024**2}M"
+        )
+        settings.append(
+            (
+                "STXXL_MEMORY",
+                stxxl_memory,
+                "the rest of the memory budget (at most 50%), for sorting "
+                "the triples",
+            )
+        )
+        args.stxxl_memory = stxxl_memory
+
+        # Each batch leads to a few files that are open at the same time when
+        # the partial vocabularies are merged.
+        num_batches = num_triples // num_triples_per_batch + 1
+        soft_limit, hard_limit = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if hard_limit == resource.RLIM_INFINITY:
+            hard_limit = 1048576
+        if (
+            soft_limit != resource.RLIM_INFINITY
+            and 10 * num_batches + 1000 > soft_limit
+        ):
+            ulimit = min(max(10 * num_batches + 1000, 65536), hard_limit)
+            settings.append(
+                (
+                    "ULIMIT",
+                    f"{ulimit}",
+                    f"~{num_batches:,} batches, the current limit of "
+                    f"{soft_limit} open files is too small",
+                )
+            )
+            args.ulimit = ulimit
+
+        # Parallel parsing is always safe for N-Triples and N-Quads (for
+        # Turtle, it requires that all prefix declarations are at the
+        # beginning, which we cannot check without reading everything).
+        if args.cat_input_files and args.format in ["nt", "nq"]:
+            settings.append(
+                (
+                    "PARALLEL_PARSING",
+                    "true",
+                    f"the input format is {args.format}",
+                )
+            )
+            args.parallel_parsing = "true"
+
+        # Distribute about half of the cores over the `lbzcat` commands in
+        # `MULTI_INPUT_JSON`, proportionally to the size of their input files
+        # (the other half is for parsing).
+        if args.multi_input_json and "lbzcat" in args.multi_input_json:
+            try:
+                input_specs = json.loads(args.multi_input_json)
+                if isinstance(input_specs, dict):
+                    input_specs = [input_specs]
+            except Exception:
+                input_specs = []
+            lbzcat_specs = [
+                spec
+                for spec in input_specs
+                if isinstance(spec, dict) and "lbzcat" in spec.get("cmd", "")
+            ]
+            spec_sizes = [
+                sum(
+                    Path(file).stat().st_size
+                    for word in shlex.split(spec["cmd"])
+                    for file in glob.glob(word)
+                    if Path(file).is_file()
+                )
+                + 1
+                for spec in lbzcat_specs
+            ]
+            num_threads = max(num_cores // 2, len(lbzcat_specs))
+            for spec, size in zip(lbzcat_specs, spec_sizes):
+                num_threads_spec = max(
+                    round(num_threads * size / sum(spec_sizes)), 1
+                )
+                spec["cmd"] = re.sub(
+                    r"lbzcat(\s+-n\s*\d+)?",
+                    f"lbzcat -n {num_threads_spec}",
+                    spec["cmd"],
+                )
+                settings.append(
+                    (
+                        "lbzcat threads",
+                        f"{num_threads_spec}",
+                        f"for `{spec['cmd']}`, proportional to its share "
+                        f"of the input size",
+                    )
+                )
+            if lbzcat_specs:
+                args.multi_input_json = json.dumps(input_specs)
+
+        # Show the settings and warn about potential problems.
+        log.info("Automatically tuned settings for the index build:")
+        log.info("")
+        for name, value, explanation in settings:
+            log.info(f"{name:<22} = {value:<12} ({explanation})")
+        log.info("")
+        if fs_type in ["nfs", "nfs4", "cifs", "smbfs", "fuse.sshfs"]:
+            log.warning(
+                f"The index is built on a network file system ({fs_type}), "
+                f"the build will likely be limited by IO"
+            )
+            log.info("")
+        elif fs_type == "tmpfs":
+            log.warning(
+                "The index is built on tmpfs, the index files will use RAM "
+                "in addition to the memory budget"
+            )
+            log.info("")
+        if disk_free < uncompressed_size:
+            log.warning(
+                f"Only {format_size(disk_free)} of free disk space, the "
+                f"index build may need about as much as the uncompressed "
+                f"input (estimated {format_size(uncompressed_size)})"
+            )
+            log.info("")
+        return True
+
     def execute(self, args) -> bool:
+        # With `--split-input`, split the single input file into several
+        # parallel input streams.
+        if args.split_input and not self.split_input_file(args):
+            return False
+
+        # With `--auto-tune`, choose the resource settings automatically.
+        if args.auto_tune and not self.auto_tune(args):
+            return False
+
         # The mandatory part of the command line (specifying the input, the
         # basename of the index, and the settings file). There are two ways
         # to specify the input: via a single stream or via multiple streams.
+        # Natively, the index builder is placed on the CPUs and NUMA nodes
+        # from the Qleverfile (in a container, via the container options).
+        placement_prefix = (
+            get_native_placement_prefix(args)
+            if args.system not in Containerize.supported_systems()
+            else ""
+        )
+        partitioning = []
         if args.cat_input_files and not args.multi_input_json:
             index_cmd = (
-                f"{args.cat_input_files} | {args.index_binary}"
+                f"{args.cat_input_files} | {placement_prefix}"
+                f"{args.index_binary}"
                 f" -i {args.name} -s {args.name}.settings.json"
                 f" --vocabulary-type {args.vocabulary_type}"
                 f" -F {args.format} -f -"
@@ -193,14 +827,16 @@ class IndexCommand(QleverCommand):
                 index_cmd += f" -p {args.parallel_parsing}"
         elif args.multi_input_json and not args.cat_input_files:
             try:
-                input_options = self.get_input_options_for_json(args)
+                input_options = self.get_input_options_for_json(
+                    args, partitioning
+                )
             except self.InvalidInputJson as e:
                 log.error(e.error_message)
                 log.info("")
                 log.info(e.additional_info)
                 return False
             index_cmd = (
-                f"{args.index_binary}"
+                f"{placement_prefix}{args.index_binary}"
                 f" -i {args.name} -s {args.name}.settings.json"
                 f" --vocabulary-type {args.vocabulary_type}"
                 f" {input_options}"
@@ -260,6 +896,8 @@ class IndexCommand(QleverCommand):
                 args.index_container,
                 volumes=[("$(pwd)", "/index")],
                 working_directory="/index",
+                cpuset_cpus=args.cpuset_cpus,
+                cpuset_mems=args.cpuset_mems,
             )
 
         # Command for writing the settings JSON to a file.
@@ -268,8 +906,19 @@ class IndexCommand(QleverCommand):
             f"> {args.name}.settings.json"
         )
 
-        # Show the command line.
-        self.show(f"{settings_json_cmd}\n{index_cmd}", only_show=args.show)
+        # With `--preflight`, only check the input streams.
+        if args.preflight:
+            return self.execute_preflight(args)
+
+        # Show the command line (preceded by the distribution of the input
+        # files over the input streams, if `MULTI_INPUT_JSON` uses `streams`).
+        partitioning_comments = "".join(
+            f"# {line}\n" for line in partitioning
+        )
+        self.show(
+            f"{partitioning_comments}{settings_json_cmd}\n{index_cmd}",
+            only_show=args.show,
+        )
         if args.show:
             return True
 
@@ -278,16 +927,13 @@ class IndexCommand(QleverCommand):
             if not binary_exists(args.index_binary, "index-binary"):
                 return False
 
+        # Check the placement on CPUs and NUMA nodes.
+        if not check_placement(args):
+            return False
+
         # Check if all of the input files exist.
-        for pattern in shlex.split(args.input_files):
-            if len(glob.glob(pattern)) == 0:
-                log.error(f'No file matching "{pattern}" found')
-                log.info("")
-                log.info(
-                    "Did you call `qlever get-data`? If you did, check "
-                    "GET_DATA_CMD and INPUT_FILES in the QLeverfile"
-                )
-                return False
+        if not self.input_files_exist(args):
+            return False
 
         # Check if index files (name.index.*) already exist.
         existing_index_files = get_existing_index_files(args.name)
@@ -323,11 +969,26 @@ class IndexCommand(QleverCommand):
             log.error(f"Writing the settings.json file failed: {e}")
             return False
 
-        # Run the index command.
+        # Run the index command, and sample the resource usage of the index
+        # build while it is running.
+        profiler = None
+        if args.profile_interval > 0:
+            is_containerized = args.system in Containerize.supported_systems()
+            profiler = IndexProfiler(
+                f"{args.name}.index-profile.jsonl",
+                args.name,
+                args.profile_interval,
+                system=args.system if is_containerized else None,
+                container=args.index_container if is_containerized else None,
+            )
+            profiler.start()
         try:
             run_command(index_cmd, show_output=True)
         except Exception as e:
             log.error(f"Building the index failed: {e}")
             return False
+        finally:
+            if profiler is not None:
+                profiler.stop()
 
         return True
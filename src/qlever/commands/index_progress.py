@@ -0,0 +1,387 @@
+from __future__ import annotations
+
+import json
+import re
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from qlever.command import QleverCommand
+from qlever.commands.index_stats import (
+    INDEX_LOG_CONVERT_BEGIN_REGEX,
+    INDEX_LOG_END_REGEX,
+    INDEX_LOG_MERGE_BEGIN_REGEX,
+    INDEX_LOG_PARSE_BEGIN_REGEX,
+    INDEX_LOG_PERM_BEGIN_OLD_REGEX,
+    INDEX_LOG_PERM_BEGIN_REGEX,
+    INDEX_LOG_TIMESTAMP_FORMAT,
+    INDEX_LOG_TIMESTAMP_REGEX,
+)
+from qlever.log import log
+
+# Regex for log lines that report the number of triples processed so far, for
+# example, "Triples parsed: 123,456,789 [average speed 2.1 M/s, ...]".
+INDEX_LOG_NUM_TRIPLES_REGEX = (
+    r"INFO:\s*(?:Input )?[Tt]riples (?:parsed|processed|converted|sorted)"
+    r"[^:]*:\s*([\d,]+)"
+)
+
+
+def format_duration(seconds: float | None) -> str:
+    """
+    Format a duration in seconds as `H:MM:SS` (or `?` if it is `None`).
+    """
+    if seconds is None:
+        return "?"
+    seconds = max(round(seconds), 0)
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+class IndexBuildProgress:
+    """
+    Incrementally parse the lines of an index log and keep track of the
+    phases of the index build (same phases as for `index-stats`), their start
+    times, and the number of triples processed in the current phase.
+    """
+
+    def __init__(self):
+        self.phases = []
+        self.phase_begins = []
+        self.num_triples = 0
+        self.num_triples_time = None
+        self.total_num_triples = None
+        self.last_timestamp = None
+        self.end = None
+        self.num_perms = 0
+        self.partial_line = ""
+
+    def start_phase(self, phase: str, timestamp: datetime):
+        self.phases.append(phase)
+        self.phase_begins.append(timestamp)
+        self.num_triples = 0
+        self.num_triples_time = None
+
+    def add_text(self, text: str):
+        """
+        Add text that was read from the log. The log may still be written,
+        so the text may end in the middle of a line. That line is parsed
+        only once it is complete, that is, with the text from the next call
+        (like in `ServerStartupWatcher`).
+        """
+        lines = (self.partial_line + text).split("\n")
+        self.partial_line = lines.pop()
+        for line in lines:
+            self.add_line(line)
+
+    def add_line(self, line: str):
+        timestamp_match = re.match(INDEX_LOG_TIMESTAMP_REGEX, line)
+        if timestamp_match is None:
+            return
+        timestamp = datetime.strptime(
+            timestamp_match.group(), INDEX_LOG_TIMESTAMP_FORMAT
+        )
+        self.last_timestamp = timestamp
+        perm_match = re.search(INDEX_LOG_PERM_BEGIN_REGEX, line)
+        if re.search(INDEX_LOG_PARSE_BEGIN_REGEX, line) and not self.phases:
+            self.start_phase("Parse input", timestamp)
+        elif re.search(INDEX_LOG_MERGE_BEGIN_REGEX, line):
+            # The number of triples at the end of the parse phase is the
+            # total number of triples.
+            self.total_num_triples = self.num_triples or None
+            self.start_phase("Build vocabularies", timestamp)
+        elif re.search(INDEX_LOG_CONVERT_BEGIN_REGEX, line):
+            self.start_phase("Convert to global IDs", timestamp)
+        elif perm_match or re.search(INDEX_LOG_PERM_BEGIN_OLD_REGEX, line):
+            self.num_perms += 1
+            perm_info = (
+                perm_match.group(1).replace(" and ", " & ")
+                if perm_match
+                else f"#{self.num_perms}"
+            )
+            self.start_phase(f"Permutation {perm_info}", timestamp)
+        elif re.search(INDEX_LOG_END_REGEX, line):
+            self.end = timestamp
+        else:
+            num_triples_match = re.search(INDEX_LOG_NUM_TRIPLES_REGEX, line)
+            if num_triples_match and self.phases:
+                self.num_triples = int(
+                    num_triples_match.group(1).replace(",", "")
+                )
+                self.num_triples_time = timestamp
+
+    def phase_durations(self) -> dict[str, float]:
+        """
+        Return the durations (in seconds) of all completed phases.
+        """
+        ends = self.phase_begins[1:] + ([self.end] if self.end else [])
+        return {
+            phase: (end - begin).total_seconds()
+            for phase, begin, end in zip(self.phases, self.phase_begins, ends)
+        }
+
+
+def read_index_log(log_file_name: str) -> IndexBuildProgress:
+    """
+    Parse the given index log (if it is still being written, the last line
+    is ignored when it is not complete yet).
+    """
+    progress = IndexBuildProgress()
+    with open(log_file_name, "r", errors="replace") as log_file:
+        progress.add_text(log_file.read())
+    return progress
+
+
+class IndexProgressCommand(QleverCommand):
+    """
+    Class for executing the `index-progress` command.
+    """
+
+    def __init__(self):
+        pass
+
+    def description(self) -> str:
+        return (
+            "Follow the progress of a running index build, with throughput "
+            "and estimated time of arrival (ETA)"
+        )
+
+    def should_have_qleverfile(self) -> bool:
+        return False
+
+    def relevant_qleverfile_arguments(self) -> dict[str, list[str]]:
+        return {"data": ["name"]}
+
+    def additional_arguments(self, subparser) -> None:
+        subparser.add_argument(
+            "--interval",
+            type=float,
+            default=2,
+            help="Update the progress every this many seconds (default: 2)",
+        )
+        subparser.add_argument(
+            "--once",
+            action="store_true",
+            default=False,
+            help="Show the current progress once and exit",
+        )
+        subparser.add_argument(
+            "--num-triples",
+            type=int,
+            help="The expected number of triples, for the ETA of the parse "
+            "phase when there are no earlier builds (see `qlever index "
+            "--preflight` for an estimate)",
+        )
+        subparser.add_argument(
+            "--history-file",
+            type=str,
+            help="File with the phase durations of earlier builds, used for "
+            "the ETA and extended when a build completes "
+            "(default: `<name>.index-history.jsonl`)",
+        )
+
+    def read_history(self, args) -> list[dict]:
+        """
+        Read the phase durations and number of triples of earlier builds,
+        from the history file and from the index logs in the `previous.*`
+        directories left behind by `rebuild-index`. The most recent build
+        comes last.
+        """
+        history = []
+        for log_file_name in sorted(
+            Path(".").glob(f"previous.*/{args.name}.index-log.txt")
+        ):
+            try:
+                progress = read_index_log(str(log_file_name))
+            except Exception as e:
+                log.debug(f"Could not read {log_file_name}: {e}")
+                continue
+            if progress.end is not None:
+                history.append(
+                    {
+                        "finished": progress.end.isoformat(),
+                        "num_triples": progress.total_num_triples,
+                        "phases": progress.phase_durations(),
+                    }
+                )
+        if Path(args.history_file).exists():
+            with open(args.history_file, "r") as history_file:
+                for line in history_file:
+                    try:
+                        history.append(json.loads(line))
+                    except json.JSONDecodeError as e:
+                        log.warning(f"Ignoring line in history file: {e}")
+        return history
+
+    def estimate_remaining(
+        self, progress: IndexBuildProgress, history: list[dict], args
+    ) -> tuple[float | None, float | None, float | None]:
+        """
+        Return the elapsed time of the current phase, the estimated remaining
+        time of the current phase, and the estimated remaining time of the
+        whole build (the latter two are `None` if unknown).
+        """
+        phase = progress.phases[-1]
+        now = progress.last_timestamp
+        phase_elapsed = (now - progress.phase_begins[-1]).total_seconds()
+
+        # Expected duration of each phase, as the median over earlier builds.
+        expected_durations = {}
+        for record in history:
+            for name, seconds in record["phases"].items():
+                expected_durations.setdefault(name, []).append(seconds)
+        expected_durations = {
+            name: statistics.median(durations)
+            for name, durations in expected_durations.items()
+        }
+
+        # For the parse phase, we can do better if we know the total number
+        # of triples (from the command line or the most recent build).
+        expected_num_triples = args.num_triples
+        if expected_num_triples is None:
+            for record in reversed(history):
+                if record.get("num_triples"):
+                    expected_num_triples = record["num_triples"]
+                    break
+        phase_remaining = None
+        if (
+            phase == "Parse input"
+            and expected_num_triples
+            and progress.num_triples > 0
+            and progress.num_triples_time is not None
+        ):
+            rate = progress.num_triples / max(
+                (
+                    progress.num_triples_time - progress.phase_begins[-1]
+                ).total_seconds(),
+                1,
+            )
+            phase_remaining = (
+                max(expected_num_triples - progress.num_triples, 0) / rate
+            )
+        elif phase in expected_durations:
+            phase_remaining = max(expected_durations[phase] - phase_elapsed, 0)
+
+        # The remaining time overall is the remaining time of this phase plus
+        # the expected durations of all phases after it.
+        total_remaining = None
+        if phase_remaining is not None and expected_durations:
+            later_phases = list(expected_durations.keys())
+            if phase in later_phases:
+                later_phases = later_phases[later_phases.index(phase) + 1:]
+            else:
+                later_phases = []
+            total_remaining = phase_remaining + sum(
+                expected_durations[name] for name in later_phases
+            )
+        return phase_elapsed, phase_remaining, total_remaining
+
+    def show_progress(
+        self, progress: IndexBuildProgress, history: list[dict], args
+    ):
+        """
+        Show a one-line summary of the current progress (overwriting the
+        previous one if the output is a terminal).
+        """
+        if not progress.phases:
+            line = "Waiting for the index build to start ..."
+        else:
+            phase_elapsed, phase_remaining, total_remaining = (
+                self.estimate_remaining(progress, history, args)
+            )
+            total_elapsed = (
+                progress.last_timestamp - progress.phase_begins[0]
+            ).total_seconds()
+            line = (
+                f"{progress.phases[-1]:<21} |"
+                f" elapsed {format_duration(phase_elapsed)}"
+                f" (total {format_duration(total_elapsed)}) |"
+                f" ETA {format_duration(phase_remaining)}"
+                f" (total {format_duration(total_remaining)})"
+            )
+            if progress.num_triples > 0:
+                rate = progress.num_triples / max(
+                    (
+                        progress.num_triples_time - progress.phase_begins[-1]
+                    ).total_seconds(),
+                    1,
+                )
+                line += (
+                    f" | {progress.num_triples:,} triples"
+                    f" ({rate / 1e6:.1f} M/s)"
+                )
+        if sys.stdout.isatty():
+            print(f"\r\033[K{line}", end="", flush=True)
+        else:
+            log.info(line)
+
+    def execute(self, args) -> bool:
+        log_file_name = f"{args.name}.index-log.txt"
+        if args.history_file is None:
+            args.history_file = f"{args.name}.index-history.jsonl"
+        self.show(
+            f"Follow `{log_file_name}` and show the current phase of the "
+            f"index build, its throughput, and the ETA (based on the "
+            f"builds recorded in `{args.history_file}` and in `previous.*`)",
+            only_show=args.show,
+        )
+        if args.show:
+            return True
+
+        # Read the history of earlier builds.
+        history = self.read_history(args)
+        if len(history) > 0:
+            log.info(f"Using {len(history)} earlier build(s) for the ETA")
+            log.info("")
+
+        # Follow the log file, reading only the new lines in each iteration.
+        progress = IndexBuildProgress()
+        try:
+            log_file = open(log_file_name, "r", errors="replace")
+        except Exception as e:
+            log.error(f"Problem reading index log file {log_file_name}: {e}")
+            return False
+        try:
+            while True:
+                progress.add_text(log_file.read())
+                if progress.end is not None or args.once:
+                    break
+                self.show_progress(progress, history, args)
+                time.sleep(args.interval)
+        except KeyboardInterrupt:
+            if sys.stdout.isatty():
+                print()
+            return True
+        finally:
+            log_file.close()
+        if sys.stdout.isatty() and not args.once:
+            print()
+
+        # If the build is still running, show the progress once (this is
+        # what `--once` does). Otherwise, show the phase durations and add
+        # them to the history.
+        if progress.end is None:
+            self.show_progress(progress, history, args)
+            if sys.stdout.isatty():
+                print()
+            return True
+        phase_durations = progress.phase_durations()
+        for phase, seconds in phase_durations.items():
+            log.info(f"{phase:<21} : {format_duration(seconds)}")
+        log.info("")
+        total_seconds = (
+            progress.end - progress.phase_begins[0]
+        ).total_seconds()
+        log.info(f"{'TOTAL time':<21} : {format_duration(total_seconds)}")
+        record = {
+            "finished": progress.end.isoformat(),
+            "num_triples": progress.total_num_triples,
+            "phases": phase_durations,
+        }
+        if not any(
+            r.get("finished") == record["finished"] for r in history
+        ):
+            with open(args.history_file, "a") as history_file:
+                print(json.dumps(record), file=history_file)
+        return True
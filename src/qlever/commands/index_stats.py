@@ -1,12 +1,43 @@
 from __future__ import annotations
 
+import json
+import os
 import re
 from datetime import datetime
 from pathlib import Path
 
 from qlever.command import QleverCommand
-from qlever.log import log
-from qlever.util import get_total_file_size
+from qlever.index_profile import (
+    PROFILE_METRICS,
+    read_profile,
+    summarize_profile,
+)
+from qlever.log import log, log_levels, mute_log
+from qlever.page_cache import get_cached_size
+from qlever.util import (
+    get_existing_index_files,
+    get_index_file_role,
+    get_total_file_size,
+    is_permutation_file,
+)
+
+# Regexes for the key lines of the index log, marking the beginning of the
+# phases of the index build (also used by `index-progress`).
+INDEX_LOG_TIMESTAMP_REGEX = r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}"
+INDEX_LOG_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+INDEX_LOG_PARSE_BEGIN_REGEX = r"INFO:\s*Processing"
+INDEX_LOG_MERGE_BEGIN_REGEX = r"INFO:\s*Merging partial vocab"
+INDEX_LOG_CONVERT_BEGIN_REGEX = r"INFO:\s*Converting triples"
+INDEX_LOG_PERM_BEGIN_OLD_REGEX = r"INFO:\s*Creating a pair"
+INDEX_LOG_PERM_INFO_OLD_REGEX = (
+    r"INFO:\s*Writing meta data for ([A-Z]+ and [A-Z]+)"
+)
+INDEX_LOG_PERM_BEGIN_REGEX = (
+    r"INFO:\s*Creating permutations ([A-Z]+ and [A-Z]+)"
+)
+INDEX_LOG_END_REGEX = r"INFO:\s*Index build completed"
+INDEX_LOG_TEXT_BEGIN_REGEX = r"INFO:\s*Adding text index"
+INDEX_LOG_TEXT_END_REGEX = r"INFO:\s*Text index build comp"
 
 
 class IndexStatsCommand(QleverCommand):
@@ -57,10 +88,43 @@ class IndexStatsCommand(QleverCommand):
             default="auto",
             help="The size unit",
         )
+        subparser.add_argument(
+            "--space-details",
+            action="store_true",
+            default=False,
+            help="Show the space used per index file and per role (like "
+            "each permutation), with the apparent size, the allocated size "
+            "on disk, how much is in the page cache, and the bytes per "
+            "triple",
+        )
+        subparser.add_argument(
+            "--output",
+            choices=["text", "json"],
+            default="text",
+            help="Show the statistics as text or as JSON (with the times "
+            "in seconds and the sizes in bytes)",
+        )
+        subparser.add_argument(
+            "--compare",
+            type=str,
+            metavar="DIR_OR_JSON",
+            help="Compare with an earlier build, given by a directory with "
+            "its index log and index files (for example, a `previous.*` "
+            "directory from `rebuild-index`) or by the output of "
+            "`index-stats --output json`",
+        )
 
-    def execute_time(self, args, log_file_name) -> bool:
+    def execute_time(
+        self,
+        args,
+        log_file_name,
+        phase_intervals: list | None = None,
+        text_log_file_name: str | None = None,
+    ) -> bool:
         """
-        Part of `execute` that shows the time used.
+        Part of `execute` that shows the time used. If `phase_intervals` is
+        given, append a tuple `(heading, seconds, begin, end)` for each phase
+        (including the total time).
         """
 
         # Read the content of `log_file_name` into a list of lines.
@@ -73,7 +137,8 @@ class IndexStatsCommand(QleverCommand):
         # If there is a separate `add-text-index-log.txt` file, append those
         # lines.
         try:
-            text_log_file_name = f"{args.name}.text-index-log.txt"
+            if text_log_file_name is None:
+                text_log_file_name = f"{args.name}.text-index-log.txt"
             if Path(text_log_file_name).exists():
                 with open(text_log_file_name, "r") as text_log_file:
                     lines.extend(text_log_file.readlines())
@@ -103,8 +168,8 @@ class IndexStatsCommand(QleverCommand):
             while current_line < len(lines):
                 line = lines[current_line]
                 current_line += 1
-                timestamp_regex = r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}"
-                timestamp_format = "%Y-%m-%d %H:%M:%S"
+                timestamp_regex = INDEX_LOG_TIMESTAMP_REGEX
+                timestamp_format = INDEX_LOG_TIMESTAMP_FORMAT
                 regex_match = re.search(regex, line)
                 if regex_match:
                     try:
@@ -124,9 +189,9 @@ class IndexStatsCommand(QleverCommand):
 
         # Find the lines matching the key_lines_regex and extract the time
         # information from them.
-        overall_begin, _ = find_next_line(r"INFO:\s*Processing")
-        merge_begin, _ = find_next_line(r"INFO:\s*Merging partial vocab")
-        convert_begin, _ = find_next_line(r"INFO:\s*Converting triples")
+        overall_begin, _ = find_next_line(INDEX_LOG_PARSE_BEGIN_REGEX)
+        merge_begin, _ = find_next_line(INDEX_LOG_MERGE_BEGIN_REGEX)
+        convert_begin, _ = find_next_line(INDEX_LOG_CONVERT_BEGIN_REGEX)
         perm_begin_and_info = []
         while True:
             # Find the next line that starts a permutation.
@@ -136,16 +201,16 @@ class IndexStatsCommand(QleverCommand):
             # line "Writing meta data for ..."; new format: name of
             # permutations already in line "Creating permutations ...").
             perm_begin, _ = find_next_line(
-                r"INFO:\s*Creating a pair", update_current_line=False
+                INDEX_LOG_PERM_BEGIN_OLD_REGEX, update_current_line=False
             )
             if perm_begin is None:
                 perm_begin, perm_info = find_next_line(
-                    r"INFO:\s*Creating permutations ([A-Z]+ and [A-Z]+)",
+                    INDEX_LOG_PERM_BEGIN_REGEX,
                     update_current_line=False,
                 )
             else:
                 _, perm_info = find_next_line(
-                    r"INFO:\s*Writing meta data for ([A-Z]+ and [A-Z]+)",
+                    INDEX_LOG_PERM_INFO_OLD_REGEX,
                     update_current_line=False,
                 )
             if perm_info is None:
@@ -154,12 +219,12 @@ class IndexStatsCommand(QleverCommand):
         convert_end = (
             perm_begin_and_info[0][0] if len(perm_begin_and_info) > 0 else None
         )
-        normal_end, _ = find_next_line(r"INFO:\s*Index build completed")
+        normal_end, _ = find_next_line(INDEX_LOG_END_REGEX)
         text_begin, _ = find_next_line(
-            r"INFO:\s*Adding text index", update_current_line=False
+            INDEX_LOG_TEXT_BEGIN_REGEX, update_current_line=False
         )
         text_end, _ = find_next_line(
-            r"INFO:\s*Text index build comp", update_current_line=False
+            INDEX_LOG_TEXT_END_REGEX, update_current_line=False
         )
         if args.ignore_text_index:
             text_begin = text_end = None
@@ -186,6 +251,13 @@ class IndexStatsCommand(QleverCommand):
                 if start and end:
                     diff_seconds += (end - start).total_seconds()
                     num_start_end_pairs += 1
+            if num_start_end_pairs > 0 and phase_intervals is not None:
+                starts, ends = zip(
+                    *[(s, e) for s, e in start_end_pairs if s and e]
+                )
+                phase_intervals.append(
+                    (heading, diff_seconds, min(starts), max(ends))
+                )
             if num_start_end_pairs > 0:
                 if time_unit == "h":
                     diff = diff_seconds / 3600
@@ -231,20 +303,352 @@ class IndexStatsCommand(QleverCommand):
             show_duration("TOTAL time", [(overall_begin, normal_end)])
         return True
 
-    def execute_space(self, args) -> bool:
+    def execute_profile(
+        self, args, profile_file_name, phase_intervals: list
+    ) -> bool:
         """
-        Part of `execute` that shows the space used.
+        Part of `execute` that shows the average and maximum of each metric
+        sampled during the index build (see `qlever/index_profile.py`), per
+        phase.
         """
+        try:
+            samples = read_profile(profile_file_name)
+        except Exception as e:
+            log.error(f"Problem reading profile {profile_file_name}: {e}")
+            return False
+        log.info(
+            f"{'avg / max':<21} : "
+            + " ".join(
+                f"{heading:>15}" for heading, _ in PROFILE_METRICS.values()
+            )
+        )
+        # The profile starts with the index build (see `summarize_profile`).
+        start = min(
+            (begin for _, _, begin, _ in phase_intervals), default=None
+        )
+        for heading, _, begin, end in phase_intervals:
+            summary = summarize_profile(samples, begin, end, start)
+            if summary is None:
+                continue
+            if heading == "TOTAL time":
+                heading = "TOTAL"
+                log.info("")
+            log.info(
+                f"{heading:<21} : "
+                + " ".join(
+                    f"{format_value(avg) + ' / ' + format_value(max):>15}"
+                    for (avg, max), (_, format_value) in zip(
+                        summary.values(), PROFILE_METRICS.values()
+                    )
+                )
+            )
+        return True
 
-        # Get the sizes for the various groups of index files.
-        index_size = get_total_file_size([f"{args.name}.index.*"])
-        vocab_size = get_total_file_size([f"{args.name}.vocabulary.*"])
-        text_size = get_total_file_size([f"{args.name}.text.*"])
+    def get_sizes(self, args, prefix: str = "") -> dict[str, int]:
+        """
+        Get the total size in bytes of each group of index files (with the
+        given prefix for the directory).
+        """
+        sizes = {
+            "index": get_total_file_size([f"{prefix}{args.name}.index.*"]),
+            "vocabulary": get_total_file_size(
+                [f"{prefix}{args.name}.vocabulary.*"]
+            ),
+            "text": get_total_file_size([f"{prefix}{args.name}.text.*"]),
+        }
         if args.ignore_text_index:
-            text_size = 0
-        total_size = index_size + vocab_size + text_size
+            sizes["text"] = 0
+        sizes["total"] = sum(sizes.values())
+        return sizes
 
-        # Determing the proper unit for the size.
+    def get_num_triples(self, args) -> int | None:
+        """
+        Get the number of triples of the index from `<name>.meta-data.json`
+        (the key differs between versions of QLever), or `None` if unknown.
+        """
+        try:
+            with open(f"{args.name}.meta-data.json", "r") as meta_data_file:
+                meta_data = json.load(meta_data_file)
+        except Exception as e:
+            log.debug(f"Could not read {args.name}.meta-data.json: {e}")
+            return None
+        num_triples = meta_data.get("num-triples")
+        if isinstance(num_triples, dict):
+            num_triples = num_triples.get("normal")
+        if num_triples is None:
+            num_triples = meta_data.get("num-triples-normal")
+        return num_triples if isinstance(num_triples, int) else None
+
+    def get_space_details(self, args) -> dict:
+        """
+        Get the apparent size, the allocated size, and the cached size (in
+        bytes) of each index file, and the same per role of the files, with
+        the bytes per triple for the permutations.
+        """
+        files = []
+        for file_name in sorted(get_existing_index_files(args.name)):
+            role = get_index_file_role(args.name, file_name)
+            if role == "Text index" and args.ignore_text_index:
+                continue
+            stat = Path(file_name).stat()
+            files.append(
+                {
+                    "file": file_name,
+                    "role": role,
+                    "apparent": stat.st_size,
+                    "allocated": stat.st_blocks * 512,
+                    "cached": get_cached_size(file_name),
+                }
+            )
+        num_triples = self.get_num_triples(args)
+        permutation_roles = {
+            file["role"]
+            for file in files
+            if is_permutation_file(args.name, file["file"])
+        }
+        roles = {}
+        for file in files:
+            role = roles.setdefault(
+                file["role"],
+                {"apparent": 0, "allocated": 0, "cached": 0},
+            )
+            for key in ["apparent", "allocated", "cached"]:
+                if role[key] is None or file[key] is None:
+                    role[key] = None
+                else:
+                    role[key] += file[key]
+        for name, role in roles.items():
+            role["bytes_per_triple"] = (
+                role["apparent"] / num_triples
+                if num_triples and name in permutation_roles
+                else None
+            )
+        return {"num_triples": num_triples, "files": files, "roles": roles}
+
+    def execute_space_details(self, args) -> bool:
+        """
+        Part of `execute` that shows the space used per file and per role.
+        """
+        details = self.get_space_details(args)
+        if len(details["files"]) == 0:
+            log.error(f'No index files found for basename "{args.name}"')
+            return False
+        size_unit = self.get_size_unit(
+            args, sum(file["apparent"] for file in details["files"])
+        )
+
+        def fmt(size):
+            if size is None:
+                return f"{'-':>9}"
+            factor = {"B": 1, "MB": 1e6, "GB": 1e9, "TB": 1e12}[size_unit]
+            return f"{size / factor:>9.1f}" if factor > 1 else f"{size:>9,}"
+
+        def fmt_cached(cached, apparent):
+            if cached is None:
+                return f"{'-':>7}"
+            return f"{100 * cached / apparent if apparent else 0:>6.0f}%"
+
+        log.info(
+            f"{'File':<35} {'Role':<26} {'Apparent':>9} {'Allocated':>9} "
+            f"{'Cached':>7}  [{size_unit}]"
+        )
+        for file in details["files"]:
+            log.info(
+                f"{file['file']:<35} {file['role']:<26} "
+                f"{fmt(file['apparent'])} {fmt(file['allocated'])} "
+                f"{fmt_cached(file['cached'], file['apparent'])}"
+            )
+        log.info("")
+        log.info(
+            f"{'Role':<26} {'Apparent':>9} {'Allocated':>9} {'Cached':>9} "
+            f"{'Bytes/triple':>12}  [{size_unit}]"
+        )
+        for name, role in details["roles"].items():
+            bytes_per_triple = (
+                f"{role['bytes_per_triple']:>12.1f}"
+                if role["bytes_per_triple"] is not None
+                else f"{'-':>12}"
+            )
+            log.info(
+                f"{name:<26} {fmt(role['apparent'])} "
+                f"{fmt(role['allocated'])} {fmt(role['cached'])} "
+                f"{bytes_per_triple}"
+            )
+        if details["num_triples"] is None:
+            log.info("")
+            log.info(
+                f"The number of triples could not be read from "
+                f"{args.name}.meta-data.json, so no bytes per triple"
+            )
+        return True
+
+    def get_stats(self, args, directory: str = ".") -> dict:
+        """
+        Get all the statistics for the index build in the given directory as
+        a dictionary (times in seconds, sizes in bytes), which is what
+        `--output json` shows.
+        """
+        prefix = "" if directory == "." else f"{os.path.relpath(directory)}/"
+        phase_intervals = []
+        with mute_log(log_levels["NO_LOG"]):
+            time_ok = self.execute_time(
+                args,
+                f"{prefix}{args.name}.index-log.txt",
+                phase_intervals,
+                text_log_file_name=f"{prefix}{args.name}.text-index-log.txt",
+            )
+        phase_seconds = {
+            heading: seconds
+            for heading, seconds, _, _ in phase_intervals
+            if heading != "TOTAL time"
+        }
+        sizes = self.get_sizes(args, prefix)
+        stats = {
+            "name": args.name,
+            "directory": directory,
+            "time": None,
+            "space": sizes,
+            "text_index": None,
+            "resources": None,
+        }
+        if args.space_details and directory == ".":
+            stats["space_details"] = self.get_space_details(args)
+        if time_ok:
+            stats["time"] = {
+                "phases": phase_seconds,
+                "permutations": {
+                    heading[len("Permutation "):]: seconds
+                    for heading, seconds in phase_seconds.items()
+                    if heading.startswith("Permutation ")
+                },
+                "total": next(
+                    (
+                        seconds
+                        for heading, seconds, _, _ in phase_intervals
+                        if heading == "TOTAL time"
+                    ),
+                    None,
+                ),
+            }
+        if "Text index" in phase_seconds or sizes["text"] > 0:
+            stats["text_index"] = {
+                "seconds": phase_seconds.get("Text index"),
+                "size": sizes["text"],
+            }
+        profile_file_name = f"{prefix}{args.name}.index-profile.jsonl"
+        if Path(profile_file_name).exists():
+            samples = read_profile(profile_file_name)
+            stats["resources"] = {}
+            start = min(
+                (begin for _, _, begin, _ in phase_intervals), default=None
+            )
+            for heading, _, begin, end in phase_intervals:
+                summary = summarize_profile(samples, begin, end, start)
+                if summary is not None:
+                    stats["resources"][heading] = {
+                        metric: {"avg": avg, "max": max}
+                        for metric, (avg, max) in summary.items()
+                    }
+        return stats
+
+    def get_comparison(self, stats: dict, other_stats: dict) -> dict:
+        """
+        Compare the times and sizes of two builds (as returned by
+        `get_stats`). For each phase and each group of files, the result
+        contains the value of this build, the value of the other build, and
+        the difference.
+        """
+
+        def compare(values, other_values):
+            return {
+                key: {
+                    "this": values.get(key),
+                    "other": other_values.get(key),
+                    "delta": (
+                        values[key] - other_values[key]
+                        if values.get(key) is not None
+                        and other_values.get(key) is not None
+                        else None
+                    ),
+                }
+                for key in list(values)
+                + [key for key in other_values if key not in values]
+            }
+
+        time = (stats["time"] or {}).get("phases", {})
+        other_time = (other_stats["time"] or {}).get("phases", {})
+        time_total = (stats["time"] or {}).get("total")
+        other_time_total = (other_stats["time"] or {}).get("total")
+        return {
+            "time": compare(
+                {**time, "TOTAL time": time_total},
+                {**other_time, "TOTAL time": other_time_total},
+            ),
+            "space": compare(stats["space"], other_stats["space"]),
+        }
+
+    def execute_compare(self, args, stats: dict, other_stats: dict) -> bool:
+        """
+        Part of `execute` that shows the per-phase and per-file-group
+        differences to an earlier build.
+        """
+        comparison = self.get_comparison(stats, other_stats)
+
+        # Use the same unit for all times and sizes.
+        time_unit = args.time_unit
+        if time_unit == "auto":
+            parse_seconds = comparison["time"].get("Parse input", {})
+            parse_seconds = parse_seconds.get("this") or 0
+            time_unit = "h"
+            if parse_seconds < 200:
+                time_unit = "s"
+            elif parse_seconds < 3600:
+                time_unit = "min"
+        time_factor = {"s": 1, "min": 60, "h": 3600}[time_unit]
+        size_unit = self.get_size_unit(
+            args, comparison["space"]["total"]["this"] or 0
+        )
+        size_factor = {"B": 1, "MB": 1e6, "GB": 1e9, "TB": 1e12}[size_unit]
+
+        def show_row(heading, values, factor, unit):
+            def fmt(value, sign=""):
+                if value is None:
+                    return f"{'-':>8}"
+                return f"{value / factor:>{sign}8.1f}"
+
+            delta = fmt(values["delta"], "+")
+            if values["delta"] is not None and values["other"]:
+                delta += f" ({100 * values['delta'] / values['other']:+.0f}%)"
+            log.info(
+                f"{heading:<21} : {fmt(values['this'])} "
+                f"{fmt(values['other'])} {delta} {unit}"
+            )
+
+        log.info(f"{'':<21}   {'this':>8} {'earlier':>8} {'delta':>8}")
+        if not args.only_space:
+            for heading, values in comparison["time"].items():
+                if heading == "TOTAL time":
+                    log.info("")
+                show_row(heading, values, time_factor, time_unit)
+        if not args.only_time:
+            if not args.only_space:
+                log.info("")
+            for group, values in comparison["space"].items():
+                if group == "text" and not (values["this"] or values["other"]):
+                    continue
+                if group == "total":
+                    log.info("")
+                    heading = "TOTAL size"
+                else:
+                    heading = f"Files {group}.*"
+                show_row(heading, values, size_factor, size_unit)
+        return True
+
+    def get_size_unit(self, args, total_size: int) -> str:
+        """
+        Get the size unit from `--size-unit`, where `auto` depends on the
+        given total size.
+        """
         size_unit = args.size_unit
         if size_unit == "auto":
             size_unit = "TB"
@@ -254,6 +658,22 @@ class IndexStatsCommand(QleverCommand):
                 size_unit = "MB"
             elif total_size < 1e12:
                 size_unit = "GB"
+        return size_unit
+
+    def execute_space(self, args) -> bool:
+        """
+        Part of `execute` that shows the space used.
+        """
+
+        # Get the sizes for the various groups of index files.
+        sizes = self.get_sizes(args)
+        index_size = sizes["index"]
+        vocab_size = sizes["vocabulary"]
+        text_size = sizes["text"]
+        total_size = sizes["total"]
+
+        # Determing the proper unit for the size.
+        size_unit = self.get_size_unit(args, total_size)
 
         # Helper function for showing the size in a uniform way.
         def show_size(heading, size):
@@ -278,9 +698,37 @@ class IndexStatsCommand(QleverCommand):
         return True
 
     def execute(self, args) -> bool:
+        # With `--output json`, show all statistics (and the comparison with
+        # an earlier build, if requested) as one JSON object on stdout.
+        if args.output == "json":
+            self.show(
+                "Show the time and space used for building the index as JSON",
+                only_show=args.show,
+            )
+            if args.show:
+                return True
+            stats = self.get_stats(args)
+            if args.compare:
+                other_stats = self.get_other_stats(args)
+                if other_stats is None:
+                    return False
+                stats["compare"] = {
+                    "with": args.compare,
+                    **self.get_comparison(stats, other_stats),
+                }
+            print(json.dumps(stats, indent=2, default=str))
+            if stats["time"] is None:
+                log.error(
+                    "No complete index log found, see `qlever index-stats "
+                    "--output text` for details"
+                )
+                return False
+            return True
+
         return_value = True
 
         # The "time" part of the command.
+        phase_intervals = []
         if not args.only_space:
             log_file_name = f"{args.name}.index-log.txt"
             self.show(
@@ -290,7 +738,27 @@ class IndexStatsCommand(QleverCommand):
                 only_show=args.show,
             )
             if not args.show:
-                return_value &= self.execute_time(args, log_file_name)
+                return_value &= self.execute_time(
+                    args, log_file_name, phase_intervals
+                )
+            if not args.only_time:
+                log.info("")
+
+        # The "resources" part of the command (only if the index build was
+        # profiled, see `qlever index --profile-interval`).
+        profile_file_name = f"{args.name}.index-profile.jsonl"
+        if not args.only_space and Path(profile_file_name).exists():
+            if args.only_time:
+                log.info("")
+            self.show(
+                f"Breakdown of the resources used per phase, based on the "
+                f'samples in "{profile_file_name}"',
+                only_show=args.show,
+            )
+            if not args.show:
+                return_value &= self.execute_profile(
+                    args, profile_file_name, phase_intervals
+                )
             if not args.only_time:
                 log.info("")
 
@@ -303,4 +771,54 @@ class IndexStatsCommand(QleverCommand):
             if not args.show:
                 return_value &= self.execute_space(args)
 
+        # The detailed "space" part of the command.
+        if args.space_details and not args.only_time:
+            log.info("")
+            self.show(
+                "Breakdown of the space used per index file and per role "
+                "(allocated = blocks on disk, cached = in the page cache)",
+                only_show=args.show,
+            )
+            if not args.show:
+                return_value &= self.execute_space_details(args)
+
+        # The "compare" part of the command.
+        if args.compare:
+            log.info("")
+            self.show(
+                f"Compare the time and space used with the build in "
+                f'"{args.compare}"',
+                only_show=args.show,
+            )
+            if not args.show:
+                other_stats = self.get_other_stats(args)
+                if other_stats is None:
+                    return False
+                return_value &= self.execute_compare(
+                    args, self.get_stats(args), other_stats
+                )
+
         return return_value
+
+    def get_other_stats(self, args) -> dict | None:
+        """
+        Get the statistics of the build given by `--compare` (a directory or
+        the output of `--output json`).
+        """
+        try:
+            if Path(args.compare).is_dir():
+                other_stats = self.get_stats(args, args.compare)
+            else:
+                with open(args.compare, "r") as json_file:
+                    other_stats = json.load(json_file)
+                if not {"time", "space"} <= other_stats.keys():
+                    raise ValueError("not the output of `--output json`")
+        except Exception as e:
+            log.error(f"Could not get the statistics of {args.compare}: {e}")
+            return None
+        if other_stats["time"] is None:
+            log.warning(
+                f"No complete index log found for {args.compare}, comparing "
+                f"only the space used"
+            )
+        return other_stats
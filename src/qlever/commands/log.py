@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import subprocess
+from pathlib import Path
 
 from qlever.command import QleverCommand
 from qlever.log import log
@@ -24,6 +25,11 @@ class LogCommand(QleverCommand):
         return {"data": ["name"]}
 
     def additional_arguments(self, subparser) -> None:
+        subparser.add_argument("--server-port", type=int,
+                               help="Show the log of the server on this port "
+                                    "(for example, a replica of `qlever "
+                                    "proxy`), default: the log file written "
+                                    "last")
         subparser.add_argument("--tail-num-lines", type=int, default=20,
                                help="Show this many of the last lines of the "
                                     "log file")
@@ -43,7 +49,25 @@ class LogCommand(QleverCommand):
             log_cmd += f" -n {args.tail_num_lines}"
         if not args.no_follow:
             log_cmd += " -f"
-        log_file = f"{args.name}.server-log.txt"
+        # After a `qlever switchover`, the server runs on an alternate port,
+        # and the replicas of `qlever proxy` run on their own ports, each
+        # with its own log file. Take the log file of the given port, or else
+        # the log file that was written last.
+        if args.server_port is not None:
+            log_file = f"{args.name}.{args.server_port}.server-log.txt"
+            # The server on PORT has no port in the name of its log file.
+            if not Path(log_file).exists():
+                log_file = f"{args.name}.server-log.txt"
+        else:
+            log_files = [Path(f"{args.name}.server-log.txt")]
+            log_files.extend(
+                Path.cwd().glob(f"{args.name}.*.server-log.txt"))
+            log_files = [path for path in log_files if path.exists()]
+            if log_files:
+                log_file = max(log_files,
+                               key=lambda path: path.stat().st_mtime).name
+            else:
+                log_file = f"{args.name}.server-log.txt"
         log_cmd += f" {log_file}"
         self.show(log_cmd, only_show=args.show)
         if args.show:
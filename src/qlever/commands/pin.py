@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import time
+
+from qlever.command import QleverCommand
+from qlever.commands.warmup import WarmupCommand
+from qlever.log import log
+from qlever.util import format_size, parse_size
+from qlever.workload import read_query_file
+
+
+def read_pinned_queries(pinned_queries_file: str) -> list[tuple[str, str]]:
+    """
+    Read the queries that should be pinned, from a TSV file (in the order
+    of their priority) or a YAML file with optional `priority` (higher
+    priorities first, the default is 0), see `read_query_file`. Return a
+    list of `(description, query)` in the order in which they should be
+    pinned, without duplicates.
+    """
+    entries = read_query_file(pinned_queries_file, "priority", 0)
+
+    # Sort by priority (the sort is stable), and remove duplicates.
+    pinned_queries = {}
+    for description, query, _ in sorted(entries, key=lambda e: -float(e[2])):
+        pinned_queries.setdefault(query, description)
+    return [
+        (description, query) for query, description in pinned_queries.items()
+    ]
+
+
+class PinCommand(QleverCommand):
+    """
+    Class for executing the `pin` command.
+    """
+
+    def __init__(self):
+        pass
+
+    def description(self) -> str:
+        return (
+            "Pin the results of the queries from PINNED_QUERIES to the cache"
+        )
+
+    def should_have_qleverfile(self) -> bool:
+        return True
+
+    def relevant_qleverfile_arguments(self) -> dict[str, list[str]]:
+        return {
+            "server": ["host_name", "port", "access_token", "pinned_queries"]
+        }
+
+    def additional_arguments(self, subparser) -> None:
+        subparser.add_argument(
+            "action",
+            choices=["sync"],
+            help="`sync`: pin the queries from PINNED_QUERIES whose results "
+            "are not pinned yet",
+        )
+        subparser.add_argument(
+            "--cache-budget",
+            type=str,
+            help="Stop pinning once the pinned results take this much space "
+            "(default: the `cache-max-size` of the server)",
+        )
+        subparser.add_argument(
+            "--max-in-flight",
+            type=int,
+            default=4,
+            help="The maximal number of queries that are pinned concurrently "
+            "(default: 4)",
+        )
+        subparser.add_argument(
+            "--sparql-endpoint",
+            help="URL of the SPARQL endpoint, default is {host_name}:{port}",
+        )
+
+    def execute(self, args) -> bool:
+        sparql_endpoint = (
+            args.sparql_endpoint
+            if args.sparql_endpoint
+            else f"{args.host_name}:{args.port}"
+        )
+        if not args.pinned_queries:
+            log.error(
+                "No file with queries to pin, specify PINNED_QUERIES in the "
+                "Qleverfile or `--pinned-queries`"
+            )
+            return False
+
+        # Show what the command does.
+        self.show(
+            f"Pin the queries from {args.pinned_queries} whose results are "
+            f"not pinned yet to the cache of {sparql_endpoint}, in the order "
+            f"of their priority, with at most {args.max_in_flight} queries "
+            f"in flight, until the pinned results take "
+            f"{args.cache_budget or 'the cache-max-size of the server'}",
+            only_show=args.show,
+        )
+        if args.show:
+            return True
+
+        # Read the queries, and get the pinned size and the budget.
+        try:
+            queries = read_pinned_queries(args.pinned_queries)
+        except Exception as e:
+            log.error(f"Could not read {args.pinned_queries}: {e}")
+            return False
+        if len(queries) == 0:
+            log.warning(f"No queries found in {args.pinned_queries}")
+            return True
+        warmup = WarmupCommand()
+        try:
+            cache_stats = warmup.get_cache_stats(sparql_endpoint)
+            pinned_size_before = cache_stats["cache-size-pinned"]
+            if args.cache_budget:
+                cache_budget = parse_size(args.cache_budget)
+            else:
+                cache_budget = parse_size(cache_stats["cache-max-size"])
+        except Exception as e:
+            log.error(f"Failed to get cache stats and settings: {e}")
+            return False
+
+        # Pin the queries in the order of their priority, until the budget
+        # is used up. A query whose result is already pinned is answered
+        # from the cache right away, so only the missing ones are computed.
+        start_time = time.monotonic()
+        pinned = warmup.pin_queries(
+            sparql_endpoint,
+            args.access_token,
+            [query for _, query in queries],
+            args.max_in_flight,
+            cache_budget,
+            pinned_size_before,
+        )
+        if pinned is None:
+            return False
+        results, pinned_size = pinned
+        total_seconds = time.monotonic() - start_time
+
+        # Show the report, one line per query, and a summary.
+        num_already_pinned = num_pinned = num_failed = 0
+        for index, (description, query) in enumerate(queries):
+            if index not in results:
+                status = "skipped (budget)"
+            else:
+                result_size, seconds, error, was_pinned = results[index]
+                if error is not None:
+                    num_failed += 1
+                    status = f"FAILED: {(error.splitlines() or [''])[0][:60]}"
+                elif was_pinned:
+                    num_already_pinned += 1
+                    status = "already pinned"
+                else:
+                    num_pinned += 1
+                    status = (
+                        f"{seconds:6.2f}s, {result_size or 0:>11,} rows"
+                    )
+            log.info(
+                f"{index + 1:>4}. {status:<30}  {description or query[:40]}"
+            )
+        log.info("")
+        log.info(
+            f"Pinned {num_pinned} of {len(queries)} queries in "
+            f"{total_seconds:.1f}s ({num_already_pinned} already pinned, "
+            f"{num_failed} failed, {len(queries) - len(results)} skipped)"
+        )
+        log.info(
+            f"Pinned cache size: {format_size(pinned_size_before)} before, "
+            f"{format_size(pinned_size)} after, budget "
+            f"{format_size(cache_budget)}"
+        )
+        if num_failed > 0:
+            log.warning(
+                f"{num_failed} queries could not be pinned, see the report "
+                f"above"
+            )
+        return True
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import shlex
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+
+import psutil
+
+from qlever.command import QleverCommand
+from qlever.log import log
+from qlever.page_cache import get_cached_size, prewarm_range
+from qlever.util import format_size, parse_size
+
+# The index files to prewarm by default, in the order of their priority (as
+# patterns for the part of the file name after `<name>.`). The PSO and POS
+# permutations and the internal vocabulary are needed by almost every query.
+DEFAULT_PREWARM_FILES = (
+    "index.pso* index.pos* vocabulary.internal* index.patterns* "
+    "index.spo* index.sop* index.osp* index.ops* internal.index.* "
+    "vocabulary.*"
+)
+
+# Large files are prewarmed in ranges of this size, so that the work is
+# distributed evenly over the parallel reads.
+PREWARM_RANGE_SIZE = 1 << 30
+
+
+class PrewarmCommand(QleverCommand):
+    """
+    Class for executing the `prewarm` command.
+    """
+
+    def __init__(self):
+        pass
+
+    def description(self) -> str:
+        return (
+            "Bring the most important index files into the page cache, so "
+            "that the first queries after a start are not slowed down by "
+            "reading from disk"
+        )
+
+    def should_have_qleverfile(self) -> bool:
+        return False
+
+    def relevant_qleverfile_arguments(self) -> dict[str, list[str]]:
+        return {"data": ["name"]}
+
+    def additional_arguments(self, subparser) -> None:
+        subparser.add_argument(
+            "--files",
+            type=str,
+            default=DEFAULT_PREWARM_FILES,
+            help="Space-separated list of patterns for the index files to "
+            "prewarm, without the `<name>.` prefix, in the order of their "
+            f"priority (default: {DEFAULT_PREWARM_FILES})",
+        )
+        subparser.add_argument(
+            "--memory-budget",
+            type=str,
+            help="Prewarm at most this much in total, a file that does not "
+            "fit completely is prewarmed from the beginning (default: 80%% "
+            "of the currently available memory)",
+        )
+        subparser.add_argument(
+            "--parallel-reads",
+            type=int,
+            default=4,
+            help="The maximal number of concurrent reads (default: 4)",
+        )
+        subparser.add_argument(
+            "--method",
+            choices=["read", "willneed"],
+            default="read",
+            help="Read the files (waits until everything is cached), or only "
+            "ask the kernel to read them ahead (returns immediately, the "
+            "caching happens in the background); default: read",
+        )
+
+    def get_prewarm_files(self, args) -> list[tuple[str, int]]:
+        """
+        Get the index files to prewarm, in the order of their priority, and
+        for each file the number of bytes to prewarm (within the memory
+        budget).
+        """
+        if args.memory_budget is None:
+            memory_budget = int(psutil.virtual_memory().available * 0.8)
+        else:
+            memory_budget = parse_size(args.memory_budget)
+        prewarm_files = []
+        seen = set()
+        for pattern in shlex.split(args.files):
+            for path in sorted(Path(".").glob(f"{args.name}.{pattern}")):
+                if path in seen or not path.is_file():
+                    continue
+                seen.add(path)
+                num_bytes = min(path.stat().st_size, memory_budget)
+                if num_bytes > 0:
+                    prewarm_files.append((str(path), num_bytes))
+                memory_budget -= num_bytes
+                if memory_budget <= 0:
+                    return prewarm_files
+        return prewarm_files
+
+    def show_progress(self, done: int, total: int, seconds: float):
+        line = (
+            f"Prewarmed {format_size(done)} of {format_size(total)}"
+            f" ({100 * done / max(total, 1):.0f}%)"
+            f" at {format_size(done / max(seconds, 1e-3))}/s"
+        )
+        if sys.stdout.isatty():
+            print(f"\r\033[K{line}", end="", flush=True)
+        else:
+            log.info(line)
+
+    def execute(self, args) -> bool:
+        try:
+            prewarm_files = self.get_prewarm_files(args)
+        except ValueError as e:
+            log.error(e)
+            return False
+        total_bytes = sum(num_bytes for _, num_bytes in prewarm_files)
+        self.show(
+            f"Prewarm {len(prewarm_files)} index files in the page cache "
+            f"({format_size(total_bytes)}, method `{args.method}`, at most "
+            f"{args.parallel_reads} concurrent reads), in this order: "
+            + ", ".join(file_name for file_name, _ in prewarm_files),
+            only_show=args.show,
+        )
+        if args.show:
+            return True
+        if len(prewarm_files) == 0:
+            log.warning(f'No index files found for basename "{args.name}"')
+            return True
+
+        # Prewarm the files in ranges, which are submitted in the order of
+        # priority, and show the progress once per second.
+        done_bytes = 0
+        done_lock = threading.Lock()
+        cancelled = threading.Event()
+
+        def add_progress(num_bytes):
+            nonlocal done_bytes
+            with done_lock:
+                done_bytes += num_bytes
+
+        start_time = time.monotonic()
+        with ThreadPoolExecutor(max_workers=args.parallel_reads) as executor:
+            futures = [
+                executor.submit(
+                    prewarm_range,
+                    file_name,
+                    offset,
+                    min(PREWARM_RANGE_SIZE, num_bytes - offset),
+                    args.method,
+                    add_progress,
+                    cancelled,
+                )
+                for file_name, num_bytes in prewarm_files
+                for offset in range(0, num_bytes, PREWARM_RANGE_SIZE)
+            ]
+            try:
+                while True:
+                    _, not_done = wait(futures, timeout=1)
+                    self.show_progress(
+                        done_bytes, total_bytes, time.monotonic() - start_time
+                    )
+                    if not not_done:
+                        break
+            except KeyboardInterrupt:
+                cancelled.set()
+                for future in futures:
+                    future.cancel()
+                if sys.stdout.isatty():
+                    print()
+                log.warning("Prewarming interrupted")
+                return False
+        if sys.stdout.isatty():
+            print()
+        errors = [f.exception() for f in futures if f.exception()]
+        if errors:
+            log.error(f"Prewarming failed: {errors[0]}")
+            return False
+
+        # Show how much of each file is now in the page cache (with method
+        # `willneed`, this may still grow for a while).
+        log.info("")
+        for file_name, num_bytes in prewarm_files:
+            size = Path(file_name).stat().st_size
+            cached_size = get_cached_size(file_name)
+            resident = (
+                f"{100 * cached_size / size:3.0f}% resident"
+                if cached_size is not None and size > 0
+                else "residency unknown"
+            )
+            log.info(
+                f"{file_name:<35} {format_size(num_bytes):>12} of "
+                f"{format_size(size):>12}, {resident}"
+            )
+        return True
@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import copy
+import json
+import shlex
+import sys
+import time
+import urllib.request
+
+from qlever.command import QleverCommand
+from qlever.commands.start import StartCommand
+from qlever.commands.switchover import SwitchoverCommand
+from qlever.commands.warmup import WarmupCommand
+from qlever.load_balancer import STATUS_PATH, find_load_balancer
+from qlever.log import log
+from qlever.server_startup import ping_server
+from qlever.util import run_command
+
+
+class ProxyCommand(QleverCommand):
+    """
+    Class for executing the `proxy` command.
+    """
+
+    def __init__(self):
+        pass
+
+    def description(self) -> str:
+        return (
+            "Start several replicas of the server on consecutive ports, with "
+            "a load-balancing proxy on PORT in front of them"
+        )
+
+    def should_have_qleverfile(self) -> bool:
+        return True
+
+    def relevant_qleverfile_arguments(self) -> dict[str, list[str]]:
+        return StartCommand().relevant_qleverfile_arguments()
+
+    def additional_arguments(self, subparser) -> None:
+        subparser.add_argument(
+            "--replicas",
+            type=int,
+            default=2,
+            help="The number of replicas of the server (each with the "
+            "MEMORY_FOR_QUERIES and CACHE_MAX_SIZE from the Qleverfile); "
+            "default: 2",
+        )
+        subparser.add_argument(
+            "--first-replica-port",
+            type=int,
+            help="The port of the first replica, the others follow "
+            "consecutively (default: PORT+1)",
+        )
+        subparser.add_argument(
+            "--routing",
+            choices=["least-outstanding", "sticky"],
+            default="least-outstanding",
+            help="Send each query to the replica with the fewest outstanding "
+            "requests, or always send the same query to the same replica, "
+            "which keeps the caches of the replicas effective (default: "
+            "least-outstanding)",
+        )
+        subparser.add_argument(
+            "--health-check-interval",
+            type=float,
+            default=5,
+            help="Check every this many seconds which replicas respond "
+            "(default: 5)",
+        )
+        subparser.add_argument(
+            "--startup-timeout",
+            type=float,
+            default=600,
+            help="Give up waiting for a replica to become ready after this "
+            "many seconds (default: 600)",
+        )
+        subparser.add_argument(
+            "--prewarm",
+            action="store_true",
+            default=False,
+            help="Prewarm the page cache (once, it is shared by all "
+            "replicas), see `qlever start --prewarm`",
+        )
+        subparser.add_argument(
+            "--warmup-workload",
+            type=str,
+            help="Pin the most frequent queries from this workload file to "
+            "the caches of all replicas, see `qlever start --warmup-workload`",
+        )
+        subparser.add_argument(
+            "--no-warmup",
+            action="store_true",
+            default=False,
+            help="Do not execute the warmup command",
+        )
+        subparser.add_argument(
+            "--status",
+            action="store_true",
+            default=False,
+            help="Only show the status of the proxy and its replicas",
+        )
+        subparser.add_argument(
+            "--stop",
+            action="store_true",
+            default=False,
+            help="Stop the proxy and its replicas",
+        )
+
+    def get_replica_ports(self, args) -> list[int]:
+        first_replica_port = args.first_replica_port or int(args.port) + 1
+        return [first_replica_port + i for i in range(args.replicas)]
+
+    def show_status(self, args) -> bool:
+        """
+        Show the status of the proxy and of each replica.
+        """
+        try:
+            with urllib.request.urlopen(
+                f"http://{args.host_name}:{args.port}{STATUS_PATH}", timeout=5
+            ) as response:
+                status = json.loads(response.read())
+        except Exception as e:
+            log.error(f"Could not get the status of the proxy: {e}")
+            return False
+        log.info(
+            f"Proxy on port {args.port}, routing {status['routing']}, up for "
+            f"{status['uptime']:,}s"
+        )
+        log.info("")
+        for backend in status["backends"]:
+            server_log_file = SwitchoverCommand().get_server_log_file(
+                args, backend["port"]
+            )
+            log.info(
+                f"Replica on port {backend['port']}: "
+                f"{'healthy' if backend['healthy'] else 'UNHEALTHY':<9}  "
+                f"{backend['outstanding']:>4} outstanding  "
+                f"{backend['requests']:>10,} requests  "
+                f"log: {server_log_file}"
+            )
+        return True
+
+    def stop(self, args, load_balancer) -> bool:
+        """
+        Stop the proxy and its replicas.
+        """
+        if load_balancer is None:
+            log.error(f"No proxy running on port {args.port}")
+            return False
+        proc, replica_ports = load_balancer
+        proc.terminate()
+        log.info(f"Stopped the proxy on port {args.port}")
+        log.info("")
+        success = True
+        for port in replica_ports:
+            success &= SwitchoverCommand().stop_server(args, port)
+        return success
+
+    def execute(self, args) -> bool:
+        load_balancer = find_load_balancer(args.port)
+        replica_ports = self.get_replica_ports(args)
+        load_balancer_cmd = (
+            f"nohup {shlex.quote(sys.executable)} -m qlever.load_balancer"
+            f" --port {args.port}"
+            f" --backends {','.join(str(port) for port in replica_ports)}"
+            f" --routing {args.routing}"
+            f" --health-check-interval {args.health_check_interval}"
+            f" > {args.name}.proxy-log.txt 2>&1 &"
+        )
+
+        # Show what the command does.
+        if args.status:
+            description = f"Show the status of the proxy on port {args.port}"
+        elif args.stop:
+            description = (
+                f"Stop the proxy on port {args.port} and its replicas on "
+                f"ports {', '.join(str(p) for p in load_balancer[1])}"
+                if load_balancer
+                else f"Stop the proxy on port {args.port} and its replicas"
+            )
+        else:
+            description = (
+                f"Start {args.replicas} replicas of the server on ports "
+                f"{', '.join(str(port) for port in replica_ports)}, "
+                f"and a proxy on port {args.port} in front of them:\n"
+                f"{load_balancer_cmd}"
+            )
+        self.show(description, only_show=args.show)
+        if args.show:
+            return True
+        if args.status:
+            return self.show_status(args)
+        if args.stop:
+            return self.stop(args, load_balancer)
+
+        # Check that nothing runs on PORT yet, and that the replicas do not
+        # write to the same index.
+        if args.replicas < 1:
+            log.error("The number of replicas must be at least 1")
+            return False
+        if ping_server(f"http://{args.host_name}:{args.port}"):
+            log.error(
+                f"There is already a server or proxy running on port "
+                f"{args.port}, stop it first"
+            )
+            return False
+        if args.persist_updates:
+            log.error(
+                "Replicas cannot persist updates, because they would all "
+                "write to the same files"
+            )
+            return False
+
+        # Start the replicas, one after the other, each with its own log
+        # file. Prewarm only once, and warm up later via the proxy (which
+        # forwards pinned queries to all replicas).
+        for i, port in enumerate(replica_ports):
+            log.info(f"Starting replica {i + 1} on port {port} ...")
+            log.info("")
+            start_args = copy.copy(args)
+            start_args.port = port
+            start_args.server_container = (
+                SwitchoverCommand().get_server_container(args, port)
+            )
+            start_args.kill_existing_with_same_port = True
+            start_args.run_in_foreground = False
+            start_args.auto_memory = False
+            start_args.runtime_parameters = []
+            start_args.prewarm = args.prewarm and i == 0
+            start_args.prewarm_memory_budget = None
+            start_args.no_warmup = True
+            start_args.warmup_workload = None
+            server_log_file = SwitchoverCommand().get_server_log_file(
+                args, port
+            )
+            if not StartCommand(server_log_file=server_log_file).execute(
+                start_args
+            ):
+                log.error(f"Starting replica {i + 1} on port {port} failed")
+                for started_port in replica_ports[: i + 1]:
+                    SwitchoverCommand().stop_server(args, started_port)
+                return False
+            log.info("")
+
+        # Start the proxy and wait until it responds.
+        log.info(load_balancer_cmd)
+        try:
+            run_command(load_balancer_cmd)
+        except Exception as e:
+            log.error(f"Starting the proxy failed: {e}")
+            return False
+        for _ in range(100):
+            if ping_server(f"http://{args.host_name}:{args.port}"):
+                break
+            time.sleep(0.1)
+        else:
+            log.error(
+                f"The proxy on port {args.port} does not respond, see "
+                f"{args.name}.proxy-log.txt"
+            )
+            return False
+        log.info("")
+        log.info(
+            f"The proxy on port {args.port} balances over the "
+            f"{args.replicas} replicas (routing: {args.routing}); the log "
+            f"of a replica is shown by `qlever log --server-port <port>`"
+        )
+
+        # Warm up all replicas via the proxy.
+        if args.warmup_cmd and not args.no_warmup:
+            log.info("")
+            args.workload = None
+            if not WarmupCommand().execute(args):
+                log.error("Warmup failed")
+                return False
+        if args.warmup_workload and not args.no_warmup:
+            log.info("")
+            args.workload = args.warmup_workload
+            args.top_k = 100
+            args.cache_budget = None
+            args.max_in_flight = 4
+            args.sparql_endpoint = None
+            if not WarmupCommand().execute(args):
+                log.error("Pinning the queries of the workload failed")
+                return False
+        return True
@@ -1,12 +1,45 @@
 from __future__ import annotations
 
+import json
+import os
+import re
 import shlex
+import shutil
+import sys
+import tempfile
+import threading
 import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
 
 from qlever.command import QleverCommand
 from qlever.log import log
-from qlever.util import run_command
+from qlever.query_batch import (
+    SparqlClient,
+    fold_queries,
+    get_fold_obstacle,
+    instantiate_template,
+    read_batch,
+    read_parameters,
+    split_folded_result,
+)
+from qlever.result_cache import (
+    RESULT_CACHE_DIR,
+    ResultCache,
+    get_index_identity,
+)
+from qlever.util import parse_size, run_command, run_curl_command
+
+# The file extension for the results of `--batch --batch-output-dir`.
+BATCH_FILE_EXTENSIONS = {
+    "text/tab-separated-values": "tsv",
+    "text/csv": "csv",
+    "application/sparql-results+json": "json",
+    "application/sparql-results+xml": "xml",
+    "application/qlever-results+json": "json",
+    "application/octet-stream": "bin",
+}
 
 
 class QueryCommand(QleverCommand):
@@ -83,8 +116,328 @@ class QueryCommand(QleverCommand):
             default=False,
             help="Do not print the (end-to-end) time taken",
         )
+        subparser.add_argument(
+            "--batch",
+            type=str,
+            help="Instead of one query, send all queries from this file "
+            "(TSV with lines `id<TAB>query`, or JSONL with keys `id` and "
+            "`query`), or with `--batch-params`, a query template with "
+            "placeholders like `%%entity%%`",
+        )
+        subparser.add_argument(
+            "--batch-params",
+            type=str,
+            help="With `--batch`, a TSV file with the names of the "
+            "parameters in the first line and one row of values per line; "
+            "the template is sent once per row",
+        )
+        subparser.add_argument(
+            "--batch-concurrency",
+            type=int,
+            default=4,
+            help="With `--batch`, the number of queries that are sent "
+            "concurrently, each over its own persistent connection "
+            "(default: 4)",
+        )
+        subparser.add_argument(
+            "--batch-output-dir",
+            type=str,
+            help="With `--batch`, write the result of each query to its own "
+            "file `<id>.<format>` in this directory (instead of one JSONL "
+            "file)",
+        )
+        subparser.add_argument(
+            "--batch-output",
+            type=str,
+            default="batch-results.jsonl",
+            help="With `--batch`, write one line per query with its ID, "
+            "status, time, and result to this JSONL file (default: "
+            "`batch-results.jsonl`)",
+        )
+        subparser.add_argument(
+            "--batch-fold-size",
+            type=int,
+            default=100,
+            help="With `--batch-params` and `--accept "
+            "application/sparql-results+json`, fold up to this many rows "
+            "into one query with a VALUES clause where this does not change "
+            "the results (default: 100, 0 to disable)",
+        )
+
+        subparser.add_argument(
+            "--result-cache",
+            action="store_true",
+            default=False,
+            help="Serve the result from a local cache if the same query was "
+            "sent with the same Accept header to the same index before (the "
+            "cache is invalidated by updates and rebuilds of the index, "
+            "see `QLEVER_RESULT_CACHE_DIR`)",
+        )
+        subparser.add_argument(
+            "--result-cache-size",
+            type=str,
+            default="1G",
+            help="With `--result-cache`, the maximal size of the cache on "
+            "disk; the least recently used results are evicted first "
+            "(default: 1G)",
+        )
+
+    def get_batch_jobs(self, args) -> list[tuple[list[str], str, bool]]:
+        """
+        Read the queries of the batch. Return a list of requests, each with
+        the IDs of the queries it answers, the query that is sent, and
+        whether it is a folded query (see `fold_queries`).
+        """
+        if not args.batch_params:
+            return [
+                ([query_id], query, False)
+                for query_id, query in read_batch(args.batch)
+            ]
+        with open(args.batch, "r", encoding="utf-8") as file:
+            template = " ".join(file.read().split())
+        names, rows = read_parameters(args.batch_params)
+        ids = [f"row-{i + 1}" for i in range(len(rows))]
+        if args.batch_fold_size > 1:
+            if args.accept != "application/sparql-results+json":
+                obstacle = (
+                    "this needs `--accept application/sparql-results+json`"
+                )
+            else:
+                obstacle = get_fold_obstacle(template, names, rows)
+            if obstacle is None:
+                size = args.batch_fold_size
+                return [
+                    (
+                        ids[i : i + size],
+                        fold_queries(template, names, rows[i : i + size]),
+                        True,
+                    )
+                    for i in range(0, len(rows), size)
+                ]
+            log.info(f"Not folding the queries into VALUES: {obstacle}")
+        return [
+            ([ids[i]], instantiate_template(template, names, row), False)
+            for i, row in enumerate(rows)
+        ]
+
+    def execute_batch(self, args) -> bool:
+        """
+        Send the queries of the batch, with at most `--batch-concurrency`
+        in flight (each thread over its own persistent connection), and
+        write the results with the status and time of each query.
+        """
+        sparql_endpoint = (
+            args.sparql_endpoint
+            if args.sparql_endpoint
+            else f"{args.host_name}:{args.port}"
+        )
+        params = (
+            f" for each row of {args.batch_params}"
+            if args.batch_params
+            else ""
+        )
+        output = (
+            f"one file per query in {args.batch_output_dir} (and the status "
+            f"of each query to {args.batch_output})"
+            if args.batch_output_dir
+            else args.batch_output
+        )
+        self.show(
+            f"Send the queries from {args.batch}{params} to {sparql_endpoint}"
+            f" (Accept: {args.accept}), "
+            f"{args.batch_concurrency} at a time over persistent "
+            f"connections, and write the results to {output}",
+            only_show=args.show,
+        )
+        if args.show:
+            return True
+
+        # Read the queries.
+        try:
+            jobs = self.get_batch_jobs(args)
+        except Exception as e:
+            log.error(f"Could not read the queries: {e}")
+            return False
+        num_queries = sum(len(ids) for ids, _, _ in jobs)
+        if len(jobs) < num_queries:
+            log.info(
+                f"Folded {num_queries:,} queries into {len(jobs):,} queries "
+                f"with a VALUES clause"
+            )
+
+        # Send one request, and return the ID, the error (if any), the
+        # result, and the time of each query it answers.
+        local = threading.local()
+        clients = []
+
+        def run_job(job) -> list[tuple[str, str | None, bytes, float]]:
+            ids, query, folded = job
+            if not hasattr(local, "client"):
+                local.client = SparqlClient(sparql_endpoint)
+                clients.append(local.client)
+            start_time = time.monotonic()
+            try:
+                status, body = local.client.query(query, args.accept)
+                if status != 200:
+                    try:
+                        error = json.loads(body)["exception"]
+                    except Exception:
+                        error = f"HTTP status {status}: {body[:200]!r}"
+                    raise Exception(error)
+                if folded:
+                    bodies = [
+                        json.dumps(result).encode()
+                        for result in split_folded_result(
+                            json.loads(body), len(ids)
+                        )
+                    ]
+                else:
+                    bodies = [body]
+            except Exception as e:
+                seconds = time.monotonic() - start_time
+                return [(query_id, str(e), b"", seconds) for query_id in ids]
+            seconds = time.monotonic() - start_time
+            return [
+                (query_id, None, body, seconds)
+                for query_id, body in zip(ids, bodies)
+            ]
+
+        # Send the requests, and write the results as they come in.
+        extension = BATCH_FILE_EXTENSIONS[args.accept]
+        if args.batch_output_dir:
+            Path(args.batch_output_dir).mkdir(parents=True, exist_ok=True)
+        num_failed = 0
+        start_time = time.monotonic()
+        with open(args.batch_output, "w", encoding="utf-8") as output_file:
+            with ThreadPoolExecutor(
+                max_workers=args.batch_concurrency
+            ) as executor:
+                futures = {executor.submit(run_job, job): job for job in jobs}
+                try:
+                    for future in as_completed(futures):
+                        folded = futures[future][2]
+                        for query_id, error, body, seconds in future.result():
+                            record = {
+                                "id": query_id,
+                                "status": "ok" if error is None else "error",
+                                "seconds": round(seconds, 3),
+                            }
+                            if folded:
+                                record["folded"] = len(futures[future][0])
+                            if error is not None:
+                                num_failed += 1
+                                record["error"] = error
+                                log.warning(
+                                    f"Query {query_id} failed: "
+                                    f"{(error.splitlines() or [''])[0][:80]}"
+                                )
+                            elif args.batch_output_dir:
+                                file_name = re.sub(r"[^\w.-]+", "_", query_id)
+                                result_file = (
+                                    Path(args.batch_output_dir)
+                                    / f"{file_name}.{extension}"
+                                )
+                                result_file.write_bytes(body)
+                                record["file"] = str(result_file)
+                            elif "json" in args.accept:
+                                record["result"] = json.loads(body)
+                            else:
+                                record["result"] = body.decode(
+                                    errors="replace"
+                                )
+                            print(json.dumps(record), file=output_file)
+                except KeyboardInterrupt:
+                    for future in futures:
+                        future.cancel()
+                    log.warning("Batch interrupted")
+                    return False
+                finally:
+                    for client in clients:
+                        client.close()
+        seconds = time.monotonic() - start_time
+        log.info(
+            f"Sent {num_queries:,} queries in {seconds:.1f}s "
+            f"({num_queries / max(seconds, 1e-6):,.1f} queries/s): "
+            f"{num_queries - num_failed:,} succeeded, {num_failed:,} failed; "
+            f"the results are in {output}"
+        )
+        return num_failed == 0
+
+    def execute_with_result_cache(
+        self, args, sparql_endpoint: str, result_cache: ResultCache
+    ) -> bool:
+        """
+        Output the result of the query from the result cache, or send the
+        query and store its result in the cache.
+        """
+        start_time = time.time()
+        try:
+            key = result_cache.get_key(
+                sparql_endpoint,
+                get_index_identity(sparql_endpoint),
+                args.query,
+                args.accept,
+            )
+        except Exception as e:
+            log.warning(f"Not using the result cache: {e}")
+            key = None
+        cached = (
+            result_cache.lookup(sparql_endpoint, key)
+            if key is not None
+            else None
+        )
+        fd, result_file = tempfile.mkstemp(prefix="qlever.query.")
+        os.close(fd)
+        stored = False
+        try:
+            if cached is None:
+                http_code = run_curl_command(
+                    sparql_endpoint,
+                    headers={"Accept": args.accept},
+                    params={"query": args.query},
+                    result_file=result_file,
+                ).strip()
+                seconds = time.time() - start_time
+                if http_code == "200" and key is not None:
+                    stored = result_cache.store(
+                        sparql_endpoint, key, result_file, seconds
+                    )
+                cached_file = result_file
+            else:
+                cached_file, seconds = cached
+            sys.stdout.flush()
+            with open(cached_file, "rb") as file:
+                shutil.copyfileobj(file, sys.stdout.buffer)
+            sys.stdout.flush()
+        except Exception as e:
+            if args.log_level == "DEBUG":
+                traceback.print_exc()
+            log.error(e)
+            return False
+        finally:
+            os.remove(result_file)
+        time_msecs = round(1000 * (time.time() - start_time))
+        if not args.no_time and args.log_level != "NO_LOG":
+            log.info("")
+            log.info(
+                f"Query processing time (end-to-end): {time_msecs:,d} ms"
+            )
+            if cached is not None:
+                log.info(
+                    f"Result cache: hit (the query originally took "
+                    f"{round(1000 * seconds):,d} ms)"
+                )
+            elif key is not None:
+                log.info(
+                    f"Result cache: miss"
+                    f"{', the result is now cached' if stored else ''}"
+                )
+        return True
 
     def execute(self, args) -> bool:
+        if args.batch:
+            return self.execute_batch(args)
+
         # Use a predefined query if requested.
         if args.predefined_query:
             args.query = self.predefined_queries[args.predefined_query]
@@ -118,9 +471,24 @@ class QueryCommand(QleverCommand):
             f" --data-urlencode query={shlex.quote(args.query)}"
             f"{curl_cmd_additions}"
         )
+        use_result_cache = args.result_cache and not args.pin_to_cache
+        if use_result_cache:
+            try:
+                result_cache = ResultCache(parse_size(args.result_cache_size))
+            except ValueError as e:
+                log.error(e)
+                return False
+            curl_cmd += (
+                f"\n\n(or take the result from the result cache in "
+                f"{RESULT_CACHE_DIR})"
+            )
         self.show(curl_cmd, only_show=args.show)
         if args.show:
             return True
+        if use_result_cache:
+            return self.execute_with_result_cache(
+                args, sparql_endpoint, result_cache
+            )
 
         # Launch query.
         try:
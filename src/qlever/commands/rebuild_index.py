@@ -10,6 +10,7 @@ from termcolor import colored
 
 from qlever.command import QleverCommand
 from qlever.log import log
+from qlever.result_cache import invalidate_result_cache
 from qlever.util import (
     get_existing_index_files,
     run_command,
@@ -86,6 +87,14 @@ class RebuildIndexCommand(QleverCommand):
             help="When the rebuild is finished, stop the server with the old "
             "index and start it again with the new index",
         )
+        subparser.add_argument(
+            "--blue-green",
+            action="store_true",
+            default=False,
+            help="With `--restart-when-finished`, start the server with the "
+            "new index on an alternate port and switch to it once it is "
+            "ready, without downtime (see `qlever switchover`)",
+        )
 
     def execute(self, args) -> bool:
         # Either `--new-index-dir` or `--old-index-dir`.
@@ -197,10 +206,13 @@ class RebuildIndexCommand(QleverCommand):
             f"mv {shlex.quote(new_index_dir_name)}/* . && "
             f"rmdir {shlex.quote(new_index_dir_name)}"
         )
-        restart_server_cmd = "qlever stop && qlever start"
+        if args.blue_green:
+            restart_server_cmd = "qlever switchover"
+        else:
+            restart_server_cmd = "qlever stop && qlever start"
         if not move_old_index_when_done:
             restart_server_cmd = (
-                f"cd {args.new_index_dir} && ${restart_server_cmd}"
+                f"cd {args.new_index_dir} && {restart_server_cmd}"
             )
 
         # Show the command lines.
@@ -277,13 +289,23 @@ class RebuildIndexCommand(QleverCommand):
             try:
                 log.info("Restarting the server with the new index ...")
                 log.info("")
-                log.info(colored("Command: start", attrs=["bold"]))
+                log.info(
+                    colored(
+                        "Command: "
+                        + ("switchover" if args.blue_green else "start"),
+                        attrs=["bold"],
+                    )
+                )
                 log.info("")
                 run_command(restart_server_cmd, show_output=True)
             except Exception as e:
                 log.error(f"Restarting the server failed: {e}")
                 return False
 
+        # The results cached by `qlever query --result-cache` are from the
+        # index before the rebuild.
+        invalidate_result_cache(f"{args.host_name}:{args.port}")
+
         # Clean up old index directories according to `--keep-old-index-dirs`.
         # Find all subdirectories starting with `old_index_dir_basename`,
         # ordered from oldest to newest (by creation time), and keep or delete
@@ -4,6 +4,7 @@ import re
 
 from qlever.command import QleverCommand
 from qlever.log import log
+from qlever.result_cache import invalidate_result_cache
 from qlever.util import run_command
 
 
@@ -31,11 +32,12 @@ class ResetUpdatesCommand(QleverCommand):
         )
 
     def execute(self, args) -> bool:
-        reset_cmd = "curl -s"
-        if args.sparql_endpoint:
-            reset_cmd += f" {args.sparql_endpoint}"
-        else:
-            reset_cmd += f" {args.host_name}:{args.port}"
+        sparql_endpoint = (
+            args.sparql_endpoint
+            if args.sparql_endpoint
+            else f"{args.host_name}:{args.port}"
+        )
+        reset_cmd = f"curl -s {sparql_endpoint}"
         reset_cmd += f' --data-urlencode "cmd=clear-delta-triples" --data-urlencode "access-token={args.access_token}"'
         self.show(reset_cmd, only_show=args.show)
         if args.show:
@@ -53,6 +55,7 @@ class ResetUpdatesCommand(QleverCommand):
                 raise Exception(error_message)
             message = "Updates reset successfully"
             log.info(message)
+            invalidate_result_cache(sparql_endpoint)
             return True
         except Exception as e:
             log.error(e)
@@ -0,0 +1,336 @@
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+
+from qlever.cache_simulator import (
+    CompiledWorkload,
+    format_cache_size,
+    get_default_cache_sizes,
+    profile_query,
+    read_query_sequence,
+    recommend_cache_settings,
+    simulate_cache,
+)
+from qlever.command import QleverCommand
+from qlever.commands.pin import read_pinned_queries
+from qlever.log import log
+from qlever.util import format_size, parse_size
+
+
+class SimulateCacheCommand(QleverCommand):
+    """
+    Class for executing the `simulate-cache` command.
+    """
+
+    def __init__(self):
+        pass
+
+    def description(self) -> str:
+        return (
+            "Simulate the cache for a query workload and recommend "
+            "CACHE_MAX_SIZE and CACHE_MAX_SIZE_SINGLE_ENTRY"
+        )
+
+    def should_have_qleverfile(self) -> bool:
+        return True
+
+    def relevant_qleverfile_arguments(self) -> dict[str, list[str]]:
+        return {
+            "data": ["name"],
+            "server": [
+                "host_name",
+                "port",
+                "access_token",
+                "cache_max_size",
+                "cache_max_size_single_entry",
+                "cache_max_num_entries",
+                "pinned_queries",
+            ],
+        }
+
+    def additional_arguments(self, subparser) -> None:
+        subparser.add_argument(
+            "--workload",
+            type=str,
+            default="log-queries.txt",
+            help="The queries in the order in which they arrive (TSV with "
+            "lines `description<TAB>query` as written by `qlever "
+            "extract-queries`, or YAML as used by `qlever "
+            "benchmark-queries`; default: `log-queries.txt`)",
+        )
+        subparser.add_argument(
+            "--profiles-file",
+            type=str,
+            help="Where to keep the sizes and times of the results and "
+            "subresults of the queries, so that each query is sent to the "
+            "server only once (default: `<name>.cache-profiles.json`)",
+        )
+        subparser.add_argument(
+            "--refresh-profiles",
+            action="store_true",
+            default=False,
+            help="Send all queries to the server again, even if they are "
+            "already in the profiles file",
+        )
+        subparser.add_argument(
+            "--cache-sizes",
+            type=str,
+            help="Comma-separated list of the cache sizes to simulate, for "
+            "example `1G,2G,5G,10G` (default: halving from the size that "
+            "holds all results and subresults of the workload)",
+        )
+        subparser.add_argument(
+            "--target-fraction",
+            type=float,
+            default=0.95,
+            help="Recommend the smallest simulated cache size that saves at "
+            "least this fraction of the time that the largest one saves "
+            "(default: 0.95)",
+        )
+        subparser.add_argument(
+            "--query-timeout",
+            type=float,
+            default=600,
+            help="Timeout in seconds for each query that is sent to the "
+            "server (default: 600)",
+        )
+        subparser.add_argument(
+            "--sparql-endpoint",
+            help="URL of the SPARQL endpoint, default is {host_name}:{port}",
+        )
+
+    def read_profiles(self, profiles_file: str) -> dict[str, dict]:
+        """
+        Read the profiles of the queries from a previous run (empty if there
+        is no such file).
+        """
+        if not Path(profiles_file).exists():
+            return {}
+        with open(profiles_file, "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    def write_profiles(self, profiles_file: str, profiles: dict) -> None:
+        with open(profiles_file, "w", encoding="utf-8") as file:
+            json.dump(profiles, file)
+
+    def profile_queries(
+        self, args, endpoint_url: str, queries: list[str], profiles: dict
+    ) -> int:
+        """
+        Send the given queries to the server one after the other, and add
+        their profiles. Return the number of queries that failed.
+        """
+        num_failed = 0
+        for i, query in enumerate(queries):
+            try:
+                profiles[query] = profile_query(
+                    endpoint_url,
+                    query,
+                    args.access_token,
+                    args.query_timeout,
+                )
+                status = (
+                    f"{profiles[query]['seconds']:6.2f}s, "
+                    f"{format_size(profiles[query]['size'])}"
+                )
+            except Exception as e:
+                num_failed += 1
+                status = f"FAILED: {(str(e).splitlines() or [''])[0][:60]}"
+            log.info(f"{i + 1:>4}/{len(queries)}  {status:<30}  {query[:60]}")
+        return num_failed
+
+    def show_results(
+        self,
+        results: list[dict],
+        current_max_size: int,
+        recommended_max_size: int,
+    ) -> None:
+        """
+        Show the hit rates and the time saved for each simulated cache size.
+        """
+        log.info(
+            f"{'Cache size':>12}  {'Query hits':>10}  "
+            f"{'Subresult hits':>14}  {'Time saved':>16}"
+        )
+        for result in results:
+            query_hit_rate = result["query_hits"] / max(
+                result["num_queries"], 1
+            )
+            hit_rate = result["hits"] / max(result["lookups"], 1)
+            saved_fraction = result["saved_seconds"] / max(
+                result["total_seconds"], 1e-9
+            )
+            marks = []
+            if result["max_size"] == current_max_size:
+                marks.append("current")
+            if result["max_size"] == recommended_max_size:
+                marks.append("recommended")
+            log.info(
+                f"{format_cache_size(result['max_size']):>12}  "
+                f"{100 * query_hit_rate:>9.1f}%  "
+                f"{100 * hit_rate:>13.1f}%  "
+                f"{result['saved_seconds']:>8.1f}s "
+                f"({100 * saved_fraction:3.0f}%)"
+                f"{'  <- ' + ', '.join(marks) if marks else ''}"
+            )
+
+    def execute(self, args) -> bool:
+        sparql_endpoint = (
+            args.sparql_endpoint
+            if args.sparql_endpoint
+            else f"{args.host_name}:{args.port}"
+        )
+        endpoint_url = (
+            sparql_endpoint
+            if "://" in sparql_endpoint
+            else f"http://{sparql_endpoint}"
+        )
+        profiles_file = (
+            args.profiles_file or f"{args.name}.cache-profiles.json"
+        )
+        try:
+            current_max_size = parse_size(args.cache_max_size)
+            current_max_size_single_entry = parse_size(
+                args.cache_max_size_single_entry
+            )
+            cache_sizes = (
+                [parse_size(size) for size in args.cache_sizes.split(",")]
+                if args.cache_sizes
+                else None
+            )
+        except ValueError as e:
+            log.error(e)
+            return False
+
+        # Show what the command does.
+        self.show(
+            f"Replay the queries from {args.workload} against a simulated "
+            f"cache of size "
+            f"{args.cache_sizes or 'up to the size of all results'} (with "
+            f"the results and subresults of each query from "
+            f"{profiles_file}, or else from {sparql_endpoint}), and "
+            f"recommend CACHE_MAX_SIZE and CACHE_MAX_SIZE_SINGLE_ENTRY",
+            only_show=args.show,
+        )
+        if args.show:
+            return True
+
+        # Read the workload, and the pinned queries.
+        try:
+            sequence = read_query_sequence(args.workload)
+            pinned_queries = [
+                query
+                for _, query in (
+                    read_pinned_queries(args.pinned_queries)
+                    if args.pinned_queries
+                    else []
+                )
+            ]
+        except Exception as e:
+            log.error(f"Could not read the queries: {e}")
+            return False
+        if len(sequence) == 0:
+            log.error(f"No queries found in {args.workload}")
+            return False
+
+        # Profile the queries that are not in the profiles file yet (each
+        # distinct query only once).
+        try:
+            profiles = (
+                {}
+                if args.refresh_profiles
+                else self.read_profiles(profiles_file)
+            )
+        except Exception as e:
+            log.error(f"Could not read {profiles_file}: {e}")
+            return False
+        missing_queries = list(
+            dict.fromkeys(
+                query
+                for query in sequence + pinned_queries
+                if query not in profiles
+            )
+        )
+        if missing_queries:
+            log.info(
+                f"Profiling {len(missing_queries)} distinct queries on "
+                f"{sparql_endpoint} ..."
+            )
+            log.info("")
+            start_time = time.monotonic()
+            try:
+                num_failed = self.profile_queries(
+                    args, endpoint_url, missing_queries, profiles
+                )
+            except KeyboardInterrupt:
+                log.warning("Profiling interrupted")
+                num_failed = None
+            self.write_profiles(profiles_file, profiles)
+            if num_failed is None:
+                return False
+            log.info("")
+            log.info(
+                f"Profiled {len(missing_queries) - num_failed} queries in "
+                f"{time.monotonic() - start_time:.1f}s and wrote them to "
+                f"{profiles_file}"
+            )
+            if num_failed > 0:
+                log.warning(
+                    f"{num_failed} queries failed and are left out of the "
+                    f"simulation"
+                )
+            log.info("")
+
+        # Simulate the cache for each size.
+        workload = CompiledWorkload(sequence, profiles)
+        if len(workload.sequence) == 0:
+            log.error("None of the queries could be profiled")
+            return False
+        if cache_sizes is None:
+            cache_sizes = get_default_cache_sizes(workload.total_size())
+            cache_sizes.append(current_max_size)
+        cache_sizes = sorted(set(cache_sizes))
+        results = [
+            simulate_cache(
+                workload,
+                max_size,
+                min(current_max_size_single_entry, max_size),
+                args.cache_max_num_entries,
+                pinned_queries,
+            )
+            for max_size in cache_sizes
+        ]
+        max_size, max_size_single_entry, recommended = (
+            recommend_cache_settings(
+                workload,
+                results,
+                args.cache_max_num_entries,
+                pinned_queries,
+                args.target_fraction,
+            )
+        )
+
+        # Show the results and the recommendation.
+        log.info(
+            f"Simulated {len(workload.sequence):,} queries "
+            f"({len(workload.query_nodes):,} distinct, "
+            f"{len(workload.entry_sizes):,} distinct subresults with "
+            f"{format_size(workload.total_size())}), with "
+            f"CACHE_MAX_SIZE_SINGLE_ENTRY = {args.cache_max_size_single_entry}"
+            f" and CACHE_MAX_NUM_ENTRIES = {args.cache_max_num_entries}"
+        )
+        log.info("")
+        self.show_results(results, current_max_size, max_size)
+        log.info("")
+        log.info(
+            f"Recommended: CACHE_MAX_SIZE = {format_cache_size(max_size)}, "
+            f"CACHE_MAX_SIZE_SINGLE_ENTRY = "
+            f"{format_cache_size(max_size_single_entry)} (saves "
+            f"{recommended['saved_seconds']:.1f}s of "
+            f"{recommended['total_seconds']:.1f}s, "
+            f"{recommended['query_hits']:,} of "
+            f"{recommended['num_queries']:,} queries from the cache)"
+        )
+        return True
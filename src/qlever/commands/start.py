@@ -2,21 +2,43 @@ from __future__ import annotations
 
 import subprocess
 import time
+from pathlib import Path
+from typing import Callable
+
+import psutil
 
 from qlever.command import QleverCommand
 from qlever.commands.cache_stats import CacheStatsCommand
+from qlever.commands.pin import PinCommand
+from qlever.commands.prewarm import DEFAULT_PREWARM_FILES, PrewarmCommand
 from qlever.commands.settings import SettingsCommand
 from qlever.commands.status import StatusCommand
 from qlever.commands.stop import StopCommand
 from qlever.commands.warmup import WarmupCommand
 from qlever.containerize import Containerize
 from qlever.log import log
+from qlever.memory_plan import (
+    HEADROOM_FRACTION,
+    MIN_SERVER_BUDGET,
+    get_index_resident_size,
+    get_memory_limit,
+    get_other_servers,
+    plan_memory,
+)
+from qlever.placement import check_placement, get_native_placement_prefix
 from qlever.qleverfile import Qleverfile
-from qlever.util import binary_exists, is_qlever_server_alive, run_command
-
-
-# Construct the command line based on the config file.
-def construct_command(args) -> str:
+from qlever.server_startup import ServerStartupWatcher
+from qlever.util import (
+    binary_exists,
+    format_size,
+    is_qlever_server_alive,
+    run_command,
+)
+
+
+# Construct the command line based on the config file (the output of the
+# server goes to `<name>.server-log.txt`, unless another file is given).
+def construct_command(args, server_log_file: str | None = None) -> str:
     start_cmd = (
         f"{args.server_binary}"
         f" -i {args.name}"
@@ -40,7 +62,9 @@ def construct_command(args) -> str:
         start_cmd += " --no-patterns"
     if args.use_text_index == "yes":
         start_cmd += " -t"
-    start_cmd += f" > {args.name}.server-log.txt 2>&1"
+    if server_log_file is None:
+        server_log_file = f"{args.name}.server-log.txt"
+    start_cmd += f" > {server_log_file} 2>&1"
     return start_cmd
 
 
@@ -56,6 +80,54 @@ def kill_existing_server(args) -> bool:
     return True
 
 
+# Compute the memory parameters of the server from the memory of the machine,
+# and show the plan.
+def apply_auto_memory(args) -> bool:
+    memory_limit, memory_limit_source = get_memory_limit()
+    other_servers = get_other_servers(args.port)
+    plan = plan_memory(
+        memory_limit, get_index_resident_size(args.name), other_servers
+    )
+    log.info("Memory plan (--auto-memory):")
+    log.info("")
+    for heading, value in [
+        (f"Memory limit ({memory_limit_source})", plan["memory_limit"]),
+        (
+            f"- Headroom ({100 * HEADROOM_FRACTION:.0f}%)",
+            plan["headroom"],
+        ),
+        (
+            f"- Other QLever servers ({len(other_servers)})",
+            plan["other_servers"],
+        ),
+        ("- Index data kept in RAM", plan["index_resident_size"]),
+        ("= Budget for this server", plan["budget"]),
+    ]:
+        log.info(f"  {heading:<40} {format_size(value):>12}")
+    if plan["budget"] < MIN_SERVER_BUDGET:
+        log.info("")
+        log.error(
+            f"Not enough memory left for this server (at least "
+            f"{format_size(MIN_SERVER_BUDGET)} needed), stop other servers "
+            f"or set the memory parameters manually"
+        )
+        return False
+    for key in [
+        "memory_for_queries",
+        "cache_max_size",
+        "cache_max_size_single_entry",
+        "cache_max_num_entries",
+    ]:
+        log.info(f"    {key.upper():<38} {plan[key]:>12}")
+        setattr(args, key, plan[key])
+    log.info(
+        f"    {'Left for the page cache':<38} "
+        f"{format_size(plan['page_cache']):>12}"
+    )
+    log.info("")
+    return True
+
+
 # Run the command in a container
 def wrap_command_in_container(args, start_cmd) -> str:
     if not args.server_container:
@@ -69,10 +141,55 @@ def wrap_command_in_container(args, start_cmd) -> str:
         volumes=[("$(pwd)", "/index")],
         ports=[(args.port, args.port)],
         working_directory="/index",
+        cpuset_cpus=args.cpuset_cpus,
+        cpuset_mems=args.cpuset_mems,
     )
     return start_cmd
 
 
+# Get a function that checks whether the server process is still running:
+# the process in the foreground, the process with the given PID, or the
+# container.
+def get_is_server_running(args, process, server_pid) -> Callable[[], bool]:
+    if args.system in Containerize.supported_systems():
+
+        def is_server_running():
+            try:
+                return (
+                    run_command(
+                        f"{args.system} inspect --format"
+                        f" '{{{{.State.Running}}}}' {args.server_container}",
+                        return_output=True,
+                    ).strip()
+                    == "true"
+                )
+            except Exception:
+                return False
+
+    elif args.run_in_foreground:
+
+        def is_server_running():
+            return process.poll() is None
+
+    elif server_pid is not None:
+
+        def is_server_running():
+            try:
+                return (
+                    psutil.Process(server_pid).status()
+                    != psutil.STATUS_ZOMBIE
+                )
+            except psutil.Error:
+                return False
+
+    else:
+
+        def is_server_running():
+            return True
+
+    return is_server_running
+
+
 # Set the index description.
 def set_index_description(access_arg, port, desc) -> bool:
     curl_cmd = (
@@ -110,8 +227,10 @@ class StartCommand(QleverCommand):
     Class for executing the `start` command.
     """
 
-    def __init__(self):
-        pass
+    def __init__(self, server_log_file: str | None = None):
+        # The log file of the server, if not `<name>.server-log.txt` (for
+        # the servers that `qlever switchover` starts on an alternate port).
+        self.server_log_file = server_log_file
 
     def description(self) -> str:
         return (
@@ -141,8 +260,16 @@ class StartCommand(QleverCommand):
                 "use_patterns",
                 "use_text_index",
                 "warmup_cmd",
+                "pinned_queries",
+            ],
+            "runtime": [
+                "system",
+                "image",
+                "server_container",
+                "cpuset_cpus",
+                "cpuset_mems",
+                "numa_memory_policy",
             ],
-            "runtime": ["system", "image", "server_container"],
         }
 
     def additional_arguments(self, subparser) -> None:
@@ -160,6 +287,51 @@ class StartCommand(QleverCommand):
             default=False,
             help="Do not execute the warmup command",
         )
+        subparser.add_argument(
+            "--prewarm",
+            action="store_true",
+            default=False,
+            help="Once the server is running, bring the most important index "
+            "files into the page cache (see `qlever prewarm`), before the "
+            "warmup command is executed",
+        )
+        subparser.add_argument(
+            "--prewarm-memory-budget",
+            type=str,
+            help="With `--prewarm`, prewarm at most this much (default: 80%% "
+            "of the available memory once the server is running)",
+        )
+        subparser.add_argument(
+            "--auto-memory",
+            action="store_true",
+            default=False,
+            help="Compute MEMORY_FOR_QUERIES, CACHE_MAX_SIZE, "
+            "CACHE_MAX_SIZE_SINGLE_ENTRY, and CACHE_MAX_NUM_ENTRIES from the "
+            "memory of the machine (or the cgroup memory limit), the part of "
+            "the index that is kept in RAM, and the other QLever servers "
+            "running on this machine (overrides the Qleverfile)",
+        )
+        subparser.add_argument(
+            "--startup-timeout",
+            type=float,
+            default=600,
+            help="Give up waiting for the server to become ready after this "
+            "many seconds (default: 600)",
+        )
+        subparser.add_argument(
+            "--warmup-workload",
+            type=str,
+            help="Once the server is running, pin the most frequent queries "
+            "from this workload file to the cache (see `qlever warmup "
+            "--workload`), after the warmup command is executed",
+        )
+        subparser.add_argument(
+            "--warmup-top-k",
+            type=int,
+            default=100,
+            help="With `--warmup-workload`, pin at most this many queries "
+            "(default: 100)",
+        )
         subparser.add_argument(
             "--run-in-foreground",
             action="store_true",
@@ -197,18 +369,25 @@ class StartCommand(QleverCommand):
             ):
                 return False
 
+        # Compute the memory parameters, if so desired.
+        if args.auto_memory and not apply_auto_memory(args):
+            return False
+
         # Construct the command line based on the config file.
-        start_cmd = construct_command(args)
+        log_file_name = self.server_log_file or f"{args.name}.server-log.txt"
+        start_cmd = construct_command(args, self.server_log_file)
 
         # Run the command in a container (if so desired). Otherwise run with
         # `nohup` so that it keeps running after the shell is closed. With
-        # `--run-in-foreground`, run the server in the foreground.
+        # `--run-in-foreground`, run the server in the foreground. Natively,
+        # place the server on the CPUs and NUMA nodes from the Qleverfile.
         if args.system in Containerize.supported_systems():
             start_cmd = wrap_command_in_container(args, start_cmd)
         elif args.run_in_foreground:
-            start_cmd = f"{start_cmd}"
+            start_cmd = f"{get_native_placement_prefix(args)}{start_cmd}"
         else:
-            start_cmd = f"nohup {start_cmd} &"
+            placement_prefix = get_native_placement_prefix(args)
+            start_cmd = f"nohup {placement_prefix}{start_cmd} &"
 
         # Show the command line.
         self.show(start_cmd, only_show=args.show)
@@ -223,6 +402,10 @@ class StartCommand(QleverCommand):
             if not binary_exists(args.server_binary, "server-binary"):
                 return False
 
+        # Check the placement on CPUs and NUMA nodes.
+        if not check_placement(args):
+            return False
+
         # Check if a QLever server is already running on this port.
         if is_qlever_server_alive(args.endpoint_url):
             log.error(f"QLever server already running on {args.endpoint_url}")
@@ -258,34 +441,77 @@ class StartCommand(QleverCommand):
         #                   f" (use `lsof -i :{port}` to find out which one)")
         #         return False
 
-        # Execute the command line.
+        # Execute the command line. When running natively in the background,
+        # also get the PID of the server process (to notice when it exits
+        # during the startup). Remove the log of a previous run first, so that
+        # we do not mistake it for the log of this run.
+        Path(log_file_name).unlink(missing_ok=True)
+        start_time = time.monotonic()
+        server_pid = None
         try:
-            process = run_command(
-                start_cmd,
-                use_popen=args.run_in_foreground,
-            )
+            if (
+                args.system not in Containerize.supported_systems()
+                and not args.run_in_foreground
+            ):
+                output = run_command(
+                    f"{start_cmd} echo $!", return_output=True
+                )
+                try:
+                    server_pid = int(output.strip())
+                except (AttributeError, ValueError):
+                    pass
+                process = None
+            else:
+                process = run_command(
+                    start_cmd,
+                    use_popen=args.run_in_foreground,
+                )
         except Exception as e:
             log.error(f"Starting the QLever server failed ({e})")
             return False
 
-        # Tail the server log until the server is ready (note that the `exec`
-        # is important to make sure that the tail process is killed and not
-        # just the bash process).
+        # Follow the server log until the server is ready. With
+        # `--run-in-foreground`, the log is followed by `tail` for as long as
+        # the server is running (note that the `exec` is important to make
+        # sure that the tail process is killed and not just the bash process).
         if args.run_in_foreground:
             log.info(
-                f"Follow {args.name}.server-log.txt as long as the server is"
+                f"Follow {log_file_name} as long as the server is"
                 f" running (Ctrl-C stops the server)"
             )
+            log.info("")
+            tail_cmd = f"exec tail -f {log_file_name}"
+            tail_proc = subprocess.Popen(tail_cmd, shell=True)
         else:
             log.info(
-                f"Follow {args.name}.server-log.txt until the server is ready"
+                f"Follow {log_file_name} until the server is ready"
                 f" (Ctrl-C stops following the log, but NOT the server)"
             )
+            log.info("")
+        watcher = ServerStartupWatcher(
+            log_file_name,
+            args.endpoint_url,
+            get_is_server_running(args, process, server_pid),
+            echo_log=not args.run_in_foreground,
+        )
+        status = watcher.wait(args.startup_timeout)
+        if status != "ready":
+            if args.run_in_foreground:
+                tail_proc.terminate()
+            if status == "exited":
+                log.error(
+                    f"The server process exited during the startup,"
+                    f" see {log_file_name}"
+                )
+            else:
+                log.error(
+                    f"The server was not ready after "
+                    f"{args.startup_timeout:.0f}s, see {log_file_name}"
+                    f" (the server is still running)"
+                )
+            return False
         log.info("")
-        tail_cmd = f"exec tail -f {args.name}.server-log.txt"
-        tail_proc = subprocess.Popen(tail_cmd, shell=True)
-        while not is_qlever_server_alive(args.endpoint_url):
-            time.sleep(1)
+        watcher.show_startup_phases(time.monotonic() - start_time)
 
         # Set the description for the index and text.
         access_arg = f'--data-urlencode "access-token={args.access_token}"'
@@ -302,22 +528,54 @@ class StartCommand(QleverCommand):
             if not ret:
                 return False
 
-        # Kill the tail process. NOTE: `tail_proc.kill()` does not work.
-        if not args.run_in_foreground:
-            tail_proc.terminate()
+        # Prewarm the page cache with the index files.
+        if args.prewarm:
+            log.info("")
+            args.files = DEFAULT_PREWARM_FILES
+            args.memory_budget = args.prewarm_memory_budget
+            args.parallel_reads = 4
+            args.method = "read"
+            if not PrewarmCommand().execute(args):
+                log.error("Prewarming the page cache failed")
+                return False
 
         # Execute the warmup command.
         if args.warmup_cmd and not args.no_warmup:
             log.info("")
+            args.workload = None
             if not WarmupCommand().execute(args):
                 log.error("Warmup failed")
                 return False
 
+        # Pin the most frequent queries of the workload to the cache.
+        if args.warmup_workload and not args.no_warmup:
+            log.info("")
+            args.workload = args.warmup_workload
+            args.top_k = args.warmup_top_k
+            args.cache_budget = None
+            args.max_in_flight = 4
+            args.sparql_endpoint = None
+            if not WarmupCommand().execute(args):
+                log.error("Pinning the queries of the workload failed")
+                return False
+
+        # Pin the queries from PINNED_QUERIES to the cache.
+        if args.pinned_queries and not args.no_warmup:
+            log.info("")
+            args.action = "sync"
+            args.cache_budget = None
+            args.max_in_flight = 4
+            args.sparql_endpoint = None
+            if not PinCommand().execute(args):
+                log.error("Pinning the queries from PINNED_QUERIES failed")
+                return False
+
         # Show cache stats.
         if not args.run_in_foreground:
             log.info("")
             args.detailed = False
             args.sparql_endpoint = None
+            args.watch = None
             CacheStatsCommand().execute(args)
 
         # Apply settings if any.
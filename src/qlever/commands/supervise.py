@@ -0,0 +1,399 @@
+from __future__ import annotations
+
+import copy
+import json
+import re
+import time
+from datetime import datetime
+
+import psutil
+
+from qlever.command import QleverCommand
+from qlever.commands.clear_cache import ClearCacheCommand
+from qlever.commands.start import StartCommand
+from qlever.commands.switchover import (
+    DEFAULT_HEALTH_CHECK_QUERY,
+    SwitchoverCommand,
+)
+from qlever.containerize import Containerize
+from qlever.log import log
+from qlever.server_startup import ping_server, probe_query
+from qlever.util import format_size, parse_size, run_command
+
+
+class SuperviseCommand(QleverCommand):
+    """
+    Class for executing the `supervise` command.
+    """
+
+    def __init__(self):
+        pass
+
+    def description(self) -> str:
+        return (
+            "Start the server (unless it is already running) and keep it "
+            "running: check it periodically, and restart it when it crashes, "
+            "hangs, or uses too much memory"
+        )
+
+    def should_have_qleverfile(self) -> bool:
+        return True
+
+    def relevant_qleverfile_arguments(self) -> dict[str, list[str]]:
+        return StartCommand().relevant_qleverfile_arguments()
+
+    def additional_arguments(self, subparser) -> None:
+        subparser.add_argument(
+            "--check-interval",
+            type=float,
+            default=10,
+            help="Check the server every this many seconds (default: 10)",
+        )
+        subparser.add_argument(
+            "--probe-query",
+            type=str,
+            default=DEFAULT_HEALTH_CHECK_QUERY,
+            help="The query that is sent to the server with each check "
+            f"(default: `{DEFAULT_HEALTH_CHECK_QUERY}`)",
+        )
+        subparser.add_argument(
+            "--latency-threshold",
+            type=float,
+            default=10,
+            help="A check fails if the probe query takes longer than this "
+            "many seconds (default: 10)",
+        )
+        subparser.add_argument(
+            "--max-failed-checks",
+            type=int,
+            default=3,
+            help="Restart the server after this many failed checks in a row "
+            "(default: 3)",
+        )
+        subparser.add_argument(
+            "--max-rss",
+            type=str,
+            help="React when the resident memory of the server exceeds this "
+            "size, see --on-max-rss (default: no limit)",
+        )
+        subparser.add_argument(
+            "--on-max-rss",
+            choices=["clear-cache", "restart"],
+            default="clear-cache",
+            help="What to do when the server exceeds --max-rss: clear the "
+            "cache (and restart the server if it still exceeds --max-rss at "
+            "the next check), or restart the server (default: clear-cache)",
+        )
+        subparser.add_argument(
+            "--restart-backoff",
+            type=float,
+            default=5,
+            help="Wait this many seconds before a restart, doubling the wait "
+            "with each restart in a row (default: 5)",
+        )
+        subparser.add_argument(
+            "--max-restart-backoff",
+            type=float,
+            default=300,
+            help="Wait at most this many seconds before a restart; once the "
+            "server has been running this long, the wait is reset to "
+            "--restart-backoff (default: 300)",
+        )
+        subparser.add_argument(
+            "--max-restarts",
+            type=int,
+            default=10,
+            help="Give up after this many restarts in a row (default: 10)",
+        )
+        subparser.add_argument(
+            "--event-log",
+            type=str,
+            help="Append the events (start, crash, failed check, restart, "
+            "...) as JSON lines to this file (default: "
+            "NAME.supervise-log.jsonl)",
+        )
+        subparser.add_argument(
+            "--startup-timeout",
+            type=float,
+            default=600,
+            help="Give up waiting for the server to become ready after this "
+            "many seconds (default: 600)",
+        )
+        subparser.add_argument(
+            "--prewarm",
+            action="store_true",
+            default=False,
+            help="Prewarm the page cache with each (re)start, see "
+            "`qlever start --prewarm`",
+        )
+        subparser.add_argument(
+            "--warmup-workload",
+            type=str,
+            help="Pin the most frequent queries from this workload file to "
+            "the cache with each (re)start, see `qlever start "
+            "--warmup-workload`",
+        )
+        subparser.add_argument(
+            "--auto-memory",
+            action="store_true",
+            default=False,
+            help="Compute the memory parameters with each (re)start, see "
+            "`qlever start --auto-memory`",
+        )
+        subparser.add_argument(
+            "--no-warmup",
+            action="store_true",
+            default=False,
+            help="Do not execute the warmup command",
+        )
+
+    def write_event(self, args, event: str, message: str, **details) -> None:
+        """
+        Show the event and append it to the event log.
+        """
+        now = datetime.now()
+        log.info(f"{now.strftime('%Y-%m-%d %H:%M:%S')} [{event}] {message}")
+        record = {
+            "time": now.isoformat(timespec="milliseconds"),
+            "event": event,
+            "port": args.port,
+            "message": message,
+            **details,
+        }
+        try:
+            with open(args.event_log, "a") as event_log:
+                event_log.write(json.dumps(record) + "\n")
+        except OSError as e:
+            log.warning(f"Could not write to {args.event_log}: {e}")
+
+    def get_server_rss(self, args) -> int | None:
+        """
+        Get the resident memory of the server on PORT (of the process, or of
+        the container), or `None` if the server is not running.
+        """
+        if args.system in Containerize.supported_systems():
+            try:
+                mem_usage = run_command(
+                    f"{args.system} stats --no-stream --format"
+                    f" '{{{{.MemUsage}}}}' {args.server_container}",
+                    return_output=True,
+                )
+                return parse_size(mem_usage.split("/")[0])
+            except Exception:
+                return None
+        for proc in psutil.process_iter():
+            try:
+                cmdline = " ".join(proc.cmdline())
+                if re.search(rf"^qlever-server.* -p {args.port} ", cmdline):
+                    if proc.status() == psutil.STATUS_ZOMBIE:
+                        continue
+                    return proc.memory_info().rss
+            except psutil.Error:
+                continue
+        return None
+
+    def check(self, args) -> str | None:
+        """
+        Check that the server responds to a ping and answers the probe query
+        in time. Return the error message if not, otherwise `None`.
+        """
+        if not ping_server(args.endpoint_url, timeout=args.latency_threshold):
+            return "No response to /ping"
+        seconds, error = probe_query(
+            args.endpoint_url,
+            args.probe_query,
+            args.access_token,
+            timeout=args.latency_threshold,
+        )
+        if error is not None:
+            return f"Probe query failed: {(error.splitlines() or [''])[0]}"
+        if seconds > args.latency_threshold:
+            return (
+                f"Probe query took {seconds:.1f}s (threshold: "
+                f"{args.latency_threshold:.1f}s)"
+            )
+        return None
+
+    def start_server(self, args) -> bool:
+        """
+        (Re)start the server on PORT, with the usual warmup.
+        """
+        start_args = copy.copy(args)
+        start_args.kill_existing_with_same_port = True
+        start_args.run_in_foreground = False
+        start_args.runtime_parameters = []
+        start_args.prewarm_memory_budget = None
+        start_args.warmup_top_k = 100
+        log.info("")
+        success = StartCommand().execute(start_args)
+        log.info("")
+        return success
+
+    def execute(self, args) -> bool:
+        args.endpoint_url = f"http://{args.host_name}:{args.port}"
+        if not args.server_container:
+            args.server_container = f"qlever.server.{args.name}"
+        if not args.event_log:
+            args.event_log = f"{args.name}.supervise-log.jsonl"
+        try:
+            max_rss = parse_size(args.max_rss) if args.max_rss else None
+        except ValueError as e:
+            log.error(f"Invalid --max-rss: {e}")
+            return False
+
+        # Show what the command does.
+        description = (
+            f"Supervise the server on port {args.port}: every "
+            f"{args.check_interval:.0f}s, ping it and send the probe query "
+            f"(at most {args.latency_threshold:.0f}s), and restart it after a "
+            f"crash or {args.max_failed_checks} failed checks in a row (with "
+            f"a backoff from {args.restart_backoff:.0f}s to "
+            f"{args.max_restart_backoff:.0f}s)"
+        )
+        if max_rss is not None:
+            reaction = (
+                "clear the cache"
+                if args.on_max_rss == "clear-cache"
+                else "restart it"
+            )
+            description += (
+                f"; {reaction} when it uses more than "
+                f"{format_size(max_rss)} of memory"
+            )
+        description += f"; write the events to {args.event_log}"
+        self.show(description, only_show=args.show)
+        if args.show:
+            return True
+
+        # Adopt a server that is already running, otherwise start it.
+        if ping_server(args.endpoint_url):
+            self.write_event(
+                args, "adopt", "Supervising the server that is running"
+            )
+            server_ok = True
+        else:
+            server_ok = self.start_server(args)
+            if server_ok:
+                self.write_event(args, "start", "Server started")
+            else:
+                self.write_event(args, "start-failed", "Starting failed")
+
+        # Check the server periodically until Ctrl-C. When a restart is
+        # needed, stop the server, wait for the backoff, and start it again.
+        # The backoff doubles with each restart in a row and is reset once
+        # the server has been running for the maximal backoff.
+        num_failed_checks = 0
+        num_restarts = 0
+        cache_cleared = False
+        last_start_time = time.monotonic()
+        restart_reason = None if server_ok else "Starting failed"
+        try:
+            while True:
+                if restart_reason is not None:
+                    if num_restarts >= args.max_restarts:
+                        self.write_event(
+                            args,
+                            "give-up",
+                            f"Giving up after {num_restarts} restarts in a "
+                            f"row",
+                        )
+                        return False
+                    backoff = min(
+                        args.restart_backoff * 2**num_restarts,
+                        args.max_restart_backoff,
+                    )
+                    num_restarts += 1
+                    self.write_event(
+                        args,
+                        "restart",
+                        f"{restart_reason}, restarting in {backoff:.0f}s "
+                        f"(restart #{num_restarts} in a row)",
+                        reason=restart_reason,
+                        backoff=backoff,
+                    )
+                    if self.get_server_rss(args) is not None:
+                        SwitchoverCommand().stop_server(args, args.port)
+                    time.sleep(backoff)
+                    last_start_time = time.monotonic()
+                    if self.start_server(args):
+                        self.write_event(args, "start", "Server restarted")
+                        restart_reason = None
+                        num_failed_checks = 0
+                        cache_cleared = False
+                    else:
+                        restart_reason = "Starting failed"
+                        self.write_event(
+                            args, "start-failed", restart_reason
+                        )
+                        continue
+
+                time.sleep(args.check_interval)
+
+                # Has the server crashed?
+                rss = self.get_server_rss(args)
+                if rss is None:
+                    restart_reason = "The server is no longer running"
+                    self.write_event(args, "crash", restart_reason)
+                    continue
+
+                # Does it respond in time?
+                error = self.check(args)
+                if error is not None:
+                    num_failed_checks += 1
+                    self.write_event(
+                        args,
+                        "check-failed",
+                        f"{error} ({num_failed_checks} of "
+                        f"{args.max_failed_checks})",
+                        rss=rss,
+                    )
+                    if num_failed_checks >= args.max_failed_checks:
+                        restart_reason = (
+                            f"{num_failed_checks} failed checks in a row"
+                        )
+                        self.write_event(args, "hang", restart_reason)
+                    continue
+                if num_failed_checks > 0:
+                    self.write_event(args, "recover", "Check passed again")
+                num_failed_checks = 0
+                if (
+                    num_restarts > 0
+                    and time.monotonic() - last_start_time
+                    >= args.max_restart_backoff
+                ):
+                    num_restarts = 0
+
+                # Does it use too much memory?
+                if max_rss is None or rss <= max_rss:
+                    cache_cleared = False
+                    continue
+                message = (
+                    f"Resident memory {format_size(rss)} exceeds "
+                    f"{format_size(max_rss)}"
+                )
+                if args.on_max_rss == "restart" or cache_cleared:
+                    restart_reason = message
+                    self.write_event(args, "memory", message, rss=rss)
+                    continue
+                self.write_event(
+                    args, "memory", f"{message}, clearing the cache", rss=rss
+                )
+                clear_cache_args = copy.copy(args)
+                clear_cache_args.sparql_endpoint = None
+                clear_cache_args.complete = False
+                clear_cache_args.show = False
+                ClearCacheCommand().execute(clear_cache_args)
+                cache_cleared = True
+        except KeyboardInterrupt:
+            log.info("")
+            self.write_event(
+                args,
+                "stop",
+                "Supervision stopped"
+                + (
+                    " (the server keeps running)"
+                    if self.get_server_rss(args) is not None
+                    else ""
+                ),
+            )
+            return True
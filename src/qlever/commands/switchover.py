@@ -0,0 +1,437 @@
+from __future__ import annotations
+
+import copy
+import json
+import random
+import shlex
+import sys
+import time
+from pathlib import Path
+
+from qlever.command import QleverCommand
+from qlever.commands.start import StartCommand
+from qlever.commands.stop import StopCommand
+from qlever.commands.warmup import read_workload
+from qlever.containerize import Containerize
+from qlever.log import log
+from qlever.server_startup import ping_server
+from qlever.switch_proxy import (
+    count_backend_connections,
+    find_switch_proxy,
+    read_backend_port,
+    write_backend_port,
+)
+from qlever.util import run_command
+
+# The query for the health check when no queries are given.
+DEFAULT_HEALTH_CHECK_QUERY = "SELECT * WHERE { ?s ?p ?o } LIMIT 1"
+
+
+class SwitchoverCommand(QleverCommand):
+    """
+    Class for executing the `switchover` command.
+    """
+
+    def __init__(self):
+        pass
+
+    def description(self) -> str:
+        return (
+            "Start a server for the current index on an alternate port, "
+            "check it, and switch the traffic on PORT to it without downtime "
+            "(blue/green)"
+        )
+
+    def should_have_qleverfile(self) -> bool:
+        return True
+
+    def relevant_qleverfile_arguments(self) -> dict[str, list[str]]:
+        return StartCommand().relevant_qleverfile_arguments()
+
+    def additional_arguments(self, subparser) -> None:
+        subparser.add_argument(
+            "--alternate-ports",
+            type=str,
+            help="Two comma-separated ports on which the servers run "
+            "alternately, behind PORT (default: PORT+1,PORT+2)",
+        )
+        subparser.add_argument(
+            "--switch-cmd",
+            type=str,
+            help="Shell command that switches the traffic to the new server, "
+            "where %%PORT%% is replaced by its port (for example, to update "
+            "the config of your reverse proxy); default: use a built-in "
+            "proxy on PORT",
+        )
+        subparser.add_argument(
+            "--health-check-queries",
+            type=str,
+            help="File with queries for the health check of the new server "
+            "(TSV or YAML, like for `qlever warmup --workload`); default: "
+            f"the query `{DEFAULT_HEALTH_CHECK_QUERY}`",
+        )
+        subparser.add_argument(
+            "--health-check-sample",
+            type=int,
+            default=10,
+            help="Number of queries to sample from --health-check-queries "
+            "(default: 10)",
+        )
+        subparser.add_argument(
+            "--drain-timeout",
+            type=float,
+            default=60,
+            help="After the switch, wait until the old server has no more "
+            "connections, but at most this many seconds, before stopping it "
+            "(default: 60)",
+        )
+        subparser.add_argument(
+            "--startup-timeout",
+            type=float,
+            default=600,
+            help="Give up waiting for the new server to become ready after "
+            "this many seconds (default: 600)",
+        )
+        subparser.add_argument(
+            "--prewarm",
+            action="store_true",
+            default=False,
+            help="Prewarm the page cache for the new server, see "
+            "`qlever start --prewarm`",
+        )
+        subparser.add_argument(
+            "--warmup-workload",
+            type=str,
+            help="Pin the most frequent queries from this workload file to "
+            "the cache of the new server, see `qlever start "
+            "--warmup-workload`",
+        )
+        subparser.add_argument(
+            "--auto-memory",
+            action="store_true",
+            default=False,
+            help="Compute the memory parameters of the new server from the "
+            "memory that is left while the old server is still running, see "
+            "`qlever start --auto-memory`",
+        )
+        subparser.add_argument(
+            "--no-warmup",
+            action="store_true",
+            default=False,
+            help="Do not execute the warmup command for the new server",
+        )
+        subparser.add_argument(
+            "--stop-proxy",
+            action="store_true",
+            default=False,
+            help="Only stop the built-in proxy on PORT (the server behind it "
+            "keeps running on its port)",
+        )
+
+    def get_server_container(self, args, port: int) -> str:
+        """
+        Get the name of the container of the server on the given port (the
+        server on PORT has the usual name, the servers behind the proxy have
+        the port appended).
+        """
+        server_container = (
+            args.server_container or f"qlever.server.{args.name}"
+        )
+        if port == args.port:
+            return server_container
+        return f"{server_container}.{port}"
+
+    def get_server_log_file(self, args, port: int) -> str:
+        """
+        Get the name of the log file of the server on the given port (like
+        for the container, the servers behind the proxy have the port
+        inserted, so that they do not overwrite each other's log).
+        """
+        if port == args.port:
+            return f"{args.name}.server-log.txt"
+        return f"{args.name}.{port}.server-log.txt"
+
+    def stop_server(self, args, port: int) -> bool:
+        """
+        Stop the server on the given port (and only that one).
+        """
+        stop_args = copy.copy(args)
+        stop_args.cmdline_regex = f"^qlever-server.* -p {port} "
+        stop_args.server_container = self.get_server_container(args, port)
+        stop_args.no_containers = (
+            args.system not in Containerize.supported_systems()
+        )
+        stop_args.show = False
+        return StopCommand().execute(stop_args)
+
+    def health_check(self, args, port: int) -> bool:
+        """
+        Send a sample of the health check queries to the server on the given
+        port, and return `True` if all of them succeeded.
+        """
+        if args.health_check_queries:
+            try:
+                queries = [
+                    query
+                    for _, query, _ in read_workload(args.health_check_queries)
+                ]
+            except Exception as e:
+                log.error(
+                    f"Could not read queries from "
+                    f"{args.health_check_queries}: {e}"
+                )
+                return False
+            queries = random.sample(
+                queries, min(args.health_check_sample, len(queries))
+            )
+        else:
+            queries = [DEFAULT_HEALTH_CHECK_QUERY]
+        num_failed = 0
+        for query in queries:
+            curl_cmd = (
+                f"curl -s {args.host_name}:{port}"
+                f' -H "Accept: application/qlever-results+json"'
+                f" --data-urlencode query={shlex.quote(query)}"
+                f" --data send=0"
+            )
+            start_time = time.monotonic()
+            try:
+                result = json.loads(run_command(curl_cmd, return_output=True))
+                error = result.get("exception")
+            except Exception as e:
+                error = str(e).strip()
+            seconds = time.monotonic() - start_time
+            if error is None:
+                result_size = result.get("resultsize") or 0
+                log.info(
+                    f"OK      {seconds:6.2f}s  {result_size:>11,} rows"
+                    f"  {query[:60]}"
+                )
+            else:
+                num_failed += 1
+                error = (error.splitlines() or [""])[0]
+                log.info(
+                    f"FAILED  {seconds:6.2f}s  {error[:40]}  {query[:60]}"
+                )
+        return num_failed == 0
+
+    def start_proxy(self, args, backend_file: str) -> bool:
+        """
+        Start the built-in proxy on PORT in the background, and wait until
+        it forwards requests.
+        """
+        proxy_cmd = (
+            f"nohup {shlex.quote(sys.executable)} -m qlever.switch_proxy"
+            f" --port {args.port} --backend-file {shlex.quote(backend_file)}"
+            f" > {args.name}.switch-proxy-log.txt 2>&1 &"
+        )
+        log.info(proxy_cmd)
+        try:
+            run_command(proxy_cmd)
+        except Exception as e:
+            log.error(f"Starting the proxy failed: {e}")
+            return False
+        for _ in range(100):
+            if ping_server(f"http://{args.host_name}:{args.port}"):
+                return True
+            time.sleep(0.1)
+        log.error(
+            f"The proxy on port {args.port} does not respond, see "
+            f"{args.name}.switch-proxy-log.txt"
+        )
+        return False
+
+    def drain(self, proxy_proc, port: int, timeout: float) -> None:
+        """
+        Wait until the proxy has no more connections to the server on the
+        given port, but at most `timeout` seconds.
+        """
+        start_time = time.monotonic()
+        while time.monotonic() - start_time < timeout:
+            try:
+                num_connections = count_backend_connections(proxy_proc, port)
+            except Exception as e:
+                log.debug(f"Cannot count the connections of the proxy: {e}")
+                num_connections = None
+            if num_connections == 0:
+                return
+            time.sleep(1)
+        log.warning(
+            f"The old server still has open connections after {timeout:.0f}s"
+            f", stopping it anyway"
+        )
+
+    def execute(self, args) -> bool:
+        proxy = find_switch_proxy(args.port)
+
+        # Only stop the proxy, if requested.
+        if args.stop_proxy:
+            self.show(
+                f"Stop the built-in proxy on port {args.port}",
+                only_show=args.show,
+            )
+            if args.show:
+                return True
+            if proxy is None:
+                log.error(f"No built-in proxy running on port {args.port}")
+                return False
+            proxy[0].terminate()
+            log.info(
+                f"Stopped the proxy on port {args.port}, the server behind it "
+                f"on port {read_backend_port(proxy[1])} is still running"
+            )
+            return True
+
+        # Determine the alternate ports and which server is currently live
+        # (on one of the alternate ports behind the proxy, or directly on
+        # PORT). The new server runs on the other alternate port.
+        try:
+            if args.alternate_ports:
+                alternate_ports = [
+                    int(port) for port in args.alternate_ports.split(",")
+                ]
+            else:
+                alternate_ports = [int(args.port) + 1, int(args.port) + 2]
+            if len(alternate_ports) != 2 or args.port in alternate_ports:
+                raise ValueError("expected two ports different from PORT")
+        except ValueError as e:
+            log.error(f"Invalid --alternate-ports: {e}")
+            return False
+        if proxy is not None:
+            live_port = read_backend_port(proxy[1])
+        elif args.switch_cmd:
+            live_port = next(
+                (
+                    port
+                    for port in alternate_ports
+                    if ping_server(f"http://{args.host_name}:{port}")
+                ),
+                None,
+            )
+        elif ping_server(f"http://{args.host_name}:{args.port}"):
+            live_port = args.port
+        else:
+            live_port = None
+        new_port = (
+            alternate_ports[1]
+            if live_port == alternate_ports[0]
+            else alternate_ports[0]
+        )
+        backend_file = (
+            proxy[1]
+            if proxy is not None
+            else str(Path(f"{args.name}.switch-proxy-backend").absolute())
+        )
+        if args.switch_cmd:
+            switch = args.switch_cmd.replace("%%PORT%%", str(new_port))
+        elif proxy is not None:
+            switch = f"Write {new_port} to {backend_file}"
+        else:
+            switch = (
+                f"Stop the server on port {args.port} and start a proxy on "
+                f"port {args.port} that forwards to port {new_port}"
+            )
+        self.show(
+            f"Start a server on port {new_port}, check it, and switch to it "
+            f"({switch}), then stop the old server"
+            + (f" on port {live_port}" if live_port else "")
+            + f" after at most {args.drain_timeout:.0f}s of draining",
+            only_show=args.show,
+        )
+        if args.show:
+            return True
+        if live_port == args.port and proxy is None and not args.switch_cmd:
+            log.info(
+                "NOTE: The first switchover to the built-in proxy has a brief "
+                "gap between stopping the server on PORT and starting the "
+                "proxy, later switchovers have none"
+            )
+
+        # Start the new server on the new port.
+        public_port = args.port
+        start_args = copy.copy(args)
+        start_args.port = new_port
+        start_args.server_container = self.get_server_container(
+            args, new_port
+        )
+        start_args.kill_existing_with_same_port = True
+        start_args.run_in_foreground = False
+        start_args.runtime_parameters = []
+        start_args.prewarm_memory_budget = None
+        start_args.warmup_top_k = 100
+        log.info("")
+        start_command = StartCommand(
+            server_log_file=self.get_server_log_file(args, new_port)
+        )
+        if not start_command.execute(start_args):
+            log.error(f"Starting the new server on port {new_port} failed")
+            self.stop_server(args, new_port)
+            return False
+
+        # Check the new server, and roll back if that fails.
+        log.info("")
+        log.info(f"Health check of the new server on port {new_port}:")
+        log.info("")
+        if not self.health_check(args, new_port):
+            log.info("")
+            log.error(
+                "The health check of the new server failed, rolling back "
+                "(the old server keeps running)"
+            )
+            self.stop_server(args, new_port)
+            return False
+
+        # Switch the traffic to the new server.
+        log.info("")
+        log.info(
+            f"Switching the traffic on port {public_port} to port {new_port}"
+        )
+        if args.switch_cmd:
+            try:
+                run_command(switch, show_output=True)
+            except Exception as e:
+                log.error(
+                    f"Switching failed, rolling back (the old server keeps "
+                    f"running): {e}"
+                )
+                self.stop_server(args, new_port)
+                return False
+        elif proxy is not None:
+            write_backend_port(backend_file, new_port)
+        else:
+            write_backend_port(backend_file, new_port)
+            if live_port is not None and not self.stop_server(
+                args, live_port
+            ):
+                log.error("Stopping the old server failed")
+                return False
+            if not self.start_proxy(args, backend_file):
+                return False
+            log.info("")
+            log.info(
+                f"The server now runs on port {new_port} behind the proxy on "
+                f"port {public_port} (`qlever switchover --stop-proxy` stops "
+                f"the proxy)"
+            )
+            return True
+
+        # Drain the old server and stop it.
+        if live_port is not None:
+            if proxy is not None:
+                log.info(
+                    f"Waiting until the old server on port {live_port} has "
+                    f"no more connections (at most {args.drain_timeout:.0f}s)"
+                )
+                self.drain(proxy[0], live_port, args.drain_timeout)
+            else:
+                time.sleep(args.drain_timeout)
+            log.info("")
+            if not self.stop_server(args, live_port):
+                log.error(f"Stopping the old server on {live_port} failed")
+                return False
+        log.info("")
+        log.info(
+            f"The server now runs on port {new_port}, the traffic on port "
+            f"{public_port} goes there"
+        )
+        return True
@@ -9,6 +9,7 @@ import psutil
 from qlever.command import QleverCommand
 from qlever.containerize import Containerize
 from qlever.log import log
+from qlever.placement import get_native_placement_prefix, get_numa_topology
 from qlever.util import format_size, run_command
 
 
@@ -49,7 +50,16 @@ class SystemInfoCommand(QleverCommand):
         return True
 
     def relevant_qleverfile_arguments(self) -> dict[str, list[str]]:
-        return {"runtime": ["system", "image", "server_container"]}
+        return {
+            "runtime": [
+                "system",
+                "image",
+                "server_container",
+                "cpuset_cpus",
+                "cpuset_mems",
+                "numa_memory_policy",
+            ]
+        }
 
     def additional_arguments(self, subparser) -> None:
         pass
@@ -92,6 +102,31 @@ class SystemInfoCommand(QleverCommand):
             f"CPU: {num_cores} Cores, "
             f"{num_threads} Threads @ {cpu_freq:.2f} GHz"
         )
+        # NUMA nodes with their CPUs, memory, and distances (only on Linux),
+        # and the placement from the Qleverfile.
+        numa_nodes = get_numa_topology()
+        if numa_nodes:
+            log.info(f"NUMA: {len(numa_nodes)} node(s)")
+            for node in numa_nodes:
+                log.info(
+                    f"  Node {node['node']}: CPUs {node['cpus']}, "
+                    f"{format_size(node['memory_total'])} total, "
+                    f"{format_size(node['memory_free'])} free, distances "
+                    f"{' '.join(str(d) for d in node['distances'])}"
+                )
+        if args.cpuset_cpus or args.cpuset_mems:
+            if args.system in Containerize.supported_systems():
+                placement = " ".join(
+                    f"--{option} {value}"
+                    for option, value in [
+                        ("cpuset-cpus", args.cpuset_cpus),
+                        ("cpuset-mems", args.cpuset_mems),
+                    ]
+                    if value
+                )
+            else:
+                placement = get_native_placement_prefix(args).strip()
+            log.info(f"Placement: {placement}")
 
         cwd = Path.cwd()
         log.info(f"CWD: {cwd}")
@@ -6,6 +6,7 @@ import traceback
 
 from qlever.command import QleverCommand
 from qlever.log import log
+from qlever.result_cache import invalidate_result_cache
 from qlever.util import run_command
 
 
@@ -70,10 +71,15 @@ class UpdateCommand(QleverCommand):
         if args.show:
             return True
 
-        # Execute update
+        # Execute update (and invalidate the results cached by `qlever query
+        # --result-cache`, even if the update fails, since it might have
+        # been applied partially).
         try:
             start_time = time.time()
-            run_command(curl_cmd)
+            try:
+                run_command(curl_cmd)
+            finally:
+                invalidate_result_cache(sparql_endpoint)
             time_msecs = round(1000 * (time.time() - start_time))
             if args.log_level != "NO_LOG":
                 log.info("")
@@ -19,6 +19,7 @@ from tqdm.contrib.logging import tqdm_logging_redirect
 
 from qlever.command import QleverCommand
 from qlever.log import log
+from qlever.result_cache import invalidate_result_cache
 from qlever.util import run_command
 
 
@@ -990,6 +991,7 @@ class UpdateWikidataCommand(QleverCommand):
                     args.num_retries,
                     log,
                 )
+                invalidate_result_cache(sparql_endpoint)
                 result_file_name = f"update.{first_offset_in_batch}.{current_batch_size}.result"
                 with open(result_file_name, "w") as f:
                     f.write(result)
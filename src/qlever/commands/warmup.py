@@ -1,9 +1,38 @@
 from __future__ import annotations
 
+import json
+import shlex
 import subprocess
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 from qlever.command import QleverCommand
 from qlever.log import log
+from qlever.util import format_size, parse_size, run_command
+from qlever.workload import read_query_file
+
+
+def read_workload(workload_file: str) -> list[tuple[str, str, int]]:
+    """
+    Read the queries from a workload file (TSV or YAML with optional
+    `count`, see `read_query_file`). Identical queries are merged and their
+    frequencies added up. Return a list of `(description, query, count)`,
+    sorted by decreasing frequency (and otherwise in the order of their
+    first occurrence).
+    """
+    # Merge identical queries (keeping the first description).
+    workload = {}
+    for description, query, count in read_query_file(
+        workload_file, "count", 1
+    ):
+        if query in workload:
+            workload[query][2] += int(count)
+        else:
+            workload[query] = [description, query, int(count)]
+    return sorted(
+        (tuple(entry) for entry in workload.values()),
+        key=lambda entry: -entry[2],
+    )
 
 
 class WarmupCommand(QleverCommand):
@@ -15,18 +44,265 @@ class WarmupCommand(QleverCommand):
         pass
 
     def description(self) -> str:
-        return ("Execute WARMUP_CMD")
+        return (
+            "Execute WARMUP_CMD, or pin the most frequent queries of a "
+            "workload to the cache"
+        )
 
     def should_have_qleverfile(self) -> bool:
         return True
 
     def relevant_qleverfile_arguments(self) -> dict[str, list[str]]:
-        return {"server": ["port", "warmup_cmd"]}
+        return {
+            "server": ["host_name", "port", "access_token", "warmup_cmd"]
+        }
 
     def additional_arguments(self, subparser) -> None:
-        pass
+        subparser.add_argument(
+            "--workload",
+            type=str,
+            help="Instead of executing WARMUP_CMD, pin the most frequent "
+            "queries from this file to the cache (TSV with lines "
+            "`description<TAB>query` as written by `qlever extract-queries`, "
+            "or YAML as used by `qlever benchmark-queries`)",
+        )
+        subparser.add_argument(
+            "--top-k",
+            type=int,
+            default=100,
+            help="With `--workload`, pin at most this many queries "
+            "(default: 100)",
+        )
+        subparser.add_argument(
+            "--cache-budget",
+            type=str,
+            help="With `--workload`, stop pinning once the pinned results "
+            "take this much space (default: the `cache-max-size` of the "
+            "server)",
+        )
+        subparser.add_argument(
+            "--max-in-flight",
+            type=int,
+            default=4,
+            help="With `--workload`, the maximal number of queries that are "
+            "pinned concurrently (default: 4)",
+        )
+        subparser.add_argument(
+            "--sparql-endpoint",
+            help="URL of the SPARQL endpoint, default is {host_name}:{port}",
+        )
+
+    def get_cache_stats(self, sparql_endpoint: str) -> dict:
+        """
+        Get the cache statistics and settings of the server, as one dict.
+        """
+        cache_stats = {}
+        for cmd in ["cache-stats", "get-settings"]:
+            result = json.loads(
+                run_command(
+                    f"curl -s {sparql_endpoint}"
+                    f' --data-urlencode "cmd={cmd}"',
+                    return_output=True,
+                )
+            )
+            if isinstance(result, list):
+                result = result[0]
+            cache_stats.update(result)
+        return cache_stats
+
+    def pin_query(
+        self, sparql_endpoint: str, access_token: str, query: str
+    ) -> tuple[int | None, float, str | None, bool]:
+        """
+        Pin the result of the given query to the cache, without sending the
+        result. Return the result size (or `None` if the query failed), the
+        time in seconds, the error message (if any), and whether the result
+        was already pinned (then the server answers from its cache, without
+        computing anything).
+        """
+        curl_cmd = (
+            f"curl -s {sparql_endpoint}"
+            f' -H "Accept: application/qlever-results+json"'
+            f" --data-urlencode query={shlex.quote(query)}"
+            f" --data pin-result=true --data send=0"
+            f" --data access-token={shlex.quote(access_token or '')}"
+        )
+        start_time = time.monotonic()
+        try:
+            result = json.loads(run_command(curl_cmd, return_output=True))
+        except Exception as e:
+            return None, time.monotonic() - start_time, str(e).strip(), False
+        seconds = time.monotonic() - start_time
+        if "exception" in result:
+            return None, seconds, result["exception"], False
+        tree = (result.get("runtimeInformation") or {}).get(
+            "query_execution_tree"
+        ) or {}
+        was_pinned = tree.get("cache_status") == "cached_pinned"
+        return result.get("resultsize"), seconds, None, was_pinned
+
+    def pin_queries(
+        self,
+        sparql_endpoint: str,
+        access_token: str,
+        queries: list[str],
+        max_in_flight: int,
+        cache_budget: int,
+        pinned_size: int,
+    ) -> tuple[dict[int, tuple], int] | None:
+        """
+        Pin the given queries in the given order, with at most
+        `max_in_flight` concurrent requests. When a query is done, check how
+        much is pinned now, and do not start more queries once the pinned
+        size reaches the cache budget. Return the result of `pin_query` for
+        the index of each query that was tried, and the pinned size at the
+        end, or `None` if the pinning was interrupted.
+        """
+        results = {}
+        next_index = 0
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            in_flight = {}
+            try:
+                while True:
+                    while (
+                        next_index < len(queries)
+                        and len(in_flight) < max_in_flight
+                        and pinned_size < cache_budget
+                    ):
+                        future = executor.submit(
+                            self.pin_query,
+                            sparql_endpoint,
+                            access_token,
+                            queries[next_index],
+                        )
+                        in_flight[future] = next_index
+                        next_index += 1
+                    if not in_flight:
+                        break
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        results[in_flight.pop(future)] = future.result()
+                    try:
+                        pinned_size = self.get_cache_stats(sparql_endpoint)[
+                            "cache-size-pinned"
+                        ]
+                    except Exception as e:
+                        log.warning(f"Failed to get cache stats: {e}")
+            except KeyboardInterrupt:
+                for future in in_flight:
+                    future.cancel()
+                log.warning("Pinning interrupted")
+                return None
+        return results, pinned_size
+
+    def execute_workload(self, args) -> bool:
+        """
+        Pin the `--top-k` most frequent queries of the workload to the cache,
+        with at most `--max-in-flight` concurrent requests, until the pinned
+        results reach the cache budget. Then show a report of what was
+        pinned.
+        """
+        sparql_endpoint = (
+            args.sparql_endpoint
+            if args.sparql_endpoint
+            else f"{args.host_name}:{args.port}"
+        )
+        try:
+            workload = read_workload(args.workload)
+        except Exception as e:
+            log.error(f"Could not read workload from {args.workload}: {e}")
+            return False
+        queries = workload[: args.top_k]
+        total_count = sum(count for _, _, count in workload)
+        self.show(
+            f"Pin the {len(queries)} most frequent of the {len(workload)} "
+            f"distinct queries from {args.workload} to the cache of "
+            f"{sparql_endpoint}, with at most {args.max_in_flight} queries "
+            f"in flight, until the pinned results take "
+            f"{args.cache_budget or 'the cache-max-size of the server'}",
+            only_show=args.show,
+        )
+        if args.show:
+            return True
+        if len(queries) == 0:
+            log.warning(f"No queries found in {args.workload}")
+            return True
+
+        # Get the pinned size before and the budget.
+        try:
+            cache_stats = self.get_cache_stats(sparql_endpoint)
+            pinned_size_before = cache_stats["cache-size-pinned"]
+            if args.cache_budget:
+                cache_budget = parse_size(args.cache_budget)
+            else:
+                cache_budget = parse_size(cache_stats["cache-max-size"])
+        except Exception as e:
+            log.error(f"Failed to get cache stats and settings: {e}")
+            return False
+
+        # Pin the queries in the order of their frequency, until the budget
+        # is used up.
+        start_time = time.monotonic()
+        pinned = self.pin_queries(
+            sparql_endpoint,
+            args.access_token,
+            [query for _, query, _ in queries],
+            args.max_in_flight,
+            cache_budget,
+            pinned_size_before,
+        )
+        if pinned is None:
+            return False
+        results, pinned_size = pinned
+        total_seconds = time.monotonic() - start_time
+
+        # Show the report, one line per query, and a summary.
+        num_pinned = 0
+        pinned_count = 0
+        for index, (description, query, count) in enumerate(queries):
+            if index not in results:
+                status = "skipped (budget)"
+            else:
+                result_size, seconds, error, was_pinned = results[index]
+                if error is None:
+                    num_pinned += 1
+                    pinned_count += count
+                    status = (
+                        "already pinned"
+                        if was_pinned
+                        else f"{seconds:6.2f}s, {result_size or 0:>11,} rows"
+                    )
+                else:
+                    status = f"FAILED: {(error.splitlines() or [''])[0][:60]}"
+            log.info(
+                f"{index + 1:>4}. {count:>6,}x  {status:<30}  "
+                f"{description or query[:40]}"
+            )
+        log.info("")
+        num_failed = sum(1 for _, _, error, _ in results.values() if error)
+        log.info(
+            f"Pinned {num_pinned} of {len(queries)} queries in "
+            f"{total_seconds:.1f}s ({num_failed} failed, "
+            f"{len(queries) - len(results)} skipped), covering "
+            f"{100 * pinned_count / max(total_count, 1):.0f}% of the "
+            f"{total_count:,} queries in the workload"
+        )
+        log.info(
+            f"Pinned cache size: {format_size(pinned_size_before)} before, "
+            f"{format_size(pinned_size)} after, budget "
+            f"{format_size(cache_budget)}"
+        )
+        if num_failed > 0:
+            log.warning(
+                f"{num_failed} queries could not be pinned, see the report "
+                f"above"
+            )
+        return True
 
     def execute(self, args) -> bool:
+        if args.workload:
+            return self.execute_workload(args)
+
         # Show what the command is doing.
         self.show(args.warmup_cmd, only_show=args.show)
         if args.show:
@@ -107,6 +107,17 @@ class QleverConfig:
                                default="INFO",
                                help="Set the log level")
 
+    def add_subparser_stub(self, subparsers, command_name):
+        """
+        Add a subparser for the given command with only its description
+        (which can be obtained without importing the module of the command,
+        see `CommandRegistry`). This is enough for `qlever --help` and for
+        the autocompletion of the command names.
+        """
+        description = command_objects.description(command_name)
+        subparsers.add_parser(command_name, description=description,
+                              help=description)
+
     def parse_args(self):
         # Determine whether we are in autocomplete mode or not.
         autocomplete_mode = "COMP_LINE" in os.environ
@@ -131,14 +142,33 @@ class QleverConfig:
         def add_qleverfile_option(parser):
             parser.add_argument("--qleverfile", "-q", type=str,
                                 default="Qleverfile")
+            parser.add_argument("--no-cache", action="store_true",
+                                default=False,
+                                help="Evaluate all `$(...)` in the "
+                                     "Qleverfile again, instead of taking "
+                                     "the values of slow ones from the "
+                                     "cache")
         qleverfile_parser = argparse.ArgumentParser(add_help=False)
         add_qleverfile_option(qleverfile_parser)
         qleverfile_parser.add_argument("command", type=str, nargs="?")
-        qleverfile_args, _ = qleverfile_parser.parse_known_args()
+        # The `--log-level` of the command also applies to reading the
+        # Qleverfile (for example, to see how long the `$(...)` take).
+        qleverfile_parser.add_argument("--log-level",
+                                       choices=log_levels.keys())
+        # In autocompletion mode, the command line is in `COMP_LINE` (up to
+        # `COMP_POINT`), without the word that is being completed.
+        if autocomplete_mode:
+            comp_line = os.environ["COMP_LINE"]
+            comp_point = int(os.environ.get("COMP_POINT", len(comp_line)))
+            comp_line = comp_line[:comp_point]
+            comp_words = comp_line.split()[1:]
+            if comp_words and not comp_line[-1].isspace():
+                comp_words = comp_words[:-1]
+            qleverfile_args, _ = qleverfile_parser.parse_known_args(
+                comp_words)
+        else:
+            qleverfile_args, _ = qleverfile_parser.parse_known_args()
         qleverfile_path_name = qleverfile_args.qleverfile
-        # command = qleverfile_args.command
-        # should_have_qleverfile = command in command_objects \
-        #     and command_objects[command].should_have_qleverfile()
 
         # Check if the Qleverfile exists and if we are using the default name.
         # We need this again further down in the code, so remember it.
@@ -160,8 +190,12 @@ class QleverConfig:
         # TODO: What if `command.should_have_qleverfile()` is `False`, should
         # we then parse the Qleverfile or not.
         if qleverfile_exists and not autocomplete_mode:
+            if qleverfile_args.log_level:
+                log.setLevel(log_levels[qleverfile_args.log_level])
             try:
-                qleverfile_config = Qleverfile.read(qleverfile_path)
+                qleverfile_config = Qleverfile.read(
+                        qleverfile_path,
+                        use_cache=not qleverfile_args.no_cache)
             except Exception as e:
                 log.info("")
                 log.error(f"Error parsing Qleverfile `{qleverfile_path}`"
@@ -173,8 +207,10 @@ class QleverConfig:
 
         # Now the regular parser with commands and a subparser for each
         # command. We have a dedicated class for each command. These classes
-        # are defined in the modules in `qlever/commands`. In `__init__.py`
-        # an object of each class is created and stored in `command_objects`.
+        # are defined in the modules in `qlever/commands`, which are only
+        # imported when needed (see `CommandRegistry` in `__init__.py`). Only
+        # the subparser of the given command (if any) gets all the arguments,
+        # the others are only needed for their names and descriptions.
         parser = argparse.ArgumentParser(
             description=colored(
                 f"This is the {script_name} command line tool, "
@@ -192,10 +228,14 @@ class QleverConfig:
         subparsers = parser.add_subparsers(dest='command')
         subparsers.required = True
         all_args = Qleverfile.all_arguments()
-        for command_name, command_object in command_objects.items():
-            self.add_subparser_for_command(
-                    subparsers, command_name, command_object,
-                    all_args, qleverfile_config)
+        for command_name in command_objects:
+            if command_name == qleverfile_args.command:
+                self.add_subparser_for_command(
+                        subparsers, command_name,
+                        command_objects[command_name], all_args,
+                        qleverfile_config)
+            else:
+                self.add_subparser_stub(subparsers, command_name)
 
         # Enable autocompletion for the commands and their options.
         #
@@ -41,6 +41,8 @@ class Containerize:
         ports: list[tuple[int, int]] = [],
         working_directory: Optional[str] = None,
         use_bash: bool = True,
+        cpuset_cpus: Optional[str] = None,
+        cpuset_mems: Optional[str] = None,
     ) -> str:
         """
         Get the command to run `cmd` with the given `container_system` and the
@@ -77,6 +79,14 @@ class Containerize:
             f" -w {working_directory}" if working_directory is not None else ""
         )
 
+        # Options for restricting the container to the given CPUs and NUMA
+        # nodes.
+        cpuset_options = ""
+        if cpuset_cpus:
+            cpuset_options += f" --cpuset-cpus {cpuset_cpus}"
+        if cpuset_mems:
+            cpuset_options += f" --cpuset-mems {cpuset_mems}"
+
         # Construct the command that runs `cmd` with the given container
         # system.
         containerized_cmd = (
@@ -86,6 +96,7 @@ class Containerize:
             f"{volume_options}"
             f"{port_options}"
             f"{working_directory_option}"
+            f"{cpuset_options}"
             f" --name {container_name}"
             f" --init"
         )
@@ -0,0 +1,63 @@
+"""
+Send requests to a QLever server over one persistent HTTP connection (see
+`qlever query --batch` and `qlever cache-stats --watch`), instead of opening
+a new connection for each request.
+"""
+
+from __future__ import annotations
+
+import http.client
+import urllib.parse
+
+
+class PersistentHttpClient:
+    """
+    Send POST requests to an endpoint over a persistent HTTP connection
+    (which is opened again if the server closed it). Not thread-safe, use
+    one client per thread.
+    """
+
+    def __init__(self, endpoint: str, timeout: float | None = None):
+        url = endpoint if "://" in endpoint else f"http://{endpoint}"
+        parts = urllib.parse.urlsplit(url)
+        self.endpoint = endpoint
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = parts.path or "/"
+        self.timeout = timeout
+        self.connection_class = (
+            http.client.HTTPSConnection
+            if parts.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        self.connection = None
+
+    def post(self, params: dict[str, str], accept: str) -> tuple[int, bytes]:
+        """
+        Send the parameters as a form and return the HTTP status and the body
+        of the response. Try once more on a new connection if the connection
+        fails.
+        """
+        body = urllib.parse.urlencode(params)
+        headers = {
+            "Content-Type": "application/x-www-form-urlencoded",
+            "Accept": accept,
+        }
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = self.connection_class(
+                    self.host, self.port, timeout=self.timeout
+                )
+            try:
+                self.connection.request("POST", self.path, body, headers)
+                response = self.connection.getresponse()
+                return response.status, response.read()
+            except (http.client.HTTPException, OSError):
+                self.close()
+                if attempt == 1:
+                    raise
+
+    def close(self) -> None:
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
@@ -0,0 +1,213 @@
+"""
+Sample the resource usage of a running index build (the process tree of the
+index command, or of the container in which it runs) at a fixed interval and
+write the samples to `<name>.index-profile.jsonl`, one JSON object per line.
+The samples are aggregated per phase of the index build by `index-stats`.
+
+The times in the index log are in the timezone of wherever the index build
+ran (with `SYSTEM = docker`, usually UTC), and they have no timezone. The
+samples are therefore matched to the phases by their time since the start of
+the profile, not by their absolute time.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from datetime import datetime
+
+import psutil
+
+from qlever.log import log
+from qlever.util import get_total_file_size, run_command
+
+# The metrics of each sample, with a short heading, and the function to
+# format a value (all sizes and rates are in bytes).
+PROFILE_METRICS = {
+    "rss": ("RSS", lambda value: f"{value / 1e9:.1f}G"),
+    "cpu": ("CPU cores", lambda value: f"{value:.1f}"),
+    "read_rate": ("Read/s", lambda value: f"{value / 1e6:.0f}M"),
+    "write_rate": ("Write/s", lambda value: f"{value / 1e6:.0f}M"),
+    "iowait": ("IO wait", lambda value: f"{value:.0f}%"),
+    "disk": ("Disk", lambda value: f"{value / 1e9:.1f}G"),
+}
+
+
+class IndexProfiler(threading.Thread):
+    """
+    Thread that samples the resource usage of all processes started by this
+    process (or of all processes in the given container), until `stop` is
+    called. The CPU time and the bytes read and written are accumulated per
+    process, so that processes that come and go between two samples (like
+    decompressors) are accounted for, too.
+    """
+
+    def __init__(
+        self,
+        profile_file_name: str,
+        index_name: str,
+        interval: float,
+        system: str | None = None,
+        container: str | None = None,
+    ):
+        super().__init__(daemon=True)
+        self.profile_file_name = profile_file_name
+        self.index_name = index_name
+        self.interval = interval
+        self.system = system
+        self.container = container
+        self.container_pid = None
+        self.stop_event = threading.Event()
+        # For each process (identified by PID and creation time), the CPU
+        # time and the number of bytes read and written so far.
+        self.process_counters = {}
+        self.start_time = None
+        self.last_time = None
+        self.last_cpu_times = None
+
+    def get_processes(self) -> list[psutil.Process]:
+        """
+        Get the processes of the index build.
+        """
+        if self.container is None:
+            return psutil.Process().children(recursive=True)
+        if self.container_pid is None:
+            try:
+                self.container_pid = int(
+                    run_command(
+                        f"{self.system} inspect --format "
+                        f"'{{{{.State.Pid}}}}' {self.container}",
+                        return_output=True,
+                    ).strip()
+                )
+            except Exception as e:
+                log.debug(f"Could not get PID of {self.container}: {e}")
+                return []
+        try:
+            root = psutil.Process(self.container_pid)
+            return [root] + root.children(recursive=True)
+        except psutil.Error:
+            return []
+
+    def sample(self) -> dict:
+        """
+        Return a sample with the current memory usage and disk usage, and the
+        CPU usage and disk throughput since the previous sample.
+        """
+        now = time.time()
+        elapsed = now - self.last_time if self.last_time else self.interval
+        rss = 0
+        cpu_seconds = 0
+        read_bytes = 0
+        write_bytes = 0
+        num_processes = 0
+        for process in self.get_processes():
+            try:
+                with process.oneshot():
+                    key = (process.pid, process.create_time())
+                    rss += process.memory_info().rss
+                    cpu_times = process.cpu_times()
+                    cpu = cpu_times.user + cpu_times.system
+                    try:
+                        io_counters = process.io_counters()
+                        io = (io_counters.read_bytes, io_counters.write_bytes)
+                    except (psutil.AccessDenied, AttributeError):
+                        io = (0, 0)
+            except psutil.Error:
+                continue
+            num_processes += 1
+            last_cpu, last_read, last_write = self.process_counters.get(
+                key, (0, 0, 0)
+            )
+            cpu_seconds += max(cpu - last_cpu, 0)
+            read_bytes += max(io[0] - last_read, 0)
+            write_bytes += max(io[1] - last_write, 0)
+            self.process_counters[key] = (cpu, io[0], io[1])
+
+        # The IO wait is only available for the whole system (and only on
+        # Linux), as a percentage of the total CPU time.
+        cpu_times = psutil.cpu_times()
+        iowait = 0
+        if self.last_cpu_times is not None:
+            total_delta = sum(cpu_times) - sum(self.last_cpu_times)
+            iowait_delta = getattr(cpu_times, "iowait", 0) - getattr(
+                self.last_cpu_times, "iowait", 0
+            )
+            if total_delta > 0:
+                iowait = 100 * iowait_delta / total_delta
+        self.last_cpu_times = cpu_times
+        self.last_time = now
+
+        return {
+            "time": round(now, 3),
+            "elapsed": round(now - self.start_time, 3),
+            "num_processes": num_processes,
+            "rss": rss,
+            "cpu": round(cpu_seconds / elapsed, 2),
+            "read_rate": round(read_bytes / elapsed),
+            "write_rate": round(write_bytes / elapsed),
+            "iowait": round(iowait, 1),
+            "disk": get_total_file_size([f"{self.index_name}.*"]),
+        }
+
+    def run(self):
+        with open(self.profile_file_name, "w") as profile_file:
+            # The profile starts right before the index build, and the first
+            # sample only initializes the counters.
+            self.start_time = time.time()
+            self.sample()
+            while not self.stop_event.wait(self.interval):
+                try:
+                    sample = self.sample()
+                except Exception as e:
+                    log.debug(f"Sampling the resource usage failed: {e}")
+                    continue
+                print(json.dumps(sample), file=profile_file, flush=True)
+
+    def stop(self):
+        self.stop_event.set()
+        self.join()
+
+
+def read_profile(profile_file_name: str) -> list[dict]:
+    """
+    Read the samples from the given profile file (ignoring incomplete lines,
+    for example, from a build that was killed).
+    """
+    samples = []
+    with open(profile_file_name, "r") as profile_file:
+        for line in profile_file:
+            try:
+                samples.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return samples
+
+
+def summarize_profile(
+    samples: list[dict], begin: datetime, end: datetime, start: datetime
+) -> dict[str, tuple[float, float]] | None:
+    """
+    For each metric, compute the average and the maximum over the samples
+    in the given time interval, relative to the start of the index build
+    (all three times as read from the index log). Return `None` if there are
+    no samples in the interval.
+    """
+    begin_offset = (begin - start).total_seconds()
+    end_offset = (end - start).total_seconds()
+    # Older profiles have no "elapsed", only the absolute time.
+    samples = [
+        sample
+        for sample in samples
+        if begin_offset
+        <= sample.get("elapsed", sample["time"] - start.timestamp())
+        <= end_offset
+    ]
+    if len(samples) == 0:
+        return None
+    summary = {}
+    for metric in PROFILE_METRICS:
+        values = [sample.get(metric, 0) for sample in samples]
+        summary[metric] = (sum(values) / len(values), max(values))
+    return summary
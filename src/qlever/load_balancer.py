@@ -0,0 +1,477 @@
+"""
+A lightweight HTTP proxy that balances SPARQL queries over several replicas
+of a QLever server (see `qlever proxy`). Queries are routed to the replica
+with the fewest outstanding requests, or, with sticky routing, always to the
+same replica for the same query (so that the cache of each replica stays
+effective). Requests that change the state of a server (commands like
+`clear-cache`, settings, updates, pinning results) are forwarded to all
+replicas, all other requests to one replica. Replicas that do not respond
+are taken out of the rotation until they respond again.
+
+Run it as `python3 -m qlever.load_balancer --port PORT --backends P1,P2,...`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import re
+import time
+import urllib.parse
+
+import psutil
+
+# The path of the status page of the proxy.
+STATUS_PATH = "/proxy-status"
+
+# The maximal size of the request headers and of a buffered response (a
+# longer response is cut, see `LoadBalancer.send_to_backend`).
+MAX_HEADER_SIZE = 1 << 16
+MAX_BUFFERED_RESPONSE_SIZE = 1 << 24
+
+# The commands (the `cmd` parameter) that change the state of a server. All
+# other commands (like `stats` or `cache-stats`) only read it.
+BROADCAST_COMMANDS = [
+    "clear-cache",
+    "clear-cache-complete",
+    "clear-delta-triples",
+    "rebuild-index",
+    "write-materialized-view",
+]
+
+# The size of the buffer when forwarding a response.
+FORWARD_BUFFER_SIZE = 1 << 16
+
+# The reason phrases for the responses of the proxy itself.
+REASON_PHRASES = {
+    200: "OK",
+    400: "Bad Request",
+    411: "Length Required",
+    502: "Bad Gateway",
+    503: "Service Unavailable",
+}
+
+
+class BackendUnavailable(Exception):
+    """
+    Raised when a backend cannot be reached.
+    """
+
+
+def find_load_balancer(port: int) -> tuple[psutil.Process, list[int]] | None:
+    """
+    Find the load balancer that listens on the given port, and return the
+    process and the ports of its backends, or `None` if there is no such
+    load balancer.
+    """
+    for proc in psutil.process_iter():
+        try:
+            cmdline = " ".join(proc.cmdline())
+        except psutil.Error:
+            continue
+        match = re.search(
+            rf"-m qlever\.load_balancer --port {port} --backends (\S+)",
+            cmdline,
+        )
+        if match:
+            return proc, [int(port) for port in match.group(1).split(",")]
+    return None
+
+
+def get_request_params(target: str, headers: dict, body: bytes) -> dict:
+    """
+    Get the parameters of a SPARQL request, from the URL and from the body
+    (for a form or a direct POST of a query or update).
+    """
+    params = dict(
+        urllib.parse.parse_qsl(urllib.parse.urlsplit(target).query)
+    )
+    content_type = headers.get("content-type", "").split(";")[0].strip()
+    if content_type == "application/x-www-form-urlencoded":
+        params.update(urllib.parse.parse_qsl(body.decode(errors="replace")))
+    elif content_type == "application/sparql-query":
+        params["query"] = body.decode(errors="replace")
+    elif content_type == "application/sparql-update":
+        params["update"] = body.decode(errors="replace")
+    return params
+
+
+def is_broadcast_request(params: dict) -> bool:
+    """
+    Whether a request has to go to all replicas: updates, commands that
+    change the state of the server (see `BROADCAST_COMMANDS`), settings
+    (parameters other than the access token, without a query or a command),
+    and queries whose results are pinned to the cache.
+    """
+    if "update" in params:
+        return True
+    if "cmd" in params:
+        return params["cmd"] in BROADCAST_COMMANDS
+    if "query" in params:
+        return params.get("pin-result") == "true"
+    return any(key != "access-token" for key in params)
+
+
+def get_sticky_backend(query: str, backends: list[int]) -> int:
+    """
+    Pick the backend for a query by rendezvous hashing, so that the same
+    query always goes to the same backend, and when a backend is removed,
+    only the queries of that backend are moved.
+    """
+    normalized_query = " ".join(query.split())
+
+    def weight(backend: int) -> bytes:
+        return hashlib.sha1(
+            f"{backend}:{normalized_query}".encode()
+        ).digest()
+
+    return max(backends, key=weight)
+
+
+class LoadBalancer:
+    """
+    The state of the proxy: the backends, which of them are healthy, and the
+    number of outstanding and total requests per backend.
+    """
+
+    def __init__(
+        self,
+        backends: list[int],
+        backend_host: str = "localhost",
+        routing: str = "least-outstanding",
+    ):
+        self.backends = backends
+        self.backend_host = backend_host
+        self.routing = routing
+        self.healthy = {backend: True for backend in backends}
+        self.outstanding = {backend: 0 for backend in backends}
+        self.num_requests = {backend: 0 for backend in backends}
+        self.start_time = time.time()
+
+    def healthy_backends(self) -> list[int]:
+        return [backend for backend in self.backends if self.healthy[backend]]
+
+    def choose_backend(self, params: dict) -> int | None:
+        """
+        Choose the backend for a query, or return `None` if no backend is
+        healthy.
+        """
+        backends = self.healthy_backends()
+        if not backends:
+            return None
+        if self.routing == "sticky":
+            return get_sticky_backend(params.get("query", ""), backends)
+        return min(backends, key=lambda backend: self.outstanding[backend])
+
+    def status(self) -> dict:
+        return {
+            "routing": self.routing,
+            "uptime": round(time.time() - self.start_time),
+            "backends": [
+                {
+                    "port": backend,
+                    "healthy": self.healthy[backend],
+                    "outstanding": self.outstanding[backend],
+                    "requests": self.num_requests[backend],
+                }
+                for backend in self.backends
+            ],
+        }
+
+    async def check_health(self, backend: int, timeout: float = 5) -> bool:
+        """
+        Ping the given backend and update its health status.
+        """
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.backend_host, backend), timeout
+            )
+            writer.write(
+                f"GET /ping HTTP/1.1\r\nHost: {self.backend_host}\r\n"
+                f"Connection: close\r\n\r\n".encode()
+            )
+            await writer.drain()
+            status_line = await asyncio.wait_for(reader.readline(), timeout)
+            writer.close()
+            healthy = status_line.startswith(b"HTTP/")
+        except (OSError, asyncio.TimeoutError):
+            healthy = False
+        if healthy != self.healthy[backend]:
+            state = "healthy" if healthy else "unhealthy"
+            print(f"Backend on port {backend} is {state}", flush=True)
+        self.healthy[backend] = healthy
+        return healthy
+
+    async def check_health_periodically(self, interval: float) -> None:
+        while True:
+            await asyncio.gather(
+                *(self.check_health(backend) for backend in self.backends)
+            )
+            await asyncio.sleep(interval)
+
+    async def send_to_backend(
+        self,
+        backend: int,
+        request: bytes,
+        client_writer=None,
+        before_forwarding=None,
+    ) -> bytes:
+        """
+        Send the request to the given backend. With `client_writer`, stream
+        the response to the client, after awaiting `before_forwarding` (if
+        given), which can cancel the forwarding by returning `False`.
+        Otherwise, return the response, which is cut after more than
+        `MAX_BUFFERED_RESPONSE_SIZE` bytes (the rest is read, but dropped,
+        so the caller can tell from the length). Raise `BackendUnavailable`
+        if the backend cannot be reached.
+        """
+        self.outstanding[backend] += 1
+        self.num_requests[backend] += 1
+        try:
+            try:
+                reader, writer = await asyncio.open_connection(
+                    self.backend_host, backend
+                )
+            except OSError as e:
+                raise BackendUnavailable(str(e))
+            try:
+                writer.write(request)
+                await writer.drain()
+                if client_writer is None:
+                    response = b""
+                    while data := await reader.read(FORWARD_BUFFER_SIZE):
+                        if len(response) <= MAX_BUFFERED_RESPONSE_SIZE:
+                            response += data
+                    return response
+                if before_forwarding is not None:
+                    if not await before_forwarding():
+                        return b""
+                while data := await reader.read(FORWARD_BUFFER_SIZE):
+                    client_writer.write(data)
+                    await client_writer.drain()
+                return b""
+            finally:
+                writer.close()
+        finally:
+            self.outstanding[backend] -= 1
+
+    async def handle_request(self, client_reader, client_writer) -> None:
+        """
+        Handle one request of a client (the connection is closed after the
+        response, and the request is sent to the backend with `Connection:
+        close`, so that responses are delimited by the end of the
+        connection).
+        """
+        try:
+            head = await client_reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            client_writer.close()
+            return
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            await self.respond(client_writer, 400, "Bad request")
+            return
+        headers = {}
+        header_lines = []
+        for line in lines[1:]:
+            if not line:
+                continue
+            key, _, value = line.partition(":")
+            headers[key.strip().lower()] = value.strip()
+            if key.strip().lower() not in ["connection", "keep-alive"]:
+                header_lines.append(line)
+        if "chunked" in headers.get("transfer-encoding", ""):
+            await self.respond(client_writer, 411, "Length required")
+            return
+        body = await client_reader.readexactly(
+            int(headers.get("content-length", 0))
+        )
+        request = (
+            "\r\n".join(
+                [lines[0]] + header_lines + ["Connection: close", "", ""]
+            ).encode("latin-1")
+            + body
+        )
+
+        # The status page of the proxy.
+        if target == STATUS_PATH:
+            await self.respond(
+                client_writer,
+                200,
+                json.dumps(self.status()),
+                "application/json",
+            )
+            return
+
+        # Requests that go to all replicas: once all other replicas have
+        # succeeded, stream the response of the first replica to the client,
+        # otherwise respond with the first failure.
+        params = get_request_params(target, headers, body)
+        if is_broadcast_request(params):
+            backends = self.healthy_backends()
+            if not backends:
+                await self.respond(client_writer, 503, "No healthy replica")
+                return
+            other_responses = asyncio.ensure_future(
+                asyncio.gather(
+                    *(self.send_to_backend(b, request) for b in backends[1:]),
+                    return_exceptions=True,
+                )
+            )
+            failure = None
+
+            async def check_other_responses() -> bool:
+                nonlocal failure
+                failure = self.get_broadcast_failure(
+                    backends[1:], await other_responses
+                )
+                return failure is None
+
+            try:
+                await self.send_to_backend(
+                    backends[0], request, client_writer, check_other_responses
+                )
+            except BackendUnavailable as e:
+                await other_responses
+                print(
+                    f"Request to all replicas failed on port {backends[0]}: "
+                    f"{e}",
+                    flush=True,
+                )
+                failure = f"Replica on port {backends[0]} failed: {e}"
+            if isinstance(failure, str):
+                await self.respond(client_writer, 502, failure)
+                return
+            if failure is not None:
+                client_writer.write(failure)
+                await client_writer.drain()
+            client_writer.close()
+            return
+
+        # Queries go to one replica (if that cannot be reached, mark it as
+        # unhealthy and try another one).
+        while True:
+            backend = self.choose_backend(params)
+            if backend is None:
+                await self.respond(client_writer, 503, "No healthy replica")
+                return
+            try:
+                await self.send_to_backend(backend, request, client_writer)
+                break
+            except BackendUnavailable as e:
+                print(f"Backend on port {backend} failed: {e}", flush=True)
+                self.healthy[backend] = False
+        client_writer.close()
+
+    def get_broadcast_failure(
+        self, backends: list[int], responses: list
+    ) -> bytes | str | None:
+        """
+        Check the responses of the given replicas to a request that went to
+        all replicas. Return the response of the first replica that failed,
+        or an error message if that response cannot be forwarded as a whole,
+        or `None` if all succeeded.
+        """
+        for backend, response in zip(backends, responses):
+            if isinstance(response, Exception):
+                print(
+                    f"Request to all replicas failed on port {backend}: "
+                    f"{response}",
+                    flush=True,
+                )
+                return f"Replica on port {backend} failed: {response}"
+            if not re.match(rb"HTTP/\S+ 2", response):
+                print(
+                    f"Request to all replicas failed on port {backend}",
+                    flush=True,
+                )
+                if len(response) > MAX_BUFFERED_RESPONSE_SIZE:
+                    status_line = response.split(b"\r\n", 1)[0]
+                    return (
+                        f"Replica on port {backend} failed with "
+                        f"{status_line.decode(errors='replace')}, the "
+                        f"response is too large to forward"
+                    )
+                return response
+        return None
+
+    async def respond(
+        self,
+        client_writer,
+        status: int,
+        message: str,
+        content_type: str = "text/plain",
+    ) -> None:
+        body = message.encode()
+        client_writer.write(
+            f"HTTP/1.1 {status} {REASON_PHRASES[status]}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n".encode()
+            + body
+        )
+        try:
+            await client_writer.drain()
+        finally:
+            client_writer.close()
+
+
+async def serve(
+    port: int,
+    backends: list[int],
+    backend_host: str,
+    routing: str,
+    health_check_interval: float,
+) -> None:
+    load_balancer = LoadBalancer(backends, backend_host, routing)
+
+    async def handle_connection(client_reader, client_writer):
+        try:
+            await load_balancer.handle_request(client_reader, client_writer)
+        except (ConnectionError, OSError, asyncio.IncompleteReadError):
+            client_writer.close()
+
+    server = await asyncio.start_server(
+        handle_connection, port=port, limit=MAX_HEADER_SIZE
+    )
+    print(
+        f"Balancing port {port} over the ports "
+        f"{', '.join(str(backend) for backend in backends)} "
+        f"(routing: {routing})",
+        flush=True,
+    )
+    health_check_task = asyncio.ensure_future(
+        load_balancer.check_health_periodically(health_check_interval)
+    )
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        health_check_task.cancel()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--backends", type=str, required=True)
+    parser.add_argument("--backend-host", type=str, default="localhost")
+    parser.add_argument(
+        "--routing",
+        choices=["least-outstanding", "sticky"],
+        default="least-outstanding",
+    )
+    parser.add_argument("--health-check-interval", type=float, default=5)
+    args = parser.parse_args()
+    asyncio.run(
+        serve(
+            args.port,
+            [int(backend) for backend in args.backends.split(",")],
+            args.backend_host,
+            args.routing,
+            args.health_check_interval,
+        )
+    )
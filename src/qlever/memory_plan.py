@@ -0,0 +1,197 @@
+"""
+Compute the memory parameters of a QLever server (MEMORY_FOR_QUERIES,
+CACHE_MAX_SIZE, CACHE_MAX_SIZE_SINGLE_ENTRY, CACHE_MAX_NUM_ENTRIES) from the
+memory of the machine (or the memory limit of the cgroup we are running in),
+the part of the index that the server keeps in RAM, and the memory reserved
+by the other QLever servers running on the same machine.
+"""
+
+from __future__ import annotations
+
+import re
+from pathlib import Path
+
+import psutil
+
+from qlever.util import (
+    get_existing_index_files,
+    get_index_file_role,
+    is_permutation_file,
+    parse_size,
+)
+
+# The part of the memory that is never planned for (for the operating system
+# and other processes).
+HEADROOM_FRACTION = 0.1
+
+# How the memory that remains for the server is divided. What is neither for
+# queries nor for the cache remains for the page cache (for the parts of the
+# index that are read from disk).
+MEMORY_FOR_QUERIES_FRACTION = 0.5
+CACHE_MAX_SIZE_FRACTION = 0.3
+CACHE_MAX_SIZE_SINGLE_ENTRY_FRACTION = 0.25
+CACHE_MAX_NUM_ENTRIES_PER_GB = 100
+MIN_CACHE_MAX_NUM_ENTRIES = 200
+
+# The smallest budget with which we still start a server.
+MIN_SERVER_BUDGET = 1 << 30
+
+# The roles of the index files (see `INDEX_FILE_ROLES`) that the server reads
+# into RAM when it starts, in addition to the metadata of the permutations
+# (the other files, in particular, the permutations and the external
+# vocabulary, are read from disk on demand).
+RESIDENT_INDEX_FILE_ROLES = ["Patterns", "Vocabulary (internal)", "Metadata"]
+
+# Values of a cgroup memory limit above this mean "no limit".
+CGROUP_NO_LIMIT = 1 << 60
+
+
+def get_cgroup_memory_limit() -> int | None:
+    """
+    Get the memory limit of the cgroup of this process (cgroup v2 or v1), or
+    `None` if there is no limit.
+    """
+    candidates = [
+        "/sys/fs/cgroup/memory.max",
+        "/sys/fs/cgroup/memory/memory.limit_in_bytes",
+    ]
+    try:
+        for line in Path("/proc/self/cgroup").read_text().splitlines():
+            _, controllers, path = line.split(":", 2)
+            if controllers == "":
+                candidates.append(f"/sys/fs/cgroup{path}/memory.max")
+            elif "memory" in controllers.split(","):
+                candidates.append(
+                    f"/sys/fs/cgroup/memory{path}/memory.limit_in_bytes"
+                )
+    except (OSError, ValueError):
+        pass
+    limits = []
+    for candidate in candidates:
+        try:
+            value = Path(candidate).read_text().strip()
+        except OSError:
+            continue
+        if value.isdigit() and int(value) < CGROUP_NO_LIMIT:
+            limits.append(int(value))
+    return min(limits) if limits else None
+
+
+def get_memory_limit() -> tuple[int, str]:
+    """
+    Get the total memory we can plan with, and where that number comes from.
+    """
+    total_memory = psutil.virtual_memory().total
+    cgroup_limit = get_cgroup_memory_limit()
+    if cgroup_limit is not None and cgroup_limit < total_memory:
+        return cgroup_limit, "cgroup memory limit"
+    return total_memory, "physical memory"
+
+
+def get_other_servers(port: int | None = None) -> list[dict]:
+    """
+    Find the other QLever servers on this machine (like `qlever status`,
+    but ignoring the server on the given port, which is about to be
+    replaced). For each, get the memory it uses now, and the memory it may
+    use (its memory for queries plus its cache size), and reserve the
+    maximum of the two.
+    """
+    servers = []
+    for proc in psutil.process_iter():
+        try:
+            cmdline = " ".join(proc.cmdline())
+            if not re.search(r"^qlever-server", cmdline):
+                continue
+            rss = proc.memory_info().rss
+        except psutil.Error:
+            continue
+        port_match = re.search(r" -p (\d+)", cmdline)
+        server_port = int(port_match.group(1)) if port_match else None
+        if port is not None and server_port == int(port):
+            continue
+        configured = 0
+        for option in ["-m", "-c"]:
+            match = re.search(rf" {option} (\S+)", cmdline)
+            if match:
+                try:
+                    configured += parse_size(match.group(1))
+                except ValueError:
+                    pass
+        servers.append(
+            {
+                "pid": proc.pid,
+                "port": server_port,
+                "rss": rss,
+                "reserved": max(rss, configured),
+            }
+        )
+    return servers
+
+
+def is_resident_index_file(name: str, file_name: str) -> bool:
+    """
+    Check whether the server keeps the given index file in RAM.
+    """
+    if is_permutation_file(name, file_name):
+        return file_name.endswith(".meta")
+    return get_index_file_role(name, file_name) in RESIDENT_INDEX_FILE_ROLES
+
+
+def get_index_resident_size(name: str) -> int:
+    """
+    Get the total size of the index files that the server keeps in RAM.
+    """
+    return sum(
+        Path(file_name).stat().st_size
+        for file_name in get_existing_index_files(name)
+        if is_resident_index_file(name, file_name)
+    )
+
+
+def format_memory_size(num_bytes: int) -> str:
+    """
+    Format a size for the command line of the server (rounded down to full
+    gigabytes, or to full megabytes below one gigabyte).
+    """
+    if num_bytes >= 1 << 30:
+        return f"{num_bytes >> 30}G"
+    return f"{max(num_bytes >> 20, 1)}M"
+
+
+def plan_memory(
+    memory_limit: int, index_resident_size: int, other_servers: list[dict]
+) -> dict:
+    """
+    Compute the memory parameters of the server. The result contains the
+    four parameters (formatted for the command line of the server), and the
+    numbers from which they were computed (in bytes). The budget of the
+    server is what remains after the headroom, the other servers, and the
+    part of the index that is kept in RAM; it is negative if the memory does
+    not suffice.
+    """
+    headroom = int(memory_limit * HEADROOM_FRACTION)
+    others = sum(server["reserved"] for server in other_servers)
+    budget = memory_limit - headroom - others - index_resident_size
+    memory_for_queries = int(max(budget, 0) * MEMORY_FOR_QUERIES_FRACTION)
+    cache_max_size = int(max(budget, 0) * CACHE_MAX_SIZE_FRACTION)
+    cache_max_size_single_entry = int(
+        cache_max_size * CACHE_MAX_SIZE_SINGLE_ENTRY_FRACTION
+    )
+    cache_max_num_entries = max(
+        MIN_CACHE_MAX_NUM_ENTRIES,
+        int(cache_max_size / (1 << 30) * CACHE_MAX_NUM_ENTRIES_PER_GB),
+    )
+    return {
+        "memory_limit": memory_limit,
+        "headroom": headroom,
+        "other_servers": others,
+        "index_resident_size": index_resident_size,
+        "budget": budget,
+        "page_cache": max(budget, 0) - memory_for_queries - cache_max_size,
+        "memory_for_queries": format_memory_size(memory_for_queries),
+        "cache_max_size": format_memory_size(cache_max_size),
+        "cache_max_size_single_entry": format_memory_size(
+            cache_max_size_single_entry
+        ),
+        "cache_max_num_entries": cache_max_num_entries,
+    }
@@ -0,0 +1,132 @@
+"""
+Helpers for the page cache of the operating system, in particular, how much
+of a file is currently cached (via `mincore` on a read-only `mmap` of the
+file). These only work on systems with a C library that provides `mmap` and
+`mincore` (Linux and macOS); elsewhere, the functions return `None`.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import mmap
+import os
+
+from qlever.log import log
+
+# Map files in windows of this size, so that the vector for `mincore` (one
+# byte per page) stays small even for very large files.
+MMAP_WINDOW_SIZE = 1 << 30
+
+# The size of the chunks when reading a file to bring it into the page cache.
+READ_CHUNK_SIZE = 8 << 20
+
+# Translation table that maps each byte to its least significant bit.
+LOWEST_BIT_TABLE = bytes(byte & 1 for byte in range(256))
+
+
+def get_libc():
+    """
+    Load the C library and declare the signatures of the functions we use,
+    or return `None` if that is not possible.
+    """
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        libc.mmap.restype = ctypes.c_void_p
+        libc.mmap.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_size_t,
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_long,
+        ]
+        libc.munmap.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
+        libc.mincore.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_size_t,
+            ctypes.POINTER(ctypes.c_ubyte),
+        ]
+        return libc
+    except (OSError, AttributeError, TypeError) as e:
+        log.debug(f"Cannot use `mmap` and `mincore` from the C library: {e}")
+        return None
+
+
+def get_cached_size(path: str) -> int | None:
+    """
+    Return the number of bytes of the given file that are currently in the
+    page cache, or `None` if this cannot be determined.
+    """
+    libc = get_libc()
+    if libc is None:
+        return None
+    map_failed = ctypes.c_void_p(-1).value
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError as e:
+        log.debug(f"Cannot open {path}: {e}")
+        return None
+    try:
+        size = os.fstat(fd).st_size
+        cached_size = 0
+        for offset in range(0, size, MMAP_WINDOW_SIZE):
+            length = min(MMAP_WINDOW_SIZE, size - offset)
+            num_pages = (length + mmap.PAGESIZE - 1) // mmap.PAGESIZE
+            address = libc.mmap(
+                None, length, mmap.PROT_READ, mmap.MAP_SHARED, fd, offset
+            )
+            if address in [None, map_failed]:
+                return None
+            try:
+                vector = (ctypes.c_ubyte * num_pages)()
+                if libc.mincore(address, length, vector) != 0:
+                    return None
+                # The least significant bit says whether the page is cached.
+                num_uncached_pages = (
+                    bytes(vector).translate(LOWEST_BIT_TABLE).count(0)
+                )
+                cached_size += (num_pages - num_uncached_pages) * mmap.PAGESIZE
+            finally:
+                libc.munmap(address, length)
+        return min(cached_size, size)
+    finally:
+        os.close(fd)
+
+
+def prewarm_range(
+    path: str,
+    offset: int,
+    length: int,
+    method: str = "read",
+    add_progress=None,
+    cancelled=None,
+) -> None:
+    """
+    Bring the given byte range of the given file into the page cache, either
+    by reading it (`read`, which blocks until the data is cached), or by
+    telling the kernel that we will need it soon (`willneed`, which only
+    starts the readahead, like `madvise(MADV_WILLNEED)` on a mapping of the
+    file). After each chunk, call `add_progress` with the number of bytes,
+    and stop early when `cancelled` (a `threading.Event`) is set.
+    """
+    with open(path, "rb", buffering=0) as file:
+        if method == "willneed" and hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(
+                file.fileno(), offset, length, os.POSIX_FADV_WILLNEED
+            )
+            if add_progress:
+                add_progress(length)
+            return
+        file.seek(offset)
+        buffer = memoryview(bytearray(READ_CHUNK_SIZE))
+        remaining = length
+        while remaining > 0:
+            if cancelled is not None and cancelled.is_set():
+                return
+            num_bytes = file.readinto(buffer[:min(remaining, len(buffer))])
+            if not num_bytes:
+                return
+            remaining -= num_bytes
+            if add_progress:
+                add_progress(num_bytes)
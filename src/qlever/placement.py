@@ -0,0 +1,113 @@
+"""
+Placement of `qlever-server` and `qlever-index` on CPUs and NUMA nodes (via
+`numactl` or `taskset` when running natively, and via `--cpuset-cpus` and
+`--cpuset-mems` when running in a container), and the NUMA topology of the
+machine.
+"""
+
+from __future__ import annotations
+
+import re
+import shutil
+from pathlib import Path
+
+from qlever.log import log
+
+# A list of CPUs or NUMA nodes, like `0-15,32-47` (the syntax of `numactl`,
+# `taskset -c`, and `docker run --cpuset-cpus`).
+CPU_LIST_REGEX = r"^\d+(-\d+)?(,\d+(-\d+)?)*$"
+
+# Where Linux describes the NUMA nodes.
+NUMA_NODE_DIR = "/sys/devices/system/node"
+
+
+def check_placement(args) -> bool:
+    """
+    Check the placement options, and when running natively, that the tool
+    that applies them is installed. Log an error and return `False` if not.
+    """
+    for option, value in [
+        ("CPUSET_CPUS", args.cpuset_cpus),
+        ("CPUSET_MEMS", args.cpuset_mems),
+    ]:
+        if value and not re.match(CPU_LIST_REGEX, value):
+            log.error(
+                f'Invalid {option} "{value}" (must be a list like 0-15,32-47)'
+            )
+            return False
+    if args.numa_memory_policy == "preferred" and args.cpuset_mems:
+        if not re.match(r"^\d+$", args.cpuset_mems):
+            log.error(
+                "With NUMA_MEMORY_POLICY = preferred, CPUSET_MEMS must be a "
+                "single NUMA node"
+            )
+            return False
+    if args.system == "native":
+        tool = get_native_placement_prefix(args).split(" ")[0]
+        if tool and shutil.which(tool) is None:
+            log.error(
+                f"`{tool}` is needed for CPUSET_CPUS and CPUSET_MEMS, but it "
+                f"is not installed"
+            )
+            return False
+    return True
+
+
+def get_native_placement_prefix(args) -> str:
+    """
+    Get the prefix for a native command line that places the process
+    according to CPUSET_CPUS, CPUSET_MEMS, and NUMA_MEMORY_POLICY (empty if
+    neither CPUSET_CPUS nor CPUSET_MEMS is set). Both `numactl` and `taskset`
+    `exec` the command, so the process keeps its usual command line.
+    """
+    if args.cpuset_mems:
+        nodes = args.cpuset_mems
+        if args.numa_memory_policy == "interleave":
+            prefix = f"numactl --interleave={nodes}"
+        elif args.numa_memory_policy == "preferred":
+            prefix = f"numactl --preferred={nodes}"
+        else:
+            prefix = f"numactl --membind={nodes}"
+        if args.cpuset_cpus:
+            prefix += f" --physcpubind={args.cpuset_cpus}"
+        elif args.numa_memory_policy != "interleave":
+            prefix += f" --cpunodebind={nodes}"
+        return f"{prefix} "
+    if args.cpuset_cpus:
+        return f"taskset -c {args.cpuset_cpus} "
+    return ""
+
+
+def get_numa_topology() -> list[dict]:
+    """
+    Get the NUMA nodes of this machine, each with its CPUs, its total and
+    free memory, and its distances to all nodes (empty if the machine does
+    not describe its NUMA nodes, for example, on macOS).
+    """
+    node_dirs = sorted(
+        Path(NUMA_NODE_DIR).glob("node[0-9]*"),
+        key=lambda node_dir: int(node_dir.name[4:]),
+    )
+    nodes = []
+    for node_dir in node_dirs:
+        try:
+            cpus = (node_dir / "cpulist").read_text().strip()
+            meminfo = (node_dir / "meminfo").read_text()
+            distances = (node_dir / "distance").read_text().split()
+        except OSError:
+            continue
+        memory = {}
+        for line in meminfo.splitlines():
+            match = re.match(r"^Node \d+ (\w+):\s+(\d+) kB", line)
+            if match:
+                memory[match.group(1)] = int(match.group(2)) * 1024
+        nodes.append(
+            {
+                "node": int(node_dir.name[4:]),
+                "cpus": cpus,
+                "memory_total": memory.get("MemTotal", 0),
+                "memory_free": memory.get("MemFree", 0),
+                "distances": [int(distance) for distance in distances],
+            }
+        )
+    return nodes
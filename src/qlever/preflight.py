@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+import glob
+import os
+import re
+import shlex
+import shutil
+import signal
+import subprocess
+import tempfile
+import time
+from typing import Optional
+
+import psutil
+
+# Regex for the tokens of Turtle (which includes N-Triples and, modulo the
+# graph label, N-Quads). The regex is deliberately a bit more permissive than
+# the grammar, the purpose is to catch broken input early, not to validate
+# every detail.
+PN_CHARS = r"[\w\u00B7\u00C0-\uFFFF-]"
+TURTLE_TOKEN_REGEX = re.compile(
+    r"(?P<ws>\s+)"
+    r"|(?P<comment>#.*)"
+    r"|(?P<iri><[^<>\"{}|^`\\\x00-\x20]*>)"
+    r'|(?P<long_string>"""(?:[^"\\]|\\.|"(?!""))*"""'
+    r"|'''(?:[^'\\]|\\.|'(?!''))*''')"
+    r"|(?P<long_string_begin>\"\"\"|''')"
+    r'|(?P<string>"(?:[^"\\\n\r]|\\.)*"'
+    r"|'(?:[^'\\\n\r]|\\.)*')"
+    r"|(?P<directive>@prefix|@base)\b"
+    r"|(?P<lang_tag>@[a-zA-Z]+(?:-[a-zA-Z0-9]+)*)"
+    r"|(?P<datatype>\^\^)"
+    rf"|(?P<blank_node>_:{PN_CHARS}(?:[\w.\u00B7\u00C0-\uFFFF-]*{PN_CHARS})?)"
+    r"|(?P<number>[+-]?(?:\d+(?:\.\d*)?[eE][+-]?\d+"
+    r"|\.\d+(?:[eE][+-]?\d+)?|\d+(?:\.\d+)?))"
+    r"|(?P<pname>(?P<prefix>[A-Za-z\u00C0-\uFFFF]"
+    rf"(?:[\w.\u00B7\u00C0-\uFFFF-]*{PN_CHARS})?)?:"
+    r"(?:[\w:%\u00B7\u00C0-\uFFFF-]|\\[-_~.!$&'()*+,;=/?#@%]"
+    r"|\.(?=[\w:%\u00B7\u00C0-\uFFFF-]))*)"
+    r"|(?P<sparql_directive>(?i:PREFIX|BASE))\b"
+    r"|(?P<keyword>a|true|false|(?i:GRAPH))\b"
+    r"|(?P<punctuation>[.;,\[\](){}])"
+)
+
+
+def byte_offset(line: str, line_offset: int, column: int) -> int:
+    """
+    Return the byte offset of the given column of `line`, where `line_offset`
+    is the byte offset of the beginning of the line.
+    """
+    return line_offset + len(line[:column].encode("utf-8"))
+
+
+class TurtleChecker:
+    """
+    Incremental, line-based check of the tokens of a Turtle (or N-Triples or
+    N-Quads) stream. Counts the statements, checks that all used prefixes are
+    declared, and (for parallel parsing) that all prefix declarations come
+    before the first statement. The first `max_errors` errors are recorded,
+    each with the byte offset and line number where it occurred.
+    """
+
+    def __init__(self, parallel: bool = False, max_errors: int = 10):
+        self.parallel = parallel
+        self.max_errors = max_errors
+        self.errors = []
+        self.num_errors = 0
+        self.num_triples = 0
+        self.num_lines = 0
+        self.num_bytes = 0
+        self.declared_prefixes = set()
+        self.undeclared_prefixes = set()
+        self.in_directive = False
+        self.expect_prefix_declaration = False
+        self.seen_statement = False
+        self.long_string_delimiter = None
+
+    def add_error(self, message: str, offset: int):
+        self.num_errors += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append(
+                {"offset": offset, "line": self.num_lines, "message": message}
+            )
+
+    def check_line(self, raw_line: bytes):
+        """
+        Check the given line (including the line break, if any).
+        """
+        line_offset = self.num_bytes
+        self.num_bytes += len(raw_line)
+        self.num_lines += 1
+        try:
+            line = raw_line.decode("utf-8")
+        except UnicodeDecodeError as e:
+            self.add_error(
+                f"Invalid UTF-8 ({e.reason})", line_offset + e.start
+            )
+            return
+
+        # If we are inside of a multi-line string, look for its end.
+        pos = 0
+        if self.long_string_delimiter is not None:
+            end = re.search(
+                r"(?<!\\)(?:\\\\)*" + self.long_string_delimiter, line
+            )
+            if end is None:
+                return
+            pos = end.end()
+            self.long_string_delimiter = None
+
+        while pos < len(line):
+            match = TURTLE_TOKEN_REGEX.match(line, pos)
+            if match is None:
+                snippet = line[pos:pos + 20].rstrip()
+                self.add_error(
+                    f'Unexpected input "{snippet}"',
+                    byte_offset(line, line_offset, pos),
+                )
+                return
+            kind = match.lastgroup
+            if kind in ("directive", "sparql_directive"):
+                if self.parallel and self.seen_statement:
+                    self.add_error(
+                        "Prefix declaration after the first statement "
+                        "(not allowed with parallel parsing)",
+                        byte_offset(line, line_offset, pos),
+                    )
+                self.in_directive = kind == "directive"
+                self.expect_prefix_declaration = True
+            elif kind == "pname":
+                prefix = match.group("prefix") or ""
+                if self.expect_prefix_declaration:
+                    self.declared_prefixes.add(prefix)
+                    self.expect_prefix_declaration = False
+                elif prefix not in self.declared_prefixes:
+                    if prefix not in self.undeclared_prefixes:
+                        self.undeclared_prefixes.add(prefix)
+                        self.add_error(
+                            f'Undeclared prefix "{prefix}:"',
+                            byte_offset(line, line_offset, pos),
+                        )
+            elif kind == "iri":
+                self.expect_prefix_declaration = False
+            elif kind == "long_string_begin":
+                self.long_string_delimiter = match.group()
+                return
+            elif kind == "punctuation":
+                token = match.group()
+                if token == "." and self.in_directive:
+                    self.in_directive = False
+                elif token in ".;,":
+                    self.num_triples += token == "."
+                    self.num_triples += token in ";,"
+                    self.seen_statement = True
+            pos = match.end()
+
+
+def get_input_files(input_cmd: str) -> list[str]:
+    """
+    Get the files that the given command reads, as far as they can be seen
+    from its arguments (the words that are, or expand to, regular files, in
+    the order in which the shell would pass them).
+    """
+    try:
+        words = shlex.split(input_cmd)
+    except ValueError:
+        return []
+    return [
+        path
+        for word in words
+        for path in sorted(glob.glob(word))
+        if os.path.isfile(path)
+    ]
+
+
+def get_read_fraction(
+    proc: subprocess.Popen, input_files: Optional[list[str]] = None
+) -> Optional[float]:
+    """
+    For a running shell command, determine how far its processes have read
+    into their input (via the positions in the regular files they have
+    open, which `psutil` only provides on Linux). If the input files are
+    given, the fraction is relative to all of them, where the files before
+    the first open one count as completely read (a command like `zcat
+    ${INPUT_FILES}` reads them one after the other). Otherwise, it is
+    relative to the files that are currently open. Return `None` if this
+    cannot be determined.
+    """
+    try:
+        processes = [psutil.Process(proc.pid)]
+        processes.extend(processes[0].children(recursive=True))
+        positions = {}
+        for process in processes:
+            for open_file in process.open_files():
+                file_position = getattr(open_file, "position", None)
+                if file_position is None or open_file.path.startswith("/dev"):
+                    continue
+                positions[os.path.realpath(open_file.path)] = file_position
+        paths = [os.path.realpath(path) for path in input_files or []]
+        open_indices = [i for i, path in enumerate(paths) if path in positions]
+        if open_indices:
+            position = sum(
+                os.stat(path).st_size for path in paths[: open_indices[0]]
+            ) + sum(positions[paths[i]] for i in open_indices)
+            size = sum(os.stat(path).st_size for path in paths)
+        else:
+            position = sum(positions.values())
+            size = sum(os.stat(path).st_size for path in positions)
+        return position / size if position > 0 and size > 0 else None
+    except Exception:
+        return None
+
+
+def check_input_stream(
+    input_cmd: str,
+    parallel: bool = False,
+    max_bytes: Optional[int] = None,
+    max_errors: int = 10,
+    input_files: Optional[list[str]] = None,
+) -> dict:
+    """
+    Run the given command (which writes Turtle, N-Triples or N-Quads to
+    stdout), check its output with a `TurtleChecker`, and return a summary.
+    If `max_bytes` is given, stop after (about) that many bytes, and estimate
+    the total number of triples from how far the command has read into its
+    input files (by default, those in its arguments, see
+    `get_input_files`).
+
+    NOTE: This function is run in a separate process for each input stream,
+    so everything it returns must be picklable.
+    """
+    if input_files is None:
+        input_files = get_input_files(input_cmd)
+    checker = TurtleChecker(parallel=parallel, max_errors=max_errors)
+    start_time = time.monotonic()
+    # The stderr goes to a file, so that a command that writes a lot to it
+    # cannot block while we only read its stdout.
+    stderr_file = tempfile.TemporaryFile()
+    proc = subprocess.Popen(
+        f"set -o pipefail; {input_cmd}",
+        shell=True,
+        executable=shutil.which("bash"),
+        stdout=subprocess.PIPE,
+        stderr=stderr_file,
+        start_new_session=True,
+    )
+    read_fraction = None
+    completed = True
+    for raw_line in proc.stdout:
+        checker.check_line(raw_line)
+        if max_bytes is not None and checker.num_bytes >= max_bytes:
+            read_fraction = get_read_fraction(proc, input_files)
+            completed = False
+            break
+    duration = max(time.monotonic() - start_time, 1e-6)
+
+    # Stop the command if we did not read all of its output, otherwise check
+    # its exit code.
+    cmd_error = None
+    if not completed:
+        os.killpg(proc.pid, signal.SIGKILL)
+        proc.wait()
+    elif proc.wait() != 0:
+        stderr_file.seek(0)
+        stderr = stderr_file.read().decode("utf-8", errors="replace")
+        cmd_error = (
+            f"Command failed with exit code {proc.returncode}"
+            + (f" ({stderr.strip()})" if stderr.strip() else "")
+        )
+    stderr_file.close()
+    if checker.long_string_delimiter is not None and completed:
+        checker.add_error("Unterminated multi-line string", checker.num_bytes)
+
+    # Estimate the total number of triples.
+    if completed:
+        estimated_num_triples = checker.num_triples
+    elif read_fraction is not None:
+        estimated_num_triples = round(checker.num_triples / read_fraction)
+    else:
+        estimated_num_triples = None
+
+    return {
+        "cmd": input_cmd,
+        "completed": completed,
+        "cmd_error": cmd_error,
+        "num_bytes": checker.num_bytes,
+        "num_lines": checker.num_lines,
+        "num_triples": checker.num_triples,
+        "estimated_num_triples": estimated_num_triples,
+        "read_fraction": 1.0 if completed else read_fraction,
+        "duration": duration,
+        "triples_per_second": checker.num_triples / duration,
+        "num_errors": checker.num_errors,
+        "errors": checker.errors,
+    }
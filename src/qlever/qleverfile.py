@@ -1,15 +1,40 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import os
 import re
+import signal
 import socket
 import subprocess
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from configparser import ConfigParser, ExtendedInterpolation, RawConfigParser
+from importlib.metadata import PackageNotFoundError, version
 from pathlib import Path
 
 from qlever import script_name
 from qlever.containerize import Containerize
 from qlever.log import log
 
+# The directory where the values of the `$(...)` substitutions of each
+# Qleverfile are cached (see `Qleverfile.read`).
+SUBSTITUTION_CACHE_DIR = (
+    Path(os.environ.get("XDG_CACHE_HOME", "~/.cache")).expanduser()
+    / "qlever/qleverfiles"
+)
+
+# Substitutions that take less time than this are not cached (running them
+# again costs less than the risk of a stale value, for example, for the
+# typical `$(date -r <file> ...)`).
+SUBSTITUTION_CACHE_MIN_SECONDS = 0.1
+
+# The maximal time for evaluating a single `$(...)` substitution (can be set
+# via the environment, for Qleverfiles with very slow substitutions).
+SUBSTITUTION_TIMEOUT_SECONDS = float(
+    os.environ.get("QLEVER_SUBSTITUTION_TIMEOUT", 60)
+)
+
 
 class QleverfileException(Exception):
     pass
@@ -124,7 +149,11 @@ class Qleverfile:
             "`format` (format like for the `--format` option), "
             "`graph` (name of the graph, use `-` for the default graph), "
             "`parallel` (parallel parsing for large files, where all "
-            "prefix declaration are at the beginning)",
+            "prefix declaration are at the beginning), "
+            "`for-each` (pattern for the files that replace the `{}` in "
+            "`cmd`, one input stream per file), "
+            "`streams` (with `for-each`, distribute the files over this "
+            "many input streams, balanced by size)",
         )
         index_args["parallel_parsing"] = arg(
             "--parallel-parsing",
@@ -340,6 +369,16 @@ class Qleverfile:
             " (executed as part of `qlever start` unless "
             " `--no-warmup` is specified, or with `qlever warmup`)",
         )
+        server_args["pinned_queries"] = arg(
+            "--pinned-queries",
+            type=str,
+            help="File with queries whose results should always be pinned "
+            "to the cache (TSV with lines `description<TAB>query` in the "
+            "order of their priority, or YAML with a key `priority`); they "
+            "are pinned by `qlever pin sync`, which is executed as part of "
+            "`qlever start` (unless `--no-warmup` is specified) and "
+            "`qlever clear-cache --complete`",
+        )
 
         runtime_args["system"] = arg(
             "--system",
@@ -368,6 +407,31 @@ class Qleverfile:
             type=str,
             help=f"The name of the container used by `{script_name} start`",
         )
+        runtime_args["cpuset_cpus"] = arg(
+            "--cpuset-cpus",
+            type=str,
+            help="Run `qlever-server` and `qlever-index` only on these CPUs "
+            "(for example, `0-15,32-47`; with `taskset` or `numactl` when "
+            "running natively, with `--cpuset-cpus` in a container)",
+        )
+        runtime_args["cpuset_mems"] = arg(
+            "--cpuset-mems",
+            type=str,
+            help="Allocate the memory of `qlever-server` and `qlever-index` "
+            "on these NUMA nodes (for example, `0`; with `numactl` when "
+            "running natively, which also binds to the CPUs of these nodes "
+            "unless CPUSET_CPUS is set, with `--cpuset-mems` in a container)",
+        )
+        runtime_args["numa_memory_policy"] = arg(
+            "--numa-memory-policy",
+            type=str,
+            choices=["bind", "interleave", "preferred"],
+            default="bind",
+            help="How memory is allocated on the NUMA nodes of CPUSET_MEMS: "
+            "only there, interleaved over them (which spreads the memory "
+            "bandwidth), or preferably there (only natively, a container "
+            "always binds)",
+        )
 
         ui_args["ui_port"] = arg(
             "--ui-port",
@@ -406,11 +470,135 @@ class Qleverfile:
         return all_args
 
     @staticmethod
-    def read(qleverfile_path):
+    def get_substitution_cache_file(qleverfile_path) -> tuple[Path, str]:
+        """
+        Get the file with the cached values of the `$(...)` substitutions of
+        the given Qleverfile, and the key for which these values are valid
+        (the contents and the modification time of the Qleverfile, and the
+        version of this script).
+        """
+        qleverfile_path = Path(qleverfile_path).resolve()
+        try:
+            script_version = version("qlever")
+        except PackageNotFoundError:
+            script_version = "unknown"
+        key = hashlib.sha256(
+            json.dumps(
+                [
+                    hashlib.sha256(qleverfile_path.read_bytes()).hexdigest(),
+                    qleverfile_path.stat().st_mtime_ns,
+                    script_name,
+                    script_version,
+                ]
+            ).encode()
+        ).hexdigest()
+        path_hash = hashlib.sha256(str(qleverfile_path).encode()).hexdigest()
+        return SUBSTITUTION_CACHE_DIR / f"{path_hash[:16]}.json", key
+
+    @staticmethod
+    def get_substitution_dependencies(
+        config: ConfigParser,
+    ) -> dict[tuple[str, str], set[tuple[str, str]]]:
+        """
+        Get all options whose (raw) value is a `$(...)` substitution, each
+        with the substitutions that it depends on via `${...}` references,
+        directly or via other options.
+        """
+
+        def is_substitution(section: str, option: str) -> bool:
+            value = config.get(section, option, raw=True)
+            return re.match(r"^\$\$(volatile)?\(.*\)$", value) is not None
+
+        def get_references(section: str, option: str) -> set[tuple[str, str]]:
+            value = config.get(section, option, raw=True)
+            references = set()
+            for ref_section, ref_option in re.findall(
+                r"\$\{(?:([^:{}]*):)?([^:{}]+)\}", value
+            ):
+                ref_section = ref_section or section
+                ref_option = config.optionxform(ref_option)
+                if config.has_option(ref_section, ref_option):
+                    references.add((ref_section, ref_option))
+            return references
+
+        def get_dependencies(section: str, option: str) -> set:
+            dependencies = set()
+            visited = set()
+            stack = list(get_references(section, option))
+            while stack:
+                reference = stack.pop()
+                if reference in visited:
+                    continue
+                visited.add(reference)
+                if is_substitution(*reference):
+                    dependencies.add(reference)
+                else:
+                    stack.extend(get_references(*reference))
+            return dependencies
+
+        return {
+            (section, option): get_dependencies(section, option)
+            for section in config.sections()
+            for option in config[section]
+            if is_substitution(section, option)
+        }
+
+    @staticmethod
+    def evaluate_substitution(
+        command: str, processes: list | None = None
+    ) -> tuple[str, float]:
+        """
+        Run the command of a `$(...)` substitution in a shell and return its
+        output (without surrounding whitespace) and the time it took. If it
+        takes longer than `SUBSTITUTION_TIMEOUT_SECONDS`, kill it and all the
+        processes it started. The process is added to `processes` (if given),
+        so that it can be killed from outside.
+        """
+        start_time = time.monotonic()
+        process = subprocess.Popen(
+            command,
+            shell=True,
+            text=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+        if processes is not None:
+            processes.append(process)
+        try:
+            output, _ = process.communicate(
+                timeout=SUBSTITUTION_TIMEOUT_SECONDS
+            )
+        except subprocess.TimeoutExpired:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except OSError:
+                pass
+            process.communicate()
+            raise QleverfileException(
+                f"Timed out after {SUBSTITUTION_TIMEOUT_SECONDS:g}s"
+            )
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(
+                process.returncode, command, output=output
+            )
+        return output.strip(), time.monotonic() - start_time
+
+    @staticmethod
+    def read(qleverfile_path, use_cache: bool = True):
         """
         Read the given Qleverfile (the function assumes that it exists) and
         return a `ConfigParser` object with all the options and their values.
 
+        The values of the `$(...)` substitutions that take at least
+        `SUBSTITUTION_CACHE_MIN_SECONDS` are cached as long as the Qleverfile
+        does not change. They are evaluated again if `use_cache` is `False` or
+        if the substitution is declared as `$volatile(...)` (in the
+        Qleverfile, this is written as `$$volatile(...)`, like `$$(...)`).
+        The substitutions are evaluated concurrently, except that one that
+        refers to the value of another one via `${...}` waits for it. Each
+        must finish within `SUBSTITUTION_TIMEOUT_SECONDS`.
+
         NOTE: The keys have the same hierarchical structure as the keys in
         `all_arguments()`. The Qleverfile may contain options that are not
         defined in `all_arguments()`. They can be used as temporary variables
@@ -427,31 +615,139 @@ class Qleverfile:
         except Exception as e:
             raise QleverfileException(f"Error parsing {qleverfile_path}: {e}")
 
-        # Iterate over all sections and options and check if there are any
-        # values of the form $$(...) that need to be replaced.
-        for section in config.sections():
-            for option in config[section]:
-                value = config[section][option]
-                match = re.match(r"^\$\((.*)\)$", value)
-                if match:
+        # The cached values of the substitutions (for the current contents of
+        # the Qleverfile).
+        cache_file, cache = None, {}
+        try:
+            cache_file, cache_key = Qleverfile.get_substitution_cache_file(
+                qleverfile_path
+            )
+            with open(cache_file, "r") as file:
+                cache = json.load(file)
+            if cache.get("key") != cache_key:
+                cache = {}
+        except (OSError, ValueError):
+            pass
+        cached_values = cache.get("values", {}) if use_cache else {}
+        new_values = {}
+
+        # Evaluate the values of the form $$(...), concurrently, except that
+        # a value that refers to another one via `${...}` is only evaluated
+        # after that one. Take the value from the cache if the (interpolated)
+        # command is the same.
+        dependencies = Qleverfile.get_substitution_dependencies(config)
+        start_time = time.monotonic()
+        total_seconds = 0.0
+        running = {}
+        processes = []
+        with ThreadPoolExecutor(
+            max_workers=min(len(dependencies), 16) or 1
+        ) as executor:
+            while dependencies or running:
+                # Start the substitutions whose dependencies are all done.
+                ready = True
+                while ready:
+                    not_done = set(dependencies) | {
+                        (section, option)
+                        for section, option, _, _ in running.values()
+                    }
+                    ready = [
+                        (section, option)
+                        for (section, option), deps in dependencies.items()
+                        if not deps & not_done
+                    ]
+                    for section, option in ready:
+                        del dependencies[(section, option)]
+                        value = config[section][option]
+                        match = re.match(r"^\$(volatile)?\((.*)\)$", value)
+                        if not match:
+                            continue
+                        is_volatile, command = match.groups()
+                        cache_id = f"{section}.{option}"
+                        cached = cached_values.get(cache_id)
+                        if not is_volatile and cached and cached[0] == command:
+                            log.debug(
+                                f"Value of {cache_id.upper()} from the cache: "
+                                f"{cached[1]}"
+                            )
+                            config[section][option] = cached[1]
+                            new_values[cache_id] = cached
+                            continue
+                        future = executor.submit(
+                            Qleverfile.evaluate_substitution,
+                            command,
+                            processes,
+                        )
+                        running[future] = (
+                            section,
+                            option,
+                            is_volatile,
+                            command,
+                        )
+                if not running:
+                    if dependencies:
+                        raise QleverfileException(
+                            "Cyclic references between "
+                            + ", ".join(
+                                f"{section}.{option.upper()}"
+                                for section, option in dependencies
+                            )
+                        )
+                    break
+
+                # Wait for the next substitution to finish.
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    section, option, is_volatile, command = running.pop(
+                        future
+                    )
                     try:
-                        value = subprocess.check_output(
-                            match.group(1),
-                            shell=True,
-                            text=True,
-                            stderr=subprocess.STDOUT,
-                        ).strip()
+                        value, seconds = future.result()
                     except Exception as e:
+                        for other_future in running:
+                            other_future.cancel()
+                        for process in processes:
+                            if process.poll() is None:
+                                try:
+                                    os.killpg(process.pid, signal.SIGKILL)
+                                except OSError:
+                                    pass
                         log.info("")
                         log.error(
-                            f"Error evaluating {value} for option "
+                            f"Error evaluating $({command}) for option "
                             f"{section}.{option.upper()} in "
                             f"{qleverfile_path}:"
                         )
                         log.info("")
                         log.info(e.output if hasattr(e, "output") else e)
                         exit(1)
+                    log.debug(
+                        f"Evaluated {section.upper()}.{option.upper()} in "
+                        f"{seconds:.2f}s: {value}"
+                    )
+                    total_seconds += seconds
+                    if (
+                        not is_volatile
+                        and seconds >= SUBSTITUTION_CACHE_MIN_SECONDS
+                    ):
+                        new_values[f"{section}.{option}"] = [command, value]
                     config[section][option] = value
+        if total_seconds > 0:
+            log.debug(
+                f"Evaluated the substitutions in the Qleverfile in "
+                f"{time.monotonic() - start_time:.2f}s (one after the other: "
+                f"{total_seconds:.2f}s)"
+            )
+
+        # Update the cache (if that fails, the Qleverfile can still be used).
+        if cache_file is not None and new_values != cache.get("values", {}):
+            try:
+                cache_file.parent.mkdir(parents=True, exist_ok=True)
+                with open(f"{cache_file}.tmp", "w") as file:
+                    json.dump({"key": cache_key, "values": new_values}, file)
+                os.replace(f"{cache_file}.tmp", cache_file)
+            except OSError as e:
+                log.debug(f"Could not write {cache_file}: {e}")
 
         # Make sure that all the sections are there.
         for section in ["data", "index", "server", "runtime", "ui"]:
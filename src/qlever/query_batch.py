@@ -0,0 +1,235 @@
+"""
+Send many queries to a SPARQL endpoint (see `qlever query --batch`): read
+the queries from a file (or instantiate a template with the rows of a
+parameter file), send them over persistent HTTP connections, and, where
+this is safe, fold the instances of a template into combined queries with a
+`VALUES` clause and split the result again.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+
+from qlever.http_client import PersistentHttpClient
+from qlever.result_export import split_prologue
+
+# The placeholder for a parameter in a template, like `%entity%`.
+PLACEHOLDER_REGEX = r"%([A-Za-z_]\w*)%"
+
+# The variables that are added to a folded query (the number of the row of
+# the parameter file, and one variable per parameter).
+FOLD_VARIABLE_PREFIX = "qlever_batch_"
+FOLD_ROW_VARIABLE = f"{FOLD_VARIABLE_PREFIX}row"
+
+# Folding a template into a `VALUES` clause does not change the result of
+# each instance only for a plain SELECT query. These are the constructs for
+# which this is not guaranteed (because they limit, aggregate, or scope the
+# result, or because variables bound from the outside change their
+# meaning).
+FOLD_UNSAFE_REGEX = (
+    r"(?<![?$:\w])(OPTIONAL|MINUS|EXISTS|SERVICE|GROUP\s+BY|HAVING|LIMIT|"
+    r"OFFSET|(?:COUNT|SUM|MIN|MAX|AVG|SAMPLE|GROUP_CONCAT)(?=\s*\())\b"
+)
+
+# A parameter value that can be used in a `VALUES` clause (an IRI, a
+# prefixed name, a literal, a number, or a boolean).
+RDF_TERM_REGEX = (
+    r"^(<[^<>\s]*>"
+    r"|[A-Za-z_]?[\w.-]*:[^\s{}()<>\"]*"
+    r"|\"(?:[^\"\\]|\\.)*\"(?:@[A-Za-z-]+|\^\^\S+)?"
+    r"|[+-]?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?"
+    r"|true|false)$"
+)
+
+
+def read_batch(batch_file: str) -> list[tuple[str, str]]:
+    """
+    Read the queries of a batch, from a JSONL file with one object with
+    keys `query` and optionally `id` per line, or from a TSV file with lines
+    `id<TAB>query` or just `query`. Return a list of `(id, query)`, where
+    queries without an ID get their line number as ID.
+    """
+    queries = []
+    with open(batch_file, "r", encoding="utf-8") as file:
+        for line_number, line in enumerate(file, start=1):
+            line = line.rstrip("\n")
+            if not line.strip():
+                continue
+            if batch_file.endswith((".jsonl", ".json")):
+                entry = json.loads(line)
+                if not isinstance(entry, dict) or "query" not in entry:
+                    raise ValueError(
+                        f"Line {line_number} of {batch_file} must be an "
+                        f"object with a key `query`"
+                    )
+                query_id = str(entry.get("id", line_number))
+                query = entry["query"]
+            else:
+                query_id, _, query = line.partition("\t")
+                if not query:
+                    query_id, query = str(line_number), query_id
+            queries.append((query_id, " ".join(query.split())))
+    return queries
+
+
+def read_parameters(params_file: str) -> tuple[list[str], list[list[str]]]:
+    """
+    Read a parameter file, which is a TSV file with the names of the
+    parameters in the first line, and one row of values per line. Return the
+    names and the rows.
+    """
+    with open(params_file, "r", encoding="utf-8") as file:
+        lines = [line.rstrip("\n") for line in file if line.strip()]
+    if not lines:
+        raise ValueError(f"{params_file} is empty")
+    names = lines[0].split("\t")
+    rows = [line.split("\t") for line in lines[1:]]
+    for row_number, row in enumerate(rows, start=2):
+        if len(row) != len(names):
+            raise ValueError(
+                f"Line {row_number} of {params_file} has {len(row)} values, "
+                f"but there are {len(names)} parameters"
+            )
+    return names, rows
+
+
+def instantiate_template(
+    template: str, names: list[str], row: list[str]
+) -> str:
+    """
+    Replace the placeholders `%name%` in the template by the values of the
+    row (other text that looks like a placeholder is left as it is).
+    """
+    values = dict(zip(names, row))
+    return re.sub(
+        PLACEHOLDER_REGEX,
+        lambda match: values.get(match.group(1), match.group(0)),
+        template,
+    )
+
+
+def get_fold_obstacle(
+    template: str, names: list[str], rows: list[list[str]]
+) -> str | None:
+    """
+    Check whether the instances of the template can be folded into one
+    query with a `VALUES` clause without changing their results. Return why
+    not, or `None` if they can.
+    """
+    _, body = split_prologue(template)
+    if not re.match(r"^SELECT\b", body, re.IGNORECASE):
+        return "the template is not a SELECT query"
+    if len(re.findall(r"\bSELECT\b", body, re.IGNORECASE)) > 1:
+        return "the template has a subquery"
+    without_terms = re.sub(r"<[^<>\s]*>|\"(?:[^\"\\]|\\.)*\"", "", body)
+    match = re.search(FOLD_UNSAFE_REGEX, without_terms, re.IGNORECASE)
+    if match:
+        return f"the template uses {match.group(1).upper()}"
+    # The placeholders must stand for whole terms in the WHERE clause (not
+    # in the SELECT clause, and not inside an IRI or a literal).
+    where_clause = body[body.find("{") :] if "{" in body else ""
+    for name in names:
+        placeholder = f"%{name}%"
+        if placeholder not in where_clause:
+            return f"{placeholder} is not in the WHERE clause"
+        if body.count(placeholder) != without_terms.count(placeholder):
+            return f"{placeholder} is inside an IRI or a literal"
+        # The `VALUES` clause is added to the outermost group, which is not
+        # visible in a nested group (like a UNION, GRAPH, or just `{ ... }`).
+        for match in re.finditer(re.escape(placeholder), without_terms):
+            before = without_terms[: match.start()]
+            if before.count("{") - before.count("}") > 1:
+                return f"{placeholder} is inside a nested group"
+    for row in rows:
+        for value in row:
+            if not re.match(RDF_TERM_REGEX, value):
+                return f"the value {value} is not an RDF term"
+    return None
+
+
+def fold_queries(
+    template: str, names: list[str], rows: list[list[str]]
+) -> str:
+    """
+    Fold the instances of the template for the given rows into one query,
+    where each placeholder is replaced by a variable that is bound by a
+    `VALUES` clause (together with the number of the row, which is added to
+    the selected variables, see `split_folded_result`).
+    """
+    prologue, body = split_prologue(template)
+    body = re.sub(
+        PLACEHOLDER_REGEX,
+        lambda match: (
+            f"?{FOLD_VARIABLE_PREFIX}{match.group(1)}"
+            if match.group(1) in names
+            else match.group(0)
+        ),
+        body,
+    )
+    select = re.match(
+        r"^SELECT\s+((?:DISTINCT|REDUCED)\s+)?(\*)?", body, re.IGNORECASE
+    )
+    if not select.group(2):
+        body = (
+            f"{select.group(0)}?{FOLD_ROW_VARIABLE} "
+            f"{body[select.end() :]}"
+        )
+    variables = " ".join(
+        [f"?{FOLD_ROW_VARIABLE}"]
+        + [f"?{FOLD_VARIABLE_PREFIX}{name}" for name in names]
+    )
+    values = " ".join(
+        f"({' '.join([str(i)] + row)})" for i, row in enumerate(rows)
+    )
+    brace = body.find("{")
+    return (
+        f"{prologue}{body[: brace + 1]} VALUES ({variables}) {{ {values} }}"
+        f"{body[brace + 1 :]}"
+    )
+
+
+def split_folded_result(result: dict, num_rows: int) -> list[dict]:
+    """
+    Split the result of a folded query (as parsed
+    `application/sparql-results+json`) into the results of the instances,
+    without the variables that were added by `fold_queries`.
+    """
+    variables = [
+        variable
+        for variable in result["head"]["vars"]
+        if not variable.startswith(FOLD_VARIABLE_PREFIX)
+    ]
+    results = [
+        {"head": {"vars": variables}, "results": {"bindings": []}}
+        for _ in range(num_rows)
+    ]
+    for binding in result["results"]["bindings"]:
+        row = int(binding[FOLD_ROW_VARIABLE]["value"])
+        results[row]["results"]["bindings"].append(
+            {
+                variable: value
+                for variable, value in binding.items()
+                if not variable.startswith(FOLD_VARIABLE_PREFIX)
+            }
+        )
+    return results
+
+
+class SparqlClient(PersistentHttpClient):
+    """
+    Send queries to a SPARQL endpoint over a persistent HTTP connection. Not
+    thread-safe, use one client per thread.
+    """
+
+    def query(
+        self, query: str, accept: str, access_token: str | None = None
+    ) -> tuple[int, bytes]:
+        """
+        Send the query and return the HTTP status and the body of the
+        response.
+        """
+        params = {"query": query}
+        if access_token:
+            params["access-token"] = access_token
+        return self.post(params, accept)
@@ -0,0 +1,207 @@
+"""
+A client-side cache for the results of queries (see `qlever query
+--result-cache`). A result is stored under a key computed from the endpoint,
+the identity of the index (from the server's `cmd=stats`), the update
+generation of the endpoint, the query, and the Accept header. Results are
+evicted in LRU order once the cache exceeds its size.
+
+The update generation is bumped (and the results of the endpoint are
+removed) by `qlever update`, `qlever update-wikidata`, `qlever
+reset-updates`, and `qlever rebuild-index`, so that results computed before
+an update are never served after it, even when the update does not change
+the statistics of the index.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import time
+import urllib.request
+from pathlib import Path
+
+from qlever.log import log
+
+# The directory of the cache (can be set via the environment, so that all
+# commands that invalidate the cache use the same directory).
+RESULT_CACHE_DIR = Path(
+    os.environ.get(
+        "QLEVER_RESULT_CACHE_DIR",
+        Path(os.environ.get("XDG_CACHE_HOME", "~/.cache")) / "qlever/results",
+    )
+).expanduser()
+
+
+def normalize_endpoint(endpoint: str) -> str:
+    """
+    Normalize the endpoint, so that `localhost:7001` and
+    `http://localhost:7001/` share the same results.
+    """
+    if "://" not in endpoint:
+        endpoint = f"http://{endpoint}"
+    return endpoint.rstrip("/")
+
+
+def get_index_identity(endpoint: str, timeout: float = 5) -> str:
+    """
+    Get a hash that identifies the index that the server is currently
+    serving (from its `cmd=stats`, which contains the name of the index, the
+    version with which it was built, and its number of triples).
+    """
+    url = f"{normalize_endpoint(endpoint)}?cmd=stats"
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        stats = json.loads(response.read())
+    return hashlib.sha256(
+        json.dumps(stats, sort_keys=True).encode()
+    ).hexdigest()
+
+
+class ResultCache:
+    """
+    The results are stored in one directory per endpoint, one file
+    `<key>.result` (with a `<key>.json` for the time it took to compute the
+    result) per query. The modification time of a result is its last use.
+    """
+
+    def __init__(self, max_size: int, cache_dir: Path = RESULT_CACHE_DIR):
+        self.max_size = max_size
+        self.cache_dir = Path(cache_dir)
+        self.num_hits = 0
+        self.num_misses = 0
+
+    def get_endpoint_dir(self, endpoint: str) -> Path:
+        digest = hashlib.sha256(normalize_endpoint(endpoint).encode())
+        return self.cache_dir / digest.hexdigest()[:16]
+
+    def get_generation(self, endpoint: str) -> int:
+        """
+        Get the update generation of the endpoint (0 if it was never
+        updated).
+        """
+        generation_file = self.get_endpoint_dir(endpoint) / "generation"
+        try:
+            return int(generation_file.read_text())
+        except (OSError, ValueError):
+            return 0
+
+    def get_key(
+        self, endpoint: str, index_identity: str, query: str, accept: str
+    ) -> str:
+        """
+        Get the key of the result of the query.
+        """
+        return hashlib.sha256(
+            json.dumps(
+                [
+                    normalize_endpoint(endpoint),
+                    index_identity,
+                    self.get_generation(endpoint),
+                    query,
+                    accept,
+                ]
+            ).encode()
+        ).hexdigest()
+
+    def lookup(self, endpoint: str, key: str) -> tuple[Path, float] | None:
+        """
+        Look up the result with the given key. Return the file with the
+        result and the time it took to compute it, or `None` if the result
+        is not in the cache.
+        """
+        result_file = self.get_endpoint_dir(endpoint) / f"{key}.result"
+        try:
+            with open(result_file.with_suffix(".json"), "r") as file:
+                seconds = json.load(file)["seconds"]
+            os.utime(result_file)
+        except (OSError, ValueError, KeyError):
+            self.num_misses += 1
+            return None
+        self.num_hits += 1
+        return result_file, seconds
+
+    def store(
+        self, endpoint: str, key: str, result_file: str, seconds: float
+    ) -> bool:
+        """
+        Store a copy of the result file under the given key, and evict the
+        least recently used results if the cache is then too large. Return
+        whether the result was stored (it is not if it alone is too large).
+        """
+        if Path(result_file).stat().st_size > self.max_size:
+            return False
+        endpoint_dir = self.get_endpoint_dir(endpoint)
+        endpoint_dir.mkdir(parents=True, exist_ok=True)
+        cached_file = endpoint_dir / f"{key}.result"
+        shutil.copyfile(result_file, f"{cached_file}.tmp")
+        os.replace(f"{cached_file}.tmp", cached_file)
+        with open(cached_file.with_suffix(".json"), "w") as file:
+            json.dump({"seconds": seconds, "time": time.time()}, file)
+        self.evict()
+        return True
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used results until the cache is not larger
+        than its maximal size.
+        """
+        entries = []
+        for result_file in self.cache_dir.glob("*/*.result"):
+            try:
+                stat = result_file.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, result_file))
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, result_file in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            result_file.unlink(missing_ok=True)
+            result_file.with_suffix(".json").unlink(missing_ok=True)
+            total_size -= size
+            log.debug(f"Evicted {result_file} from the result cache")
+
+    def invalidate(self, endpoint: str) -> int:
+        """
+        Bump the update generation of the endpoint and remove its results.
+        Return the number of removed results.
+        """
+        endpoint_dir = self.get_endpoint_dir(endpoint)
+        if not endpoint_dir.exists():
+            return 0
+        generation_file = endpoint_dir / "generation"
+        generation_file.write_text(str(self.get_generation(endpoint) + 1))
+        num_removed = 0
+        for result_file in endpoint_dir.glob("*.result"):
+            result_file.unlink(missing_ok=True)
+            result_file.with_suffix(".json").unlink(missing_ok=True)
+            num_removed += 1
+        return num_removed
+
+    def format_stats(self) -> str:
+        """
+        Format the number of hits and misses so far.
+        """
+        return (
+            f"{self.num_hits:,} hit{'s' if self.num_hits != 1 else ''}, "
+            f"{self.num_misses:,} miss{'es' if self.num_misses != 1 else ''}"
+        )
+
+
+def invalidate_result_cache(endpoint: str) -> None:
+    """
+    Invalidate the cached results of the endpoint after an update (called by
+    the commands that change the data of the endpoint; never fails).
+    """
+    try:
+        num_removed = ResultCache(0).invalidate(endpoint)
+    except OSError as e:
+        log.warning(f"Could not invalidate the result cache: {e}")
+        return
+    if num_removed > 0:
+        log.info(
+            f"Removed {num_removed:,} cached "
+            f"result{'s' if num_removed != 1 else ''} for "
+            f"{normalize_endpoint(endpoint)} from the result cache"
+        )
@@ -0,0 +1,251 @@
+"""
+Export the result of a query to a (compressed) file (see `qlever export`):
+split the query into pages (via ORDER BY + LIMIT/OFFSET, or via ranges of a
+numeric key variable), stream each page from the server into its own
+compressed part file, and concatenate the parts in order (gzip members and
+zstd frames can be concatenated as they are).
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import shutil
+import subprocess
+import urllib.parse
+import urllib.request
+
+# The compressors, by the suffix of the output file (without a compressor,
+# the result is written as it is).
+COMPRESSORS = {
+    ".gz": ["gzip", "-c"],
+    ".zst": ["zstd", "-q", "-c"],
+    ".zstd": ["zstd", "-q", "-c"],
+}
+
+# Read the result from the server in chunks of this size.
+CHUNK_SIZE = 1 << 20
+
+# The PREFIX and BASE declarations at the beginning of a query.
+PROLOGUE_REGEX = (
+    r"^\s*((?:(?:PREFIX\s+[^\s:]*:\s*<[^>]*>|BASE\s*<[^>]*>)\s*)*)(.*)$"
+)
+
+
+def get_compressor(output_file: str) -> list[str] | None:
+    """
+    Get the command line of the compressor for the given output file (`None`
+    if the file is not compressed). Raise an exception if the compressor is
+    not installed.
+    """
+    for suffix, compressor in COMPRESSORS.items():
+        if output_file.endswith(suffix):
+            if shutil.which(compressor[0]) is None:
+                raise Exception(
+                    f"`{compressor[0]}` is needed for {output_file}, but it "
+                    f"is not installed"
+                )
+            return compressor
+    return None
+
+
+def split_prologue(query: str) -> tuple[str, str]:
+    """
+    Split the query into its PREFIX and BASE declarations and the rest (which
+    can then be used as a subquery).
+    """
+    match = re.match(PROLOGUE_REGEX, query, re.DOTALL | re.IGNORECASE)
+    return match.group(1), match.group(2).strip()
+
+
+def get_paged_queries(
+    query: str, num_pages: int, num_rows: int, order_by: list[str]
+) -> list[str]:
+    """
+    Split the query into `num_pages` queries with a deterministic order (by
+    the given variables) and consecutive ranges of LIMIT and OFFSET, which
+    together yield the `num_rows` rows of the result.
+    """
+    prologue, body = split_prologue(query)
+    page_size = max(-(-num_rows // num_pages), 1)
+    return [
+        f"{prologue}SELECT * WHERE {{ {body} }} "
+        f"ORDER BY {' '.join(order_by)} "
+        f"LIMIT {page_size} OFFSET {i * page_size}"
+        for i in range(num_pages)
+    ]
+
+
+def get_range_queries(
+    query: str, num_pages: int, key: str, min_value, max_value
+) -> list[str]:
+    """
+    Split the query into `num_pages` queries for consecutive ranges of the
+    values of the given numeric key variable, from `min_value` to
+    `max_value` (both inclusive), plus one last query for the rows where the
+    variable is unbound or not numeric (which are in none of the ranges).
+    """
+    prologue, body = split_prologue(query)
+    step = (max_value - min_value) / num_pages
+    if isinstance(min_value, int) and isinstance(max_value, int):
+        step = max(-(-(max_value - min_value + 1) // num_pages), 1)
+    queries = []
+    for i in range(num_pages):
+        low = min_value + i * step
+        if i < num_pages - 1:
+            high = min_value + (i + 1) * step
+            condition = f"{key} >= {low} && {key} < {high}"
+        else:
+            condition = f"{key} >= {low} && {key} <= {max_value}"
+        queries.append(
+            f"{prologue}SELECT * WHERE {{ {{ {body} }} FILTER({condition}) }}"
+        )
+    queries.append(
+        f"{prologue}SELECT * WHERE {{ {{ {body} }} "
+        f"FILTER(!BOUND({key}) || !isNumeric({key})) }}"
+    )
+    return queries
+
+
+def get_json_result(
+    endpoint_url: str, query: str, timeout: float | None = None
+) -> dict:
+    """
+    Send the query to the server and return the result as parsed
+    `application/sparql-results+json`.
+    """
+    request = urllib.request.Request(
+        endpoint_url,
+        data=urllib.parse.urlencode({"query": query}).encode(),
+        headers={"Accept": "application/sparql-results+json"},
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def get_variables(endpoint_url: str, query: str) -> list[str]:
+    """
+    Get the variables of the result of the query (without computing it).
+    """
+    prologue, body = split_prologue(query)
+    result = get_json_result(
+        endpoint_url, f"{prologue}SELECT * WHERE {{ {body} }} LIMIT 0"
+    )
+    return [f"?{variable}" for variable in result["head"]["vars"]]
+
+
+def get_num_rows(endpoint_url: str, query: str) -> int:
+    """
+    Get the number of rows of the result of the query.
+    """
+    prologue, body = split_prologue(query)
+    result = get_json_result(
+        endpoint_url,
+        f"{prologue}SELECT (COUNT(*) AS ?count) WHERE {{ {body} }}",
+    )
+    return int(result["results"]["bindings"][0]["count"]["value"])
+
+
+def get_key_range(endpoint_url: str, query: str, key: str) -> tuple:
+    """
+    Get the smallest and the largest numeric value of the given key variable
+    in the result of the query (as `int` if both are integers).
+    """
+    prologue, body = split_prologue(query)
+    result = get_json_result(
+        endpoint_url,
+        f"{prologue}SELECT (MIN({key}) AS ?min) (MAX({key}) AS ?max) "
+        f"WHERE {{ {{ {body} }} FILTER(isNumeric({key})) }}",
+    )
+    binding = result["results"]["bindings"][0]
+    if "min" not in binding or "max" not in binding:
+        raise Exception(f"The result has no numeric values for {key}")
+    values = [binding["min"]["value"], binding["max"]["value"]]
+    try:
+        return tuple(int(value) for value in values)
+    except ValueError:
+        try:
+            return tuple(float(value) for value in values)
+        except ValueError:
+            raise Exception(f"The values of {key} are not numeric: {values}")
+
+
+def download_page(
+    endpoint_url: str,
+    query: str,
+    accept: str,
+    part_file: str,
+    compressor: list[str] | None,
+    skip_header: bool,
+) -> tuple[int, int]:
+    """
+    Stream the result of the query into the given part file (through the
+    compressor, if any), without the header line if `skip_header` is set.
+    Return the number of lines (without the header) and the number of bytes
+    that were written (before compression).
+    """
+    request = urllib.request.Request(
+        endpoint_url,
+        data=urllib.parse.urlencode({"query": query}).encode(),
+        headers={"Accept": accept},
+    )
+    num_lines = num_bytes = 0
+    with open(part_file, "wb") as file:
+        process = None
+        output = file
+        if compressor is not None:
+            process = subprocess.Popen(
+                compressor, stdin=subprocess.PIPE, stdout=file
+            )
+            output = process.stdin
+        try:
+            with urllib.request.urlopen(request) as response:
+                header_seen = False
+                while True:
+                    chunk = response.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    if not header_seen:
+                        newline = chunk.find(b"\n")
+                        if newline < 0:
+                            raise Exception("The result has no header line")
+                        header_seen = True
+                        if skip_header:
+                            chunk = chunk[newline + 1 :]
+                        else:
+                            num_lines -= 1
+                    num_lines += chunk.count(b"\n")
+                    num_bytes += len(chunk)
+                    output.write(chunk)
+        finally:
+            if process is not None:
+                process.stdin.close()
+                if process.wait() != 0:
+                    raise Exception(
+                        f"`{' '.join(compressor)}` failed with exit code "
+                        f"{process.returncode}"
+                    )
+    return num_lines, num_bytes
+
+
+def format_throughput(num_lines: int, num_bytes: int, seconds: float) -> str:
+    """
+    Format the number of rows and bytes, and the rows and megabytes per
+    second.
+    """
+    seconds = max(seconds, 1e-6)
+    return (
+        f"{num_lines:,} rows, {num_bytes / 1e6:,.1f} MB in {seconds:.1f}s "
+        f"({num_lines / seconds:,.0f} rows/s, "
+        f"{num_bytes / 1e6 / seconds:,.1f} MB/s)"
+    )
+
+
+def concatenate_parts(part_files: list[str], output_file: str) -> None:
+    """
+    Concatenate the part files in order into the output file.
+    """
+    with open(output_file, "wb") as output:
+        for part_file in part_files:
+            with open(part_file, "rb") as part:
+                shutil.copyfileobj(part, output, CHUNK_SIZE)
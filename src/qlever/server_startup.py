@@ -0,0 +1,236 @@
+"""
+Wait until a freshly started QLever server is ready, by following its log
+file (for the line that says that the server is ready), pinging it via HTTP
+(with exponential backoff), and checking that the server process is still
+running. From the timestamps in the log, compute how long the phases of the
+startup took (reading the metadata, the vocabulary, the patterns, ...).
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime
+from typing import Callable
+
+from qlever.log import log
+
+# Regex for the timestamp at the beginning of a log line, and for the line
+# that says that the server is ready.
+LOG_LINE_REGEX = r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{3}) - [A-Z]+:"
+SERVER_READY_REGEX = r"INFO:\s*The server is ready"
+
+# The phases of the startup, with a regex for the log lines that belong to
+# each phase (in the order in which the regexes are tried). Each phase lasts
+# from its first line until the first line of another phase.
+STARTUP_PHASE_REGEXES = [
+    ("Metadata", r"INFO:.*meta ?data"),
+    ("Vocabulary", r"INFO:.*vocabulary"),
+    ("Patterns", r"INFO:.*pattern"),
+    ("Permutations", r"INFO:.*permutation"),
+    ("Text index", r"INFO:.*text index"),
+]
+
+# Ping the server after this many seconds, doubling the wait after each
+# failed ping up to the maximum.
+PING_INITIAL_WAIT = 0.05
+PING_MAX_WAIT = 1.0
+
+# How often to look for new lines in the log file.
+LOG_POLL_INTERVAL = 0.1
+
+
+def ping_server(endpoint_url: str, timeout: float = 1.0) -> bool:
+    """
+    Ping the server at the given endpoint (in-process, without starting
+    `curl`). Return `True` if the server responds at all (also with an HTTP
+    error), `False` otherwise.
+    """
+    data = urllib.parse.urlencode({"msg": "from the `qlever` CLI"})
+    request = urllib.request.Request(
+        f"{endpoint_url}/ping", data=data.encode()
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout):
+            return True
+    except urllib.error.HTTPError:
+        return True
+    except (urllib.error.URLError, OSError):
+        return False
+
+
+def probe_query(
+    endpoint_url: str,
+    query: str,
+    access_token: str | None = None,
+    timeout: float = 10.0,
+) -> tuple[float, str | None]:
+    """
+    Send the given query to the server at the given endpoint (in-process,
+    without sending the result back). Return the time in seconds, and the
+    error message if the query failed or timed out (otherwise `None`).
+    """
+    params = {"query": query, "send": "0"}
+    if access_token:
+        params["access-token"] = access_token
+    request = urllib.request.Request(
+        endpoint_url,
+        data=urllib.parse.urlencode(params).encode(),
+        headers={"Accept": "application/qlever-results+json"},
+    )
+    start_time = time.monotonic()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            result = json.loads(response.read())
+        error = result.get("exception")
+    except urllib.error.HTTPError as e:
+        try:
+            error = json.loads(e.read()).get("exception") or str(e)
+        except ValueError:
+            error = str(e)
+    except (urllib.error.URLError, OSError, ValueError) as e:
+        error = str(getattr(e, "reason", e))
+    return time.monotonic() - start_time, error
+
+
+def get_startup_phases(log_lines: list[str]) -> list[tuple[str, float]]:
+    """
+    Compute the time of each startup phase (in seconds) from the given server
+    log lines, in the order of the first occurrence of each phase. The time
+    before the first phase and after the last phase (until the server is
+    ready) is accounted as "Other".
+    """
+    phase_times = {}
+    current_phase = "Other"
+    current_begin = None
+    last_time = None
+    for line in log_lines:
+        match = re.match(LOG_LINE_REGEX, line)
+        if not match:
+            continue
+        try:
+            line_time = datetime.strptime(
+                match.group(1), "%Y-%m-%d %H:%M:%S.%f"
+            )
+        except ValueError:
+            continue
+        if current_begin is None:
+            current_begin = line_time
+        last_time = line_time
+        if re.search(SERVER_READY_REGEX, line):
+            break
+        for phase, phase_regex in STARTUP_PHASE_REGEXES:
+            if re.search(phase_regex, line, re.IGNORECASE):
+                break
+        else:
+            continue
+        if phase != current_phase:
+            seconds = (line_time - current_begin).total_seconds()
+            phase_times[current_phase] = (
+                phase_times.get(current_phase, 0) + seconds
+            )
+            current_phase = phase
+            current_begin = line_time
+    if current_begin is not None:
+        seconds = (last_time - current_begin).total_seconds()
+        phase_times[current_phase] = (
+            phase_times.get(current_phase, 0) + seconds
+        )
+    return [
+        (phase, seconds)
+        for phase, seconds in phase_times.items()
+        if phase != "Other" or seconds > 0
+    ]
+
+
+class ServerStartupWatcher:
+    """
+    Follow the log file of a server that is starting up, and wait until the
+    server is ready, or the server process has exited, or the timeout has
+    passed. With `echo_log`, show the new log lines while waiting.
+    """
+
+    def __init__(
+        self,
+        log_file_name: str,
+        endpoint_url: str,
+        is_running: Callable[[], bool] | None = None,
+        echo_log: bool = True,
+    ):
+        self.log_file_name = log_file_name
+        self.endpoint_url = endpoint_url
+        self.is_running = is_running
+        self.echo_log = echo_log
+        self.log_file = None
+        self.partial_line = ""
+        self.log_lines = []
+        self.ready_line_seen = False
+
+    def read_new_log_lines(self) -> None:
+        """
+        Read the lines that were added to the log file since the last call
+        (the file may not exist yet when the server has just been started).
+        """
+        if self.log_file is None:
+            try:
+                self.log_file = open(self.log_file_name, "r", errors="replace")
+            except OSError:
+                return
+        text = self.partial_line + self.log_file.read()
+        lines = text.split("\n")
+        self.partial_line = lines.pop()
+        for line in lines:
+            if self.echo_log:
+                print(line, flush=True)
+            self.log_lines.append(line)
+            if re.search(SERVER_READY_REGEX, line):
+                self.ready_line_seen = True
+
+    def wait(self, timeout: float) -> str:
+        """
+        Wait until the server is ready. Return "ready", "exited" (if the
+        server process is no longer running), or "timeout".
+        """
+        start_time = time.monotonic()
+        ping_wait = PING_INITIAL_WAIT
+        next_ping_time = start_time + ping_wait
+        try:
+            while True:
+                self.read_new_log_lines()
+                now = time.monotonic()
+                if self.ready_line_seen or now >= next_ping_time:
+                    if ping_server(self.endpoint_url):
+                        self.read_new_log_lines()
+                        return "ready"
+                    if self.is_running is not None and not self.is_running():
+                        self.read_new_log_lines()
+                        return "exited"
+                    ping_wait = min(2 * ping_wait, PING_MAX_WAIT)
+                    next_ping_time = time.monotonic() + ping_wait
+                if now - start_time >= timeout:
+                    return "timeout"
+                time.sleep(
+                    max(0, min(LOG_POLL_INTERVAL, next_ping_time - now))
+                )
+        finally:
+            if self.log_file is not None:
+                self.log_file.close()
+                self.log_file = None
+
+    def show_startup_phases(self, total_seconds: float) -> None:
+        """
+        Show how long the startup took, and how long each phase took
+        according to the log.
+        """
+        phases = get_startup_phases(self.log_lines)
+        message = f"The server was ready after {total_seconds:.1f}s"
+        if phases:
+            message += " (" + ", ".join(
+                f"{phase.lower()}: {seconds:.1f}s"
+                for phase, seconds in phases
+            ) + ")"
+        log.info(message)
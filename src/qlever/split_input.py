@@ -0,0 +1,204 @@
+# Copyright 2025, University of Freiburg,
+# Chair of Algorithms and Data Structures
+
+"""
+Split a single line-based input file (N-Triples or N-Quads, uncompressed or
+compressed with bzip2) into independent parts, so that `qlever-index` can
+parse them as parallel input streams. No temporary copies are written.
+
+An uncompressed file is split at line boundaries into byte ranges, which can
+be read with `tail` and `head`. A bzip2 file is split at block boundaries and
+each part is decompressed by running this module:
+
+    python3 -m qlever.split_input <file> <part> <num_parts>
+
+Each part starts after the first line break at or after its start and
+extends to the first line break at or after its end, so that every line is
+contained in exactly one part.
+"""
+
+from __future__ import annotations
+
+import bz2
+import sys
+from pathlib import Path
+
+# The magic numbers that start a bzip2 block and the end-of-stream marker.
+BZ2_BLOCK_MAGIC = 0x314159265359
+BZ2_EOS_MAGIC = 0x177245385090
+
+
+def get_line_aligned_offsets(path: str, num_parts: int) -> list[int]:
+    """
+    Return `num_parts + 1` byte offsets that split the given uncompressed file
+    into parts of about equal size, each starting at the beginning of a line.
+    """
+    size = Path(path).stat().st_size
+    offsets = [0]
+    with open(path, "rb") as file:
+        for i in range(1, num_parts):
+            file.seek(max(i * size // num_parts - 1, offsets[-1]))
+            file.readline()
+            offsets.append(min(file.tell(), size))
+    offsets.append(size)
+    return offsets
+
+
+def find_magic(
+    data: bytes, magic: int, start_bit: int = 0, end_byte: int | None = None
+) -> int:
+    """
+    Return the first bit offset at or after `start_bit` (and before `end_byte`
+    if given) where the 48-bit `magic` occurs in `data`, or -1 if there is no
+    such offset. The magic
+    numbers in bzip2 files are not byte-aligned, so we search for each of the
+    eight possible shifts (the five bytes that are fully determined by the
+    magic number) and then check the remaining bits.
+    """
+    matches = []
+    for shift in range(8):
+        # The magic number at bit `shift` of a 7-byte window.
+        pattern = (magic << (8 - shift)).to_bytes(7, "big")
+        first_mask = (1 << (8 - shift)) - 1
+        last_mask = (0xFF00 >> shift) & 0xFF
+        pos = start_bit // 8 + 1
+        while True:
+            pos = data.find(pattern[1:6], pos, end_byte)
+            if pos < 0:
+                break
+            byte = pos - 1
+            bit = byte * 8 + shift
+            if (
+                bit >= start_bit
+                and byte + 6 < len(data)
+                and data[byte] & first_mask == pattern[0] & first_mask
+                and data[byte + 6] & last_mask == pattern[6] & last_mask
+            ):
+                matches.append(bit)
+                break
+            pos += 1
+    return min(matches) if matches else -1
+
+
+def get_bits(data: bytes, start_bit: int, end_bit: int) -> int:
+    """
+    Return the bits `[start_bit, end_bit)` of `data` as an integer.
+    """
+    chunk = data[start_bit // 8:(end_bit + 7) // 8]
+    num_bits = end_bit - start_bit
+    value = int.from_bytes(chunk, "big")
+    value >>= len(chunk) * 8 - (start_bit % 8) - num_bits
+    return value & ((1 << num_bits) - 1)
+
+
+def decompress_bz2_block(data: bytes, start_bit: int, end_bit: int) -> bytes:
+    """
+    Decompress the bzip2 block in the bits `[start_bit, end_bit)` of `data`,
+    by wrapping it in a stream of its own (header, block, end-of-stream
+    marker, and the combined CRC, which for a single block is the CRC of the
+    block).
+    """
+    num_bits = end_bit - start_bit
+    block = get_bits(data, start_bit, end_bit)
+    block_crc = (block >> (num_bits - 80)) & 0xFFFFFFFF
+    stream = (block << 80) | (BZ2_EOS_MAGIC << 32) | block_crc
+    padding = -(num_bits + 80) % 8
+    stream <<= padding
+    stream_bytes = stream.to_bytes((num_bits + 80 + padding) // 8, "big")
+    return bz2.decompress(b"BZh9" + stream_bytes)
+
+
+def iter_bz2_blocks(path: str, start_byte: int, chunk_size: int = 1 << 24):
+    """
+    Iterate over the blocks of the given bzip2 file, starting with the first
+    block at or after `start_byte`, and yield the byte offset of the start of
+    each block together with its decompressed content. Works for files with
+    multiple streams (as written by `pbzip2`), too.
+    """
+    with open(path, "rb") as file:
+        file.seek(start_byte)
+        data = file.read(chunk_size)
+        data_offset = start_byte
+        block_start = find_magic(data, BZ2_BLOCK_MAGIC)
+        while block_start >= 0:
+            # Find the end of the block (the next block or end-of-stream
+            # marker), reading more data if needed.
+            while True:
+                search_from = block_start + 48
+                next_block = find_magic(data, BZ2_BLOCK_MAGIC, search_from)
+                next_eos = find_magic(
+                    data,
+                    BZ2_EOS_MAGIC,
+                    search_from,
+                    next_block // 8 + 7 if next_block >= 0 else None,
+                )
+                ends = [pos for pos in [next_block, next_eos] if pos >= 0]
+                if len(ends) > 0:
+                    break
+                more_data = file.read(chunk_size)
+                if len(more_data) == 0:
+                    return
+                data += more_data
+            block_end = min(ends)
+            yield (
+                data_offset + block_start // 8,
+                decompress_bz2_block(data, block_start, block_end),
+            )
+            # Drop the data before the end of the block, and find the start of
+            # the next block (skipping the end-of-stream marker and the header
+            # of the next stream, if any).
+            drop = block_end // 8
+            data = data[drop:]
+            data_offset += drop
+            block_start = find_magic(data, BZ2_BLOCK_MAGIC, block_end % 8)
+            if block_start < 0:
+                more_data = file.read(chunk_size)
+                if len(more_data) == 0:
+                    return
+                data += more_data
+                block_start = find_magic(data, BZ2_BLOCK_MAGIC, block_end % 8)
+
+
+def write_bz2_part(path: str, part: int, num_parts: int, output) -> None:
+    """
+    Write the decompressed lines of the given part of the given bzip2 file to
+    `output` (see the module docstring for which lines belong to which part).
+    """
+    size = Path(path).stat().st_size
+    start = part * size // num_parts
+    end = (part + 1) * size // num_parts if part + 1 < num_parts else size
+    skipping = part > 0
+    for block_offset, block in iter_bz2_blocks(path, start):
+        # Skip the (partial) line before the first line break. If that line
+        # extends beyond the end of the part, the part is empty.
+        if skipping:
+            line_break = block.find(b"\n")
+            if line_break < 0:
+                continue
+            if block_offset >= end:
+                return
+            block = block[line_break + 1:]
+            skipping = False
+        # After the end of the part, write until the first line break.
+        if block_offset >= end:
+            line_break = block.find(b"\n")
+            if line_break >= 0:
+                output.write(block[: line_break + 1])
+                return
+        output.write(block)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4:
+        print(
+            "Usage: python3 -m qlever.split_input <file> <part> <num_parts>",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    try:
+        write_bz2_part(
+            sys.argv[1], int(sys.argv[2]), int(sys.argv[3]), sys.stdout.buffer
+        )
+        sys.stdout.buffer.flush()
+    except BrokenPipeError:
+        sys.stderr.close()
@@ -0,0 +1,126 @@
+"""
+A minimal TCP proxy for blue/green switchovers (see `qlever switchover`). It
+listens on the public port of the server and forwards each connection to the
+backend port that is currently written in the backend file. The backend is
+read for each new connection, so replacing the file (atomically, with
+`write_backend_port`) switches all new connections to the new server, while
+existing connections stay with the old server until they are closed.
+
+Run it as `python3 -m qlever.switch_proxy --port PORT --backend-file FILE`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import re
+
+import psutil
+
+# The size of the buffer when forwarding data between client and backend.
+FORWARD_BUFFER_SIZE = 1 << 16
+
+
+def read_backend_port(backend_file: str) -> int:
+    """
+    Read the backend port from the given file.
+    """
+    with open(backend_file, "r") as file:
+        return int(file.read().strip())
+
+
+def write_backend_port(backend_file: str, port: int) -> None:
+    """
+    Write the backend port to the given file, atomically (so that the proxy
+    never sees a partially written file).
+    """
+    tmp_file = f"{backend_file}.tmp"
+    with open(tmp_file, "w") as file:
+        print(port, file=file)
+    os.replace(tmp_file, backend_file)
+
+
+def find_switch_proxy(port: int) -> tuple[psutil.Process, str] | None:
+    """
+    Find the switch proxy that listens on the given port, and return the
+    process and the name of its backend file, or `None` if there is no such
+    proxy.
+    """
+    for proc in psutil.process_iter():
+        try:
+            cmdline = " ".join(proc.cmdline())
+        except psutil.Error:
+            continue
+        match = re.search(
+            rf"-m qlever\.switch_proxy --port {port} --backend-file (\S+)",
+            cmdline,
+        )
+        if match:
+            return proc, match.group(1)
+    return None
+
+
+def count_backend_connections(proc: psutil.Process, port: int) -> int:
+    """
+    Count the open connections of the given proxy process to the given
+    backend port.
+    """
+    # NOTE: `net_connections` is called `connections` before psutil 6.0.
+    net_connections = getattr(proc, "net_connections", None)
+    if net_connections is None:
+        net_connections = proc.connections
+    return sum(
+        1
+        for connection in net_connections(kind="tcp")
+        if connection.raddr
+        and connection.raddr.port == port
+        and connection.status == psutil.CONN_ESTABLISHED
+    )
+
+
+async def forward(reader, writer) -> None:
+    try:
+        while data := await reader.read(FORWARD_BUFFER_SIZE):
+            writer.write(data)
+            await writer.drain()
+    except (ConnectionError, OSError):
+        pass
+    finally:
+        try:
+            writer.close()
+        except (ConnectionError, OSError):
+            pass
+
+
+async def serve(port: int, backend_file: str, backend_host: str) -> None:
+    async def handle_connection(client_reader, client_writer):
+        try:
+            backend_port = read_backend_port(backend_file)
+            backend_reader, backend_writer = await asyncio.open_connection(
+                backend_host, backend_port
+            )
+        except (OSError, ValueError) as e:
+            print(f"Cannot connect to the backend: {e}", flush=True)
+            client_writer.close()
+            return
+        await asyncio.gather(
+            forward(client_reader, backend_writer),
+            forward(backend_reader, client_writer),
+        )
+
+    server = await asyncio.start_server(handle_connection, port=port)
+    print(
+        f"Forwarding port {port} to the port in {backend_file}", flush=True
+    )
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--backend-file", type=str, required=True)
+    parser.add_argument("--backend-host", type=str, default="localhost")
+    args = parser.parse_args()
+    asyncio.run(serve(args.port, args.backend_file, args.backend_host))
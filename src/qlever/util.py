@@ -174,12 +174,59 @@ def get_existing_index_files(basename: str, add_non_essential: bool = False) ->
         existing_index_files.extend(Path.cwd().glob(f"{basename}.view.*"))
         existing_index_files.extend(Path.cwd().glob(f"{basename}.settings.json"))
         existing_index_files.extend(Path.cwd().glob(f"{basename}.index-log.txt"))
+        existing_index_files.extend(
+            Path.cwd().glob(f"{basename}.index-profile.jsonl")
+        )
         existing_index_files.extend(Path.cwd().glob(f"{basename}.server-log.txt"))
+        existing_index_files.extend(
+            Path.cwd().glob(f"{basename}.*.server-log.txt")
+        )
 
     # Return only the file names, not the full paths.
     return [path.name for path in existing_index_files]
 
 
+# The roles of the index files, as pairs of a regex for the part of the file
+# name after `<name>.` and the name of the role (the first match counts).
+PERMUTATION_FILE_ROLES = [
+    (r"index\.(pso|pos|spo|sop|osp|ops)(\.meta)?$", "Permutation {}"),
+    (
+        r"internal\.index\.(pso|pos|spo|sop|osp|ops)(\.meta)?$",
+        "Internal permutation {}",
+    ),
+]
+INDEX_FILE_ROLES = PERMUTATION_FILE_ROLES + [
+    (r"index\.patterns", "Patterns"),
+    (r"vocabulary\.internal", "Vocabulary (internal)"),
+    (r"vocabulary\.external", "Vocabulary (external)"),
+    (r"vocabulary\.", "Vocabulary (other)"),
+    (r"text\.", "Text index"),
+    (r"(meta-data\.json|prefixes)$", "Metadata"),
+]
+
+
+def get_index_file_role(name: str, file_name: str) -> str:
+    """
+    Get the role of the given index file (for example, "Permutation PSO" for
+    `<name>.index.pso` and `<name>.index.pso.meta`).
+    """
+    suffix = file_name[len(name) + 1:]
+    for regex, role in INDEX_FILE_ROLES:
+        match = re.match(regex, suffix)
+        if match:
+            return role.format(*[g.upper() for g in match.groups() if g][:1])
+    return "Other"
+
+
+def is_permutation_file(name: str, file_name: str) -> bool:
+    """
+    Check whether the given index file belongs to a permutation (including
+    the internal permutations).
+    """
+    suffix = file_name[len(name) + 1:]
+    return any(re.match(regex, suffix) for regex, _ in PERMUTATION_FILE_ROLES)
+
+
 def show_process_info(psutil_process, cmdline_regex, show_heading=True):
     """
     Helper function that shows information about a process if information
@@ -250,7 +297,10 @@ def format_size(bytes, suffix="B"):
     e.g:
         1253656 => '1.20MB'
         1253656678 => '1.17GB'
+        -1253656678 => '-1.17GB'
     """
+    if bytes < 0:
+        return "-" + format_size(-bytes, suffix)
     factor = 1024
     for unit in ["", "K", "M", "G", "T", "P"]:
         if bytes < factor:
@@ -258,6 +308,50 @@ def format_size(bytes, suffix="B"):
         bytes /= factor
 
 
+def parse_size(size: str) -> int:
+    """
+    Parse a size like `5G`, `500 MB`, `1.5T` or `1024` and return the number
+    of bytes (like `format_size`, the units are powers of 1024). Raise a
+    `ValueError` if the size cannot be parsed.
+    """
+    match = re.match(
+        r"^\s*(\d+(?:\.\d+)?)\s*([KMGTP]?)i?B?\s*$", str(size), re.IGNORECASE
+    )
+    if not match:
+        raise ValueError(f'Invalid size "{size}" (examples: 5G, 500MB, 1024)')
+    factor = 1024 ** "_KMGTP".index(match.group(2).upper() or "_")
+    return int(float(match.group(1)) * factor)
+
+
+def partition_by_size(sizes: list[int], num_parts: int) -> list[range]:
+    """
+    Partition the items with the given sizes into at most `num_parts`
+    consecutive ranges (preserving the order of the items), such that the
+    total sizes of the ranges are about equal, and no range is empty.
+    """
+    num_parts = min(num_parts, len(sizes))
+    total_size = sum(sizes)
+    parts = []
+    begin = 0
+    cumulative_size = 0
+    for i in range(num_parts - 1):
+        # Extend the range as long as this brings the cumulative size closer
+        # to the target, but leave at least one item for each later range.
+        target_size = total_size * (i + 1) / num_parts
+        end = begin + 1
+        cumulative_size += sizes[begin]
+        while end < len(sizes) - (num_parts - 1 - i) and abs(
+            cumulative_size + sizes[end] - target_size
+        ) <= abs(cumulative_size - target_size):
+            cumulative_size += sizes[end]
+            end += 1
+        parts.append(range(begin, end))
+        begin = end
+    if begin < len(sizes):
+        parts.append(range(begin, len(sizes)))
+    return parts
+
+
 def stop_process(proc: psutil.Process, pinfo: dict[str, Any]) -> bool:
     """
     Try to kill the given process, return True iff it was killed
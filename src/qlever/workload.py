@@ -0,0 +1,61 @@
+"""
+Read the files with queries that are used as a workload (`qlever warmup
+--workload`, `qlever simulate-cache`, the health check of `qlever
+switchover`) or as PINNED_QUERIES (`qlever pin`). Each command then
+aggregates the entries in its own way.
+"""
+
+from __future__ import annotations
+
+import yaml
+
+
+def read_query_file(
+    query_file: str, value_key: str, default_value: float
+) -> list[tuple[str, str, float]]:
+    """
+    Read the queries from a TSV file with lines `description<TAB>query` or
+    just `query` (as written by `qlever extract-queries`), or from a YAML
+    file with a top-level key `queries` and a list of entries with keys
+    `query` (the description), `sparql`, and optionally `value_key` (like
+    `count` or `priority`, as used by `qlever benchmark-queries`). Return a
+    list of `(description, query, value)` in the order of the file, where
+    the whitespace in the queries is normalized, and the value is
+    `default_value` where it is not given.
+    """
+    entries = []
+    with open(query_file, "r", encoding="utf-8") as file:
+        if query_file.endswith((".yml", ".yaml")):
+            data = yaml.safe_load(file)
+            if not isinstance(data, dict) or not isinstance(
+                data.get("queries"), list
+            ):
+                raise ValueError(
+                    f"YAML file {query_file} must contain a top-level key "
+                    f"`queries` with a list of queries"
+                )
+            for item in data["queries"]:
+                if not isinstance(item, dict) or "sparql" not in item:
+                    raise ValueError(
+                        f"Each query in {query_file} must have a key "
+                        f"`sparql`"
+                    )
+                entries.append(
+                    (
+                        str(item.get("query", "")),
+                        " ".join(str(item["sparql"]).split()),
+                        item.get(value_key, default_value),
+                    )
+                )
+        else:
+            for line in file:
+                line = line.rstrip("\n")
+                if not line.strip():
+                    continue
+                description, _, query = line.partition("\t")
+                if not query:
+                    description, query = "", description
+                entries.append(
+                    (description, " ".join(query.split()), default_value)
+                )
+    return entries
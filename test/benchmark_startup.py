@@ -0,0 +1,82 @@
+"""
+Measure the startup time of the `qlever` command line tool: `qlever --help`,
+TAB completion of the command names and of the options of a command, and
+`qlever status`. Each is run several times in a fresh process, the minimum
+and the median wall-clock time are reported.
+
+Usage: python test/benchmark_startup.py [--qlever PATH] [--runs N]
+
+Run it in a directory with a Qleverfile to include the time for reading the
+Qleverfile.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import time
+
+# The invocations to measure, as (description, arguments, COMP_LINE), where
+# COMP_LINE is set for TAB completion.
+INVOCATIONS = [
+    ("qlever --help", ["--help"], None),
+    ("TAB completion of `qlever sta`", [], "qlever sta"),
+    ("TAB completion of `qlever start --`", [], "qlever start --"),
+    ("qlever status", ["status"], None),
+]
+
+
+def measure(qlever: str, args: list[str], comp_line: str | None) -> float:
+    """
+    Run `qlever` once and return the wall-clock time in seconds.
+    """
+    env = dict(os.environ, QLEVER_ARGCOMPLETE_CHECK_OFF="1")
+    if comp_line is not None:
+        env.update(
+            _ARGCOMPLETE="1",
+            _ARGCOMPLETE_STDOUT_FILENAME=os.devnull,
+            COMP_LINE=comp_line,
+            COMP_POINT=str(len(comp_line)),
+            COMP_TYPE="9",
+        )
+    start_time = time.perf_counter()
+    subprocess.run(
+        [qlever, *args],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - start_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--qlever",
+        default=shutil.which("qlever"),
+        help="Path of the `qlever` script (default: the one on the PATH)",
+    )
+    parser.add_argument(
+        "--runs", type=int, default=10, help="Number of runs (default: 10)"
+    )
+    args = parser.parse_args()
+    if args.qlever is None:
+        parser.error("`qlever` is not on the PATH, use --qlever")
+
+    print(f"{'':<36} {'min':>8} {'median':>8}")
+    for description, qlever_args, comp_line in INVOCATIONS:
+        times = [
+            1000 * measure(args.qlever, qlever_args, comp_line)
+            for _ in range(args.runs)
+        ]
+        print(
+            f"{description:<36} {min(times):6.0f}ms "
+            f"{statistics.median(times):6.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
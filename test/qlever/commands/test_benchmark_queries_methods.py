@@ -186,3 +186,33 @@ def test_single_int_result_failure(mock_command):
 
     run_cmd_mock.assert_called_once()
     assert single_int_result is None
+
+
+def test_get_percentile():
+    times = [float(t) for t in range(1, 101)]
+    assert BenchmarkQueriesCommand.get_percentile(times, 50) == 50.0
+    assert BenchmarkQueriesCommand.get_percentile(times, 99) == 99.0
+    assert BenchmarkQueriesCommand.get_percentile([3.0], 95) == 3.0
+
+
+def test_show_comparison(tmp_path, mock_command):
+    mock_log = mock_command(MODULE, "log")
+    earlier = tmp_path / "test.numa.results.yaml"
+    earlier.write_text(
+        "queries:\n"
+        "  - query: q1\n"
+        "    result_size: 1\n"
+        "    runtime_info: {client_time: 1.0}\n"
+        "  - query: q2\n"
+        "    result_size: 1\n"
+        "    runtime_info: {client_time: 4.0}\n"
+        "  - query: q3\n"
+        "    runtime_info: {client_time: 0.1}\n"
+    )
+    bc = BenchmarkQueriesCommand()
+    assert bc.show_comparison({"q1": 1.0, "q2": 2.0, "q3": 1.0}, earlier)
+    lines = [call.args[0] for call in mock_log.info.call_args_list]
+    assert "(2 queries in common)" in lines[0]
+    assert any(line.startswith("MAX") and "-50%" in line for line in lines)
+    assert not bc.show_comparison({"q3": 1.0}, earlier)
+    assert not bc.show_comparison({"q1": 1.0}, tmp_path / "missing.yaml")
@@ -25,6 +25,7 @@ class TestCacheStatsCommand(unittest.TestCase):
         args.port = 1234
         args.show = False
         args.detailed = False
+        args.watch = None
 
         # Mock `subprocess.check_output` and `json.loads` as encoded bytes
         mock_check_output.side_effect = [
@@ -80,6 +81,7 @@ class TestCacheStatsCommand(unittest.TestCase):
         args.sparql_endpoint = "http://testlocalhost:1234"
         args.show = False
         args.detailed = True
+        args.watch = None
 
         # Mock the responses from `subprocess.check_output` and `json.loads`
         mock_check_output.side_effect = [
@@ -130,6 +132,7 @@ class TestCacheStatsCommand(unittest.TestCase):
         args.sparql_endpoint = "http://testlocalhost:1234"
         args.show = False
         args.detailed = False
+        args.watch = None
 
         # Simulate a command execution failure
         mock_check_output.side_effect = Exception("Mocked command failure")
@@ -157,6 +160,7 @@ class TestCacheStatsCommand(unittest.TestCase):
         args.port = 1234
         args.show = False
         args.detailed = False
+        args.watch = None
 
         # Mock the responses with invalid cache size format
         mock_check_output.side_effect = [
@@ -193,6 +197,7 @@ class TestCacheStatsCommand(unittest.TestCase):
         args.port = 1234
         args.show = False
         args.detailed = False
+        args.watch = None
 
         # Mock the responses with empty cache size
         mock_check_output.side_effect = [
@@ -1,9 +1,45 @@
 import argparse
+import csv
+import json
+import os
+import tempfile
 import unittest
+from unittest.mock import patch
 
 from qlever.commands.cache_stats import CacheStatsCommand
 
 
+def get_watch_args(**kwargs):
+    args = argparse.Namespace(
+        host_name="localhost",
+        port=7001,
+        sparql_endpoint=None,
+        detailed=False,
+        watch=0.01,
+        watch_endpoints=None,
+        watch_count=2,
+        watch_output=None,
+        show=False,
+    )
+    for key, value in kwargs.items():
+        setattr(args, key, value)
+    return args
+
+
+def get_sample(endpoint, time, unpinned_entries, unpinned_size):
+    return {
+        "time": time,
+        "endpoint": endpoint,
+        "pinned_entries": 0,
+        "unpinned_entries": unpinned_entries,
+        "pinned_size": 0,
+        "unpinned_size": unpinned_size,
+        "max_size": 10**9,
+        "hits": None,
+        "misses": None,
+    }
+
+
 class TestStartCommand(unittest.TestCase):
     def test_description(self):
         self.assertEqual(
@@ -51,3 +87,50 @@ class TestStartCommand(unittest.TestCase):
         self.assertEqual(
             "Show detailed statistics and settings", argument_help
         )
+
+    @patch("qlever.commands.cache_stats.CacheStatsClient.sample")
+    def test_execute_watch_jsonl(self, mock_sample):
+        # Two endpoints, two rounds: the second sample of each endpoint has
+        # the deltas to the first one.
+        mock_sample.side_effect = [
+            get_sample("a:1", 1.0, 10, 1000),
+            get_sample("b:2", 1.0, 0, 0),
+            get_sample("a:1", 2.0, 12, 3000),
+            get_sample("b:2", 2.0, 1, 500),
+        ]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output = os.path.join(tmp_dir, "samples.jsonl")
+            args = get_watch_args(
+                watch_endpoints="a:1,b:2", watch_output=output
+            )
+            self.assertTrue(CacheStatsCommand().execute(args))
+            with open(output) as jsonl_file:
+                records = [json.loads(line) for line in jsonl_file]
+        self.assertEqual(len(records), 4)
+        self.assertNotIn("delta_size", records[0])
+        self.assertEqual(records[2]["endpoint"], "a:1")
+        self.assertEqual(records[2]["delta_unpinned_entries"], 2)
+        self.assertEqual(records[2]["delta_size"], 2000)
+        self.assertEqual(records[3]["delta_size"], 500)
+
+    @patch("qlever.commands.cache_stats.CacheStatsClient.sample")
+    def test_execute_watch_csv_and_failures(self, mock_sample):
+        # A failed sample is reported, the next sample has no deltas.
+        mock_sample.side_effect = [
+            get_sample("localhost:7001", 1.0, 10, 1000),
+            Exception("Connection refused"),
+            get_sample("localhost:7001", 3.0, 11, 1500),
+        ]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output = os.path.join(tmp_dir, "samples.csv")
+            args = get_watch_args(watch_count=3, watch_output=output)
+            self.assertTrue(CacheStatsCommand().execute(args))
+            with open(output, newline="") as csv_file:
+                rows = list(csv.DictReader(csv_file))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1]["unpinned_entries"], "11")
+        self.assertEqual(rows[1]["delta_size"], "")
+
+    def test_execute_watch_invalid_interval(self):
+        args = get_watch_args(watch=0)
+        self.assertFalse(CacheStatsCommand().execute(args))
@@ -26,6 +26,10 @@ class TestIndexCommand(unittest.TestCase):
     ):
         # Setup args
         args = MagicMock()
+        args.preflight = False
+        args.auto_tune = False
+        args.split_input = None
+        args.profile_interval = 0
         args.name = "TestName"
         args.format = "turtle"
         args.cat_input_files = "cat input.nt"
@@ -44,6 +48,8 @@ class TestIndexCommand(unittest.TestCase):
         args.vocabulary_type = "on-disk-compressed"
         args.index_container = "test_container"
         args.image = "test_image"
+        args.cpuset_cpus = None
+        args.cpuset_mems = None
         args.multi_input_json = False
         args.ulimit = None
         args.encode_as_id = None
@@ -109,6 +115,10 @@ class TestIndexCommand(unittest.TestCase):
     ):
         # Setup args
         args = MagicMock()
+        args.preflight = False
+        args.auto_tune = False
+        args.split_input = None
+        args.profile_interval = 0
         args.name = "TestName"
         args.format = "turtle"
         args.cat_input_files = "cat input.nt"
@@ -125,6 +135,8 @@ class TestIndexCommand(unittest.TestCase):
         args.overwrite_existing = False
         args.index_container = "test_container"
         args.image = "test_image"
+        args.cpuset_cpus = None
+        args.cpuset_mems = None
         args.multi_input_json = False
 
         # Mock glob, get_total_file_size, get_existing_index_files,
@@ -171,6 +183,10 @@ class TestIndexCommand(unittest.TestCase):
     ):
         # Setup args
         args = MagicMock()
+        args.preflight = False
+        args.auto_tune = False
+        args.split_input = None
+        args.profile_interval = 0
         args.name = "TestName"
         args.format = "turtle"
         args.cat_input_files = "cat input.nt"
@@ -187,6 +203,8 @@ class TestIndexCommand(unittest.TestCase):
         args.overwrite_existing = False
         args.index_container = "test_container"
         args.image = "test_image"
+        args.cpuset_cpus = None
+        args.cpuset_mems = None
         args.multi_input_json = False
 
         # Mock glob, get_total_file_size, get_existing_index_files,
@@ -235,6 +253,10 @@ class TestIndexCommand(unittest.TestCase):
     ):
         # Setup args
         args = MagicMock()
+        args.preflight = False
+        args.auto_tune = False
+        args.split_input = None
+        args.profile_interval = 0
         args.name = "TestName"
         args.format = "turtle"
         args.cat_input_files = "cat input.nt"
@@ -253,6 +275,8 @@ class TestIndexCommand(unittest.TestCase):
         args.vocabulary_type = "on-disk-compressed"
         args.index_container = "test_container"
         args.image = "test_image"
+        args.cpuset_cpus = None
+        args.cpuset_mems = None
         args.multi_input_json = False
         args.ulimit = None
         args.encode_as_id = None
@@ -291,6 +315,10 @@ class TestIndexCommand(unittest.TestCase):
     def test_execute_get_input_options_error(self, mock_json, mock_log):
         # Setup args
         args = MagicMock()
+        args.preflight = False
+        args.auto_tune = False
+        args.split_input = None
+        args.profile_interval = 0
         args.cat_input_files = False
         args.multi_input_json = '{"cmd": "test_data"}'
 
@@ -319,6 +347,10 @@ class TestIndexCommand(unittest.TestCase):
     def test_execute_cat_files_and_multi_json(self, mock_log):
         # Setup args
         args = MagicMock()
+        args.preflight = False
+        args.auto_tune = False
+        args.split_input = None
+        args.profile_interval = 0
         args.cat_input_files = True
         args.multi_input_json = True
 
@@ -349,6 +381,10 @@ class TestIndexCommand(unittest.TestCase):
     ):
         # Setup args
         args = MagicMock()
+        args.preflight = False
+        args.auto_tune = False
+        args.split_input = None
+        args.profile_interval = 0
         args.name = "TestName"
         args.index_binary = "/test/path/index-binary"
         args.multi_input_json = True
@@ -366,6 +402,8 @@ class TestIndexCommand(unittest.TestCase):
         args.ulimit = None
         args.encode_as_id = None
         args.parser_buffer_size = None
+        args.cpuset_cpus = None
+        args.cpuset_mems = None
 
         # Mock get_input_options_for_json
         mock_input_json.return_value = "test_input_stream"
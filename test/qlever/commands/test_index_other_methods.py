@@ -1,4 +1,7 @@
 import argparse
+import json
+import subprocess
+import tempfile
 import unittest
 from unittest.mock import MagicMock, patch
 
@@ -47,7 +50,14 @@ class TestIndexCommand(unittest.TestCase):
                     "stxxl_memory",
                     "parser_buffer_size",
                 ],
-                "runtime": ["system", "image", "index_container"],
+                "runtime": [
+                    "system",
+                    "image",
+                    "index_container",
+                    "cpuset_cpus",
+                    "cpuset_mems",
+                    "numa_memory_policy",
+                ],
             },
         )
 
@@ -63,9 +73,13 @@ class TestIndexCommand(unittest.TestCase):
 
         # Test that the default value for cmdline_regex is set correctly
         self.assertEqual(args.overwrite_existing, False)
+        self.assertEqual(args.preflight, False)
+        self.assertEqual(args.preflight_sample_size, "1G")
 
         # Test that the help text for cmdline_regex is correctly set
-        argument_help = subparser._group_actions[-1].help
+        argument_help = {
+            action.dest: action.help for action in subparser._group_actions
+        }["overwrite_existing"]
         self.assertEqual(
             argument_help,
             "Overwrite an existing index, " "think twice before using this",
@@ -197,7 +211,7 @@ class TestIndexCommand(unittest.TestCase):
         # Verify error mentions the missing `cmd` key
         self.assertEqual(
             "Element 0 in `MULTI_INPUT_JSON` must only "
-            "contain the keys `format`, `graph`, and `parallel`. "
+            "contain the keys `format`, `graph`, `parallel`, and `streams`. "
             "Contains extra keys {'test_key'}.",
             context.exception.error_message,
         )
@@ -206,3 +220,201 @@ class TestIndexCommand(unittest.TestCase):
             {"cmd": "test_data1", "test_key": "data2"},
             context.exception.additional_info,
         )
+
+    def test_get_input_options_for_json_streams(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for i, size in enumerate([300, 100, 100, 100, 100, 200]):
+                with open(f"{tmp_dir}/{i}.ttl.gz", "wb") as f:
+                    f.write(b"x" * size)
+            args = MagicMock()
+            args.multi_input_json = json.dumps(
+                {
+                    "cmd": "zcat {}",
+                    "for-each": f"{tmp_dir}/*.ttl.gz",
+                    "streams": 3,
+                }
+            )
+            partitioning = []
+
+            result = self.index_command.get_input_options_for_json(
+                args, partitioning
+            )
+
+            # Three streams of 300 bytes each, with the files in order.
+            self.assertEqual(
+                result,
+                f"-f <(zcat {tmp_dir}/0.ttl.gz) -g - -F {args.format} "
+                "-p false "
+                f"-f <(zcat {tmp_dir}/1.ttl.gz {tmp_dir}/2.ttl.gz "
+                f"{tmp_dir}/3.ttl.gz) -g - -F {args.format} -p false "
+                f"-f <(zcat {tmp_dir}/4.ttl.gz {tmp_dir}/5.ttl.gz) "
+                f"-g - -F {args.format} -p false",
+            )
+            self.assertEqual(len(partitioning), 1)
+            self.assertIn("6 files", partitioning[0])
+            self.assertIn("3 streams", partitioning[0])
+
+    def test_get_input_options_for_json_invalid_streams(self):
+        args = MagicMock()
+        args.multi_input_json = (
+            '[{"cmd": "zcat {}", "for-each": "*.gz", "streams": 0}]'
+        )
+        with self.assertRaises(IndexCommand.InvalidInputJson) as context:
+            self.index_command.get_input_options_for_json(args)
+        self.assertIn("positive integer", context.exception.error_message)
+
+        args.multi_input_json = '[{"cmd": "cat a.nt", "streams": 2}]'
+        with self.assertRaises(IndexCommand.InvalidInputJson) as context:
+            self.index_command.get_input_options_for_json(args)
+        self.assertIn("no key `for-each`", context.exception.error_message)
+
+    @patch("qlever.commands.index.resource")
+    @patch("qlever.commands.index.get_partition")
+    @patch("qlever.commands.index.psutil")
+    def test_auto_tune(self, mock_psutil, mock_get_partition, mock_resource):
+        mock_psutil.cpu_count.return_value = 8
+        mock_psutil.disk_usage.return_value.free = 10**12
+        mock_get_partition.return_value.fstype = "ext4"
+        mock_resource.getrlimit.return_value = (1024, 1048576)
+        args = argparse.Namespace(
+            memory_budget="10G",
+            input_files="",
+            settings_json='{"ascii-prefixes-only": true}',
+            cat_input_files="cat input.nt",
+            format="nt",
+            multi_input_json=None,
+            stxxl_memory=None,
+            parser_buffer_size=None,
+            parallel_parsing=None,
+            ulimit=None,
+        )
+
+        self.assertTrue(self.index_command.auto_tune(args))
+
+        # The memory-related settings are fractions of the memory budget.
+        self.assertEqual(args.stxxl_memory, "5G")
+        self.assertEqual(args.parser_buffer_size, "60M")
+        self.assertEqual(args.parallel_parsing, "true")
+        self.assertEqual(
+            json.loads(args.settings_json),
+            {"ascii-prefixes-only": True, "num-triples-per-batch": 100000},
+        )
+        # With no input files, there is no need to raise the file limit.
+        self.assertIsNone(args.ulimit)
+
+    @patch("qlever.commands.index.resource")
+    @patch("qlever.commands.index.get_partition")
+    @patch("qlever.commands.index.psutil")
+    def test_auto_tune_unlimited_open_files(
+        self, mock_psutil, mock_get_partition, mock_resource
+    ):
+        mock_psutil.cpu_count.return_value = 8
+        mock_psutil.disk_usage.return_value.free = 10**12
+        mock_get_partition.return_value.fstype = "ext4"
+        mock_resource.RLIM_INFINITY = -1
+        mock_resource.getrlimit.return_value = (-1, -1)
+        args = argparse.Namespace(
+            memory_budget="10G",
+            input_files="",
+            settings_json="{}",
+            cat_input_files="cat input.nt",
+            format="nt",
+            multi_input_json=None,
+            stxxl_memory=None,
+            parser_buffer_size=None,
+            parallel_parsing=None,
+            ulimit=None,
+        )
+
+        self.assertTrue(self.index_command.auto_tune(args))
+
+        # An unlimited number of open files is enough.
+        self.assertIsNone(args.ulimit)
+
+    @patch("qlever.commands.index.resource")
+    @patch("qlever.commands.index.get_partition")
+    @patch("qlever.commands.index.psutil")
+    def test_auto_tune_many_cores(
+        self, mock_psutil, mock_get_partition, mock_resource
+    ):
+        mock_psutil.cpu_count.return_value = 48
+        mock_psutil.disk_usage.return_value.free = 10**12
+        mock_get_partition.return_value.fstype = "ext4"
+        mock_resource.getrlimit.return_value = (1024, 1048576)
+        args = argparse.Namespace(
+            memory_budget="3G",
+            input_files="",
+            settings_json="{}",
+            cat_input_files="cat input.nt",
+            format="nt",
+            multi_input_json=None,
+            stxxl_memory=None,
+            parser_buffer_size=None,
+            parallel_parsing=None,
+            ulimit=None,
+        )
+
+        self.assertTrue(self.index_command.auto_tune(args))
+
+        # The parser buffers (96 x 10 MB) take more than 10% of the budget,
+        # which is subtracted from STXXL_MEMORY, so that the sum of the
+        # STXXL memory, the batches (30%), and the buffers fits the budget.
+        self.assertEqual(args.parser_buffer_size, "10M")
+        self.assertEqual(args.stxxl_memory, "1G")
+
+        # With even more cores, there is not enough left for STXXL.
+        mock_psutil.cpu_count.return_value = 128
+        self.assertFalse(self.index_command.auto_tune(args))
+
+    @patch("qlever.commands.index.psutil")
+    def test_auto_tune_memory_budget_too_small(self, mock_psutil):
+        args = argparse.Namespace(memory_budget="500M")
+        self.assertFalse(self.index_command.auto_tune(args))
+
+    def test_split_input_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            input_file = f"{tmp_dir}/input.nt"
+            lines = [f"<s{i}> <p> <o{i}> .\n" for i in range(100)]
+            with open(input_file, "w") as f:
+                f.writelines(lines)
+            args = argparse.Namespace(
+                split_input=3,
+                cat_input_files=f"cat {input_file}",
+                multi_input_json=None,
+                format="nt",
+                input_files=input_file,
+                system="native",
+            )
+
+            self.assertTrue(self.index_command.split_input_file(args))
+
+            # Three parallel streams that together yield the input file.
+            self.assertIsNone(args.cat_input_files)
+            streams = self.index_command.get_input_streams_for_json(args)
+            self.assertEqual(len(streams), 3)
+            self.assertTrue(all(s[1:] == ("nt", "-", "true") for s in streams))
+            output = "".join(
+                subprocess.run(
+                    s[0], shell=True, capture_output=True, text=True
+                ).stdout
+                for s in streams
+            )
+            self.assertEqual(output, "".join(lines))
+
+    def test_split_input_file_not_splittable(self):
+        args = argparse.Namespace(
+            split_input=3,
+            cat_input_files="zcat input.nt.gz",
+            multi_input_json=None,
+            format="ttl",
+            input_files="input.ttl.gz",
+            system="native",
+        )
+        self.assertFalse(self.index_command.split_input_file(args))
+        args.format = "nt"
+        with patch("qlever.commands.index.glob.glob") as mock_glob:
+            mock_glob.return_value = ["input.nt.gz"]
+            self.assertFalse(self.index_command.split_input_file(args))
+            mock_glob.return_value = ["a.nt", "b.nt"]
+            self.assertFalse(self.index_command.split_input_file(args))
+        self.assertEqual(args.cat_input_files, "zcat input.nt.gz")
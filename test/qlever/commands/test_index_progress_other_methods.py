@@ -0,0 +1,87 @@
+import argparse
+import unittest
+from datetime import datetime
+
+from qlever.commands.index_progress import (
+    IndexBuildProgress,
+    IndexProgressCommand,
+    format_duration,
+)
+
+INDEX_LOG_LINES = [
+    "2025-01-01 10:00:00.000 - INFO: QLever index builder\n",
+    "2025-01-01 10:00:01.000 - INFO: Processing triples from stdin\n",
+    "2025-01-01 10:01:01.000 - INFO: Triples parsed: 60,000,000 [...]\n",
+    "2025-01-01 10:02:01.000 - INFO: Triples parsed: 120,000,000 [...]\n",
+    "2025-01-01 10:02:30.000 - INFO: Merging partial vocabularies ...\n",
+    "2025-01-01 10:03:30.000 - INFO: Converting triples to global IDs\n",
+    "2025-01-01 10:05:00.000 - INFO: Creating permutations SPO and SOP\n",
+    "2025-01-01 10:06:00.000 - INFO: Creating permutations PSO and POS\n",
+    "2025-01-01 10:07:00.000 - INFO: Index build completed\n",
+]
+
+
+class TestIndexProgressCommand(unittest.TestCase):
+    def setUp(self):
+        self.command = IndexProgressCommand()
+
+    def test_format_duration(self):
+        self.assertEqual(format_duration(None), "?")
+        self.assertEqual(format_duration(59.6), "0:01:00")
+        self.assertEqual(format_duration(3 * 3600 + 62), "3:01:02")
+
+    def test_index_build_progress_completed(self):
+        progress = IndexBuildProgress()
+        for line in INDEX_LOG_LINES:
+            progress.add_line(line)
+        self.assertEqual(progress.end, datetime(2025, 1, 1, 10, 7))
+        self.assertEqual(progress.total_num_triples, 120_000_000)
+        self.assertEqual(
+            progress.phase_durations(),
+            {
+                "Parse input": 149.0,
+                "Build vocabularies": 60.0,
+                "Convert to global IDs": 90.0,
+                "Permutation SPO & SOP": 60.0,
+                "Permutation PSO & POS": 60.0,
+            },
+        )
+
+    def test_index_build_progress_with_partial_lines(self):
+        # The log is read while it is written, so a line can be split
+        # anywhere, also within a phase marker.
+        text = "".join(INDEX_LOG_LINES)
+        progress = IndexBuildProgress()
+        for i in range(0, len(text), 7):
+            progress.add_text(text[i : i + 7])
+        self.assertEqual(progress.end, datetime(2025, 1, 1, 10, 7))
+        self.assertEqual(len(progress.phases), 5)
+
+    def test_estimate_remaining_from_history(self):
+        progress = IndexBuildProgress()
+        for line in INDEX_LOG_LINES[:3]:
+            progress.add_line(line)
+        history = [
+            {
+                "num_triples": 120_000_000,
+                "phases": {"Parse input": 120.0, "Build vocabularies": 60.0},
+            }
+        ]
+        args = argparse.Namespace(num_triples=None)
+        elapsed, phase_remaining, total_remaining = (
+            self.command.estimate_remaining(progress, history, args)
+        )
+        # 60M triples in 60s, so another 60s for the remaining 60M triples.
+        self.assertEqual(elapsed, 60.0)
+        self.assertEqual(phase_remaining, 60.0)
+        self.assertEqual(total_remaining, 120.0)
+
+    def test_estimate_remaining_without_history(self):
+        progress = IndexBuildProgress()
+        for line in INDEX_LOG_LINES[:6]:
+            progress.add_line(line)
+        args = argparse.Namespace(num_triples=None)
+        self.assertEqual(
+            self.command.estimate_remaining(progress, [], args),
+            (0.0, None, None),
+        )
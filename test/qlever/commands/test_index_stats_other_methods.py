@@ -0,0 +1,143 @@
+import argparse
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from qlever.commands.index_stats import IndexStatsCommand
+from qlever.util import get_index_file_role, is_permutation_file
+
+INDEX_LOG_LINES = [
+    "2025-01-01 10:00:00.000 - INFO: Processing triples from stdin\n",
+    "2025-01-01 10:02:00.000 - INFO: Merging partial vocabularies ...\n",
+    "2025-01-01 10:03:00.000 - INFO: Converting triples to global IDs\n",
+    "2025-01-01 10:05:00.000 - INFO: Creating permutations SPO and SOP\n",
+    "2025-01-01 10:06:00.000 - INFO: Creating permutations PSO and POS\n",
+    "2025-01-01 10:06:30.000 - INFO: Index build completed\n",
+]
+
+
+class TestIndexStatsCommand(unittest.TestCase):
+    def setUp(self):
+        self.command = IndexStatsCommand()
+        self.args = argparse.Namespace(
+            name="test",
+            ignore_text_index=False,
+            time_unit="auto",
+            size_unit="auto",
+            space_details=False,
+        )
+        self.cwd = os.getcwd()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp_dir.name)
+        Path("test.index-log.txt").write_text("".join(INDEX_LOG_LINES))
+        Path("test.index.pso").write_bytes(b"x" * 300)
+        Path("test.vocabulary.internal").write_bytes(b"x" * 100)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp_dir.cleanup()
+
+    def test_get_stats(self):
+        stats = self.command.get_stats(self.args)
+        self.assertEqual(
+            stats["time"]["phases"],
+            {
+                "Parse input": 120,
+                "Build vocabularies": 60,
+                "Convert to global IDs": 120,
+                "Permutation SPO & SOP": 60,
+                "Permutation PSO & POS": 30,
+            },
+        )
+        self.assertEqual(
+            stats["time"]["permutations"], {"SPO & SOP": 60, "PSO & POS": 30}
+        )
+        self.assertEqual(stats["time"]["total"], 390)
+        self.assertEqual(
+            stats["space"],
+            {"index": 300, "vocabulary": 100, "text": 0, "total": 400},
+        )
+        self.assertIsNone(stats["text_index"])
+        self.assertIsNone(stats["resources"])
+
+    def test_get_stats_of_other_directory(self):
+        # An earlier build with a slower parse phase and no index log.
+        Path("previous.1").mkdir()
+        Path("previous.1/test.index-log.txt").write_text(
+            "".join(INDEX_LOG_LINES).replace("10:02:00", "10:01:00")
+        )
+        other_stats = self.command.get_stats(self.args, "previous.1")
+        self.assertEqual(other_stats["time"]["phases"]["Parse input"], 60)
+        self.assertEqual(other_stats["space"]["total"], 0)
+        Path("previous.2").mkdir()
+        self.assertIsNone(
+            self.command.get_stats(self.args, "previous.2")["time"]
+        )
+
+        comparison = self.command.get_comparison(
+            self.command.get_stats(self.args), other_stats
+        )
+        self.assertEqual(
+            comparison["time"]["Parse input"],
+            {"this": 120, "other": 60, "delta": 60},
+        )
+        self.assertEqual(
+            comparison["time"]["Build vocabularies"],
+            {"this": 60, "other": 120, "delta": -60},
+        )
+        self.assertEqual(comparison["time"]["TOTAL time"]["delta"], 0)
+        self.assertEqual(
+            comparison["space"]["index"],
+            {"this": 300, "other": 0, "delta": 300},
+        )
+
+    def test_get_index_file_role(self):
+        for file_name, role in [
+            ("test.index.pso", "Permutation PSO"),
+            ("test.index.pso.meta", "Permutation PSO"),
+            ("test.internal.index.ops", "Internal permutation OPS"),
+            ("test.index.patterns", "Patterns"),
+            ("test.vocabulary.internal", "Vocabulary (internal)"),
+            ("test.vocabulary.words.idx", "Vocabulary (other)"),
+            ("test.text.index", "Text index"),
+            ("test.meta-data.json", "Metadata"),
+            ("test.index.foo", "Other"),
+        ]:
+            self.assertEqual(get_index_file_role("test", file_name), role)
+
+    def test_is_permutation_file(self):
+        for file_name, is_permutation in [
+            ("test.index.pso", True),
+            ("test.index.pso.meta", True),
+            ("test.internal.index.ops", True),
+            ("test.index.patterns", False),
+            ("test.text.index", False),
+            ("test.vocabulary.permutation", False),
+        ]:
+            self.assertEqual(
+                is_permutation_file("test", file_name), is_permutation
+            )
+
+    def test_get_space_details(self):
+        Path("test.index.pso.meta").write_bytes(b"x" * 100)
+        Path("test.meta-data.json").write_text(
+            '{"num-triples": {"normal": 8}}'
+        )
+        details = self.command.get_space_details(self.args)
+        self.assertEqual(details["num_triples"], 8)
+        self.assertEqual(
+            [file["file"] for file in details["files"]],
+            [
+                "test.index.pso",
+                "test.index.pso.meta",
+                "test.meta-data.json",
+                "test.vocabulary.internal",
+            ],
+        )
+        permutation = details["roles"]["Permutation PSO"]
+        self.assertEqual(permutation["apparent"], 400)
+        self.assertEqual(permutation["bytes_per_triple"], 50)
+        self.assertIsNone(
+            details["roles"]["Vocabulary (internal)"]["bytes_per_triple"]
+        )
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import os
+import tempfile
 import unittest
+from pathlib import Path
 from unittest.mock import MagicMock, call, patch
 
 from qlever.commands.log import LogCommand
@@ -17,6 +20,7 @@ class TestLogCommand(unittest.TestCase):
         args.from_beginning = True
         args.no_follow = False
         args.show = False
+        args.server_port = None
 
         # Instantiate LogCommand and execute the function
         result = LogCommand().execute(args)
@@ -50,6 +54,7 @@ class TestLogCommand(unittest.TestCase):
         args.from_beginning = False
         args.no_follow = True
         args.show = False
+        args.server_port = None
         args.tail_num_lines = 50
         # Instantiate LogCommand and execute the function
         result = LogCommand().execute(args)
@@ -80,6 +85,7 @@ class TestLogCommand(unittest.TestCase):
         args.from_beginning = True
         args.no_follow = True
         args.show = True
+        args.server_port = None
         # Instantiate LogCommand and execute the function
         result = LogCommand().execute(args)
 
@@ -103,6 +109,7 @@ class TestLogCommand(unittest.TestCase):
         args.from_beginning = False
         args.no_follow = True
         args.show = False
+        args.server_port = None
         args.tail_num_lines = 50
 
         # Assertions
@@ -132,3 +139,61 @@ class TestLogCommand(unittest.TestCase):
         mock_log.error.assert_called_once_with(error_msg)
 
         assert not result
+
+    @patch("subprocess.run")
+    @patch("qlever.commands.log.log")
+    # tests that the log file written last is shown (after a switchover)
+    def test_execute_after_switchover(self, mock_log, mock_run):
+        args = MagicMock()
+        args.name = "TestName"
+        args.from_beginning = True
+        args.no_follow = True
+        args.show = False
+        args.server_port = None
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            os.chdir(tmp_dir)
+            try:
+                Path("TestName.server-log.txt").write_text("old")
+                Path("TestName.7002.server-log.txt").write_text("new")
+                os.utime("TestName.server-log.txt", (0, 0))
+                result = LogCommand().execute(args)
+            finally:
+                os.chdir(cwd)
+        mock_run.assert_called_once_with(
+            "tail -n +1 TestName.7002.server-log.txt", shell=True
+        )
+        assert result
+
+    @patch("subprocess.run")
+    @patch("qlever.commands.log.log")
+    # tests that the log file of the given port is shown (for example, of a
+    # replica of `qlever proxy`)
+    def test_execute_with_server_port(self, mock_log, mock_run):
+        args = MagicMock()
+        args.name = "TestName"
+        args.from_beginning = True
+        args.no_follow = True
+        args.show = False
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            os.chdir(tmp_dir)
+            try:
+                Path("TestName.server-log.txt").write_text("proxy port")
+                Path("TestName.7002.server-log.txt").write_text("replica 1")
+                Path("TestName.7003.server-log.txt").write_text("replica 2")
+                os.utime("TestName.7002.server-log.txt", (0, 0))
+                args.server_port = 7002
+                self.assertTrue(LogCommand().execute(args))
+                # The server on PORT has no port in its log file name.
+                args.server_port = 7001
+                self.assertTrue(LogCommand().execute(args))
+            finally:
+                os.chdir(cwd)
+        self.assertEqual(
+            mock_run.call_args_list,
+            [
+                call("tail -n +1 TestName.7002.server-log.txt", shell=True),
+                call("tail -n +1 TestName.server-log.txt", shell=True),
+            ],
+        )
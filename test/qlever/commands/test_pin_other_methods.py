@@ -0,0 +1,134 @@
+import argparse
+import json
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from qlever.commands.pin import PinCommand, read_pinned_queries
+
+
+def get_args(pinned_queries, **kwargs):
+    args = argparse.Namespace(
+        action="sync",
+        pinned_queries=pinned_queries,
+        cache_budget=None,
+        max_in_flight=1,
+        sparql_endpoint=None,
+        host_name="localhost",
+        port=7001,
+        access_token="abc",
+        show=False,
+    )
+    for key, value in kwargs.items():
+        setattr(args, key, value)
+    return args
+
+
+class TestPinCommand(unittest.TestCase):
+    def test_relevant_qleverfile_arguments(self):
+        self.assertEqual(
+            PinCommand().relevant_qleverfile_arguments(),
+            {
+                "server": [
+                    "host_name",
+                    "port",
+                    "access_token",
+                    "pinned_queries",
+                ]
+            },
+        )
+
+    def test_read_pinned_queries_tsv(self):
+        with TemporaryDirectory() as tmp_dir:
+            pinned_queries_file = Path(tmp_dir) / "pinned-queries.tsv"
+            pinned_queries_file.write_text(
+                "Q1\tSELECT * WHERE { ?s ?p ?o }\n"
+                "Q2\tASK  { ?s ?p ?o }\n"
+                "\n"
+                "Q3\tSELECT * WHERE { ?s ?p ?o }\n"
+            )
+            self.assertEqual(
+                read_pinned_queries(str(pinned_queries_file)),
+                [
+                    ("Q1", "SELECT * WHERE { ?s ?p ?o }"),
+                    ("Q2", "ASK { ?s ?p ?o }"),
+                ],
+            )
+
+    def test_read_pinned_queries_yaml(self):
+        with TemporaryDirectory() as tmp_dir:
+            pinned_queries_file = Path(tmp_dir) / "pinned-queries.yaml"
+            pinned_queries_file.write_text(
+                "queries:\n"
+                "  - query: low\n"
+                "    sparql: ASK { ?s ?p ?o }\n"
+                "  - query: high\n"
+                "    sparql: SELECT * WHERE { ?s ?p ?o }\n"
+                "    priority: 10\n"
+                "  - query: also low\n"
+                "    sparql: SELECT ?s WHERE { ?s ?p ?o }\n"
+            )
+            self.assertEqual(
+                [
+                    description
+                    for description, _ in read_pinned_queries(
+                        str(pinned_queries_file)
+                    )
+                ],
+                ["high", "low", "also low"],
+            )
+            pinned_queries_file.write_text("queries:\n  - query: x\n")
+            with self.assertRaises(ValueError):
+                read_pinned_queries(str(pinned_queries_file))
+
+    @patch("qlever.commands.warmup.run_command")
+    def test_execute_sync(self, mock_run_command):
+        # The first query is already pinned, the second one fails, the third
+        # one is pinned and uses up the budget of 1 KB, and the fourth one
+        # is skipped.
+        pinned = []
+
+        def run_command(cmd, return_output=False):
+            if "cmd=cache-stats" in cmd:
+                return json.dumps({"cache-size-pinned": 1024 * len(pinned)})
+            if "cmd=get-settings" in cmd:
+                return json.dumps({"cache-max-size": "1 GB"})
+            assert "pin-result=true" in cmd and "access-token=abc" in cmd
+            if "FAIL" in cmd:
+                return json.dumps({"exception": "Parse error"})
+            cache_status = "cached_pinned" if "ASK" in cmd else "computed"
+            if cache_status == "computed":
+                pinned.append(cmd)
+            return json.dumps(
+                {
+                    "resultsize": 42,
+                    "runtimeInformation": {
+                        "query_execution_tree": {"cache_status": cache_status}
+                    },
+                }
+            )
+
+        mock_run_command.side_effect = run_command
+        with TemporaryDirectory() as tmp_dir:
+            pinned_queries_file = Path(tmp_dir) / "pinned-queries.tsv"
+            pinned_queries_file.write_text(
+                "Q1\tASK { ?s ?p ?o }\n"
+                "Q2\tFAIL\n"
+                "Q3\tSELECT * WHERE { ?s ?p ?o }\n"
+                "Q4\tSELECT ?s WHERE { ?s ?p ?o }\n"
+            )
+            args = get_args(str(pinned_queries_file), cache_budget="1K")
+            with self.assertLogs("qlever", level="INFO") as logs:
+                self.assertTrue(PinCommand().execute(args))
+        self.assertEqual(len(pinned), 1)
+        self.assertIn("SELECT * WHERE", pinned[0])
+        output = "\n".join(logs.output)
+        self.assertIn("already pinned", output)
+        self.assertIn("FAILED: Parse error", output)
+        self.assertIn("skipped (budget)", output)
+        self.assertIn("Pinned 1 of 4 queries", output)
+        self.assertIn("(1 already pinned, 1 failed, 1 skipped)", output)
+
+    def test_execute_without_pinned_queries(self):
+        self.assertFalse(PinCommand().execute(get_args(None)))
@@ -0,0 +1,70 @@
+import argparse
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from qlever.commands.prewarm import DEFAULT_PREWARM_FILES, PrewarmCommand
+
+
+class TestPrewarmCommand(unittest.TestCase):
+    def setUp(self):
+        self.command = PrewarmCommand()
+        self.cwd = os.getcwd()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp_dir.name)
+        for file_name, size in [
+            ("test.index.spo", 100),
+            ("test.index.pso", 300),
+            ("test.index.pso.meta", 10),
+            ("test.vocabulary.internal", 200),
+            ("test.vocabulary.external", 50),
+            ("other.index.pso", 1000),
+        ]:
+            Path(file_name).write_bytes(b"x" * size)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp_dir.cleanup()
+
+    def get_args(self, **kwargs):
+        args = argparse.Namespace(
+            name="test",
+            files=DEFAULT_PREWARM_FILES,
+            memory_budget=None,
+            parallel_reads=2,
+            method="read",
+            show=False,
+        )
+        for key, value in kwargs.items():
+            setattr(args, key, value)
+        return args
+
+    def test_get_prewarm_files_in_order_of_priority(self):
+        self.assertEqual(
+            self.command.get_prewarm_files(self.get_args()),
+            [
+                ("test.index.pso", 300),
+                ("test.index.pso.meta", 10),
+                ("test.vocabulary.internal", 200),
+                ("test.index.spo", 100),
+                ("test.vocabulary.external", 50),
+            ],
+        )
+
+    def test_get_prewarm_files_with_memory_budget(self):
+        self.assertEqual(
+            self.command.get_prewarm_files(
+                self.get_args(memory_budget="400", files="vocabulary.* *")
+            ),
+            [
+                ("test.vocabulary.external", 50),
+                ("test.vocabulary.internal", 200),
+                ("test.index.pso", 150),
+            ],
+        )
+
+    def test_execute(self):
+        for method in ["read", "willneed"]:
+            self.assertTrue(self.command.execute(self.get_args(method=method)))
+        self.assertTrue(self.command.execute(self.get_args(name="none")))
@@ -0,0 +1,131 @@
+import argparse
+import io
+import json
+import unittest
+from unittest.mock import patch
+
+from qlever.commands.proxy import ProxyCommand
+
+
+def get_args(**kwargs):
+    args = argparse.Namespace(
+        name="test",
+        host_name="localhost",
+        port=7001,
+        replicas=3,
+        first_replica_port=None,
+        routing="least-outstanding",
+        health_check_interval=5,
+        persist_updates=False,
+        status=False,
+        stop=False,
+        show=False,
+    )
+    for key, value in kwargs.items():
+        setattr(args, key, value)
+    return args
+
+
+class TestProxyCommand(unittest.TestCase):
+    def test_get_replica_ports(self):
+        pc = ProxyCommand()
+        self.assertEqual(
+            pc.get_replica_ports(get_args()), [7002, 7003, 7004]
+        )
+        args = get_args(replicas=2, first_replica_port=8000)
+        self.assertEqual(pc.get_replica_ports(args), [8000, 8001])
+
+    def test_additional_arguments(self):
+        parser = argparse.ArgumentParser()
+        ProxyCommand().additional_arguments(parser)
+        args = parser.parse_args([])
+        self.assertEqual(args.replicas, 2)
+        self.assertEqual(args.routing, "least-outstanding")
+        self.assertFalse(args.status)
+        self.assertFalse(args.stop)
+
+    @patch("qlever.commands.proxy.find_load_balancer", return_value=None)
+    def test_execute_show(self, mock_find_load_balancer):
+        with patch.object(ProxyCommand, "show") as mock_show:
+            self.assertTrue(
+                ProxyCommand().execute(get_args(show=True, routing="sticky"))
+            )
+        description = mock_show.call_args[0][0]
+        self.assertIn("Start 3 replicas", description)
+        self.assertIn(
+            "--backends 7002,7003,7004 --routing sticky", description
+        )
+
+    @patch("qlever.commands.proxy.StartCommand.execute")
+    @patch("qlever.commands.proxy.ping_server", return_value=False)
+    @patch("qlever.commands.proxy.find_load_balancer", return_value=None)
+    def test_execute_refuses_persist_updates(
+        self, mock_find_load_balancer, mock_ping_server, mock_start
+    ):
+        args = get_args(persist_updates=True)
+        self.assertFalse(ProxyCommand().execute(args))
+        mock_start.assert_not_called()
+
+    @patch("qlever.commands.proxy.StartCommand.execute")
+    @patch("qlever.commands.proxy.ping_server", return_value=True)
+    @patch("qlever.commands.proxy.find_load_balancer", return_value=None)
+    def test_execute_refuses_when_port_in_use(
+        self, mock_find_load_balancer, mock_ping_server, mock_start
+    ):
+        self.assertFalse(ProxyCommand().execute(get_args()))
+        mock_start.assert_not_called()
+
+    @patch("qlever.commands.proxy.find_load_balancer", return_value=None)
+    def test_execute_stop_without_proxy(self, mock_find_load_balancer):
+        self.assertFalse(ProxyCommand().execute(get_args(stop=True)))
+
+    @patch("qlever.commands.proxy.run_command")
+    @patch("qlever.commands.proxy.StartCommand")
+    @patch("qlever.commands.proxy.ping_server", side_effect=[False, True])
+    @patch("qlever.commands.proxy.find_load_balancer", return_value=None)
+    def test_execute_replicas_have_their_own_log(
+        self,
+        mock_find_load_balancer,
+        mock_ping_server,
+        mock_start_command,
+        mock_run_command,
+    ):
+        mock_start_command.return_value.execute.return_value = True
+        args = get_args(
+            replicas=2,
+            prewarm=False,
+            warmup_cmd=None,
+            warmup_workload=None,
+            server_container=None,
+            no_warmup=True,
+        )
+        self.assertTrue(ProxyCommand().execute(args))
+        self.assertEqual(
+            [
+                call.kwargs["server_log_file"]
+                for call in mock_start_command.call_args_list
+            ],
+            ["test.7002.server-log.txt", "test.7003.server-log.txt"],
+        )
+
+    @patch("qlever.commands.proxy.log")
+    @patch("qlever.commands.proxy.urllib.request.urlopen")
+    def test_show_status(self, mock_urlopen, mock_log):
+        status = {
+            "routing": "sticky",
+            "uptime": 60,
+            "backends": [
+                {
+                    "port": 7002,
+                    "healthy": True,
+                    "outstanding": 1,
+                    "requests": 10,
+                },
+            ],
+        }
+        mock_urlopen.return_value = io.BytesIO(json.dumps(status).encode())
+        self.assertTrue(ProxyCommand().show_status(get_args()))
+        self.assertIn(
+            "log: test.7002.server-log.txt",
+            mock_log.info.call_args_list[-1][0][0],
+        )
@@ -93,6 +93,8 @@ def test_wrap_command_in_container(mock_containerize_command):
     args.port = 1234
     args.system = "native"
     args.image = None
+    args.cpuset_cpus = "0-3"
+    args.cpuset_mems = "0"
 
     # Mock wrap_command_in_container
     mock_containerize_command.return_value = "Test_Container_Command"
@@ -112,6 +114,8 @@ def test_wrap_command_in_container(mock_containerize_command):
         volumes=[("$(pwd)", "/index")],
         ports=[(args.port, args.port)],
         working_directory="/index",
+        cpuset_cpus="0-3",
+        cpuset_mems="0",
     )
     # check start command was successfully returned
     start_command = "Test_Container_Command"
@@ -293,6 +297,7 @@ def test_set_text_description_exception(mock_log, mock_run_cmd):
 
 
 class TestStartCommand(unittest.TestCase):
+    @patch("qlever.commands.start.ServerStartupWatcher")
     @patch("qlever.commands.start.CacheStatsCommand.execute")
     @patch("qlever.commands.stop.StopCommand.execute", return_value=True)
     @patch("qlever.util.run_command")
@@ -311,9 +316,16 @@ class TestStartCommand(unittest.TestCase):
         mock_util_run_command,
         mock_stop,
         mock_cache_stats_command,
+        mock_startup_watcher,
     ):
         # Setup args
         args = MagicMock()
+        args.prewarm = False
+        args.auto_memory = False
+        args.cpuset_cpus = None
+        args.cpuset_mems = None
+        args.warmup_workload = None
+        args.pinned_queries = None
         args.kill_existing_with_same_port = True
         args.port = 1234
         args.server_binary = "/test/path/server_binary"
@@ -346,6 +358,9 @@ class TestStartCommand(unittest.TestCase):
         # Mock Popen
         mock_popen.return_value = MagicMock()
 
+        # Mock that the server becomes ready
+        mock_startup_watcher.return_value.wait.return_value = "ready"
+
         # Instantiate the StartCommand
         sc = StartCommand()
 
@@ -381,7 +396,7 @@ class TestStartCommand(unittest.TestCase):
 
         mock_util_run_command.assert_has_calls([call(run_call_1)])
         mock_start_run_command.assert_has_calls(
-            [call(run_call_2, use_popen=False)]
+            [call(f"{run_call_2} echo $!", return_output=True)]
         )
         # Ensure execution was successful
         self.assertTrue(result)
@@ -394,6 +409,12 @@ class TestStartCommand(unittest.TestCase):
     ):
         # Setup args
         args = MagicMock()
+        args.prewarm = False
+        args.auto_memory = False
+        args.cpuset_cpus = None
+        args.cpuset_mems = None
+        args.warmup_workload = None
+        args.pinned_queries = None
         args.kill_existing_with_same_port = False
         args.port = "localhorst"
         args.port = 1234
@@ -433,6 +454,7 @@ class TestStartCommand(unittest.TestCase):
         # The function should return False if the server is already running
         self.assertFalse(result)
 
+    @patch("qlever.commands.start.ServerStartupWatcher")
     @patch("qlever.commands.start.CacheStatsCommand.execute")
     @patch("qlever.util.run_command")
     @patch("qlever.commands.start.run_command")
@@ -449,9 +471,16 @@ class TestStartCommand(unittest.TestCase):
         mock_start_run_command,
         mock_util_run_command,
         mock_cache_stats_command,
+        mock_startup_watcher,
     ):
         # Setup args
         args = MagicMock()
+        args.prewarm = False
+        args.auto_memory = False
+        args.cpuset_cpus = None
+        args.cpuset_mems = None
+        args.warmup_workload = None
+        args.pinned_queries = None
         args.kill_existing_with_same_port = False
         args.port = 1234
         args.server_binary = "/test/path/server_binary"
@@ -480,6 +509,9 @@ class TestStartCommand(unittest.TestCase):
         # Mock sleep
         mock_sleep.return_value = None
 
+        # Mock that the server becomes ready
+        mock_startup_watcher.return_value.wait.return_value = "ready"
+
         # Instantiate the StartCommand
         sc = StartCommand()
 
@@ -495,6 +527,7 @@ class TestStartCommand(unittest.TestCase):
         # Ensure execution was successful
         self.assertTrue(result)
 
+    @patch("qlever.commands.start.ServerStartupWatcher")
     @patch("qlever.commands.start.CacheStatsCommand.execute")
     @patch("qlever.util.run_command")
     @patch("qlever.commands.start.run_command")
@@ -511,9 +544,16 @@ class TestStartCommand(unittest.TestCase):
         mock_start_run_command,
         mock_util_run_command,
         mock_cache_stats_command,
+        mock_startup_watcher,
     ):
         # Setup args
         args = MagicMock()
+        args.prewarm = False
+        args.auto_memory = False
+        args.cpuset_cpus = None
+        args.cpuset_mems = None
+        args.warmup_workload = None
+        args.pinned_queries = None
         args.kill_existing_with_same_port = False
         args.port = 1234
         args.server_binary = "/test/path/server_binary"
@@ -540,6 +580,9 @@ class TestStartCommand(unittest.TestCase):
         # Mock that no server is currently running
         mock_is_qlever_server_alive.side_effect = [False, True]
 
+        # Mock that the server becomes ready
+        mock_startup_watcher.return_value.wait.return_value = "ready"
+
         # Instantiate the StartCommand
         sc = StartCommand()
 
@@ -563,6 +606,7 @@ class TestStartCommand(unittest.TestCase):
         # Execution should succeed
         self.assertTrue(result)
 
+    @patch("qlever.commands.start.ServerStartupWatcher")
     @patch("qlever.commands.start.CacheStatsCommand.execute")
     @patch("qlever.commands.stop.StopCommand.execute", return_value=True)
     @patch("qlever.commands.start.run_command")
@@ -581,9 +625,16 @@ class TestStartCommand(unittest.TestCase):
         mock_run_command,
         mock_stop,
         mock_cache_stats_command,
+        mock_startup_watcher,
     ):
         # Setup args
         args = MagicMock()
+        args.prewarm = False
+        args.auto_memory = False
+        args.cpuset_cpus = None
+        args.cpuset_mems = None
+        args.warmup_workload = None
+        args.pinned_queries = None
         args.kill_existing_with_same_port = True
         args.port = 1234
         args.server_binary = "/test/path/server_binary"
@@ -621,6 +672,9 @@ class TestStartCommand(unittest.TestCase):
         # Mock Containerize
         mock_containerize.return_value = ["test1", "test2"]
 
+        # Mock that the server becomes ready
+        mock_startup_watcher.return_value.wait.return_value = "ready"
+
         # Instantiate the StartCommand
         sc = StartCommand()
 
@@ -667,6 +721,12 @@ class TestStartCommand(unittest.TestCase):
     def test_execute_show(self, mock_construct_cmd_line):
         # Setup args
         args = MagicMock()
+        args.prewarm = False
+        args.auto_memory = False
+        args.cpuset_cpus = None
+        args.cpuset_mems = None
+        args.warmup_workload = None
+        args.pinned_queries = None
         args.kill_existing_with_same_port = False
         args.system = None
         args.show = True
@@ -1,7 +1,8 @@
 import argparse
 import unittest
+from unittest.mock import MagicMock, patch
 
-from qlever.commands.start import StartCommand
+from qlever.commands.start import StartCommand, apply_auto_memory
 
 
 class TestStartCommand(unittest.TestCase):
@@ -43,8 +44,16 @@ class TestStartCommand(unittest.TestCase):
                     "use_patterns",
                     "use_text_index",
                     "warmup_cmd",
+                    "pinned_queries",
+                ],
+                "runtime": [
+                    "system",
+                    "image",
+                    "server_container",
+                    "cpuset_cpus",
+                    "cpuset_mems",
+                    "numa_memory_policy",
                 ],
-                "runtime": ["system", "image", "server_container"],
             },
         )
 
@@ -65,7 +74,8 @@ class TestStartCommand(unittest.TestCase):
 
         # Test that the help text for
         # --kill-existing-with-same-port is correctly set
-        argument_help = subparser._group_actions[-4].help
+        actions = {action.dest: action for action in subparser._group_actions}
+        argument_help = actions["kill_existing_with_same_port"].help
         self.assertEqual(
             argument_help,
             "If a QLever server is already running "
@@ -77,5 +87,39 @@ class TestStartCommand(unittest.TestCase):
         self.assertEqual(args.no_warmup, False)
 
         # Test that the help text for --no-warmup is correctly set
-        argument_help = subparser._group_actions[-3].help
+        argument_help = actions["no_warmup"].help
         self.assertEqual(argument_help, "Do not execute the warmup command")
+
+        # Test that prewarming the page cache is off by default
+        self.assertEqual(args.prewarm, False)
+        self.assertIsNone(args.prewarm_memory_budget)
+
+        # Test that no workload is pinned to the cache by default
+        self.assertIsNone(args.warmup_workload)
+        self.assertEqual(args.warmup_top_k, 100)
+
+    @patch("qlever.commands.start.log")
+    @patch("qlever.commands.start.get_index_resident_size")
+    @patch("qlever.commands.start.get_other_servers")
+    @patch("qlever.commands.start.get_memory_limit")
+    def test_apply_auto_memory_without_memory_left(
+        self,
+        mock_get_memory_limit,
+        mock_get_other_servers,
+        mock_get_index_resident_size,
+        mock_log,
+    ):
+        # The other servers reserve more memory than there is, so the budget
+        # is negative, and shown as such.
+        mock_get_memory_limit.return_value = (10 * 2**30, "cgroup")
+        mock_get_other_servers.return_value = [
+            {"pid": 1, "port": 7002, "rss": 0, "reserved": 14 * 2**30}
+        ]
+        mock_get_index_resident_size.return_value = 0
+        args = MagicMock()
+        args.port = 7001
+        self.assertFalse(apply_auto_memory(args))
+        lines = [call[0][0] for call in mock_log.info.call_args_list]
+        budget_line = next(line for line in lines if "Budget" in line)
+        self.assertTrue(budget_line.endswith("-5.00 GB"), budget_line)
+        mock_log.error.assert_called_once()
@@ -0,0 +1,142 @@
+import argparse
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from qlever.commands.supervise import SuperviseCommand
+
+
+def get_args(**kwargs):
+    args = argparse.Namespace(
+        name="test",
+        host_name="localhost",
+        port=7001,
+        access_token=None,
+        system="native",
+        server_container=None,
+        check_interval=10,
+        probe_query="SELECT * WHERE { ?s ?p ?o } LIMIT 1",
+        latency_threshold=5,
+        max_failed_checks=2,
+        max_rss=None,
+        on_max_rss="clear-cache",
+        restart_backoff=5,
+        max_restart_backoff=300,
+        max_restarts=3,
+        event_log=None,
+        show=False,
+    )
+    args.endpoint_url = "http://localhost:7001"
+    for key, value in kwargs.items():
+        setattr(args, key, value)
+    return args
+
+
+class TestSuperviseCommand(unittest.TestCase):
+    def setUp(self):
+        self.event_log = tempfile.NamedTemporaryFile(delete=False).name
+
+    def tearDown(self):
+        os.remove(self.event_log)
+
+    def read_events(self):
+        with open(self.event_log) as event_log:
+            return [json.loads(line)["event"] for line in event_log]
+
+    @patch("qlever.commands.supervise.probe_query")
+    @patch("qlever.commands.supervise.ping_server")
+    def test_check(self, mock_ping_server, mock_probe_query):
+        sc = SuperviseCommand()
+        mock_ping_server.return_value = True
+        mock_probe_query.return_value = (0.1, None)
+        self.assertIsNone(sc.check(get_args()))
+        mock_probe_query.return_value = (0.1, "Parse error\nat line 1")
+        self.assertEqual(
+            sc.check(get_args()), "Probe query failed: Parse error"
+        )
+        mock_probe_query.return_value = (6.0, None)
+        self.assertIn("took 6.0s", sc.check(get_args()))
+        mock_ping_server.return_value = False
+        self.assertEqual(sc.check(get_args()), "No response to /ping")
+
+    @patch("qlever.commands.supervise.run_command")
+    def test_get_server_rss_container(self, mock_run_command):
+        args = get_args(system="docker", server_container="qlever.server.x")
+        mock_run_command.return_value = "1.5GiB / 16GiB\n"
+        self.assertEqual(SuperviseCommand().get_server_rss(args), 3 << 29)
+        self.assertIn("qlever.server.x", mock_run_command.call_args[0][0])
+        mock_run_command.side_effect = Exception("No such container")
+        self.assertIsNone(SuperviseCommand().get_server_rss(args))
+
+    @patch("qlever.commands.supervise.time.sleep")
+    @patch("qlever.commands.supervise.SwitchoverCommand.stop_server")
+    @patch("qlever.commands.supervise.ping_server", return_value=False)
+    def test_execute_restarts_after_crash(
+        self, mock_ping_server, mock_stop_server, mock_sleep
+    ):
+        # Start the server, crash at the first check, restart after the
+        # backoff, then stop supervising at the next check.
+        mock_sleep.side_effect = [None, None, KeyboardInterrupt]
+        args = get_args(event_log=self.event_log)
+        with patch.object(
+            SuperviseCommand, "start_server", return_value=True
+        ) as mock_start_server, patch.object(
+            SuperviseCommand, "get_server_rss", return_value=None
+        ):
+            self.assertTrue(SuperviseCommand().execute(args))
+        self.assertEqual(mock_start_server.call_count, 2)
+        self.assertEqual(
+            [call[0][0] for call in mock_sleep.call_args_list], [10, 5, 10]
+        )
+        self.assertEqual(
+            self.read_events(), ["start", "crash", "restart", "start", "stop"]
+        )
+
+    @patch("qlever.commands.supervise.time.sleep")
+    @patch("qlever.commands.supervise.SwitchoverCommand.stop_server")
+    @patch("qlever.commands.supervise.ping_server", return_value=True)
+    def test_execute_gives_up_with_backoff(
+        self, mock_ping_server, mock_stop_server, mock_sleep
+    ):
+        # The server is adopted, hangs, and then never starts again.
+        args = get_args(event_log=self.event_log)
+        with patch.object(
+            SuperviseCommand, "start_server", return_value=False
+        ), patch.object(
+            SuperviseCommand, "get_server_rss", return_value=1 << 30
+        ), patch.object(
+            SuperviseCommand, "check", return_value="No response to /ping"
+        ):
+            self.assertFalse(SuperviseCommand().execute(args))
+        self.assertEqual(
+            [call[0][0] for call in mock_sleep.call_args_list],
+            [10, 10, 5, 10, 20],
+        )
+        self.assertEqual(mock_stop_server.call_count, 3)
+        events = self.read_events()
+        self.assertEqual(events[:5], ["adopt"] + ["check-failed"] * 2 + [
+            "hang",
+            "restart",
+        ])
+        self.assertEqual(events[-1], "give-up")
+
+    @patch("qlever.commands.supervise.time.sleep")
+    @patch("qlever.commands.supervise.ClearCacheCommand.execute")
+    @patch("qlever.commands.supervise.ping_server", return_value=True)
+    def test_execute_clears_cache_when_above_max_rss(
+        self, mock_ping_server, mock_clear_cache, mock_sleep
+    ):
+        mock_sleep.side_effect = [None, None, KeyboardInterrupt]
+        args = get_args(event_log=self.event_log, max_rss="1G")
+        rss_values = [2 << 30, 1 << 20, 1 << 20]
+        with patch.object(
+            SuperviseCommand, "get_server_rss", side_effect=rss_values
+        ), patch.object(SuperviseCommand, "check", return_value=None):
+            self.assertTrue(SuperviseCommand().execute(args))
+        mock_clear_cache.assert_called_once()
+        self.assertEqual(self.read_events()[:2], ["adopt", "memory"])
+
+    def test_execute_invalid_max_rss(self):
+        self.assertFalse(SuperviseCommand().execute(get_args(max_rss="lots")))
@@ -0,0 +1,131 @@
+import argparse
+import json
+import unittest
+from unittest.mock import MagicMock, patch
+
+from qlever.commands.start import StartCommand
+from qlever.commands.switchover import SwitchoverCommand
+
+
+def get_args(**kwargs):
+    args = argparse.Namespace(
+        name="test",
+        host_name="localhost",
+        port=7001,
+        server_container=None,
+        system="native",
+        alternate_ports=None,
+        switch_cmd=None,
+        health_check_queries=None,
+        health_check_sample=10,
+        drain_timeout=0,
+        stop_proxy=False,
+        show=False,
+    )
+    for key, value in kwargs.items():
+        setattr(args, key, value)
+    return args
+
+
+class TestSwitchoverCommand(unittest.TestCase):
+    def test_relevant_qleverfile_arguments(self):
+        self.assertEqual(
+            SwitchoverCommand().relevant_qleverfile_arguments(),
+            StartCommand().relevant_qleverfile_arguments(),
+        )
+
+    def test_get_server_container(self):
+        sc = SwitchoverCommand()
+        args = get_args()
+        self.assertEqual(
+            sc.get_server_container(args, 7001), "qlever.server.test"
+        )
+        self.assertEqual(
+            sc.get_server_container(args, 7002), "qlever.server.test.7002"
+        )
+        args.server_container = "my.server"
+        self.assertEqual(sc.get_server_container(args, 7003), "my.server.7003")
+
+    def test_get_server_log_file(self):
+        sc = SwitchoverCommand()
+        args = get_args()
+        self.assertEqual(
+            sc.get_server_log_file(args, 7001), "test.server-log.txt"
+        )
+        self.assertEqual(
+            sc.get_server_log_file(args, 7002), "test.7002.server-log.txt"
+        )
+
+    @patch("qlever.commands.switchover.run_command")
+    def test_health_check(self, mock_run_command):
+        sc = SwitchoverCommand()
+        mock_run_command.return_value = json.dumps({"resultsize": 1})
+        self.assertTrue(sc.health_check(get_args(), 7002))
+        self.assertIn("localhost:7002", mock_run_command.call_args[0][0])
+        mock_run_command.return_value = json.dumps({"exception": "Oops"})
+        self.assertFalse(sc.health_check(get_args(), 7002))
+        mock_run_command.side_effect = Exception("Connection refused")
+        self.assertFalse(sc.health_check(get_args(), 7002))
+
+    @patch("qlever.commands.switchover.find_switch_proxy", return_value=None)
+    @patch("qlever.commands.switchover.ping_server", return_value=True)
+    def test_execute_show(self, mock_ping_server, mock_find_switch_proxy):
+        args = get_args(show=True)
+        with patch.object(SwitchoverCommand, "show") as mock_show:
+            self.assertTrue(SwitchoverCommand().execute(args))
+        description = mock_show.call_args[0][0]
+        self.assertIn("Start a server on port 7002", description)
+        self.assertIn("start a proxy on port 7001", description)
+        self.assertIn("old server on port 7001", description)
+
+    @patch("qlever.commands.switchover.ping_server", return_value=True)
+    @patch("qlever.commands.switchover.read_backend_port", return_value=7002)
+    @patch("qlever.commands.switchover.find_switch_proxy")
+    def test_execute_alternates_ports_behind_proxy(
+        self, mock_find_switch_proxy, mock_read_backend_port, mock_ping
+    ):
+        mock_find_switch_proxy.return_value = (MagicMock(), "/tmp/backend")
+        args = get_args(show=True)
+        with patch.object(SwitchoverCommand, "show") as mock_show:
+            self.assertTrue(SwitchoverCommand().execute(args))
+        description = mock_show.call_args[0][0]
+        self.assertIn("Start a server on port 7003", description)
+        self.assertIn("Write 7003 to /tmp/backend", description)
+
+    def test_execute_invalid_alternate_ports(self):
+        for alternate_ports in ["7002", "7001,7002", "a,b"]:
+            args = get_args(alternate_ports=alternate_ports)
+            with patch(
+                "qlever.commands.switchover.find_switch_proxy",
+                return_value=None,
+            ):
+                self.assertFalse(SwitchoverCommand().execute(args))
+
+    @patch("qlever.commands.switchover.write_backend_port")
+    @patch("qlever.commands.switchover.StopCommand.execute")
+    @patch("qlever.commands.switchover.StartCommand.execute")
+    @patch("qlever.commands.switchover.ping_server", return_value=True)
+    @patch("qlever.commands.switchover.find_switch_proxy", return_value=None)
+    def test_execute_rolls_back_when_health_check_fails(
+        self,
+        mock_find_switch_proxy,
+        mock_ping_server,
+        mock_start,
+        mock_stop,
+        mock_write_backend_port,
+    ):
+        mock_start.return_value = True
+        mock_stop.return_value = True
+        with patch.object(
+            SwitchoverCommand, "health_check", return_value=False
+        ):
+            self.assertFalse(SwitchoverCommand().execute(get_args()))
+        # The new server was started on the alternate port and stopped again,
+        # and the traffic was not switched.
+        self.assertEqual(mock_start.call_args[0][0].port, 7002)
+        mock_stop.assert_called_once()
+        self.assertEqual(
+            mock_stop.call_args[0][0].cmdline_regex,
+            "^qlever-server.* -p 7002 ",
+        )
+        mock_write_backend_port.assert_not_called()
@@ -0,0 +1,127 @@
+import argparse
+import json
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from qlever.commands.warmup import WarmupCommand, read_workload
+
+
+class TestWarmupCommand(unittest.TestCase):
+    def test_relevant_qleverfile_arguments(self):
+        self.assertEqual(
+            WarmupCommand().relevant_qleverfile_arguments(),
+            {"server": ["host_name", "port", "access_token", "warmup_cmd"]},
+        )
+
+    def test_additional_arguments(self):
+        parser = argparse.ArgumentParser()
+        WarmupCommand().additional_arguments(parser)
+        args = parser.parse_args([])
+        self.assertIsNone(args.workload)
+        self.assertEqual(args.top_k, 100)
+        self.assertIsNone(args.cache_budget)
+        self.assertEqual(args.max_in_flight, 4)
+
+    def test_read_workload_tsv(self):
+        with TemporaryDirectory() as tmp_dir:
+            workload_file = Path(tmp_dir) / "log-queries.txt"
+            workload_file.write_text(
+                "Log extract, Query #1\tSELECT * WHERE { ?s ?p ?o }\n"
+                "Log extract, Query #2\tASK { ?s ?p ?o }\n"
+                "Log extract, Query #3\tASK  {  ?s ?p ?o }\n"
+                "\n"
+                "SELECT ?s WHERE { ?s ?p ?o }\n"
+            )
+            workload = read_workload(str(workload_file))
+        self.assertEqual(
+            workload,
+            [
+                ("Log extract, Query #2", "ASK { ?s ?p ?o }", 2),
+                ("Log extract, Query #1", "SELECT * WHERE { ?s ?p ?o }", 1),
+                ("", "SELECT ?s WHERE { ?s ?p ?o }", 1),
+            ],
+        )
+
+    def test_read_workload_yaml(self):
+        with TemporaryDirectory() as tmp_dir:
+            workload_file = Path(tmp_dir) / "queries.yml"
+            workload_file.write_text(
+                "queries:\n"
+                "  - query: all triples\n"
+                "    sparql: SELECT * WHERE { ?s ?p ?o }\n"
+                "  - query: ask\n"
+                "    sparql: ASK { ?s ?p ?o }\n"
+                "    count: 5\n"
+            )
+            workload = read_workload(str(workload_file))
+            self.assertEqual(
+                workload,
+                [
+                    ("ask", "ASK { ?s ?p ?o }", 5),
+                    ("all triples", "SELECT * WHERE { ?s ?p ?o }", 1),
+                ],
+            )
+            workload_file.write_text("queries: 42\n")
+            with self.assertRaises(ValueError):
+                read_workload(str(workload_file))
+
+    @patch("qlever.commands.warmup.run_command")
+    def test_execute_workload_stops_at_budget(self, mock_run_command):
+        # Each pinned query adds 1 KB to the pinned size, the budget is 2 KB,
+        # and only one query is in flight at a time.
+        pinned = []
+
+        def run_command(cmd, return_output=False):
+            if "cmd=cache-stats" in cmd:
+                return json.dumps({"cache-size-pinned": 1024 * len(pinned)})
+            if "cmd=get-settings" in cmd:
+                return json.dumps({"cache-max-size": "1 GB"})
+            assert "pin-result=true" in cmd and "access-token=abc" in cmd
+            if "FAIL" in cmd:
+                return json.dumps({"exception": "Parse error"})
+            pinned.append(cmd)
+            return json.dumps({"resultsize": 42})
+
+        mock_run_command.side_effect = run_command
+        with TemporaryDirectory() as tmp_dir:
+            workload_file = Path(tmp_dir) / "log-queries.txt"
+            workload_file.write_text(
+                "Q1\tASK { ?s ?p ?o }\n"
+                "Q1\tASK { ?s ?p ?o }\n"
+                "Q1\tASK { ?s ?p ?o }\n"
+                "Q2\tFAIL\n"
+                "Q2\tFAIL\n"
+                "Q3\tSELECT * WHERE { ?s ?p ?o }\n"
+                "Q4\tSELECT ?s WHERE { ?s ?p ?o }\n"
+            )
+            args = argparse.Namespace(
+                workload=str(workload_file),
+                top_k=10,
+                cache_budget="2K",
+                max_in_flight=1,
+                sparql_endpoint=None,
+                host_name="localhost",
+                port=7001,
+                access_token="abc",
+                show=False,
+            )
+            result = WarmupCommand().execute(args)
+        self.assertTrue(result)
+        # The first three queries were tried (one failed), the fourth was
+        # skipped because the budget was used up.
+        self.assertEqual(len(pinned), 2)
+        self.assertIn("ASK", pinned[0])
+        self.assertNotIn("?s WHERE", " ".join(pinned))
+
+    def test_execute_workload_missing_file(self):
+        args = argparse.Namespace(
+            workload="does-not-exist.tsv",
+            top_k=10,
+            cache_budget=None,
+            max_in_flight=1,
+            sparql_endpoint="localhost:7001",
+            show=False,
+        )
+        self.assertFalse(WarmupCommand().execute(args))
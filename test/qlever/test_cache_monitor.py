@@ -0,0 +1,96 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from qlever.cache_monitor import CacheStatsClient, compute_deltas
+
+
+def get_sample(**kwargs):
+    sample = {
+        "time": 100.0,
+        "endpoint": "localhost:7001",
+        "pinned_entries": 2,
+        "unpinned_entries": 10,
+        "pinned_size": 1000,
+        "unpinned_size": 5000,
+        "max_size": 10000,
+        "hits": None,
+        "misses": None,
+    }
+    sample.update(kwargs)
+    return sample
+
+
+def test_compute_deltas():
+    previous = get_sample()
+    current = get_sample(
+        time=110.0,
+        pinned_entries=3,
+        unpinned_entries=8,
+        pinned_size=2000,
+        unpinned_size=4000,
+    )
+    deltas = compute_deltas(previous, current)
+    assert deltas["seconds"] == 10.0
+    assert deltas["delta_pinned_entries"] == 1
+    assert deltas["delta_unpinned_entries"] == -2
+    assert deltas["delta_size"] == 0
+    assert deltas["size_churn"] == 2000
+    assert deltas["hit_rate"] is None
+
+    # With hits and misses.
+    previous = get_sample(hits=10, misses=10)
+    current = get_sample(time=110.0, hits=40, misses=20)
+    deltas = compute_deltas(previous, current)
+    assert (deltas["delta_hits"], deltas["delta_misses"]) == (30, 10)
+    assert deltas["hit_rate"] == 0.75
+
+
+def test_cache_stats_client_reuses_connection():
+    connections = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            connections.append(self.client_address)
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            if b"cache-stats" in body:
+                result = {
+                    "num-pinned-entries": 1,
+                    "num-non-pinned-entries": 5,
+                    "cache-size-pinned": 100,
+                    "cache-size-unpinned": 500,
+                    "num-cache-hits": 7,
+                    "num-cache-misses": 3,
+                }
+            else:
+                result = [{"cache-max-size": "1 GB"}]
+            data = json.dumps(result).encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("localhost", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        client = CacheStatsClient(f"localhost:{server.server_port}")
+        for _ in range(3):
+            sample = client.sample()
+        client.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert len(connections) == 1
+    assert sample["unpinned_entries"] == 5
+    # Like for `warmup`, `pin`, and `simulate-cache` (see `parse_size`).
+    assert sample["max_size"] == 1024**3
+    assert (sample["hits"], sample["misses"]) == (7, 3)
@@ -0,0 +1,181 @@
+import pytest
+
+from qlever.cache_simulator import (
+    CompiledWorkload,
+    format_cache_size,
+    get_default_cache_sizes,
+    get_profile,
+    read_query_sequence,
+    recommend_cache_settings,
+    simulate_cache,
+)
+
+MB = 1 << 20
+
+
+def node(key, size, seconds, children=()):
+    return {
+        "key": key,
+        "description": key,
+        "size": size,
+        "seconds": seconds,
+        "children": list(children),
+    }
+
+
+# Two queries that share the subresult `scan`, and a query with a large
+# result.
+PROFILES = {
+    "q1": node("join1", 2 * MB, 3.0, [node("scan", 4 * MB, 1.0)]),
+    "q2": node("join2", 1 * MB, 2.0, [node("scan", 4 * MB, 1.0)]),
+    "big": node("big", 64 * MB, 10.0),
+}
+
+
+def test_read_query_sequence(tmp_path):
+    tsv_file = tmp_path / "log-queries.txt"
+    tsv_file.write_text("Q1\tSELECT  *\nQ2\tASK {}\n\nQ3\tSELECT *\n")
+    assert read_query_sequence(str(tsv_file)) == [
+        "SELECT *",
+        "ASK {}",
+        "SELECT *",
+    ]
+    yaml_file = tmp_path / "queries.yaml"
+    yaml_file.write_text(
+        "queries:\n"
+        "  - query: A\n    sparql: ASK {}\n    count: 2\n"
+        "  - query: B\n    sparql: SELECT *\n"
+    )
+    assert read_query_sequence(str(yaml_file)) == [
+        "ASK {}",
+        "ASK {}",
+        "SELECT *",
+    ]
+    yaml_file.write_text("queries: 42\n")
+    with pytest.raises(ValueError):
+        read_query_sequence(str(yaml_file))
+
+
+def test_get_profile():
+    tree = {
+        "description": "Join on ?x",
+        "result_rows": 1000,
+        "result_cols": 2,
+        "total_time": 500,
+        "cache_status": "computed",
+        "children": [
+            {
+                "description": "IndexScan ?x <p> ?y",
+                "result_rows": 10,
+                "result_cols": 3,
+                "total_time": 0,
+                "original_total_time": 200,
+                "cache_status": "cached_not_pinned",
+            }
+        ],
+    }
+    profile = get_profile(tree)
+    assert profile["size"] == 16000
+    assert profile["seconds"] == 0.5
+    assert profile["children"][0]["size"] == 240
+    assert profile["children"][0]["seconds"] == 0.2
+    # The key depends on the whole subtree.
+    other_tree = dict(tree, children=[dict(tree["children"][0])])
+    assert get_profile(other_tree)["key"] == profile["key"]
+    other_tree["children"][0]["description"] = "IndexScan ?x <q> ?y"
+    assert get_profile(other_tree)["key"] != profile["key"]
+
+
+def test_compiled_workload():
+    workload = CompiledWorkload(["q1", "q2", "unknown", "q1"], PROFILES)
+    assert workload.sequence == [0, 1, 0]
+    assert workload.entry_sizes == [2 * MB, 4 * MB, 1 * MB]
+    assert workload.query_nodes == [[0, 1], [2, 1]]
+    assert workload.query_subtree_sizes == [[2, 1], [2, 1]]
+    assert workload.total_size() == 7 * MB
+
+
+def test_simulate_cache():
+    workload = CompiledWorkload(["q1", "q2", "q1", "q2"], PROFILES)
+
+    # Everything fits: q2 reuses the scan of q1, and the repetitions are
+    # answered from the cache.
+    result = simulate_cache(workload, 100 * MB, 100 * MB)
+    assert result["num_queries"] == 4
+    assert result["query_hits"] == 2
+    assert result["hits"] == 3
+    assert result["lookups"] == 6
+    assert result["total_seconds"] == 10.0
+    assert result["saved_seconds"] == 6.0
+
+    # With 6 MB, the scan is shared, but the join results evict each other.
+    result = simulate_cache(workload, 6 * MB, 6 * MB)
+    assert result["query_hits"] == 0
+    assert result["hits"] == 3
+    assert result["saved_seconds"] == 3.0
+
+    # When the scan is too large for a single entry, the join results stay
+    # in the cache.
+    result = simulate_cache(workload, 6 * MB, 3 * MB)
+    assert result["query_hits"] == 2
+    assert result["saved_seconds"] == 5.0
+
+    # Nothing is reused with only 2 MB.
+    result = simulate_cache(workload, 2 * MB, 2 * MB)
+    assert result["hits"] == 0
+
+    # Only one entry in the cache.
+    result = simulate_cache(workload, 100 * MB, 100 * MB, max_num_entries=1)
+    assert result["query_hits"] == 0
+
+
+def test_simulate_cache_pinned():
+    workload = CompiledWorkload(["q1", "big", "q1"], PROFILES)
+    # Without pinning, the big result evicts the result of q1.
+    result = simulate_cache(workload, 64 * MB, 64 * MB)
+    assert result["query_hits"] == 0
+    # With q1 pinned, both occurrences of q1 are hits, and the big result is
+    # not cached at all.
+    result = simulate_cache(
+        workload, 64 * MB, 64 * MB, pinned_queries=["q1"]
+    )
+    assert result["query_hits"] == 2
+    assert result["saved_seconds"] == 6.0
+
+
+def test_get_default_cache_sizes():
+    assert get_default_cache_sizes(8 * MB, 4) == [
+        1 * MB,
+        2 * MB,
+        4 * MB,
+        8 * MB,
+    ]
+    assert get_default_cache_sizes(MB // 2, 3) == [MB]
+    assert get_default_cache_sizes(3 * MB + 1, 1) == [4 * MB]
+
+
+def test_format_cache_size():
+    assert format_cache_size(5 << 30) == "5G"
+    assert format_cache_size(1536 * MB) == "1536M"
+    assert format_cache_size(MB + 1) == "2M"
+    assert format_cache_size(0) == "1M"
+
+
+def test_recommend_cache_settings():
+    workload = CompiledWorkload(["q1", "big", "q1"], PROFILES)
+    results = [
+        simulate_cache(workload, size, size) for size in [4 * MB, 64 * MB]
+    ]
+    assert [result["saved_seconds"] for result in results] == [3.0, 0.0]
+    # The smallest size that saves enough time.
+    max_size, _, _ = recommend_cache_settings(workload, results)
+    assert max_size == 4 * MB
+    # With 64 MB, the big result evicts the result of q1, unless the single
+    # entries are limited (the smallest limit wins in case of a tie).
+    max_size, max_size_single_entry, result = recommend_cache_settings(
+        workload, results[1:]
+    )
+    assert max_size == 64 * MB
+    assert max_size_single_entry == 64 * MB // 20
+    assert result["query_hits"] == 1
+    assert result["saved_seconds"] == 3.0
@@ -0,0 +1,64 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import qlever
+from qlever import CommandRegistry
+from qlever.config import QleverConfig
+from qlever.qleverfile import Qleverfile
+
+
+def get_registry():
+    return CommandRegistry(Path(qlever.__file__).parent, "qlever")
+
+
+def test_descriptions_without_import():
+    # The description from the source of each module is the one that the
+    # command object returns.
+    registry = get_registry()
+    descriptions = {name: registry.description(name) for name in registry}
+    assert registry.command_objects == {}
+    assert "status" in descriptions and "start" in descriptions
+    for name, description in descriptions.items():
+        assert description == registry[name].description()
+
+
+def test_subparsers_for_all_commands():
+    # The relevant Qleverfile arguments and the additional arguments of each
+    # command can be added to a parser.
+    registry = get_registry()
+    subparsers = argparse.ArgumentParser().add_subparsers(dest="command")
+    all_args = Qleverfile.all_arguments()
+    for name in registry:
+        QleverConfig().add_subparser_for_command(
+            subparsers, name, registry[name], all_args
+        )
+
+
+def test_parse_args_imports_only_the_given_command():
+    code = (
+        "import json, sys\n"
+        "sys.argv = ['qlever', 'status', '--show']\n"
+        "from qlever import command_objects\n"
+        "from qlever.config import QleverConfig\n"
+        "args = QleverConfig().parse_args()\n"
+        "loaded = list(command_objects.command_objects)\n"
+        "print(json.dumps([args.command, loaded, 'rdflib' in sys.modules]))\n"
+    )
+    env = dict(
+        os.environ,
+        PYTHONPATH=str(Path(qlever.__file__).parent.parent),
+        QLEVER_ARGCOMPLETE_CHECK_OFF="1",
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+        cwd=Path(__file__).parent,
+    ).stdout
+    assert json.loads(output.splitlines()[-1]) == ["status", ["status"], False]
@@ -0,0 +1,47 @@
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from qlever.http_client import PersistentHttpClient
+
+
+def test_persistent_http_client_reconnects():
+    connections = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            connections.append(self.client_address)
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            params = urllib.parse.parse_qs(body.decode())
+            data = f"{params['query'][0]} {self.headers['Accept']}".encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(data)))
+            # Close the connection after the second request.
+            if len(connections) == 1 and params["query"][0] == "2":
+                self.send_header("Connection", "close")
+                self.close_connection = True
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("localhost", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        client = PersistentHttpClient(f"localhost:{server.server_port}")
+        results = [
+            client.post({"query": str(i)}, "text/plain") for i in range(4)
+        ]
+        client.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert results == [(200, f"{i} text/plain".encode()) for i in range(4)]
+    assert len(connections) == 2
@@ -0,0 +1,71 @@
+import json
+import subprocess
+from datetime import datetime
+
+from qlever.index_profile import (
+    IndexProfiler,
+    read_profile,
+    summarize_profile,
+)
+
+
+def test_index_profiler_samples_child_processes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "test.index.pso").write_bytes(b"x" * 1000)
+    profiler = IndexProfiler("test.index-profile.jsonl", "test", 0.05)
+    # The name of the index must not replace the name of the thread.
+    assert profiler.index_name == "test"
+    assert profiler.name.startswith("Thread-")
+    child = subprocess.Popen(["sleep", "1"])
+    try:
+        profiler.start()
+        profiler.stop_event.wait(0.3)
+        profiler.stop()
+    finally:
+        child.kill()
+        child.wait()
+    samples = read_profile("test.index-profile.jsonl")
+    assert len(samples) >= 2
+    assert all(sample["num_processes"] >= 1 for sample in samples)
+    assert all(sample["rss"] > 0 for sample in samples)
+    assert 0 < samples[0]["elapsed"] < samples[-1]["elapsed"] < 10
+    # The disk usage includes the profile itself, which grows.
+    assert all(sample["disk"] >= 1000 for sample in samples)
+
+
+def test_read_and_summarize_profile(tmp_path):
+    begin = datetime(2025, 1, 1, 12, 0, 0)
+    end = datetime(2025, 1, 1, 12, 0, 10)
+    profile_file = tmp_path / "test.index-profile.jsonl"
+    with open(profile_file, "w") as f:
+        for i, rss in enumerate([4, 2, 6]):
+            sample = {"time": begin.timestamp() + 4 * i, "rss": rss, "cpu": 1}
+            print(json.dumps(sample), file=f)
+        print('{"time": 12', file=f)
+    samples = read_profile(str(profile_file))
+    assert len(samples) == 3
+    summary = summarize_profile(samples, begin, end, begin)
+    assert summary["rss"] == (4, 6)
+    assert summary["cpu"] == (1, 1)
+    assert summary["iowait"] == (0, 0)
+    summary = summarize_profile(samples, end, end.replace(minute=1), begin)
+    assert summary is None
+
+
+def test_summarize_profile_in_other_timezone():
+    # The index log was written in UTC (for example, in a container), and the
+    # samples were taken on a host that is hours off, but both start at the
+    # same moment.
+    start = datetime(2025, 1, 1, 12, 0, 0)
+    host_start = start.timestamp() + 5 * 3600
+    samples = [
+        {"time": host_start + elapsed, "elapsed": elapsed, "rss": rss}
+        for elapsed, rss in [(1, 4), (5, 2), (9, 6), (15, 8)]
+    ]
+    phase_end = start.replace(second=10)
+    summary = summarize_profile(samples, start, phase_end, start)
+    assert summary["rss"] == (4, 6)
+    summary = summarize_profile(
+        samples, phase_end, start.replace(second=20), start
+    )
+    assert summary["rss"] == (8, 8)
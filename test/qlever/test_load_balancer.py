@@ -0,0 +1,179 @@
+import json
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.request import urlopen
+
+from qlever.load_balancer import (
+    MAX_BUFFERED_RESPONSE_SIZE,
+    LoadBalancer,
+    find_load_balancer,
+    get_request_params,
+    get_sticky_backend,
+    is_broadcast_request,
+)
+
+
+def test_get_request_params():
+    form = {"content-type": "application/x-www-form-urlencoded"}
+    assert get_request_params(
+        "/?query=ASK+%7B%7D", {}, b""
+    ) == {"query": "ASK {}"}
+    assert get_request_params(
+        "/", form, b"cmd=clear-cache&access-token=abc"
+    ) == {"cmd": "clear-cache", "access-token": "abc"}
+    assert get_request_params(
+        "/", {"content-type": "application/sparql-query"}, b"ASK {}"
+    ) == {"query": "ASK {}"}
+    assert get_request_params(
+        "/", {"content-type": "application/sparql-update"}, b"CLEAR ALL"
+    ) == {"update": "CLEAR ALL"}
+
+
+def test_is_broadcast_request():
+    assert not is_broadcast_request({"query": "ASK {}"})
+    assert is_broadcast_request({"query": "ASK {}", "pin-result": "true"})
+    assert is_broadcast_request({"cmd": "clear-cache"})
+    assert is_broadcast_request({"update": "CLEAR ALL"})
+    assert is_broadcast_request({"timeout": "60s", "access-token": "abc"})
+    assert not is_broadcast_request({"cmd": "stats"})
+    assert not is_broadcast_request({"cmd": "get-settings"})
+    assert not is_broadcast_request({})
+    assert not is_broadcast_request({"access-token": "abc"})
+
+
+def test_get_sticky_backend():
+    backends = [7001, 7002, 7003]
+    queries = [f"SELECT * WHERE {{ ?s ?p {i} }}" for i in range(100)]
+    choices = {query: get_sticky_backend(query, backends) for query in queries}
+    # Whitespace does not matter, and all backends get some queries.
+    assert get_sticky_backend("  " + queries[0] + "\n", backends) == (
+        choices[queries[0]]
+    )
+    assert set(choices.values()) == set(backends)
+    # When a backend is removed, only its queries move.
+    for query, backend in choices.items():
+        if backend != 7002:
+            assert get_sticky_backend(query, [7001, 7003]) == backend
+
+
+def test_choose_backend_least_outstanding():
+    load_balancer = LoadBalancer([7001, 7002, 7003])
+    load_balancer.outstanding = {7001: 2, 7002: 1, 7003: 1}
+    assert load_balancer.choose_backend({"query": "ASK {}"}) == 7002
+    load_balancer.healthy[7002] = False
+    assert load_balancer.choose_backend({"query": "ASK {}"}) == 7003
+    load_balancer.healthy = {7001: False, 7002: False, 7003: False}
+    assert load_balancer.choose_backend({"query": "ASK {}"}) is None
+
+
+def test_get_broadcast_failure():
+    load_balancer = LoadBalancer([7001, 7002])
+    ok = b"HTTP/1.1 200 OK\r\n\r\nok"
+    failed = b"HTTP/1.1 400 Bad Request\r\n\r\nfailed"
+    assert load_balancer.get_broadcast_failure([7001, 7002], [ok, ok]) is None
+    assert load_balancer.get_broadcast_failure(
+        [7001, 7002], [ok, failed]
+    ) == failed
+    assert "7001 failed: down" in load_balancer.get_broadcast_failure(
+        [7001, 7002], [OSError("down"), ok]
+    )
+    # A failed response that was cut is not forwarded.
+    message = load_balancer.get_broadcast_failure(
+        [7001], [failed + b"x" * MAX_BUFFERED_RESPONSE_SIZE]
+    )
+    assert "HTTP/1.1 400 Bad Request, the response is too large" in message
+
+
+def test_load_balancer_routes_and_broadcasts():
+    requests = []
+
+    def start_backend() -> HTTPServer:
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                requests.append((self.server.server_port, body.decode()))
+                self.send_response(200)
+                self.end_headers()
+                if "pin-result" in body.decode():
+                    # Larger than what the proxy buffers.
+                    self.wfile.write(b"x" * (MAX_BUFFERED_RESPONSE_SIZE + 1))
+                else:
+                    self.wfile.write(str(self.server.server_port).encode())
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(("localhost", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    backends = [start_backend(), start_backend()]
+    backend_ports = [backend.server_port for backend in backends]
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        port = sock.getsockname()[1]
+    proxy = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "qlever.load_balancer",
+            "--port",
+            str(port),
+            "--backends",
+            ",".join(str(backend_port) for backend_port in backend_ports),
+            "--routing",
+            "sticky",
+            "--health-check-interval",
+            "60",
+        ]
+    )
+
+    def post(params: dict) -> str:
+        data = urllib.parse.urlencode(params).encode()
+        with urlopen(f"http://localhost:{port}", data=data) as response:
+            return response.read().decode()
+
+    try:
+        for _ in range(100):
+            try:
+                urlopen(f"http://localhost:{port}/proxy-status").close()
+                break
+            except OSError:
+                time.sleep(0.05)
+        assert find_load_balancer(port)[1] == backend_ports
+
+        # The same query always goes to the same backend.
+        answers = {post({"query": "ASK { ?s ?p ?o }"}) for _ in range(5)}
+        assert len(answers) == 1
+
+        # Commands go to all backends.
+        requests.clear()
+        post({"cmd": "clear-cache"})
+        assert sorted(port for port, _ in requests) == sorted(backend_ports)
+
+        # Commands that only read the state go to one backend.
+        requests.clear()
+        post({"cmd": "stats"})
+        assert len(requests) == 1
+
+        # A large response of a request that goes to all backends is
+        # forwarded completely.
+        requests.clear()
+        answer = post({"query": "ASK { ?s ?p ?o }", "pin-result": "true"})
+        assert len(answer) == MAX_BUFFERED_RESPONSE_SIZE + 1
+        assert sorted(port for port, _ in requests) == sorted(backend_ports)
+
+        with urlopen(f"http://localhost:{port}/proxy-status") as response:
+            status = json.loads(response.read())
+        assert status["routing"] == "sticky"
+        assert [b["port"] for b in status["backends"]] == backend_ports
+    finally:
+        proxy.terminate()
+        proxy.wait()
+        for backend in backends:
+            backend.shutdown()
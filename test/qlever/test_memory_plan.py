@@ -0,0 +1,76 @@
+from unittest.mock import MagicMock, patch
+
+from qlever.memory_plan import (
+    format_memory_size,
+    get_index_resident_size,
+    get_other_servers,
+    plan_memory,
+)
+
+GB = 1 << 30
+
+
+def test_format_memory_size():
+    assert format_memory_size(5 * GB) == "5G"
+    assert format_memory_size(5 * GB + GB // 2) == "5G"
+    assert format_memory_size(GB // 2) == "512M"
+    assert format_memory_size(0) == "1M"
+
+
+def test_plan_memory():
+    plan = plan_memory(
+        100 * GB, 10 * GB, [{"reserved": 20 * GB}, {"reserved": 10 * GB}]
+    )
+    assert plan["headroom"] == 10 * GB
+    assert plan["other_servers"] == 30 * GB
+    assert plan["budget"] == 50 * GB
+    assert plan["memory_for_queries"] == "25G"
+    assert plan["cache_max_size"] == "15G"
+    assert plan["cache_max_size_single_entry"] == "3G"
+    assert plan["cache_max_num_entries"] == 1500
+    assert plan["page_cache"] == 10 * GB
+
+    # Not enough memory: a negative budget, and minimal parameters.
+    plan = plan_memory(10 * GB, 20 * GB, [])
+    assert plan["budget"] < 0
+    assert plan["cache_max_num_entries"] == 200
+
+
+def test_get_other_servers():
+    def process(pid, cmdline, rss):
+        proc = MagicMock()
+        proc.pid = pid
+        proc.cmdline.return_value = cmdline.split()
+        proc.memory_info.return_value.rss = rss
+        return proc
+
+    processes = [
+        process(1, "qlever-server -i a -p 7001 -m 5G -c 2G", 1 * GB),
+        process(2, "qlever-server -i b -p 7002 -m 1G -c 1G", 4 * GB),
+        process(3, "qlever-server -i c -p 7003", 3 * GB),
+        process(4, "bash -c qlever-server -p 7004", 1 * GB),
+    ]
+    with patch("psutil.process_iter", return_value=processes):
+        servers = get_other_servers(7003)
+    assert [(s["pid"], s["port"], s["reserved"]) for s in servers] == [
+        (1, 7001, 7 * GB),
+        (2, 7002, 4 * GB),
+    ]
+
+
+def test_get_index_resident_size(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for file_name, size in [
+        ("test.index.pso", 1000),
+        ("test.index.pso.meta", 10),
+        ("test.index.pos", 1000),
+        ("test.index.pos.meta", 20),
+        ("test.vocabulary.internal", 300),
+        ("test.vocabulary.external", 5000),
+        ("test.index.patterns", 40),
+        ("test.meta-data.json", 5),
+        ("test.internal.index.pso.meta", 2),
+        ("test.text.index", 700),
+    ]:
+        (tmp_path / file_name).write_bytes(b"x" * size)
+    assert get_index_resident_size("test") == 10 + 20 + 300 + 40 + 5 + 2
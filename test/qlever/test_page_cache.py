@@ -0,0 +1,30 @@
+import threading
+
+from qlever.page_cache import get_cached_size, prewarm_range
+
+
+def test_get_cached_size(tmp_path):
+    path = tmp_path / "file"
+    path.write_bytes(b"x" * 100_000)
+    # The file was just written, so it is (still) in the page cache.
+    assert get_cached_size(str(path)) == 100_000
+    (tmp_path / "empty").write_bytes(b"")
+    assert get_cached_size(str(tmp_path / "empty")) == 0
+    assert get_cached_size(str(tmp_path / "missing")) is None
+
+
+def test_prewarm_range(tmp_path):
+    path = tmp_path / "file"
+    path.write_bytes(b"x" * 100_000)
+    progress = []
+    prewarm_range(str(path), 1000, 50_000, "read", progress.append)
+    assert sum(progress) == 50_000
+    # Reading stops at the end of the file and when cancelled.
+    progress = []
+    prewarm_range(str(path), 90_000, 50_000, "read", progress.append)
+    assert sum(progress) == 10_000
+    cancelled = threading.Event()
+    cancelled.set()
+    progress = []
+    prewarm_range(str(path), 0, 50_000, "read", progress.append, cancelled)
+    assert progress == []
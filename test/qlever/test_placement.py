@@ -0,0 +1,113 @@
+import argparse
+from unittest.mock import patch
+
+from qlever.containerize import Containerize
+from qlever.placement import (
+    check_placement,
+    get_native_placement_prefix,
+    get_numa_topology,
+)
+
+
+def get_args(**kwargs):
+    args = argparse.Namespace(
+        system="native",
+        cpuset_cpus=None,
+        cpuset_mems=None,
+        numa_memory_policy="bind",
+    )
+    for key, value in kwargs.items():
+        setattr(args, key, value)
+    return args
+
+
+def test_get_native_placement_prefix():
+    assert get_native_placement_prefix(get_args()) == ""
+    assert (
+        get_native_placement_prefix(get_args(cpuset_cpus="0-7,16-23"))
+        == "taskset -c 0-7,16-23 "
+    )
+    assert (
+        get_native_placement_prefix(get_args(cpuset_mems="1"))
+        == "numactl --membind=1 --cpunodebind=1 "
+    )
+    assert (
+        get_native_placement_prefix(
+            get_args(cpuset_mems="0", cpuset_cpus="0-3")
+        )
+        == "numactl --membind=0 --physcpubind=0-3 "
+    )
+    assert (
+        get_native_placement_prefix(
+            get_args(cpuset_mems="0,1", numa_memory_policy="interleave")
+        )
+        == "numactl --interleave=0,1 "
+    )
+    assert (
+        get_native_placement_prefix(
+            get_args(cpuset_mems="1", numa_memory_policy="preferred")
+        )
+        == "numactl --preferred=1 --cpunodebind=1 "
+    )
+
+
+@patch("qlever.placement.shutil.which", return_value="/usr/bin/numactl")
+def test_check_placement(mock_which):
+    assert check_placement(get_args())
+    assert check_placement(get_args(cpuset_cpus="0-3,8", cpuset_mems="0"))
+    assert not check_placement(get_args(cpuset_cpus="0-3;8"))
+    assert not check_placement(get_args(cpuset_mems="first"))
+    assert not check_placement(
+        get_args(cpuset_mems="0,1", numa_memory_policy="preferred")
+    )
+    mock_which.return_value = None
+    assert not check_placement(get_args(cpuset_mems="0"))
+    # In a container, no tool is needed.
+    assert check_placement(get_args(system="docker", cpuset_mems="0"))
+    assert check_placement(get_args())
+
+
+def test_containerize_command_with_cpusets():
+    cmd = Containerize.containerize_command(
+        "qlever-server -p 7001",
+        "docker",
+        "run -d",
+        "qlever",
+        "qlever.server.test",
+        cpuset_cpus="0-15",
+        cpuset_mems="0",
+    )
+    assert " --cpuset-cpus 0-15 --cpuset-mems 0 --name" in cmd
+
+
+def test_get_numa_topology(tmp_path):
+    for node, cpus, distances in [(0, "0-3", "10 21"), (1, "4-7", "21 10")]:
+        node_dir = tmp_path / f"node{node}"
+        node_dir.mkdir()
+        (node_dir / "cpulist").write_text(f"{cpus}\n")
+        (node_dir / "distance").write_text(f"{distances}\n")
+        (node_dir / "meminfo").write_text(
+            f"Node {node} MemTotal:       1048576 kB\n"
+            f"Node {node} MemFree:         524288 kB\n"
+        )
+    (tmp_path / "possible").write_text("0-1\n")
+    with patch("qlever.placement.NUMA_NODE_DIR", str(tmp_path)):
+        nodes = get_numa_topology()
+    assert nodes == [
+        {
+            "node": 0,
+            "cpus": "0-3",
+            "memory_total": 1 << 30,
+            "memory_free": 1 << 29,
+            "distances": [10, 21],
+        },
+        {
+            "node": 1,
+            "cpus": "4-7",
+            "memory_total": 1 << 30,
+            "memory_free": 1 << 29,
+            "distances": [21, 10],
+        },
+    ]
+    with patch("qlever.placement.NUMA_NODE_DIR", str(tmp_path / "none")):
+        assert get_numa_topology() == []
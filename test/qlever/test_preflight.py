@@ -0,0 +1,91 @@
+import sys
+
+import pytest
+
+from qlever.preflight import TurtleChecker, check_input_stream
+
+
+def check_lines(lines, parallel=False):
+    checker = TurtleChecker(parallel=parallel)
+    for line in lines:
+        checker.check_line(line.encode("utf-8"))
+    return checker
+
+
+def test_turtle_checker_counts_triples():
+    checker = check_lines(
+        [
+            "@prefix ex: <http://example.org/> .\n",
+            'ex:a ex:b "x"@en , 1.5 ; ex:c """multi\n',
+            'line""" .\n',
+            "<http://s> <http://p> _:b1 .\n",
+        ]
+    )
+    assert checker.num_errors == 0
+    assert checker.num_triples == 4
+    assert checker.num_lines == 4
+
+
+def test_turtle_checker_reports_errors_with_offsets():
+    checker = check_lines(
+        [
+            "@prefix ex: <http://example.org/> .\n",
+            "foo:a ex:b ex:c .\n",
+            "@prefix late: <http://late.org/> .\n",
+            'ex:a ex:b "unterminated .\n',
+        ],
+        parallel=True,
+    )
+    assert checker.num_errors == 3
+    assert checker.errors[0] == {
+        "offset": 36,
+        "line": 2,
+        "message": 'Undeclared prefix "foo:"',
+    }
+    assert checker.errors[1]["line"] == 3
+    assert "parallel parsing" in checker.errors[1]["message"]
+    assert checker.errors[2]["offset"] == 36 + 18 + 35 + 10
+
+
+def test_check_input_stream():
+    result = check_input_stream(
+        "printf '<http://s> <http://p> \"%s\" .\\n' 1 2 3 4 5"
+    )
+    assert result["completed"]
+    assert result["cmd_error"] is None
+    assert result["num_triples"] == 5
+    assert result["estimated_num_triples"] == 5
+    assert result["num_errors"] == 0
+
+    result = check_input_stream("echo '<http://s> <http://p> 1 .'; exit 3")
+    assert result["cmd_error"] == "Command failed with exit code 3"
+
+
+def test_check_input_stream_with_many_stderr_lines():
+    # More output on stderr than fits into a pipe must not block.
+    result = check_input_stream(
+        "head -c 1000000 /dev/zero >&2; echo '<http://s> <http://p> 1 .'"
+    )
+    assert result["cmd_error"] is None
+    assert result["num_triples"] == 1
+
+
+# The positions in the open files are only available on Linux.
+@pytest.mark.skipif(
+    not sys.platform.startswith("linux"), reason="needs file positions"
+)
+def test_check_input_stream_estimate_for_several_files(tmp_path):
+    input_files = []
+    for i in range(3):
+        input_files.append(tmp_path / f"part-{i}.nt")
+        input_files[-1].write_text(
+            "".join(f"<http://s{j}> <http://p> {i} .\n" for j in range(50000))
+        )
+    result = check_input_stream(
+        " ".join(["cat"] + [str(file) for file in input_files]),
+        max_bytes=input_files[0].stat().st_size * 5 // 2,
+    )
+    assert not result["completed"]
+    # The estimate is relative to all files, not only the one being read.
+    assert result["estimated_num_triples"] is not None
+    assert 130000 < result["estimated_num_triples"] < 170000
@@ -0,0 +1,124 @@
+import time
+
+import pytest
+
+from qlever import qleverfile
+from qlever.qleverfile import Qleverfile
+
+
+@pytest.fixture
+def qleverfile_path(tmp_path, monkeypatch):
+    # Substitutions that count their evaluations in `runs.txt`.
+    monkeypatch.setattr(
+        qleverfile, "SUBSTITUTION_CACHE_DIR", tmp_path / "cache"
+    )
+    monkeypatch.setattr(qleverfile, "SUBSTITUTION_CACHE_MIN_SECONDS", 0)
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "Qleverfile"
+    path.write_text(
+        "[data]\n"
+        "NAME = test\n"
+        "SIZE = $$(echo size >> runs.txt && echo 42)\n"
+        "DATE = $$volatile(echo date >> runs.txt && echo today)\n"
+        "DESCRIPTION = ${NAME} with ${SIZE} triples from ${DATE}\n"
+    )
+    return path
+
+
+def get_runs(tmp_path):
+    # The substitutions are evaluated concurrently, so their order in
+    # `runs.txt` is arbitrary.
+    return sorted((tmp_path / "runs.txt").read_text().split())
+
+
+def test_read_with_substitution_cache(qleverfile_path, tmp_path):
+    for _ in range(2):
+        config = Qleverfile.read(qleverfile_path)
+        assert config["data"]["size"] == "42"
+        assert config["data"]["date"] == "today"
+        assert config["data"]["description"] == (
+            "test with 42 triples from today"
+        )
+    # The volatile substitution is evaluated each time, the other only once.
+    assert get_runs(tmp_path) == ["date", "date", "size"]
+
+    # Without the cache, all substitutions are evaluated again.
+    Qleverfile.read(qleverfile_path, use_cache=False)
+    assert get_runs(tmp_path) == ["date", "date", "date", "size", "size"]
+
+    # When the Qleverfile changes, the cached values are no longer used.
+    qleverfile_path.write_text(
+        qleverfile_path.read_text().replace("echo 42", "echo 43")
+    )
+    assert Qleverfile.read(qleverfile_path)["data"]["size"] == "43"
+    assert get_runs(tmp_path) == ["date"] * 4 + ["size"] * 3
+
+
+def test_fast_substitutions_are_not_cached(
+    qleverfile_path, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(qleverfile, "SUBSTITUTION_CACHE_MIN_SECONDS", 60)
+    for _ in range(2):
+        Qleverfile.read(qleverfile_path)
+    assert get_runs(tmp_path) == ["date", "date", "size", "size"]
+
+
+def test_substitutions_are_evaluated_concurrently(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        qleverfile, "SUBSTITUTION_CACHE_DIR", tmp_path / "cache"
+    )
+    path = tmp_path / "Qleverfile"
+    path.write_text(
+        "[data]\n"
+        "NAME = test\n"
+        "A = $$(sleep 0.5 && echo a)\n"
+        "B = $$(sleep 0.5 && echo b)\n"
+        "C = ${A}-${B}\n"
+        "[index]\n"
+        "D = $$(echo ${data:C}-d)\n"
+        "E = $$(echo ${D}-e)\n"
+    )
+    start_time = time.monotonic()
+    config = Qleverfile.read(path, use_cache=False)
+    assert time.monotonic() - start_time < 0.9
+    # The substitutions that depend on others see their values.
+    assert config["index"]["d"] == "a-b-d"
+    assert config["index"]["e"] == "a-b-d-e"
+
+
+def test_get_substitution_dependencies(tmp_path):
+    path = tmp_path / "Qleverfile"
+    path.write_text(
+        "[data]\n"
+        "A = $$(echo a)\n"
+        "B = ${A}\n"
+        "C = $$(echo ${B})\n"
+        "[index]\n"
+        "D = $$volatile(echo ${data:C} ${data:A})\n"
+    )
+    config = qleverfile.ConfigParser(
+        interpolation=qleverfile.ExtendedInterpolation()
+    )
+    config.read(path)
+    assert Qleverfile.get_substitution_dependencies(config) == {
+        ("data", "a"): set(),
+        ("data", "c"): {("data", "a")},
+        ("index", "d"): {("data", "a"), ("data", "c")},
+    }
+
+
+def test_substitution_timeout(tmp_path, monkeypatch):
+    monkeypatch.setattr(qleverfile, "SUBSTITUTION_TIMEOUT_SECONDS", 0.2)
+    path = tmp_path / "Qleverfile"
+    path.write_text("[data]\nA = $$(sleep 10)\n")
+    start_time = time.monotonic()
+    with pytest.raises(SystemExit):
+        Qleverfile.read(path, use_cache=False)
+    assert time.monotonic() - start_time < 5
+
+
+def test_cyclic_substitutions(tmp_path):
+    path = tmp_path / "Qleverfile"
+    path.write_text("[data]\nA = $$(echo ${B})\nB = $$(echo ${A})\n")
+    with pytest.raises(qleverfile.QleverfileException, match="Cyclic"):
+        Qleverfile.read(path, use_cache=False)
@@ -0,0 +1,111 @@
+import pytest
+
+from qlever.query_batch import (
+    fold_queries,
+    get_fold_obstacle,
+    instantiate_template,
+    read_batch,
+    read_parameters,
+    split_folded_result,
+)
+
+TEMPLATE = "PREFIX x: <http://x/> SELECT ?v WHERE { %e% x:p ?v }"
+
+
+def test_read_batch(tmp_path):
+    batch_file = tmp_path / "batch.tsv"
+    batch_file.write_text("q1\tSELECT  *  WHERE { ?s ?p ?o }\n\nASK {}\n")
+    assert read_batch(str(batch_file)) == [
+        ("q1", "SELECT * WHERE { ?s ?p ?o }"),
+        ("3", "ASK {}"),
+    ]
+    batch_file = tmp_path / "batch.jsonl"
+    batch_file.write_text('{"id": "a", "query": "ASK {}"}\n{"query": "X"}\n')
+    assert read_batch(str(batch_file)) == [("a", "ASK {}"), ("2", "X")]
+    batch_file.write_text('{"id": "a"}\n')
+    with pytest.raises(ValueError, match="key `query`"):
+        read_batch(str(batch_file))
+
+
+def test_read_parameters(tmp_path):
+    params_file = tmp_path / "params.tsv"
+    params_file.write_text("e\tn\nx:a\t1\nx:b\t2\n")
+    assert read_parameters(str(params_file)) == (
+        ["e", "n"],
+        [["x:a", "1"], ["x:b", "2"]],
+    )
+    params_file.write_text("e\tn\nx:a\n")
+    with pytest.raises(ValueError, match="has 1 values"):
+        read_parameters(str(params_file))
+
+
+def test_instantiate_template():
+    assert instantiate_template(TEMPLATE, ["e"], ["x:a"]) == (
+        "PREFIX x: <http://x/> SELECT ?v WHERE { x:a x:p ?v }"
+    )
+    assert instantiate_template("%e% %other%", ["e"], ["1"]) == "1 %other%"
+
+
+def test_get_fold_obstacle():
+    rows = [["x:a"], ["<http://b>"]]
+    assert get_fold_obstacle(TEMPLATE, ["e"], rows) is None
+    # Variables that look like aggregates are fine.
+    assert (
+        get_fold_obstacle(
+            "SELECT ?count WHERE { %e% x:p ?count }", ["e"], [["1"]]
+        )
+        is None
+    )
+    for template, obstacle in [
+        ("ASK { %e% ?p ?o }", "not a SELECT query"),
+        ("SELECT (COUNT(?v) AS ?n) WHERE { %e% x:p ?v }", "uses COUNT"),
+        ("SELECT ?v WHERE { %e% x:p ?v } LIMIT 10", "uses LIMIT"),
+        ("SELECT ?v WHERE { OPTIONAL { %e% x:p ?v } }", "uses OPTIONAL"),
+        ("SELECT * WHERE { { SELECT ?v WHERE { %e% ?p ?v } } }", "subquery"),
+        ("SELECT ?v WHERE { <http://x/%e%> x:p ?v }", "inside an IRI"),
+        ("SELECT ?v WHERE { ?s x:p ?v }", "not in the WHERE clause"),
+        (
+            "SELECT ?x WHERE { { ?x <p> ?y FILTER(?y = %e%) } "
+            "UNION { ?x <q> ?y } }",
+            "inside a nested group",
+        ),
+        ("SELECT ?v WHERE { GRAPH ?g { %e% x:p ?v } }", "nested group"),
+    ]:
+        assert obstacle in get_fold_obstacle(template, ["e"], [["x:a"]])
+    assert "not an RDF term" in get_fold_obstacle(
+        TEMPLATE, ["e"], [["x:a } ?s ?p ?o {"]]
+    )
+
+
+def test_fold_queries():
+    assert fold_queries(TEMPLATE, ["e"], [["x:a"], ["x:b"]]) == (
+        "PREFIX x: <http://x/> SELECT ?qlever_batch_row ?v WHERE {"
+        " VALUES (?qlever_batch_row ?qlever_batch_e) { (0 x:a) (1 x:b) }"
+        " ?qlever_batch_e x:p ?v }"
+    )
+    # With `SELECT *`, the variables of the VALUES clause are selected
+    # anyway.
+    assert fold_queries(
+        "SELECT DISTINCT * WHERE { %e% ?p ?o }", ["e"], [["1"]]
+    ).startswith("SELECT DISTINCT * WHERE { VALUES")
+
+
+def test_split_folded_result():
+    result = {
+        "head": {"vars": ["qlever_batch_row", "qlever_batch_e", "v"]},
+        "results": {
+            "bindings": [
+                {
+                    "qlever_batch_row": {"type": "literal", "value": "2"},
+                    "qlever_batch_e": {"type": "uri", "value": "http://x/c"},
+                    "v": {"type": "literal", "value": "c"},
+                }
+            ]
+        },
+    }
+    results = split_folded_result(result, 3)
+    assert [len(r["results"]["bindings"]) for r in results] == [0, 0, 1]
+    assert results[2] == {
+        "head": {"vars": ["v"]},
+        "results": {"bindings": [{"v": {"type": "literal", "value": "c"}}]},
+    }
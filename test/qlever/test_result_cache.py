@@ -0,0 +1,75 @@
+import os
+
+from qlever.result_cache import ResultCache, normalize_endpoint
+
+
+def write_result(tmp_path, name, size):
+    result_file = tmp_path / name
+    result_file.write_bytes(b"x" * size)
+    return str(result_file)
+
+
+def test_normalize_endpoint():
+    assert normalize_endpoint("localhost:7001") == "http://localhost:7001"
+    assert normalize_endpoint("https://x.org/api/") == "https://x.org/api"
+
+
+def test_get_key(tmp_path):
+    cache = ResultCache(1000, tmp_path / "cache")
+    key = cache.get_key("localhost:7001", "index", "ASK {}", "text/csv")
+    assert key == cache.get_key(
+        "http://localhost:7001/", "index", "ASK {}", "text/csv"
+    )
+    for other in [
+        ("localhost:7002", "index", "ASK {}", "text/csv"),
+        ("localhost:7001", "other-index", "ASK {}", "text/csv"),
+        ("localhost:7001", "index", "ASK { }", "text/csv"),
+        ("localhost:7001", "index", "ASK {}", "text/tab-separated-values"),
+    ]:
+        assert cache.get_key(*other) != key
+
+
+def test_store_and_lookup(tmp_path):
+    cache = ResultCache(1000, tmp_path / "cache")
+    assert cache.lookup("localhost:7001", "k1") is None
+    assert cache.store(
+        "localhost:7001", "k1", write_result(tmp_path, "r", 10), 1.5
+    )
+    result_file, seconds = cache.lookup("localhost:7001", "k1")
+    assert result_file.read_bytes() == b"x" * 10 and seconds == 1.5
+    assert cache.lookup("localhost:7002", "k1") is None
+    assert cache.format_stats() == "1 hit, 2 misses"
+
+    # A result that is larger than the whole cache is not stored.
+    assert not cache.store(
+        "localhost:7001", "k2", write_result(tmp_path, "r", 1001), 1.0
+    )
+
+
+def test_evict_least_recently_used(tmp_path):
+    cache = ResultCache(250, tmp_path / "cache")
+    for i, key in enumerate(["k1", "k2"]):
+        cache.store("localhost:7001", key, write_result(tmp_path, key, 100), 1)
+        endpoint_dir = cache.get_endpoint_dir("localhost:7001")
+        os.utime(endpoint_dir / f"{key}.result", (i, i))
+    # Using `k1` makes `k2` the least recently used result.
+    assert cache.lookup("localhost:7001", "k1") is not None
+    cache.store("localhost:7001", "k3", write_result(tmp_path, "k3", 100), 1)
+    assert cache.lookup("localhost:7001", "k2") is None
+    assert cache.lookup("localhost:7001", "k1") is not None
+    assert cache.lookup("localhost:7001", "k3") is not None
+
+
+def test_invalidate(tmp_path):
+    cache = ResultCache(1000, tmp_path / "cache")
+    assert cache.invalidate("localhost:7001") == 0
+    key = cache.get_key("localhost:7001", "index", "ASK {}", "text/csv")
+    cache.store("localhost:7001", key, write_result(tmp_path, "r", 10), 1)
+    assert cache.invalidate("localhost:7001") == 1
+    assert cache.get_generation("localhost:7001") == 1
+    assert cache.lookup("localhost:7001", key) is None
+    # A result that was computed before the update (and stored after it)
+    # is never served again.
+    assert key != cache.get_key(
+        "localhost:7001", "index", "ASK {}", "text/csv"
+    )
@@ -0,0 +1,144 @@
+import gzip
+import io
+from unittest.mock import patch
+
+import pytest
+
+from qlever.result_export import (
+    concatenate_parts,
+    download_page,
+    format_throughput,
+    get_compressor,
+    get_key_range,
+    get_paged_queries,
+    get_range_queries,
+    split_prologue,
+)
+
+QUERY = "PREFIX x: <http://x/>\nSELECT ?k ?v WHERE { ?k x:p ?v }"
+RESULT = b"?k\t?v\n1\ta\n2\tb\n3\tc\n"
+
+
+def test_get_compressor():
+    with patch("qlever.result_export.shutil.which", return_value="/bin/x"):
+        assert get_compressor("result.tsv.gz") == ["gzip", "-c"]
+        assert get_compressor("result.tsv.zst")[0] == "zstd"
+        assert get_compressor("result.tsv") is None
+    with patch("qlever.result_export.shutil.which", return_value=None):
+        with pytest.raises(Exception, match="not installed"):
+            get_compressor("result.tsv.zst")
+
+
+def test_split_prologue():
+    assert split_prologue(QUERY) == (
+        "PREFIX x: <http://x/>\n",
+        "SELECT ?k ?v WHERE { ?k x:p ?v }",
+    )
+    assert split_prologue("  ASK { ?s ?p ?o } ") == ("", "ASK { ?s ?p ?o }")
+
+
+def test_get_paged_queries():
+    queries = get_paged_queries(QUERY, 3, 10, ["?k", "?v"])
+    assert queries[0] == (
+        "PREFIX x: <http://x/>\nSELECT * WHERE "
+        "{ SELECT ?k ?v WHERE { ?k x:p ?v } } "
+        "ORDER BY ?k ?v LIMIT 4 OFFSET 0"
+    )
+    assert [query.split("LIMIT")[1] for query in queries] == [
+        " 4 OFFSET 0",
+        " 4 OFFSET 4",
+        " 4 OFFSET 8",
+    ]
+
+
+def test_get_range_queries():
+    queries = get_range_queries(QUERY, 3, "?k", 1, 10)
+    assert [query.split("FILTER")[1] for query in queries] == [
+        "(?k >= 1 && ?k < 5) }",
+        "(?k >= 5 && ?k < 9) }",
+        "(?k >= 9 && ?k <= 10) }",
+        "(!BOUND(?k) || !isNumeric(?k)) }",
+    ]
+    assert queries[0].startswith("PREFIX x: <http://x/>\nSELECT * WHERE")
+    queries = get_range_queries(QUERY, 2, "?k", 0.0, 1.0)
+    assert [query.split("FILTER")[1] for query in queries] == [
+        "(?k >= 0.0 && ?k < 0.5) }",
+        "(?k >= 0.5 && ?k <= 1.0) }",
+        "(!BOUND(?k) || !isNumeric(?k)) }",
+    ]
+
+
+@patch("qlever.result_export.get_json_result")
+def test_get_key_range(mock_get_json_result):
+    mock_get_json_result.return_value = {
+        "results": {
+            "bindings": [{"min": {"value": "1"}, "max": {"value": "10"}}]
+        }
+    }
+    assert get_key_range("http://localhost:7001", QUERY, "?k") == (1, 10)
+    # Only the numeric values count (the others are in an extra page).
+    assert "FILTER(isNumeric(?k))" in mock_get_json_result.call_args[0][1]
+    mock_get_json_result.return_value = {"results": {"bindings": [{}]}}
+    with pytest.raises(Exception, match="no numeric values"):
+        get_key_range("http://localhost:7001", QUERY, "?k")
+
+
+@patch("qlever.result_export.urllib.request.urlopen")
+def test_download_page(mock_urlopen, tmp_path):
+    mock_urlopen.return_value = io.BytesIO(RESULT)
+    part_file = str(tmp_path / "part-1")
+    result = download_page(
+        "http://localhost:7001",
+        QUERY,
+        "text/tab-separated-values",
+        part_file,
+        None,
+        skip_header=False,
+    )
+    assert result == (3, len(RESULT))
+    with open(part_file, "rb") as file:
+        assert file.read() == RESULT
+
+    # Without the header, and compressed.
+    mock_urlopen.return_value = io.BytesIO(RESULT)
+    result = download_page(
+        "http://localhost:7001",
+        QUERY,
+        "text/tab-separated-values",
+        part_file,
+        ["gzip", "-c"],
+        skip_header=True,
+    )
+    assert result == (3, len(RESULT) - 6)
+    with gzip.open(part_file, "rb") as file:
+        assert file.read() == RESULT[6:]
+
+    # A result without a header line.
+    mock_urlopen.return_value = io.BytesIO(b"no header")
+    with pytest.raises(Exception, match="no header"):
+        download_page(
+            "http://localhost:7001",
+            QUERY,
+            "text/csv",
+            part_file,
+            None,
+            skip_header=False,
+        )
+
+
+def test_concatenate_parts(tmp_path):
+    part_files = []
+    for i, text in enumerate([b"?k\n1\n", b"2\n", b"3\n"]):
+        part_files.append(str(tmp_path / f"part-{i}"))
+        with gzip.open(part_files[-1], "wb") as file:
+            file.write(text)
+    output_file = str(tmp_path / "result.tsv.gz")
+    concatenate_parts(part_files, output_file)
+    with gzip.open(output_file, "rb") as file:
+        assert file.read() == b"?k\n1\n2\n3\n"
+
+
+def test_format_throughput():
+    assert format_throughput(1000, 2_000_000, 2.0) == (
+        "1,000 rows, 2.0 MB in 2.0s (500 rows/s, 1.0 MB/s)"
+    )
@@ -0,0 +1,114 @@
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest.mock import patch
+
+from qlever.server_startup import (
+    ServerStartupWatcher,
+    get_startup_phases,
+    ping_server,
+    probe_query,
+)
+
+SERVER_LOG = [
+    "2025-01-01 10:00:00.000 - INFO: QLever Server, compiled on ...",
+    "2025-01-01 10:00:00.500 - INFO: Initializing server ...",
+    "2025-01-01 10:00:01.000 - INFO: Reading vocabulary from file ...",
+    "2025-01-01 10:00:05.000 - INFO: Done, vocabulary size: 1,234",
+    "2025-01-01 10:00:05.000 - INFO: Reading patterns from file ...",
+    "2025-01-01 10:00:06.500 - INFO: Number of triples: 5,678",
+    "2025-01-01 10:00:07.000 - INFO: The server is ready, listening for "
+    "requests on port 7001 ...",
+]
+
+
+def test_get_startup_phases():
+    assert get_startup_phases(SERVER_LOG) == [
+        ("Other", 1.0),
+        ("Vocabulary", 4.0),
+        ("Patterns", 2.0),
+    ]
+    assert get_startup_phases([]) == []
+    assert get_startup_phases(["no timestamp"]) == []
+
+
+def test_ping_server():
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.send_response(404)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("localhost", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        assert ping_server(f"http://localhost:{server.server_port}")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # A port on which nobody is listening.
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        port = sock.getsockname()[1]
+    assert not ping_server(f"http://localhost:{port}")
+
+
+@patch("qlever.server_startup.ping_server")
+def test_wait_ready_after_ready_line(mock_ping_server, tmp_path):
+    log_file = tmp_path / "test.server-log.txt"
+    log_file.write_text("\n".join(SERVER_LOG) + "\n")
+    mock_ping_server.side_effect = lambda url: watcher.ready_line_seen
+    watcher = ServerStartupWatcher(
+        str(log_file), "http://localhost:7001", echo_log=False
+    )
+    assert watcher.wait(timeout=5) == "ready"
+    assert watcher.log_lines == SERVER_LOG
+
+
+@patch("qlever.server_startup.ping_server", return_value=False)
+def test_wait_exited_and_timeout(mock_ping_server, tmp_path):
+    log_file = tmp_path / "test.server-log.txt"
+    watcher = ServerStartupWatcher(
+        str(log_file), "http://localhost:7001", lambda: False, echo_log=False
+    )
+    assert watcher.wait(timeout=5) == "exited"
+
+    watcher = ServerStartupWatcher(
+        str(log_file), "http://localhost:7001", lambda: True, echo_log=False
+    )
+    assert watcher.wait(timeout=0.2) == "timeout"
+
+
+def test_probe_query():
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers["Content-Length"])
+            body = self.rfile.read(length).decode()
+            if "send=0" in body and "LIMIT" in body:
+                self.send_response(200)
+                result = b'{"resultsize": 1}'
+            else:
+                self.send_response(400)
+                result = b'{"exception": "Invalid SPARQL query"}'
+            self.end_headers()
+            self.wfile.write(result)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("localhost", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        url = f"http://localhost:{server.server_port}"
+        seconds, error = probe_query(url, "SELECT * { ?s ?p ?o } LIMIT 1")
+        assert error is None and seconds >= 0
+        _, error = probe_query(url, "SELEKT")
+        assert error == "Invalid SPARQL query"
+    finally:
+        server.shutdown()
+        server.server_close()
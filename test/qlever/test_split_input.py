@@ -0,0 +1,52 @@
+import bz2
+import io
+
+import pytest
+
+from qlever.split_input import (
+    BZ2_BLOCK_MAGIC,
+    find_magic,
+    get_line_aligned_offsets,
+    write_bz2_part,
+)
+
+LINES = [f'<s{i}> <p> "{"x" * (i % 97)}" .\n'.encode() for i in range(20000)]
+
+
+def test_find_magic_at_any_bit_offset():
+    for shift in range(12):
+        data = (BZ2_BLOCK_MAGIC << (40 - shift)).to_bytes(11, "big")
+        assert find_magic(data, BZ2_BLOCK_MAGIC) == shift
+        assert find_magic(data, BZ2_BLOCK_MAGIC, shift + 1) == -1
+
+
+def test_get_line_aligned_offsets(tmp_path):
+    input_file = tmp_path / "input.nt"
+    input_file.write_bytes(b"".join(LINES))
+    data = input_file.read_bytes()
+    offsets = get_line_aligned_offsets(str(input_file), 7)
+    assert len(offsets) == 8
+    assert offsets[0] == 0 and offsets[-1] == len(data)
+    assert all(data[offset - 1] == ord("\n") for offset in offsets[1:])
+
+
+@pytest.mark.parametrize("num_parts", [1, 2, 5, 50])
+@pytest.mark.parametrize("num_streams", [1, 3])
+def test_write_bz2_part(tmp_path, num_parts, num_streams):
+    # Compress with the smallest block size, so that there are many blocks
+    # (and optionally several streams, like `pbzip2` writes them).
+    data = b"".join(LINES)
+    input_file = tmp_path / "input.nt.bz2"
+    stream_size = len(data) // num_streams + 1
+    input_file.write_bytes(
+        b"".join(
+            bz2.compress(data[i:i + stream_size], 1)
+            for i in range(0, len(data), stream_size)
+        )
+    )
+    parts = []
+    for part in range(num_parts):
+        output = io.BytesIO()
+        write_bz2_part(str(input_file), part, num_parts, output)
+        parts.append(output.getvalue())
+    assert b"".join(parts) == data
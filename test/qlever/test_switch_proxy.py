@@ -0,0 +1,81 @@
+import socket
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.request import urlopen
+
+from qlever.switch_proxy import (
+    find_switch_proxy,
+    read_backend_port,
+    write_backend_port,
+)
+
+
+def get_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+def start_backend(text: str) -> HTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(text.encode())
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("localhost", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_write_and_read_backend_port(tmp_path):
+    backend_file = str(tmp_path / "backend")
+    write_backend_port(backend_file, 7002)
+    assert read_backend_port(backend_file) == 7002
+    write_backend_port(backend_file, 7003)
+    assert read_backend_port(backend_file) == 7003
+    assert not (tmp_path / "backend.tmp").exists()
+
+
+def test_proxy_switches_backend(tmp_path):
+    blue, green = start_backend("blue"), start_backend("green")
+    backend_file = str(tmp_path / "backend")
+    write_backend_port(backend_file, blue.server_port)
+    port = get_free_port()
+    proxy = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "qlever.switch_proxy",
+            "--port",
+            str(port),
+            "--backend-file",
+            backend_file,
+        ]
+    )
+    try:
+        for _ in range(100):
+            try:
+                with urlopen(f"http://localhost:{port}") as response:
+                    assert response.read() == b"blue"
+                break
+            except OSError:
+                time.sleep(0.05)
+        else:
+            raise AssertionError("The proxy does not respond")
+        assert find_switch_proxy(port)[1] == backend_file
+        write_backend_port(backend_file, green.server_port)
+        with urlopen(f"http://localhost:{port}") as response:
+            assert response.read() == b"green"
+    finally:
+        proxy.terminate()
+        proxy.wait()
+        blue.shutdown()
+        green.shutdown()
+    assert find_switch_proxy(port) is None
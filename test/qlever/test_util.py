@@ -1,4 +1,11 @@
-from qlever.util import get_random_string
+import pytest
+
+from qlever.util import (
+    format_size,
+    get_random_string,
+    parse_size,
+    partition_by_size,
+)
 
 
 def test_get_random_string():
@@ -7,3 +14,34 @@ def test_get_random_string():
     assert len(random_string_1) == 20
     assert len(random_string_2) == 20
     assert random_string_1 != random_string_2
+
+
+def test_format_size():
+    assert format_size(1253656) == "1.20 MB"
+    assert format_size(5 * 1024**3) == "5.00 GB"
+    assert format_size(-5 * 1024**3) == "-5.00 GB"
+
+
+def test_parse_size():
+    assert parse_size("1024") == 1024
+    assert parse_size("5G") == 5 * 1024**3
+    assert parse_size("500 MB") == 500 * 1024**2
+    assert parse_size("1.5T") == int(1.5 * 1024**4)
+    with pytest.raises(ValueError):
+        parse_size("five gigabytes")
+
+
+def test_partition_by_size():
+    assert partition_by_size([1, 1, 1, 1], 2) == [range(0, 2), range(2, 4)]
+    assert partition_by_size([5, 1, 1, 1, 1, 1], 2) == [
+        range(0, 1),
+        range(1, 6),
+    ]
+    # No empty parts, even if the first item is huge.
+    assert partition_by_size([100, 1, 1], 3) == [
+        range(0, 1),
+        range(1, 2),
+        range(2, 3),
+    ]
+    assert partition_by_size([1, 2], 5) == [range(0, 1), range(1, 2)]
+    assert partition_by_size([], 3) == []
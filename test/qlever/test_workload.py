@@ -0,0 +1,29 @@
+import pytest
+
+from qlever.workload import read_query_file
+
+
+def test_read_query_file(tmp_path):
+    tsv_file = tmp_path / "log-queries.txt"
+    tsv_file.write_text("Q1\tSELECT  *\n\nASK {}\nQ1\tSELECT *\n")
+    assert read_query_file(str(tsv_file), "count", 1) == [
+        ("Q1", "SELECT *", 1),
+        ("", "ASK {}", 1),
+        ("Q1", "SELECT *", 1),
+    ]
+    yaml_file = tmp_path / "queries.yaml"
+    yaml_file.write_text(
+        "queries:\n"
+        "  - query: A\n    sparql: ASK  {}\n    priority: 2\n"
+        "  - sparql: SELECT *\n"
+    )
+    assert read_query_file(str(yaml_file), "priority", 0) == [
+        ("A", "ASK {}", 2),
+        ("", "SELECT *", 0),
+    ]
+    yaml_file.write_text("queries: 42\n")
+    with pytest.raises(ValueError, match="top-level key"):
+        read_query_file(str(yaml_file), "count", 1)
+    yaml_file.write_text("queries:\n  - query: A\n")
+    with pytest.raises(ValueError, match="key `sparql`"):
+        read_query_file(str(yaml_file), "count", 1)